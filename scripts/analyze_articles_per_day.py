@@ -1,41 +1,29 @@
 """
 Analyze dataset to understand articles per day distribution
+
+Counts come from the article store or the merged dataset's date index
+(see src/processing/article_query.py), so the dataset is not loaded.
 """
-import json
+import sys
 from collections import Counter, defaultdict
-from datetime import datetime
 from pathlib import Path
 
-# Load data
-data_file = Path("data/datasets/complete_dataset.json")
-with open(data_file, 'r', encoding='utf-8') as f:
-    articles = json.load(f)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.article_query import ArticleQuery
+
+query = ArticleQuery()
 
 print("="*70)
 print("📊 DATASET ANALYSIS: ARTICLES PER DAY")
 print("="*70)
 
-# Parse dates
-dates = []
-date_errors = 0
-
-for article in articles:
-    date_str = article.get('published_date', '')
-    if date_str:
-        try:
-            # Try DD/MM/YYYY format
-            dt = datetime.strptime(date_str, '%d/%m/%Y')
-            dates.append(dt.date())
-        except:
-            date_errors += 1
-    else:
-        date_errors += 1
-
-# Count by date
-date_counts = Counter(dates)
+date_counts = Counter(query.per_day())
+dated = sum(date_counts.values())
+date_errors = query.count() - dated
 
-print(f"\n📈 Total Articles: {len(articles):,}")
-print(f"✅ Articles with valid dates: {len(dates):,}")
+print(f"\n📈 Total Articles: {dated + date_errors:,}")
+print(f"✅ Articles with valid dates: {dated:,}")
 print(f"❌ Articles with date errors: {date_errors}")
 
 if date_counts:
@@ -1,16 +1,20 @@
-import json
+import sys
+from pathlib import Path
 
-# Load and check summarized dataset
-with open('data/datasets/summarized_dataset.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-summarized = [a for a in data if a.get('summarized')]
+from src.processing.article_query import ArticleQuery
 
-print(f"✅ Summarized: {len(summarized)}/{len(data)} articles ({len(summarized)/len(data)*100:.1f}%)")
+# Check summarization progress from the article store (or summarized dataset)
+query = ArticleQuery(dataset='data/datasets/summarized_dataset.json')
+total = query.count()
+summarized = query.count(summarized=True)
+
+print(f"✅ Summarized: {summarized}/{total} articles ({summarized/total*100:.1f}%)")
 print(f"\n📊 Sample Summary:")
 print("="*70)
-if summarized:
-    sample = summarized[5]
+sample = query.first(fields=['title', 'word_count', 'summary'], offset=5, summarized=True)
+if sample:
     print(f"Title: {sample['title'][:60]}...")
     print(f"Original: {sample['word_count']} words")
     print(f"\nSummary:\n{sample['summary'][:400]}")
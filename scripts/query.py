@@ -0,0 +1,18 @@
+"""
+Query the article corpus from the command line
+
+Examples:
+    python scripts/query.py --from 2024-01-01 --to 2024-01-31 --publisher Mint --fields title,url
+    python scripts/query.py --topic "Nifty 50 stock market India" --count
+    python scripts/query.py --text "repo rate" --summarized yes --limit 5
+    python scripts/query.py --per-day --from 2024-03-01
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.article_query import main
+
+if __name__ == "__main__":
+    main()
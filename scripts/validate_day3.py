@@ -1,5 +1,10 @@
-import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.article_query import ArticleQuery
 
 print("📊 DAY 3 VALIDATION")
 print("="*70)
@@ -20,16 +25,17 @@ for name, path in files.items():
     print(f"   {name}: {status}")
 
 # Check summarization progress
-data = json.load(open('data/datasets/summarized_dataset.json', 'r', encoding='utf-8'))
-summarized = [a for a in data if a.get('summarized')]
+query = ArticleQuery(dataset='data/datasets/summarized_dataset.json')
+total = query.count()
+summarized = query.count(summarized=True)
 
 print(f"\n✅ Summarization Progress:")
-print(f"   Total articles: {len(data)}")
-print(f"   Summarized: {len(summarized)} ({len(summarized)/len(data)*100:.1f}%)")
-print(f"   Remaining: {len(data)-len(summarized)}")
+print(f"   Total articles: {total}")
+print(f"   Summarized: {summarized} ({summarized/total*100:.1f}%)")
+print(f"   Remaining: {total-summarized}")
 
 # Check quality
-sample = summarized[0]
+sample = query.first(fields=['title', 'word_count', 'summary'], summarized=True)
 facts = sample['summary'].split('\n')
 
 print(f"\n✅ Sample Summary Quality:")
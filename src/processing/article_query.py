@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Article Query API
+Answer status and slicing questions from indexes instead of loading datasets
+
+Sources, in order of preference:
+1. SQLite article store (data/datasets/articles.db): every filter uses an
+   index or the FTS5 table
+2. A merged JSON dataset and its date index (<name>.dates.idx): date filters
+   and unfiltered counts come from the index, other filters scan lazily
+
+Results are streamed; nothing is loaded that the caller does not consume.
+
+Usage:
+    from src.processing.article_query import ArticleQuery
+    q = ArticleQuery()
+    q.count(summarized=True)
+    for article in q.articles(start='2024-01-01', end='2024-01-31',
+                              publishers=['Mint'], fields=['title', 'summary']):
+        ...
+
+    python scripts/query.py --from 2024-01-01 --to 2024-01-31 --publisher Mint --fields title,url
+    python scripts/query.py --text "RBI repo rate" --count
+    python scripts/query.py --per-day
+
+Author: StockBus Team
+"""
+
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.processing.article_store import ArticleStore, DEFAULT_PATH as DEFAULT_STORE
+from src.scraping.dates import DateIndex, article_day, parse_date
+
+DEFAULT_DATASET = "data/datasets/complete_dataset.json"
+
+
+def _day(value):
+    """Query date (date, 'YYYY-MM-DD' or 'DD/MM/YYYY') to a date, None passes through"""
+    if value is None:
+        return None
+    dt = parse_date(value)
+    if dt is None:
+        raise ValueError(f"Unrecognized date: {value!r}")
+    return dt.date()
+
+
+class ArticleQuery:
+    """
+    Filtered, lazy access to the article corpus
+
+    Filters (all optional, combined with AND):
+        start, end: Inclusive published-date bounds
+        publishers, topics, processing: Keep only these values
+        summarized: True/False to select by summary state
+        text: Full-text query over title, body and summary
+
+    Args:
+        store_path: SQLite article store, used if it exists
+        dataset: JSON dataset used when there is no store
+    """
+
+    def __init__(self, store_path: str = DEFAULT_STORE, dataset: str = DEFAULT_DATASET):
+        store_path = project_root / store_path
+        self.store = ArticleStore(store_path) if store_path.exists() else None
+        self.dataset = project_root / dataset
+        self._date_index = None
+
+    @property
+    def source(self) -> str:
+        return str(self.store.path if self.store else self.dataset)
+
+    # ------------------------------------------------------------------
+    # SQLite store
+    # ------------------------------------------------------------------
+
+    def _where(self, start=None, end=None, publishers=None, topics=None,
+               processing=None, summarized=None, text=None):
+        conditions = []
+        params = []
+
+        if start is not None:
+            conditions.append("published_iso >= ?")
+            params.append(_day(start).isoformat())
+        if end is not None:
+            conditions.append("published_iso <= ?")
+            params.append(_day(end).isoformat())
+        for column, values in (('publisher', publishers), ('topic', topics), ('processing', processing)):
+            if values is not None:
+                values = list(values)
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if summarized is not None:
+            conditions.append("summarized = 1" if summarized else "summarized IS NOT 1")
+        if text:
+            if self.store.fts:
+                conditions.append("id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+                params.append(text)
+            else:
+                conditions.append("(title LIKE ? OR body LIKE ? OR summary LIKE ?)")
+                params.extend([f"%{text}%"] * 3)
+
+        return (' AND '.join(conditions) or None), params
+
+    # ------------------------------------------------------------------
+    # JSON dataset fallback
+    # ------------------------------------------------------------------
+
+    def _dates(self) -> Optional[DateIndex]:
+        if self._date_index is None:
+            path = DateIndex.path_for(self.dataset)
+            if path.exists():
+                self._date_index = DateIndex.load(path)
+        return self._date_index
+
+    def _scan(self, start=None, end=None, **filters) -> Iterator[Dict]:
+        """Stream dataset articles matching the filters"""
+        from src.scraping.json_stream import iter_json_records
+
+        index = self._dates()
+        start, end = _day(start), _day(end)
+        if index is not None and (start or end):
+            articles = index.read(self.dataset, start, end)
+        else:
+            articles = iter_json_records(self.dataset)
+
+        for article in articles:
+            if self._matches(article, start, end, **filters):
+                yield article
+
+    @staticmethod
+    def _matches(article, start=None, end=None, publishers=None, topics=None,
+                 processing=None, summarized=None, text=None) -> bool:
+        if start or end:
+            day = article_day(article)
+            if day is None or (start and day < start) or (end and day > end):
+                return False
+        if publishers is not None and article.get('publisher') not in publishers:
+            return False
+        if topics is not None and article.get('topic') not in topics:
+            return False
+        if processing is not None and article.get('processing') not in processing:
+            return False
+        if summarized is not None and bool(article.get('summarized')) != summarized:
+            return False
+        if text:
+            haystack = ' '.join(article.get(k) or '' for k in ('title', 'body', 'summary')).lower()
+            if not all(word in haystack for word in text.lower().split()):
+                return False
+        return True
+
+    @staticmethod
+    def _only_dates(filters) -> bool:
+        return all(v is None for k, v in filters.items() if k not in ('start', 'end'))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def articles(self, fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                 offset: int = 0, **filters) -> Iterator[Dict]:
+        """Lazily yield matching articles (store results are date-ordered when a date bound is given)"""
+        if self.store:
+            where, params = self._where(**filters)
+            order = 'published_iso, id' if filters.get('start') or filters.get('end') else 'id'
+            articles = self.store.iter_articles(where, params, fields=fields, order_by=order,
+                                                limit=limit, offset=offset)
+        else:
+            articles = self._scan(**filters)
+            if offset:
+                articles = itertools.islice(articles, offset, None)
+            if fields:
+                keep = set(fields) | {'url'}
+                articles = ({k: v for k, v in a.items() if k in keep} for a in articles)
+
+            if limit is not None:
+                articles = itertools.islice(articles, limit)
+        return articles
+
+    def first(self, fields: Optional[List[str]] = None, offset: int = 0, **filters) -> Optional[Dict]:
+        """The first matching article (after `offset`), or None"""
+        return next(self.articles(fields=fields, limit=1, offset=offset, **filters), None)
+
+    def count(self, **filters) -> int:
+        """Number of matching articles"""
+        if self.store:
+            where, params = self._where(**filters)
+            return self.store.count(where, params)
+
+        index = self._dates()
+        if index is not None and self._only_dates(filters):
+            if filters.get('start') is None and filters.get('end') is None:
+                return len(index) + index.undated
+            return index.count(_day(filters.get('start')), _day(filters.get('end')))
+        return sum(1 for _ in self._scan(**filters))
+
+    def per_day(self, **filters) -> Dict:
+        """{date: article count} for days with matching articles"""
+        if self.store:
+            where, params = self._where(**filters)
+            dated = "published_iso IS NOT NULL AND published_iso != ''"
+            where = f"{where} AND {dated}" if where else dated
+            return {_day(iso): n for iso, n in self.store.group_counts('published_iso', where, params).items()}
+
+        index = self._dates()
+        if index is not None and self._only_dates(filters):
+            return index.per_day(_day(filters.get('start')), _day(filters.get('end')))
+
+        counts = {}
+        for article in self._scan(**filters):
+            day = article_day(article)
+            if day:
+                counts[day] = counts.get(day, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def group_counts(self, column: str, **filters) -> Dict:
+        """{value: article count} for publisher, topic, processing, ..."""
+        if self.store:
+            where, params = self._where(**filters)
+            return self.store.group_counts(column, where, params)
+
+        counts = {}
+        for article in self._scan(**filters):
+            value = article.get(column)
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def close(self):
+        if self.store:
+            self.store.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the article corpus")
+    parser.add_argument('--from', dest='start', help='Published on or after (YYYY-MM-DD or DD/MM/YYYY)')
+    parser.add_argument('--to', dest='end', help='Published on or before')
+    parser.add_argument('--publisher', action='append', help='Publisher (repeatable)')
+    parser.add_argument('--topic', action='append', help='Search topic (repeatable)')
+    parser.add_argument('--processing', action='append', help='Processing tag (repeatable)')
+    parser.add_argument('--summarized', choices=['yes', 'no'], help='Summary state')
+    parser.add_argument('--text', help='Full-text query over title, body and summary')
+    parser.add_argument('--fields', help='Comma-separated fields to output (default: all)')
+    parser.add_argument('--limit', type=int, help='Maximum articles to output')
+    parser.add_argument('--count', action='store_true', help='Only print the number of matches')
+    parser.add_argument('--per-day', action='store_true', help='Print matches per published day')
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'Article store (default: {DEFAULT_STORE})')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET,
+                        help=f'JSON dataset used without a store (default: {DEFAULT_DATASET})')
+    args = parser.parse_args(argv)
+
+    filters = {
+        'start': args.start,
+        'end': args.end,
+        'publishers': args.publisher,
+        'topics': args.topic,
+        'processing': args.processing,
+        'summarized': None if args.summarized is None else args.summarized == 'yes',
+        'text': args.text,
+    }
+    fields = [f.strip() for f in args.fields.split(',')] if args.fields else None
+
+    query = ArticleQuery(args.store, args.dataset)
+    try:
+        if args.count:
+            print(query.count(**filters))
+        elif args.per_day:
+            for day, n in query.per_day(**filters).items():
+                print(f"{day.isoformat()}\t{n}")
+        else:
+            for article in query.articles(fields=fields, limit=args.limit, **filters):
+                if fields:
+                    article = {k: article.get(k) for k in fields}
+                print(json.dumps(article, ensure_ascii=False))
+    except BrokenPipeError:
+        pass  # Output piped into head etc.
+    finally:
+        query.close()
+
+
+if __name__ == "__main__":
+    main()
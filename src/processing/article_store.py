@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+SQLite Article Store
+One row per canonical article, updated in place by each pipeline stage
+
+Instead of every stage rewriting a full JSON array to add a few fields,
+stages read the rows they need and write back per-row updates:
+
+- scraper (DataManager): inserts scraped articles
+- 2_merge_data.py --store: inserts deduplicated, FinBERT-tagged articles,
+  and sets the tags and normalized dates on rows the scraper inserted
+- summarizers --store: read articles needing a summary, update summary fields
+- prepare_finbert --store: updates finbert_input fields
+
+Schema:
+- articles: one column per known field, unknown fields kept as JSON in `extra`
+- articles_fts: FTS5 index on title, body and summary (kept in sync by triggers)
+- indexes on published_iso, publisher, topic, processing and summarized
+
+Usage:
+    from src.processing.article_store import ArticleStore
+    store = ArticleStore()
+    for article in store.iter_articles("processing = ?", ['needs_summary']):
+        store.update(article['url'], summary=..., summarized=True)
+
+    python src/processing/article_store.py import data/datasets/finbert_ready.json
+    python src/processing/article_store.py export data/datasets/summarized_dataset.json
+    python src/processing/article_store.py stats
+
+Author: StockBus Team
+Requires: sqlite3 with FTS5 (bundled with CPython)
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.scraping.dates import normalize_published
+
+DEFAULT_PATH = "data/datasets/articles.db"
+
+# Known article fields and their SQLite types, in pipeline order
+COLUMNS = {
+    'url': 'TEXT NOT NULL UNIQUE',
+    'original_url': 'TEXT',
+    'title': 'TEXT',
+    'gnews_title': 'TEXT',
+    'body': 'TEXT',
+    'publisher': 'TEXT',
+    'topic': 'TEXT',
+    'authors': 'TEXT',              # JSON list
+    'published_date': 'TEXT',       # DD/MM/YYYY
+    'published_iso': 'TEXT',        # YYYY-MM-DD
+    'published_ts': 'INTEGER',
+    'scraped_date': 'TEXT',
+    'body_length': 'INTEGER',
+    'word_count': 'INTEGER',
+    'extraction_method': 'TEXT',
+    # 2_merge_data.py
+    'processing': 'TEXT',
+    'finbert_ready': 'INTEGER',
+    # Summarizers
+    'summary': 'TEXT',
+    'summarized': 'INTEGER',
+    'summarized_at': 'TEXT',
+    'summary_error': 'TEXT',
+    'needs_summary': 'INTEGER',
+    # prepare_finbert.py
+    'finbert_input': 'TEXT',
+    'input_source': 'TEXT',
+    'finbert_input_words': 'INTEGER',
+    'warning': 'TEXT',
+}
+
+# Fields each stage writes back with update()
+SUMMARY_FIELDS = ['summary', 'summarized', 'summarized_at', 'summary_method', 'route_reason', 'processing',
+                  'needs_summary', 'summary_error']
+FINBERT_FIELDS = ['finbert_input', 'input_source', 'finbert_input_words', 'finbert_ready', 'warning']
+# Fields 2_merge_data.py owns: refreshed on rows that already exist
+MERGE_FIELDS = ['processing', 'finbert_ready', 'published_date', 'published_iso', 'published_ts']
+
+# How a refreshed column is set when a later stage already wrote it
+# (a summarized article keeps processing='summarized', prepare_finbert's
+# finbert_ready wins over the merge's tag)
+REFRESH_RULES = {
+    'processing': "CASE WHEN articles.summarized THEN articles.processing ELSE excluded.processing END",
+    'finbert_ready': "CASE WHEN articles.finbert_input IS NOT NULL THEN articles.finbert_ready "
+                     "ELSE excluded.finbert_ready END",
+}
+
+BOOL_COLUMNS = {'finbert_ready', 'summarized', 'needs_summary'}
+JSON_COLUMNS = {'authors'}
+FTS_COLUMNS = ['title', 'body', 'summary']
+INDEXED_COLUMNS = ['published_iso', 'publisher', 'topic', 'processing', 'summarized']
+
+
+class ArticleStore:
+    """
+    SQLite-backed article store with full-text search
+
+    Features:
+    - Insert-or-skip by URL (the store doubles as the dedup index), or
+      upsert of a stage's own columns
+    - Per-row updates of any field, unknown fields merged into `extra`
+    - FTS5 search over title, body and summary
+    - WAL journal so readers never block the writing stage
+    - Batched writes with transaction()
+
+    Args:
+        path: Database file (created on first use)
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.RLock()
+        self._depth = 0
+        self.fts = True
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ',\n    '.join(f"{name} {kind}" for name, kind in COLUMNS.items())
+        with self.lock, self.conn:
+            self.conn.execute(f"""CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    {columns},
+    extra TEXT
+)""")
+            for name in INDEXED_COLUMNS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_articles_{name} ON articles({name})")
+
+            try:
+                fts_columns = ', '.join(FTS_COLUMNS)
+                new_values = ', '.join(f"new.{c}" for c in FTS_COLUMNS)
+                old_values = ', '.join(f"old.{c}" for c in FTS_COLUMNS)
+                self.conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                    f"{fts_columns}, content='articles', content_rowid='id')"
+                )
+                self.conn.execute(f"""CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, {fts_columns}) VALUES (new.id, {new_values});
+END""")
+                self.conn.execute(f"""CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, {fts_columns}) VALUES ('delete', old.id, {old_values});
+END""")
+                # Only text changes touch the full-text index
+                self.conn.execute(f"""CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF {fts_columns} ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, {fts_columns}) VALUES ('delete', old.id, {old_values});
+    INSERT INTO articles_fts(rowid, {fts_columns}) VALUES (new.id, {new_values});
+END""")
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ Full-text search unavailable ({e}); text queries will use LIKE")
+                self.fts = False
+
+    # ------------------------------------------------------------------
+    # Row conversion
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_columns(article: Dict) -> Dict:
+        """Split an article dict into column values and the JSON `extra` blob"""
+        values = {}
+        extra = {}
+        for key, value in article.items():
+            if key not in COLUMNS:
+                extra[key] = value
+            elif key in JSON_COLUMNS:
+                values[key] = json.dumps(value, ensure_ascii=False) if value is not None else None
+            elif key in BOOL_COLUMNS:
+                values[key] = None if value is None else int(bool(value))
+            else:
+                values[key] = value
+        if extra:
+            values['extra'] = json.dumps(extra, ensure_ascii=False)
+        return values
+
+    @staticmethod
+    def _to_article(row: sqlite3.Row) -> Dict:
+        """Rebuild the article dict from a row, dropping NULL columns"""
+        article = {}
+        for key in row.keys():
+            value = row[key]
+            if value is None or key == 'id':
+                continue
+            if key == 'extra':
+                article.update(json.loads(value))
+            elif key in JSON_COLUMNS:
+                article[key] = json.loads(value)
+            elif key in BOOL_COLUMNS:
+                article[key] = bool(value)
+            else:
+                article[key] = value
+        return article
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one commit (nested calls join the outer one)"""
+        with self.lock:
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.conn.rollback()
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.commit()
+
+    def _commit(self):
+        if self._depth == 0:
+            self.conn.commit()
+
+    def add(self, article: Dict, refresh: Optional[Iterable[str]] = None) -> bool:
+        """Insert an article; returns False if its URL is already stored
+
+        An existing row is left as it is, except for the `refresh` columns
+        (e.g. MERGE_FIELDS), which take the article's values.
+        """
+        if not article.get('url'):
+            return False
+        values = self._to_columns(normalize_published(dict(article)))
+        names = ', '.join(values)
+        marks = ', '.join('?' * len(values))
+        refresh = [name for name in (refresh or ()) if name in values]
+        if refresh:
+            assignments = ', '.join(f"{name} = {REFRESH_RULES.get(name, f'excluded.{name}')}" for name in refresh)
+            sql = f"INSERT INTO articles ({names}) VALUES ({marks}) ON CONFLICT(url) DO UPDATE SET {assignments}"
+        else:
+            sql = f"INSERT OR IGNORE INTO articles ({names}) VALUES ({marks})"
+        with self.lock:
+            existed = refresh and article['url'] in self
+            cursor = self.conn.execute(sql, list(values.values()))
+            self._commit()
+        return cursor.rowcount > 0 and not existed
+
+    def add_many(self, articles: Iterable[Dict]) -> int:
+        """Insert articles in one transaction; returns how many were new"""
+        added = 0
+        with self.transaction():
+            for article in articles:
+                added += self.add(article)
+        return added
+
+    def update(self, url: str, fields: Optional[Dict] = None, **kwargs) -> bool:
+        """Set fields on one article; returns False if the URL is unknown"""
+        fields = dict(fields or {}, **kwargs)
+        values = self._to_columns(fields)
+        extra = values.pop('extra', None)
+
+        with self.lock:
+            if extra is not None:
+                row = self.conn.execute("SELECT extra FROM articles WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    return False
+                merged = json.loads(row['extra']) if row['extra'] else {}
+                merged.update(json.loads(extra))
+                values['extra'] = json.dumps(merged, ensure_ascii=False)
+
+            if not values:
+                return True
+            assignments = ', '.join(f"{name} = ?" for name in values)
+            cursor = self.conn.execute(
+                f"UPDATE articles SET {assignments} WHERE url = ?",
+                list(values.values()) + [url]
+            )
+            self._commit()
+        return cursor.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM articles WHERE url = ?", (url,)).fetchone()
+        return self._to_article(row) if row else None
+
+    def __contains__(self, url: str) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM articles WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def _select(self, where: Optional[str], fields: Optional[List[str]]) -> str:
+        if fields:
+            unknown = [f for f in fields if f not in COLUMNS]
+            names = [f for f in fields if f in COLUMNS]
+            if 'url' not in names:
+                names.insert(0, 'url')
+            if unknown:
+                names.append('extra')
+            select = ', '.join(names)
+        else:
+            select = '*'
+        sql = f"SELECT {select} FROM articles"
+        if where:
+            sql += f" WHERE {where}"
+        return sql
+
+    def iter_articles(self, where: Optional[str] = None, params: Iterable = (),
+                      fields: Optional[List[str]] = None, order_by: str = 'id',
+                      limit: Optional[int] = None, offset: int = 0,
+                      batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream articles matching an SQL condition
+
+        Args:
+            where: SQL condition on article columns, e.g. "processing = ?"
+            params: Values for the condition's placeholders
+            fields: Columns to read (default: all); url is always included
+            order_by: SQL ORDER BY clause
+            limit: Maximum number of articles
+            offset: Matching articles to skip
+            batch_size: Rows fetched per round trip
+        """
+        sql = self._select(where, fields) + f" ORDER BY {order_by}"
+        params = list(params)
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset])
+
+        # A separate cursor per query so updates can run while iterating
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._to_article(row)
+
+    def count(self, where: Optional[str] = None, params: Iterable = ()) -> int:
+        sql = "SELECT COUNT(*) FROM articles"
+        if where:
+            sql += f" WHERE {where}"
+        with self.lock:
+            return self.conn.execute(sql, list(params)).fetchone()[0]
+
+    def search(self, text: str, fields: Optional[List[str]] = None,
+               limit: Optional[int] = None) -> Iterator[Dict]:
+        """Full-text search over title, body and summary (FTS5 query syntax)"""
+        if self.fts:
+            where = "id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+            return self.iter_articles(where, [text], fields=fields, limit=limit)
+        pattern = f"%{text}%"
+        where = "title LIKE ? OR body LIKE ? OR summary LIKE ?"
+        return self.iter_articles(where, [pattern] * 3, fields=fields, limit=limit)
+
+    def group_counts(self, column: str, where: Optional[str] = None, params: Iterable = ()) -> Dict:
+        """{value: article count} for an indexed column"""
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        sql = f"SELECT {column}, COUNT(*) FROM articles"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" GROUP BY {column}"
+        with self.lock:
+            return {value: n for value, n in self.conn.execute(sql, list(params))}
+
+    # ------------------------------------------------------------------
+    # JSON interop
+    # ------------------------------------------------------------------
+
+    def import_json(self, path) -> int:
+        """Insert every article of a JSON array/JSONL file; returns how many were new"""
+        from src.scraping.json_stream import iter_json_records
+        return self.add_many(iter_json_records(path))
+
+    def export_json(self, path, where: Optional[str] = None, params: Iterable = ()) -> int:
+        """Write matching articles as a JSON array file; returns the count"""
+        from src.scraping.json_stream import JsonArrayWriter
+        with JsonArrayWriter(path) as out:
+            for article in self.iter_articles(where, params):
+                out.write(article)
+        return out.count
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ArticleStoreWriter:
+    """
+    Adds articles to a store in one transaction, like the dataset writers
+
+    write() inserts new articles and refreshes the merge's own columns
+    (MERGE_FIELDS) on rows the scraper already stored; every other field,
+    summaries included, is left as it is. close() commits, abort() rolls
+    back.
+
+    Args:
+        path: Database file
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.store = ArticleStore(path)
+        self.path = self.store.path
+        self.count = 0
+        self._transaction = self.store.transaction()
+        self._transaction.__enter__()
+
+    def write(self, article: Dict):
+        self.count += self.store.add(article, refresh=MERGE_FIELDS)
+
+    def close(self):
+        if self._transaction is not None:
+            self._transaction.__exit__(None, None, None)
+            self._transaction = None
+            self.store.close()
+
+    def abort(self):
+        if self._transaction is not None:
+            try:
+                self._transaction.__exit__(RuntimeError, RuntimeError("aborted"), None)
+            except RuntimeError:
+                pass
+            self._transaction = None
+            self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the SQLite article store")
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Store path (default: {DEFAULT_PATH})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_import = sub.add_parser('import', help='Add articles from JSON files')
+    p_import.add_argument('files', nargs='+')
+    p_export = sub.add_parser('export', help='Write the store as a JSON array')
+    p_export.add_argument('output')
+    p_export.add_argument('--processing', help='Only articles with this processing tag')
+    sub.add_parser('stats', help='Show article counts')
+
+    args = parser.parse_args()
+
+    with ArticleStore(project_root / args.db) as store:
+        if args.command == 'import':
+            for path in args.files:
+                added = store.import_json(path)
+                print(f"✅ {Path(path).name}: {added:,} new articles")
+            print(f"📊 Store now holds {store.count():,} articles")
+
+        elif args.command == 'export':
+            if args.processing:
+                count = store.export_json(args.output, "processing = ?", [args.processing])
+            else:
+                count = store.export_json(args.output)
+            print(f"💾 Exported {count:,} articles to {args.output}")
+
+        elif args.command == 'stats':
+            print(f"\n📊 Articles: {store.count():,}")
+            print(f"✅ Summarized: {store.count('summarized = 1'):,}")
+            print(f"\n📋 Processing:")
+            for tag, n in sorted(store.group_counts('processing').items(), key=lambda x: -x[1]):
+                print(f"   {tag or 'untagged'}: {n:,}")
+            print(f"\n📰 Top 10 Publishers:")
+            publishers = sorted(store.group_counts('publisher').items(), key=lambda x: -x[1])
+            for publisher, n in publishers[:10]:
+                print(f"   {publisher or 'unknown'}: {n:,}")
+
+
+if __name__ == "__main__":
+    main()
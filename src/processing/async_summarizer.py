@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+ASYNC LLM Summarizer using Multiple Groq API Keys
+One event loop, several in-flight requests per key, results as they finish
+
+ParallelSummarizer blocks one thread per request on the synchronous Groq
+client, so concurrency is capped by its thread pool. Here
+`in_flight_per_key` x keys worker coroutines share one event loop and one
+article queue. The key router sends each request to the best key with a
+free slot (a fast key simply takes more articles), and every result is
+handed back the moment its request completes.
+
+Config (config/config.yaml):
+    llm:
+      concurrency:
+        in_flight_per_key: 4
+
+Usage:
+    python src/processing/async_summarizer.py --test
+    python src/processing/async_summarizer.py --in-flight 8 --store
+
+    summarizer = AsyncSummarizer()
+    async for article, summary in summarizer.stream(articles):
+        ...
+
+Author: StockBus Team
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from tqdm import tqdm
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.processing.parallel_summarizer import ParallelSummarizer
+from src.processing.key_router import is_rate_limit_error
+from src.processing.rate_limiter import QuotaExhausted
+
+DEFAULT_IN_FLIGHT = 4
+
+
+class AsyncSummarizer(ParallelSummarizer):
+    """
+    Asyncio article summarizer over multiple Groq API keys
+
+    Features:
+    - AsyncGroq clients (async HTTP), no thread per request
+    - Configurable number of in-flight requests per key
+    - All keys share one event loop and one work queue; the key router
+      sends each request to the least-loaded, fastest key
+    - Streams (article, summary) pairs as requests complete
+    - Short articles packed several to a request, as in ParallelSummarizer
+    - Time-based checkpoints that never pause the requests
+    - Optional hedged requests; the losing request is cancelled
+
+    Args:
+        config_path: YAML config with the Groq keys and summarization settings
+        in_flight_per_key: Concurrent requests per key
+            (default: llm.concurrency.in_flight_per_key, else 4)
+        pack: Short articles per request (default: llm.packing, else 5)
+        routing: Passthrough / extractive / LLM routing (default: llm.routing)
+        metrics_port: Serve /metrics during the run (default: llm.metrics.port)
+        hedging: Hedge requests slower than their key's p95 (default:
+            llm.hedging.enabled, else off)
+    """
+
+    BANNER = "⚡ ASYNC GROQ LLM SUMMARIZER (MULTI-KEY)"
+
+    def __init__(self, config_path: str = "config/config.yaml", in_flight_per_key: Optional[int] = None,
+                 use_cache: bool = True, pack: Optional[int] = None, fallback: Optional[str] = None,
+                 routing: Optional[bool] = None, metrics_port: Optional[int] = None,
+                 hedging: Optional[bool] = None):
+        super().__init__(config_path, use_cache, pack=pack, fallback=fallback, routing=routing,
+                         metrics_port=metrics_port, hedging=hedging)
+        concurrency = self.config.get('llm', {}).get('concurrency', {}) or {}
+        self.in_flight_per_key = max(1, in_flight_per_key or concurrency.get('in_flight_per_key', DEFAULT_IN_FLIGHT))
+        self.async_clients = []
+
+    def _init_async_clients(self):
+        """Initialize one AsyncGroq client per API key"""
+        if self.async_clients:
+            return
+
+        try:
+            from groq import AsyncGroq
+        except ImportError:
+            print("📦 Installing groq package...")
+            import subprocess
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "groq"])
+            from groq import AsyncGroq
+
+        base_url = self.config['llm']['groq'].get('base_url')
+        for key in self.api_keys:
+            self.async_clients.append(AsyncGroq(api_key=key, base_url=base_url, max_retries=0))
+        self._init_rate_limiter()
+
+        print(f"✅ Initialized {len(self.async_clients)} async Groq client(s)")
+        print(f"⚡ Up to {len(self.async_clients) * self.in_flight_per_key} requests in flight "
+              f"({self.in_flight_per_key} per key)")
+
+    async def _close_async_clients(self):
+        for client in self.async_clients:
+            await client.close()
+        self.async_clients = []
+
+    async def _request_async(self, key_idx: int, prompt: str, estimate: int, articles: int = 1) -> str:
+        """One API call on a key the router reserved (exceptions and
+        cancellation propagate after accounting)"""
+        self.metrics.request_started(key_idx)
+        started = time.monotonic()
+        try:
+            response = await self.async_clients[key_idx].chat.completions.create(
+                **self._request_kwargs(prompt, articles)
+            )
+        except asyncio.CancelledError:
+            self._request_cancelled(key_idx, estimate, time.monotonic() - started)
+            raise
+        except Exception as e:
+            self._request_failed(key_idx, estimate, time.monotonic() - started, e)
+            raise
+
+        latency = time.monotonic() - started
+        self.router.finished(key_idx, latency)
+        return self._finish_response(key_idx, response, prompt, estimate, articles, latency)
+
+    async def _hedged_async(self, key_idx: int, prompt: str, estimate: int, articles: int = 1) -> str:
+        """
+        _request_async, hedged on a second key once the request runs past
+        its key's p95 (see request_hedging.py); the loser is cancelled
+
+        Raises:
+            The primary's exception when no request answered
+        """
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._request_async(key_idx, prompt, estimate, articles))
+        tasks = [primary]
+        try:
+            delay = self.hedging.delay(key_idx)
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done():
+                    hedge_key = self.hedging.acquire(self.router, key_idx, estimate)
+                    if hedge_key is not None:
+                        tasks.append(asyncio.ensure_future(
+                            self._request_async(hedge_key, prompt, estimate, articles)))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is None:
+                    continue
+                latency = time.monotonic() - started
+                self.hedging.record(latency, latency, hedged=len(tasks) > 1, won=winner is not primary)
+                return winner.result()
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _complete_async(self, prompt: str, label: str, articles: int = 1) -> Optional[str]:
+        """
+        Send a prompt on whichever key the router picks (see _complete)
+
+        Raises:
+            QuotaExhausted: every key has used its daily quota
+        """
+        estimate = self.limiter.estimate(prompt, articles)
+
+        for attempt in range(self._max_attempts()):
+            key_idx = await self.router.acquire_async(estimate)
+            try:
+                if self.hedging is not None:
+                    return await self._hedged_async(key_idx, prompt, estimate, articles)
+                return await self._request_async(key_idx, prompt, estimate, articles)
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    continue
+                print(f"\n⚠️ Error with key_{key_idx + 1}: {str(e)[:100]}")
+                return None
+
+        print(f"\n⚠️ Rate limited on every attempt: {label[:60]}")
+        return None
+
+    async def _summarize_async(self, article: Dict) -> Optional[str]:
+        """
+        Summarize one article on whichever key the router picks
+
+        Returns:
+            Summary string or None
+
+        Raises:
+            QuotaExhausted: every key has used its daily quota
+        """
+        summary = await self._complete_async(self._create_summary_prompt(article), article.get('title', ''))
+        self._cache_put(article, summary)
+        return summary
+
+    async def _summarize_unit_async(self, unit: List[Dict]) -> List[Tuple[Dict, Optional[str]]]:
+        """One article, or a packed request with single-article retries (see _summarize_unit)"""
+        if len(unit) == 1:
+            return [(unit[0], await self._summarize_async(unit[0]))]
+
+        prompt, bodies = self._packed_prompt(unit)
+        text = await self._complete_async(prompt, unit[0].get('title', ''), len(unit))
+        results, retry = self._split_packed(unit, text, bodies)
+        for article in retry:
+            try:
+                results.append((article, await self._summarize_async(article)))
+            except QuotaExhausted:
+                self.quota_exhausted = True
+                break
+        return results
+
+    async def stream(self, articles: Iterable[Dict]) -> AsyncIterator[Tuple[Dict, Optional[str]]]:
+        """
+        Summarize articles concurrently, yielding results in completion order
+
+        Args:
+            articles: Articles to summarize
+
+        Yields:
+            (article, summary) with summary None on failure (the error, if
+            one was raised, is in the article's summary_error). Once every
+            key has used its daily quota the stream ends; the remaining
+            articles are not yielded.
+        """
+        self._init_async_clients()
+
+        articles = list(articles)
+        pending = asyncio.Queue()
+        for unit in self.packer.units(articles):
+            pending.put_nowait(unit)
+        total = len(articles)
+        results = asyncio.Queue()
+        alive = [0]
+        stopped = []
+
+        async def worker():
+            try:
+                while True:
+                    try:
+                        unit = pending.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    self.metrics.set_queue(pending.qsize())
+                    try:
+                        pairs = await self._summarize_unit_async(unit)
+                    except QuotaExhausted as e:
+                        # Leave the articles for another day
+                        pending.put_nowait(unit)
+                        self.quota_exhausted = True
+                        if not stopped:
+                            stopped.append(e)
+                            print(f"\n⏸️ {e}")
+                        return
+                    except Exception as e:
+                        error = str(e)[:100]
+                        for article in unit:
+                            article['summary_error'] = error
+                        pairs = [(article, None) for article in unit]
+                    else:
+                        for article, _ in pairs:
+                            article.pop('summary_error', None)     # Left over from an earlier run
+                    for pair in pairs:
+                        results.put_nowait(pair)
+            finally:
+                alive[0] -= 1
+                if alive[0] == 0:
+                    results.put_nowait(None)  # No workers left
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(self.in_flight_per_key * len(self.async_clients))
+        ]
+        alive[0] = len(workers)
+        try:
+            for _ in range(total):
+                result = await results.get()
+                if result is None:
+                    break
+                yield result
+        finally:
+            # Consumer stopped early (or we are done): drop outstanding requests
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def summarize_all(self, articles: List[Dict]) -> List[Tuple[Dict, Optional[str]]]:
+        """Blocking helper: summarize a list on a fresh event loop, in completion order"""
+        async def run():
+            try:
+                return [result async for result in self.stream(articles)]
+            finally:
+                await self._close_async_clients()
+
+        return asyncio.run(run())
+
+    async def _process(self, articles, articles_to_summarize, store, output_path: Path):
+        finished = []
+        saving = asyncio.Lock()
+
+        async def checkpoint():
+            # The write runs in a thread so the loop keeps collecting results;
+            # the lock keeps a periodic checkpoint and the final one apart
+            async with saving:
+                done = finished[:]
+                finished.clear()
+                try:
+                    await asyncio.to_thread(self._checkpoint, articles, done, store, output_path)
+                except Exception:
+                    finished[:0] = done     # Saved with the next checkpoint
+                    raise
+
+        async def checkpointer():
+            # Runs beside the workers on the same loop: time-based, never a barrier.
+            # Shielded: cancelling the ticker must not abandon a write halfway
+            while True:
+                await asyncio.sleep(self.checkpoint_seconds)
+                await asyncio.shield(checkpoint())
+
+        ticker = asyncio.create_task(checkpointer())
+        try:
+            next_status = 0.0
+            with tqdm(total=len(articles_to_summarize), desc="Summarizing (async)", unit="article") as progress:
+                async for article, summary in self.stream(articles_to_summarize):
+                    self._apply_result(article, summary, article.get('summary_error'))
+                    finished.append(article)
+                    progress.update(1)
+                    if time.monotonic() >= next_status:
+                        progress.set_postfix_str(self.metrics.progress_line(), refresh=False)
+                        next_status = time.monotonic() + 1.0
+        finally:
+            ticker.cancel()
+            await checkpoint()
+            await self._close_async_clients()
+
+    def _summarize_pending(self, articles: Optional[List[Dict]], articles_to_summarize: List[Dict],
+                           store, output_path: Path):
+        """Summarize everything on one event loop, checkpointing every checkpoint_seconds"""
+        asyncio.run(self._process(articles, articles_to_summarize, store, output_path))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Async article summarization with multiple Groq API keys"
+    )
+    parser.add_argument('--input', default='data/datasets/finbert_ready.json')
+    parser.add_argument('--output', default='data/datasets/summarized_dataset.json')
+    parser.add_argument('--test', action='store_true', help='Test mode (10 articles)')
+    parser.add_argument('--count', type=int, default=10, help='Test count')
+    parser.add_argument('--checkpoint-seconds', type=float, default=None,
+                        help='Seconds between checkpoints (default: config or 30)')
+    parser.add_argument('--in-flight', type=int, default=None,
+                        help=f'Concurrent requests per key (default: config or {DEFAULT_IN_FLIGHT})')
+    parser.add_argument('--pack', type=int, default=None,
+                        help='Short articles per request (default: config or 5; 1 disables packing)')
+    parser.add_argument('--no-fallback', action='store_true',
+                        help='Leave articles unsummarized when every key is out of quota')
+    parser.add_argument('--no-routing', action='store_true',
+                        help='Summarize every article (no passthrough or extractive routes)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus /metrics and /metrics.json on this port during the run')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Duplicate requests slower than their key\'s p95 on another key')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the summary cache')
+    parser.add_argument('--store', nargs='?', const='data/datasets/articles.db', default=None,
+                        help='Use the SQLite article store instead of JSON files')
+
+    args = parser.parse_args()
+
+    try:
+        summarizer = AsyncSummarizer(in_flight_per_key=args.in_flight, use_cache=not args.no_cache,
+                                     pack=args.pack, fallback='none' if args.no_fallback else None,
+                                     routing=False if args.no_routing else None,
+                                     metrics_port=args.metrics_port,
+                                     hedging=True if args.hedge else None)
+        summarizer.process_dataset(
+            input_file=args.input,
+            output_file=args.output,
+            test_mode=args.test,
+            test_count=args.count,
+            store_path=args.store,
+            checkpoint_seconds=args.checkpoint_seconds
+        )
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
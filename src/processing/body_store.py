@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Compressed Article Body Store
+zstd-compressed bodies with one trained dictionary per publisher
+
+Article bodies are most of the corpus by size and repeat a lot of publisher
+boilerplate (bylines, disclaimers, "also read" blocks). A dictionary trained
+on each publisher's bodies captures that boilerplate once, so even small
+blocks of articles compress well.
+
+Layout (data/datasets/bodies/):
+- dicts/<id>.zdict   trained dictionaries (id 0 is shared by small publishers)
+- dicts.json         publisher -> dictionary id
+- blocks.bin         zstd frames, each holding up to block_size bodies of one publisher
+- index.bin          URL hash -> (block offset, block size, slot, dictionary id), sorted
+- meta.json          counts and byte totals
+
+Reading one body decompresses one block; a small LRU keeps recent blocks.
+Articles read through src.scraping.article_record.iter_articles/load_articles
+get their body filled in transparently when it was stripped.
+
+Usage:
+    python src/processing/body_store.py pack data/raw/news/*.json
+    python src/processing/body_store.py pack data/datasets/complete_dataset.json --strip-to data/datasets/stripped
+    python src/processing/body_store.py stats
+    python src/processing/body_store.py scan      # full-corpus pass, bytes read vs JSON
+
+    from src.processing.body_store import BodyStore
+    bodies = BodyStore()
+    text = bodies.get(url)
+
+Author: StockBus Team
+Requires: zstandard
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import subprocess
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.scraping.json_stream import iter_json_records, JsonArrayWriter
+
+DEFAULT_ROOT = "data/datasets/bodies"
+SHARED_DICT = 0
+
+
+def _import_zstd():
+    """Import zstandard, installing it on first use"""
+    try:
+        import zstandard
+    except ImportError:
+        print("📦 Installing zstandard package...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "zstandard"])
+        import zstandard
+    return zstandard
+
+
+def url_key(url: str) -> int:
+    """64-bit URL hash, same scheme as the merge's URL index"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _pack_block(bodies: List[bytes]) -> bytes:
+    """count, lengths, then the concatenated UTF-8 bodies"""
+    header = struct.pack(f'<I{len(bodies)}I', len(bodies), *map(len, bodies))
+    return header + b''.join(bodies)
+
+
+def _unpack_block(payload: bytes) -> List[bytes]:
+    (count,) = struct.unpack_from('<I', payload)
+    lengths = struct.unpack_from(f'<{count}I', payload, 4)
+    pos = 4 + 4 * count
+    bodies = []
+    for length in lengths:
+        bodies.append(payload[pos:pos + length])
+        pos += length
+    return bodies
+
+
+class _Index:
+    """Sorted parallel arrays: URL hash -> block location"""
+
+    def __init__(self):
+        self.keys = array('Q')
+        self.offsets = array('Q')
+        self.sizes = array('I')
+        self.slots = array('H')
+        self.dict_ids = array('H')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, key: int) -> int:
+        i = bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def extend(self, entries):
+        """Add (key, offset, size, slot, dict_id) tuples and re-sort"""
+        rows = list(zip(self.keys, self.offsets, self.sizes, self.slots, self.dict_ids))
+        rows.extend(entries)
+        rows.sort()
+        self.keys = array('Q', (r[0] for r in rows))
+        self.offsets = array('Q', (r[1] for r in rows))
+        self.sizes = array('I', (r[2] for r in rows))
+        self.slots = array('H', (r[3] for r in rows))
+        self.dict_ids = array('H', (r[4] for r in rows))
+
+    def save(self, path: Path):
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            array('Q', [len(self.keys)]).tofile(f)
+            for column in (self.keys, self.offsets, self.sizes, self.slots, self.dict_ids):
+                column.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path):
+        index = cls()
+        if not path.exists():
+            return index
+        with open(path, 'rb') as f:
+            header = array('Q')
+            header.fromfile(f, 1)
+            count = header[0]
+            for column in (index.keys, index.offsets, index.sizes, index.slots, index.dict_ids):
+                column.fromfile(f, count)
+        return index
+
+
+class BodyStore:
+    """
+    Random-access reader for the compressed body store
+
+    Features:
+    - get(url): one block read + decompression, LRU-cached per block
+    - hydrate(articles): fill stripped bodies while streaming
+    - iter_blocks(): sequential full-corpus pass over every body
+    - bytes_read: compressed bytes read so far (for I/O accounting)
+
+    Args:
+        root: Store directory
+        cache_blocks: Decompressed blocks kept in memory
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, cache_blocks: int = 64):
+        self.zstd = _import_zstd()
+        self.root = Path(root)
+        self.meta = self._read_json(self.root / 'meta.json', {})
+        self.publisher_dicts = self._read_json(self.root / 'dicts.json', {})
+        self.index = _Index.load(self.root / 'index.bin')
+        self.cache_blocks = cache_blocks
+        self._cache = OrderedDict()
+        self._decompressors = {}
+        self._file = None
+        self.bytes_read = 0
+
+    @staticmethod
+    def _read_json(path: Path, default):
+        if not path.exists():
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @classmethod
+    def open_default(cls) -> Optional['BodyStore']:
+        """The project's body store if one has been packed, else None"""
+        root = project_root / DEFAULT_ROOT
+        return cls(root) if (root / 'index.bin').exists() else None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url: str) -> bool:
+        return self.index.find(url_key(url)) >= 0
+
+    def _decompressor(self, dict_id: int):
+        if dict_id not in self._decompressors:
+            dict_path = self.root / 'dicts' / f'{dict_id}.zdict'
+            if dict_path.exists():
+                data = self.zstd.ZstdCompressionDict(dict_path.read_bytes())
+                self._decompressors[dict_id] = self.zstd.ZstdDecompressor(dict_data=data)
+            else:
+                self._decompressors[dict_id] = self.zstd.ZstdDecompressor()
+        return self._decompressors[dict_id]
+
+    def _read_block(self, offset: int, size: int, dict_id: int) -> List[bytes]:
+        cached = self._cache.get(offset)
+        if cached is not None:
+            self._cache.move_to_end(offset)
+            return cached
+
+        if self._file is None:
+            self._file = open(self.root / 'blocks.bin', 'rb')
+        self._file.seek(offset)
+        frame = self._file.read(size)
+        self.bytes_read += size
+        bodies = _unpack_block(self._decompressor(dict_id).decompress(frame))
+
+        self._cache[offset] = bodies
+        if len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+        return bodies
+
+    def get(self, url: str, default: Optional[str] = None) -> Optional[str]:
+        """Decompressed body for a URL"""
+        i = self.index.find(url_key(url))
+        if i < 0:
+            return default
+        bodies = self._read_block(self.index.offsets[i], self.index.sizes[i], self.index.dict_ids[i])
+        return bodies[self.index.slots[i]].decode('utf-8')
+
+    def hydrate(self, articles: Iterable) -> Iterator:
+        """Yield articles with stripped bodies filled in from the store"""
+        for article in articles:
+            if not article.get('body') and article.get('url'):
+                body = self.get(article['url'])
+                if body is not None:
+                    article['body'] = body
+            yield article
+
+    def iter_blocks(self) -> Iterator[List[str]]:
+        """Sequentially decompress every block (a full-corpus pass)"""
+        blocks = sorted(set(zip(self.index.offsets, self.index.sizes, self.index.dict_ids)))
+        with open(self.root / 'blocks.bin', 'rb') as f:
+            for offset, size, dict_id in blocks:
+                f.seek(offset)
+                frame = f.read(size)
+                self.bytes_read += size
+                payload = self._decompressor(dict_id).decompress(frame)
+                yield [body.decode('utf-8') for body in _unpack_block(payload)]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BodyStoreWriter:
+    """
+    Packs article bodies into the store (new URLs only)
+
+    Bodies are buffered per dictionary and written as one zstd frame per
+    block_size bodies. On close() the index and metadata are replaced
+    atomically; abort() truncates blocks.bin back to its previous size.
+
+    Args:
+        root: Store directory
+        block_size: Bodies per compressed block (larger: better ratio, slower random reads)
+        level: zstd compression level
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, block_size: int = 16, level: int = 9):
+        self.zstd = _import_zstd()
+        self.root = Path(root)
+        (self.root / 'dicts').mkdir(parents=True, exist_ok=True)
+        self.block_size = block_size
+        self.level = level
+
+        self.publisher_dicts = BodyStore._read_json(self.root / 'dicts.json', {})
+        self.meta = BodyStore._read_json(self.root / 'meta.json', {
+            'articles': 0, 'raw_bytes': 0, 'compressed_bytes': 0, 'blocks': 0,
+        })
+        self.index = _Index.load(self.root / 'index.bin')
+        self.known = set(self.index.keys)
+
+        self.blocks_path = self.root / 'blocks.bin'
+        self.file = open(self.blocks_path, 'ab')
+        self.start_size = self.file.tell()
+        self.buffers = defaultdict(list)
+        self.entries = []
+        self._compressors = {}
+        self.count = 0
+
+    # ------------------------------------------------------------------
+    # Dictionaries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _slug(publisher: str) -> str:
+        return re.sub(r'[^\w-]+', '_', publisher.lower()).strip('_') or 'unknown'
+
+    def train(self, samples: Dict[str, List[bytes]], dict_size: int = 64 * 1024,
+              min_samples: int = 50):
+        """Train one dictionary per publisher with enough samples, plus the shared one
+
+        Publishers that already have a dictionary keep it, so existing
+        blocks stay readable.
+        """
+        shared = [body for bodies in samples.values() for body in bodies]
+        if not (self.root / 'dicts' / f'{SHARED_DICT}.zdict').exists() and len(shared) >= min_samples:
+            self._train_one(SHARED_DICT, shared, dict_size)
+
+        next_id = max([SHARED_DICT] + list(self.publisher_dicts.values())) + 1
+        for publisher, bodies in sorted(samples.items()):
+            if publisher in self.publisher_dicts or len(bodies) < min_samples:
+                continue
+            if self._train_one(next_id, bodies, dict_size):
+                self.publisher_dicts[publisher] = next_id
+                next_id += 1
+
+    def _train_one(self, dict_id: int, bodies: List[bytes], dict_size: int) -> bool:
+        try:
+            trained = self.zstd.train_dictionary(dict_size, bodies)
+        except Exception as e:  # Too little or too uniform data
+            print(f"   ⚠️ Dictionary {dict_id} not trained: {e}")
+            return False
+        (self.root / 'dicts' / f'{dict_id}.zdict').write_bytes(trained.as_bytes())
+        return True
+
+    def _compressor(self, dict_id: int):
+        if dict_id not in self._compressors:
+            dict_path = self.root / 'dicts' / f'{dict_id}.zdict'
+            if dict_path.exists():
+                data = self.zstd.ZstdCompressionDict(dict_path.read_bytes())
+                self._compressors[dict_id] = self.zstd.ZstdCompressor(level=self.level, dict_data=data)
+            else:
+                self._compressors[dict_id] = self.zstd.ZstdCompressor(level=self.level)
+        return self._compressors[dict_id]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add(self, url: str, body: str, publisher: str = '') -> bool:
+        """Queue a body; returns False if the URL is already stored"""
+        if not url or not body:
+            return False
+        key = url_key(url)
+        if key in self.known:
+            return False
+        self.known.add(key)
+
+        dict_id = self.publisher_dicts.get(publisher or '', SHARED_DICT)
+        buffer = self.buffers[dict_id]
+        buffer.append((key, body.encode('utf-8')))
+        if len(buffer) >= self.block_size:
+            self._flush(dict_id)
+        self.count += 1
+        return True
+
+    def write(self, article) -> bool:
+        """Dataset-writer style: add an article's body"""
+        return self.add(article.get('url', ''), article.get('body', ''), article.get('publisher', ''))
+
+    def _flush(self, dict_id: int):
+        buffer = self.buffers.pop(dict_id, [])
+        if not buffer:
+            return
+        bodies = [body for _, body in buffer]
+        frame = self._compressor(dict_id).compress(_pack_block(bodies))
+
+        offset = self.file.tell()
+        self.file.write(frame)
+        for slot, (key, _) in enumerate(buffer):
+            self.entries.append((key, offset, len(frame), slot, dict_id))
+
+        self.meta['blocks'] += 1
+        self.meta['raw_bytes'] += sum(map(len, bodies))
+        self.meta['compressed_bytes'] += len(frame)
+
+    def close(self):
+        """Flush remaining blocks and publish the new index"""
+        for dict_id in list(self.buffers):
+            self._flush(dict_id)
+        self.file.close()
+
+        self.index.extend(self.entries)
+        self.meta['articles'] = len(self.index)
+        self.meta['block_size'] = self.block_size
+        self.meta['level'] = self.level
+        self.index.save(self.root / 'index.bin')
+        for name, data in (('dicts.json', self.publisher_dicts), ('meta.json', self.meta)):
+            tmp = self.root / (name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.root / name)
+
+    def abort(self):
+        """Drop everything written since opening"""
+        self.buffers = {}
+        self.file.close()
+        os.truncate(self.blocks_path, self.start_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def collect_samples(files: Iterable, per_publisher: int = 2000, seed: int = 42) -> Dict[str, List[bytes]]:
+    """Reservoir-sample bodies per publisher for dictionary training"""
+    rng = random.Random(seed)
+    samples = defaultdict(list)
+    seen = defaultdict(int)
+    for path in files:
+        for article in iter_json_records(path):
+            body = article.get('body')
+            if not body:
+                continue
+            publisher = article.get('publisher') or ''
+            seen[publisher] += 1
+            bucket = samples[publisher]
+            if len(bucket) < per_publisher:
+                bucket.append(body.encode('utf-8'))
+            else:
+                j = rng.randrange(seen[publisher])
+                if j < per_publisher:
+                    bucket[j] = body.encode('utf-8')
+    return samples
+
+
+def pack(files: List[Path], root: str = DEFAULT_ROOT, block_size: int = 16,
+         level: int = 9, strip_to: Optional[str] = None) -> BodyStoreWriter:
+    """Train dictionaries on the files' bodies, then pack every new body
+
+    With strip_to, a copy of each input without bodies is written there;
+    article_record.load_articles restores the bodies on read.
+    """
+    print(f"\n🧪 Sampling bodies from {len(files)} file(s)...")
+    samples = collect_samples(files)
+
+    with BodyStoreWriter(root, block_size=block_size, level=level) as writer:
+        writer.train(samples)
+        print(f"📚 Dictionaries: {len(writer.publisher_dicts)} publisher + shared")
+
+        for path in files:
+            out = JsonArrayWriter(Path(strip_to) / Path(path).name) if strip_to else None
+            for article in iter_json_records(path):
+                writer.write(article)
+                if out is not None:
+                    article.pop('body', None)
+                    out.write(article)
+            if out is not None:
+                out.close()
+            print(f"   ✅ {Path(path).name}")
+
+    return writer
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compressed per-publisher body store")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help=f'Store directory (default: {DEFAULT_ROOT})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_pack = sub.add_parser('pack', help='Add bodies from raw or merged JSON files')
+    p_pack.add_argument('files', nargs='+')
+    p_pack.add_argument('--block-size', type=int, default=16, help='Bodies per block (default: 16)')
+    p_pack.add_argument('--level', type=int, default=9, help='zstd level (default: 9)')
+    p_pack.add_argument('--strip-to', help='Also write copies of the inputs without bodies to this directory')
+    sub.add_parser('stats', help='Show store size and compression ratio')
+    p_scan = sub.add_parser('scan', help='Time a full pass over every body')
+    p_scan.add_argument('--compare', nargs='*', default=[], help='JSON files to read for comparison')
+
+    args = parser.parse_args()
+    root = project_root / args.root
+
+    if args.command == 'pack':
+        started = time.perf_counter()
+        writer = pack([Path(f) for f in args.files], root, args.block_size, args.level, args.strip_to)
+        meta = writer.meta
+        print(f"\n✅ Packed {writer.count:,} new bodies in {time.perf_counter() - started:.1f}s")
+        if meta['compressed_bytes']:
+            print(f"📦 {meta['raw_bytes'] / 1024 / 1024:.1f} MB -> {meta['compressed_bytes'] / 1024 / 1024:.1f} MB "
+                  f"({meta['raw_bytes'] / meta['compressed_bytes']:.1f}x)")
+
+    elif args.command == 'stats':
+        store = BodyStore(root)
+        meta = store.meta
+        print(f"\n📦 Bodies: {meta.get('articles', 0):,} in {meta.get('blocks', 0):,} blocks")
+        print(f"   Raw: {meta.get('raw_bytes', 0) / 1024 / 1024:.1f} MB")
+        print(f"   Compressed: {meta.get('compressed_bytes', 0) / 1024 / 1024:.1f} MB")
+        if meta.get('compressed_bytes'):
+            print(f"   Ratio: {meta['raw_bytes'] / meta['compressed_bytes']:.1f}x")
+        print(f"📚 Publisher dictionaries: {len(store.publisher_dicts)}")
+
+    elif args.command == 'scan':
+        store = BodyStore(root)
+        started = time.perf_counter()
+        count = sum(len(block) for block in store.iter_blocks())
+        elapsed = time.perf_counter() - started
+        print(f"\n⚡ Body store: {count:,} bodies, {store.bytes_read / 1024 / 1024:.1f} MB read in {elapsed:.2f}s")
+
+        if args.compare:
+            started = time.perf_counter()
+            json_count = sum(1 for path in args.compare for _ in iter_json_records(path))
+            elapsed = time.perf_counter() - started
+            json_bytes = sum(Path(p).stat().st_size for p in args.compare)
+            print(f"📄 JSON: {json_count:,} articles, {json_bytes / 1024 / 1024:.1f} MB read in {elapsed:.2f}s")
+            if store.bytes_read:
+                print(f"📉 Bytes read: {json_bytes / store.bytes_read:.1f}x less with the body store")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Adaptive API Key Router
+Send each request to the key most likely to answer it soonest
+
+Round-robin gives a throttled or slow key its full share of articles, and
+every 429 it hits turns into a failed summary. The router instead:
+
+- Ranks keys by recent latency (moving average), requests already in flight
+  on the key and the free fraction of its per-minute budget
+- Reserves the request on the best key through the RateLimiter
+- Takes a key out of rotation after a 429, for the server's retry-after
+  (or an exponential backoff when the header is missing)
+- Marks a key exhausted for the day when the 429 says so
+
+Usage:
+    router = KeyRouter(limiter)
+    key_idx = router.acquire(estimate)           # or: await router.acquire_async(...)
+    started = time.monotonic()
+    try:
+        response = clients[key_idx].chat.completions.create(...)
+        router.finished(key_idx, time.monotonic() - started)
+    except Exception as e:
+        router.finished(key_idx, time.monotonic() - started, ok=False)
+        if is_rate_limit_error(e):
+            router.throttled(key_idx, e)
+
+Author: StockBus Team
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.processing.rate_limiter import QuotaExhausted, RateLimiter
+
+DEFAULT_COOLDOWN = 10.0     # Seconds out of rotation after a 429 without retry-after
+MAX_COOLDOWN = 300.0
+EWMA_ALPHA = 0.2
+MAX_POLL = 1.0              # Re-rank at least this often while waiting
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """True for HTTP 429 errors (groq.RateLimitError and compatible clients)"""
+    if getattr(exc, 'status_code', None) == 429:
+        return True
+    return type(exc).__name__ == 'RateLimitError'
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    """Seconds from the error's retry-after header, if the server sent one"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def is_daily_limit(exc: Exception) -> bool:
+    """The 429 is about the per-day quota (Groq says 'requests per day (RPD)')"""
+    message = str(exc).lower()
+    return 'per day' in message or '(rpd)' in message
+
+
+class _KeyState:
+    __slots__ = ('latency', 'in_flight', 'cooldown_until', 'strikes')
+
+    def __init__(self):
+        self.latency = None         # Seconds, moving average of successful calls
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.strikes = 0            # Consecutive 429s, drives the backoff
+
+
+class KeyRouter:
+    """
+    Least-loaded, lowest-latency key selection on top of a RateLimiter
+
+    Args:
+        limiter: Per-key RPM/TPM/daily limiter (one budget per key)
+        max_in_flight: Cap on concurrent requests per key (None: no cap)
+        stats: Optional stats['key_usage'] dict to extend with
+            latency_ms, throttled and cooldowns counters
+    """
+
+    def __init__(self, limiter: RateLimiter, max_in_flight: Optional[int] = None,
+                 stats: Optional[Dict] = None):
+        self.limiter = limiter
+        self.max_in_flight = max_in_flight
+        self.keys = [_KeyState() for _ in limiter.keys]
+        self.lock = threading.Lock()
+        self.key_usage = stats
+        if stats is not None:
+            for i in range(len(self.keys)):
+                usage = stats.setdefault(f'key_{i + 1}', {})
+                usage.setdefault('latency_ms', None)
+                usage.setdefault('throttled', 0)
+                usage.setdefault('cooldowns', 0)
+                usage.setdefault('cooldown_seconds', 0.0)
+
+    def _score(self, key_idx: int, state: _KeyState) -> float:
+        """Expected time to an answer on this key, lower is better"""
+        latency = state.latency if state.latency is not None else 0.0
+        headroom = self.limiter.headroom(key_idx)
+        return (latency + 0.05) * (state.in_flight + 1) / (0.05 + headroom)
+
+    def try_acquire(self, tokens: int, exclude: Optional[int] = None,
+                    extra_in_flight: int = 0) -> Tuple[Optional[int], float]:
+        """Reserve the request on the best available key
+
+        Args:
+            tokens: Estimated tokens of the request
+            exclude: Key not to use (a hedge must go to another key)
+            extra_in_flight: Requests allowed above max_in_flight (hedges
+                may take a slot beyond the concurrency cap, not beyond the
+                rate limits)
+
+        Returns:
+            (key_idx, 0.0) on success, else (None, seconds until worth retrying)
+
+        Raises:
+            QuotaExhausted: every key has used its daily quota
+        """
+        with self.lock:
+            now = time.monotonic()
+            wait = MAX_POLL
+            candidates = []
+            live = 0
+            for i, state in enumerate(self.keys):
+                if i == exclude or self.limiter.exhausted(i):
+                    continue
+                live += 1
+                if state.cooldown_until > now:
+                    wait = min(wait, state.cooldown_until - now)
+                    continue
+                if self.max_in_flight and state.in_flight >= self.max_in_flight + extra_in_flight:
+                    continue
+                candidates.append((self._score(i, state), i))
+
+            if not live:
+                raise QuotaExhausted("All API keys used their daily quota")
+
+            for _, i in sorted(candidates):
+                try:
+                    key_wait = self.limiter.try_acquire(i, tokens)
+                except QuotaExhausted:
+                    continue
+                if not key_wait:
+                    self.keys[i].in_flight += 1
+                    return i, 0.0
+                wait = min(wait, key_wait)
+            return None, max(wait, 0.001)
+
+    def acquire(self, tokens: int) -> int:
+        """Block until some key can take the request; returns its index"""
+        while True:
+            key_idx, wait = self.try_acquire(tokens)
+            if key_idx is not None:
+                return key_idx
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> int:
+        """Like acquire(), but yields to the event loop while waiting"""
+        while True:
+            key_idx, wait = self.try_acquire(tokens)
+            if key_idx is not None:
+                return key_idx
+            await asyncio.sleep(wait)
+
+    def finished(self, key_idx: int, latency: float, ok: bool = True):
+        """A request on the key completed (ok=False: it raised)"""
+        with self.lock:
+            state = self.keys[key_idx]
+            state.in_flight = max(0, state.in_flight - 1)
+            if ok:
+                state.strikes = 0
+                if state.latency is None:
+                    state.latency = latency
+                else:
+                    state.latency += EWMA_ALPHA * (latency - state.latency)
+                if self.key_usage is not None:
+                    self.key_usage[f'key_{key_idx + 1}']['latency_ms'] = round(state.latency * 1000, 1)
+
+    def throttled(self, key_idx: int, exc: Optional[Exception] = None):
+        """Take the key out of rotation after a 429"""
+        if exc is not None and is_daily_limit(exc):
+            self.limiter.mark_exhausted(key_idx)
+
+        with self.lock:
+            state = self.keys[key_idx]
+            state.strikes += 1
+            delay = retry_after(exc) if exc is not None else None
+            if delay is None:
+                delay = min(MAX_COOLDOWN, DEFAULT_COOLDOWN * 2 ** (state.strikes - 1))
+            state.cooldown_until = max(state.cooldown_until, time.monotonic() + delay)
+
+            if self.key_usage is not None:
+                usage = self.key_usage[f'key_{key_idx + 1}']
+                usage['throttled'] += 1
+                usage['cooldowns'] += 1
+                usage['cooldown_seconds'] = round(usage['cooldown_seconds'] + delay, 1)
+
+    def cooling(self, key_idx: int) -> bool:
+        return self.keys[key_idx].cooldown_until > time.monotonic()
@@ -10,19 +10,33 @@ Strategy: Use 5 Groq API keys in parallel for 5x speedup
 
 import os
 import sys
-import json
 import time
+import threading
 import yaml
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from tqdm import tqdm
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.processing.key_router import KeyRouter, is_rate_limit_error
+from src.processing.prompt_budget import PromptBudget
+from src.processing.rate_limiter import QuotaExhausted, RateLimiter
+from src.processing.request_hedging import HedgePolicy
+from src.processing.request_packing import RequestPacker
+from src.processing.summary_backends import get_backend
+from src.processing.summary_cache import SummaryCache
+from src.processing.summary_journal import SummaryJournal
+from src.processing.summary_router import ROUTES, SummaryRouter
+from src.processing.summarizer_metrics import SummarizerMetrics
+from src.scraping.article_record import load_articles
+
+DEFAULT_CHECKPOINT_SECONDS = 30
+
 
 class ParallelSummarizer:
     """
@@ -31,26 +45,104 @@ class ParallelSummarizer:
     Features:
     - Use 3-5 API keys concurrently
     - 3x-5x speedup over single-key processing
-    - Smart load balancing across keys
-    - Rate limiting per key
-    - Shared checkpoint system
+    - Routes each request to the least-loaded, fastest key
+    - Rate limiting per key; throttled keys sit out their retry-after
+    - Sliding window: a new article starts the moment any request finishes
+    - Time-based checkpoints to a JSONL journal; the dataset is written once at the end
+    - Persistent summary cache checked before any API call
+    - Short articles packed several to a request (JSON reply keyed by article ID)
+    - Offline extractive backend, also the fallback once every key is out of quota
+    - Routing: clean articles that fit FinBERT pass through, noisy or slightly
+      long ones are trimmed locally, only long ones use the API
+    - Thread-safe metrics (latency percentiles, tokens/sec, queue depth,
+      error classes) on the progress bar, in JSON/Prometheus files and
+      optionally over HTTP
+    - Optional hedged requests: a request slower than its key's p95 is
+      duplicated on another key and the first answer wins
     """
     
-    def __init__(self, config_path: str = "config/config.yaml"):
-        """Initialize with multiple API keys"""
+    # Same prompt as ArticleSummarizer; bump both when it changes
+    PROMPT_VERSION = 2
+    
+    # Per-key concurrency cap for the router (None: bounded by the thread pool)
+    in_flight_per_key = None
+    
+    BANNER = "🚀 PARALLEL GROQ LLM SUMMARIZER (MULTI-KEY)"
+    
+    def __init__(self, config_path: str = "config/config.yaml", use_cache: bool = True,
+                 window: Optional[int] = None, pack: Optional[int] = None,
+                 backend: Optional[str] = None, fallback: Optional[str] = None,
+                 routing: Optional[bool] = None, metrics_port: Optional[int] = None,
+                 hedging: Optional[bool] = None):
+        """Initialize with multiple API keys
+        
+        Args:
+            config_path: YAML config with the Groq keys and summarization settings
+            use_cache: Look up and store summaries in the summary cache
+            window: Requests kept in flight (default: llm.concurrency.window,
+                else 2 per key)
+            pack: Short articles per request (default: llm.packing, else 5;
+                1 disables packing)
+            backend: 'groq', or a local backend from summary_backends.py
+                (default: llm.backend, else groq)
+            fallback: Local backend for articles left when every key is out
+                of quota, 'none' to leave them (default: llm.fallback, else
+                extractive)
+            routing: Route articles between passthrough, extractive trim
+                and the LLM (default: llm.routing.enabled, else on)
+            metrics_port: Serve /metrics and /metrics.json on this port
+                during the run (default: llm.metrics.port, else off)
+            hedging: Hedge requests slower than their key's p95 on another
+                key (default: llm.hedging.enabled, else off)
+        """
         # Initialize stats FIRST (needed by _load_api_keys)
         self.stats = {
             'total_articles': 0,
             'summarized': 0,
             'failed': 0,
+            'cached': 0,
             'total_tokens': 0,
+            'packed_requests': 0,
+            'packed_articles': 0,
+            'pack_fallbacks': 0,
+            'by_method': {},
             'key_usage': {}  # Track per-key usage
         }
         
         # Now load config and API keys
         self.config = self._load_config(config_path)
-        self.api_keys = self._load_api_keys()
+        llm = self.config.get('llm', {})
+        self.backend_name = backend or llm.get('backend') or 'groq'
+        fallback = fallback or llm.get('fallback') or 'extractive'
+        # Local backends need no keys, no network and no quota
+        self.local = get_backend(self.backend_name, self.config) if self.backend_name != 'groq' else None
+        self.fallback = None
+        if self.local is None and fallback != 'none':
+            self.fallback = get_backend(fallback, self.config)
+        self.api_keys = self._load_api_keys() if self.local is None else []
         self.clients = []
+        self.limiter = None
+        self.router = None
+        self.quota_exhausted = False
+        self.cache = SummaryCache.from_config(self.config) if use_cache else None
+        self.budget = PromptBudget.from_config(self.config)
+        self.packer = RequestPacker.from_config(self.config, self.budget.counter, pack)
+        self.routing = SummaryRouter.from_config(self.config, self.budget.counter, routing)
+        self.journal = None
+        # Optional hook ordering (and filtering) the articles to summarize,
+        # set by summary_scheduler.py
+        self.schedule = None
+        
+        # Worker threads update stats['key_usage'] and the token/pack counters
+        self.stats_lock = threading.Lock()
+        self.metrics = SummarizerMetrics.from_config(self.config, [f'key_{i + 1}' for i in range(len(self.api_keys))])
+        self.metrics_port = metrics_port or (self.config.get('llm', {}).get('metrics', {}) or {}).get('port')
+        self.hedging = HedgePolicy.from_config(self.config, self.metrics, hedging)
+        self.hedge_pool = None
+        
+        concurrency = self.config.get('llm', {}).get('concurrency', {}) or {}
+        self.window = max(1, window or concurrency.get('window') or 2 * len(self.api_keys))
+        self.checkpoint_seconds = concurrency.get('checkpoint_seconds', DEFAULT_CHECKPOINT_SECONDS)
         
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from YAML"""
@@ -130,23 +222,29 @@ class ParallelSummarizer:
             from groq import Groq
         
         for i, key in enumerate(self.api_keys):
-            client = Groq(api_key=key)
+            # Retries are ours: a 429 should move the request to another key,
+            # not hold this thread in the SDK's backoff
+            client = Groq(api_key=key, base_url=self.config['llm']['groq'].get('base_url'), max_retries=0)
             self.clients.append(client)
         
+        self._init_rate_limiter()
+        
         print(f"✅ Initialized {len(self.clients)} Groq client(s)")
         print(f"⚡ Expected speedup: ~{len(self.clients)}x faster!")
     
+    def _init_rate_limiter(self):
+        """Per-key RPM/TPM/daily limits from llm.rate_limit, and the key router"""
+        if self.limiter is None:
+            self.limiter = RateLimiter.from_config(self.config, self.api_keys,
+                                                  token_counter=self.budget.counter)
+            self.router = KeyRouter(self.limiter, self.in_flight_per_key, self.stats['key_usage'])
+    
     def _create_summary_prompt(self, article: Dict) -> str:
         """Create prompt for article summarization"""
         title = article.get('title', 'No title')
-        body = article.get('body', '')
-        
-        # Truncate if too long
-        max_tokens = self.config['llm']['summarization']['max_input_tokens']
-        max_chars = max_tokens * 4
         
-        if len(body) > max_chars:
-            body = body[:max_chars] + "..."
+        # Best sentences that fit max_input_tokens (see prompt_budget.py)
+        body = self.budget.fit(article)
         
         prompt = f"""You are a financial news analyst. Extract 5-10 KEY FACTS from this Indian stock market news article.
 
@@ -204,55 +302,279 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         
         return '\n'.join(cleaned_lines)
     
-    def _summarize_with_client(self, article: Dict, client_idx: int) -> Optional[str]:
-        """
-        Summarize article using specific client
-        
-        Args:
-            article: Article to summarize
-            client_idx: Index of client to use
+    def _request_kwargs(self, prompt: str, articles: int = 1) -> Dict:
+        """Chat completion arguments for a summary prompt (articles > 1: packed, JSON reply)"""
+        max_tokens = self.config['llm']['summarization']['max_tokens']
+        kwargs = {
+            'model': self.config['llm']['groq']['model'],
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "You are a financial news analyst specializing in Indian stock markets."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            'temperature': self.config['llm']['summarization']['temperature'],
+            'max_tokens': max_tokens,
+        }
+        if articles > 1:
+            kwargs['max_tokens'] = self.packer.completion_tokens(articles, max_tokens)
+            kwargs['response_format'] = {'type': 'json_object'}
+        return kwargs
+    
+    def _apply_result(self, article: Dict, summary: Optional[str], error: Optional[str] = None,
+                      method: str = 'llm'):
+        """Record a summary (or the failure) on the article and in stats"""
+        if summary:
+            article['summary'] = summary
+            article['summarized'] = True
+            article['summarized_at'] = datetime.now().isoformat()
+            article['summary_method'] = method
+            article['processing'] = 'summarized'
+            article['needs_summary'] = False
+            article.pop('summary_error', None)
+            self.stats['summarized'] += 1
+            self.stats['by_method'][method] = self.stats['by_method'].get(method, 0) + 1
+            self.metrics.articles_done(1, method)
+        else:
+            # A local stand-in summary stays usable until the LLM replaces it
+            if article.get('summary_method') != 'fallback':
+                article['summarized'] = False
+            article['summary_error'] = error or "Failed to generate summary"
+            self.stats['failed'] += 1
+            self.metrics.articles_done(1, 'failed')
+    
+    def _cache_key(self, article: Dict) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.key_for(
+            article,
+            self.config['llm']['groq']['model'],
+            self.PROMPT_VERSION,
+            self.config['llm']['summarization']['temperature'],
+        )
+    
+    def _cache_put(self, article: Dict, summary: Optional[str]):
+        if self.cache is not None and summary:
+            self.cache.put(self._cache_key(article), summary, self.config['llm']['groq']['model'])
+    
+    def _resolve_cached(self, articles: List[Dict]) -> List[Dict]:
+        """Apply cached summaries; returns the articles that still need the API"""
+        if self.cache is None:
+            return articles
         
-        Returns:
-            Summary string or None
-        """
-        client = self.clients[client_idx]
-        key_name = f'key_{client_idx + 1}'
+        remaining = []
+        for article in articles:
+            summary = self.cache.get(self._cache_key(article))
+            if summary:
+                self._apply_result(article, summary)
+                self.stats['cached'] += 1
+            else:
+                remaining.append(article)
         
-        prompt = self._create_summary_prompt(article)
+        if self.stats['cached']:
+            print(f"📦 From cache: {self.stats['cached']} (no API call)")
+        return remaining
+    
+    def _finish_response(self, key_idx: int, response, prompt: str, estimate: int, articles: int = 1,
+                         latency: float = 0.0) -> str:
+        """Account the response's token usage and latency; returns the cleaned
+        summary (the raw JSON text for packed requests)"""
+        key_name = f'key_{key_idx + 1}'
         
-        try:
-            response = client.chat.completions.create(
-                model=self.config['llm']['groq']['model'],
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a financial news analyst specializing in Indian stock markets."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=self.config['llm']['summarization']['temperature'],
-                max_tokens=self.config['llm']['summarization']['max_tokens'],
-            )
-            
-            summary = response.choices[0].message.content.strip()
+        summary = (response.choices[0].message.content or '').strip()
+        if articles == 1:
             summary = self._clean_summary(summary)
-            
-            # Track usage
+        
+        # Track usage
+        usage = getattr(response, 'usage', None)
+        self.limiter.record(key_idx, estimate, usage, prompt=prompt, articles=articles)
+        with self.stats_lock:
             self.stats['key_usage'][key_name]['requests'] += 1
-            if hasattr(response, 'usage'):
-                tokens = response.usage.total_tokens
+            if usage:
+                tokens = usage.total_tokens
                 self.stats['key_usage'][key_name]['tokens'] += tokens
                 self.stats['total_tokens'] += tokens
-            
-            return summary
-            
+        self.metrics.request_finished(
+            key_idx, latency,
+            getattr(usage, 'prompt_tokens', 0) or 0,
+            getattr(usage, 'completion_tokens', 0) or 0,
+        )
+        
+        return summary
+    
+    def _request_failed(self, key_idx: int, estimate: int, latency: float, error: Exception):
+        """Account a failed call; 429s take the key out of rotation"""
+        self.router.finished(key_idx, latency, ok=False)
+        self.limiter.record(key_idx, estimate)
+        self.metrics.request_failed(key_idx, latency, error)
+        if is_rate_limit_error(error):
+            self.router.throttled(key_idx, error)
+        else:
+            with self.stats_lock:
+                self.stats['key_usage'][f'key_{key_idx + 1}']['errors'] += 1
+    
+    def _request_cancelled(self, key_idx: int, estimate: int, latency: float):
+        """Account a request cancelled before it answered (billed or not, the
+        estimate stays charged)"""
+        self.router.finished(key_idx, latency, ok=False)
+        self.limiter.record(key_idx, estimate, refund=False)
+        self.metrics.request_cancelled(key_idx)
+    
+    def _request_on_key(self, key_idx: int, prompt: str, estimate: int, articles: int = 1) -> str:
+        """One API call on a key the router reserved (exceptions propagate after accounting)"""
+        self.metrics.request_started(key_idx)
+        started = time.monotonic()
+        try:
+            response = self.clients[key_idx].chat.completions.create(**self._request_kwargs(prompt, articles))
         except Exception as e:
-            self.stats['key_usage'][key_name]['errors'] += 1
-            print(f"\n⚠️ Error with {key_name}: {str(e)[:100]}")
-            return None
+            self._request_failed(key_idx, estimate, time.monotonic() - started, e)
+            raise
+        latency = time.monotonic() - started
+        self.router.finished(key_idx, latency)
+        return self._finish_response(key_idx, response, prompt, estimate, articles, latency)
+    
+    def _hedged_request(self, key_idx: int, prompt: str, estimate: int, articles: int = 1) -> str:
+        """
+        _request_on_key, hedged on a second key once the request runs past
+        its key's p95 (see request_hedging.py)
+        
+        The synchronous client cannot cancel a call in progress, so the
+        losing request is abandoned: it finishes in the hedge pool and its
+        answer is accounted, then dropped.
+        
+        Raises:
+            The primary's exception when no request answered
+        """
+        if self.hedge_pool is None:
+            with self.stats_lock:
+                if self.hedge_pool is None:
+                    self.hedge_pool = ThreadPoolExecutor(max_workers=2 * self.window, thread_name_prefix='hedge')
+        
+        started = time.monotonic()
+        primary = self.hedge_pool.submit(self._request_on_key, key_idx, prompt, estimate, articles)
+        hedge = None
+        delay = self.hedging.delay(key_idx)
+        if delay is not None:
+            wait([primary], timeout=delay)
+            if not primary.done():
+                hedge_key = self.hedging.acquire(self.router, key_idx, estimate)
+                if hedge_key is not None:
+                    hedge = self.hedge_pool.submit(self._request_on_key, hedge_key, prompt, estimate, articles)
+        
+        for future in as_completed([f for f in (primary, hedge) if f is not None]):
+            if future.exception() is not None:
+                continue
+            latency = time.monotonic() - started
+            if future is hedge and not primary.done():
+                # The abandoned primary still reports how long it would have taken
+                primary.add_done_callback(lambda _: self.hedging.record(
+                    latency, time.monotonic() - started, hedged=True, won=True))
+            else:
+                self.hedging.record(latency, latency, hedged=hedge is not None, won=future is hedge)
+            return future.result()
+        raise primary.exception()
+    
+    def _max_attempts(self) -> int:
+        return max(1, self.config['llm'].get('rate_limit', {}).get('retry_attempts', 3))
+    
+    def _complete(self, prompt: str, label: str, articles: int = 1) -> Optional[str]:
+        """
+        Send a prompt on whichever key the router picks
+        
+        A rate-limited attempt is retried on another key (the throttled one
+        sits out its retry-after); other errors give up.
+        
+        Returns:
+            Response text (see _finish_response) or None
+        
+        Raises:
+            QuotaExhausted: every key has used its daily quota
+        """
+        estimate = self.limiter.estimate(prompt, articles)
+        
+        for attempt in range(self._max_attempts()):
+            key_idx = self.router.acquire(estimate)
+            try:
+                if self.hedging is not None:
+                    return self._hedged_request(key_idx, prompt, estimate, articles)
+                return self._request_on_key(key_idx, prompt, estimate, articles)
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    continue
+                print(f"\n⚠️ Error with key_{key_idx + 1}: {str(e)[:100]}")
+                return None
+        
+        print(f"\n⚠️ Rate limited on every attempt: {label[:60]}")
+        return None
+    
+    def _summarize_article(self, article: Dict) -> Optional[str]:
+        """
+        Summarize one article on whichever key the router picks
+        
+        Returns:
+            Summary string or None
+        
+        Raises:
+            QuotaExhausted: every key has used its daily quota
+        """
+        summary = self._complete(self._create_summary_prompt(article), article.get('title', ''))
+        self._cache_put(article, summary)
+        return summary
+    
+    def _packed_prompt(self, pack: List[Dict]) -> Tuple[str, List[str]]:
+        """Packed prompt for several short articles, and the bodies it contains"""
+        bodies = [self.budget.fit(article) for article in pack]
+        prompt = self.packer.prompt([(a.get('title', 'No title'), body) for a, body in zip(pack, bodies)])
+        return prompt, bodies
+    
+    def _split_packed(self, pack: List[Dict], text: Optional[str], bodies: List[str]) -> Tuple[List, List[Dict]]:
+        """Validated (article, summary) pairs from a packed reply, and the articles to retry alone"""
+        facts = self.packer.parse(text, pack, bodies) if text else {}
+        results, retry = [], []
+        for i, article in enumerate(pack):
+            summary = self._clean_summary('\n'.join(facts[i])) if i in facts else None
+            if summary:
+                self._cache_put(article, summary)
+                results.append((article, summary))
+            else:
+                retry.append(article)
+        
+        with self.stats_lock:
+            self.stats['packed_requests'] += 1
+            self.stats['packed_articles'] += len(pack) - len(retry)
+            self.stats['pack_fallbacks'] += len(retry)
+        return results, retry
+    
+    def _summarize_unit(self, unit: List[Dict]) -> List[Tuple[Dict, Optional[str]]]:
+        """
+        Summarize a work unit: one article, or a pack of short articles in a
+        single request with a single-article retry for each one that fails
+        validation
+        
+        Returns:
+            (article, summary) pairs; after QuotaExhausted during the retries
+            the remaining articles are left out (they stay unsummarized)
+        
+        Raises:
+            QuotaExhausted: every key has used its daily quota
+        """
+        if len(unit) == 1:
+            return [(unit[0], self._summarize_article(unit[0]))]
+        
+        prompt, bodies = self._packed_prompt(unit)
+        text = self._complete(prompt, unit[0].get('title', ''), len(unit))
+        results, retry = self._split_packed(unit, text, bodies)
+        for article in retry:
+            try:
+                results.append((article, self._summarize_article(article)))
+            except QuotaExhausted:
+                self.quota_exhausted = True
+                break
+        return results
     
     def process_batch_parallel(
         self,
@@ -277,15 +599,9 @@ KEY FACTS (one per line, no bullets, no formatting):"""
             # Submit all tasks
             future_to_article = {}
             
-            for i, article in enumerate(articles):
-                # Round-robin assignment to clients
-                client_idx = i % len(self.clients)
-                
-                future = executor.submit(
-                    self._summarize_with_client,
-                    article,
-                    client_idx
-                )
+            for article in articles:
+                # The router picks the key when the request actually starts
+                future = executor.submit(self._summarize_article, article)
                 future_to_article[future] = article
             
             # Collect results with progress bar
@@ -298,91 +614,310 @@ KEY FACTS (one per line, no bullets, no formatting):"""
                 article = future_to_article[future]
                 
                 try:
-                    summary = future.result()
-                    
-                    if summary:
-                        article['summary'] = summary
-                        article['summarized'] = True
-                        article['summarized_at'] = datetime.now().isoformat()
-                        article['processing'] = 'summarized'
-                        article['needs_summary'] = False
-                        self.stats['summarized'] += 1
-                    else:
-                        article['summarized'] = False
-                        article['summary_error'] = "Failed to generate summary"
-                        self.stats['failed'] += 1
-                        
+                    self._apply_result(article, future.result())
+                except QuotaExhausted:
+                    # Not a failure: the article waits for tomorrow's quota
+                    self.quota_exhausted = True
                 except Exception as e:
-                    article['summarized'] = False
-                    article['summary_error'] = str(e)[:200]
-                    self.stats['failed'] += 1
+                    self._apply_result(article, None, str(e)[:200])
         
         return articles
     
+    def _load_pending(self, input_file: str, store_path: Optional[str],
+                      test_mode: bool = False, test_count: int = 10):
+        """Load the dataset (or open the store) and select unsummarized articles
+        
+        In JSON mode the summary journal of an interrupted run is replayed
+        onto the loaded articles first, so they are not summarized again.
+        
+        Returns:
+            (articles, articles_to_summarize, store); with store_path, articles
+            is None and store is an open ArticleStore
+        """
+        store = None
+        articles = None
+        if store_path:
+            from src.processing.article_store import ArticleStore
+            store = ArticleStore(project_root / store_path)
+            where = "summarized IS NOT 1"
+            if self.local is None:
+                # Extractive stand-ins from a quota-exhausted run get the LLM now
+                where += " OR json_extract(extra, '$.summary_method') = 'fallback'"
+            articles_to_summarize = list(store.iter_articles(where))
+            total = store.count()
+            
+            print(f"\n🗄️ Store: {total} articles ({store_path})")
+            print(f"📝 Need summarization: {len(articles_to_summarize)}")
+            print(f"✅ Already done: {total - len(articles_to_summarize)}")
+        else:
+            # Load dataset
+            input_path = project_root / input_file
+            articles = load_articles(input_path)
+            
+            print(f"\n📂 Loaded: {len(articles)} articles")
+            
+            if self.journal is not None:
+                resumed = self.journal.apply(articles)
+                if resumed:
+                    print(f"♻️ Resumed: {resumed} results from {self.journal.path.name}")
+            
+            # Filter unsummarized
+            articles_to_summarize = [
+                a for a in articles 
+                if not a.get('summarized', False)
+                or (self.local is None and a.get('summary_method') == 'fallback')
+            ]
+            
+            print(f"📝 Need summarization: {len(articles_to_summarize)}")
+            print(f"✅ Already done: {len(articles) - len(articles_to_summarize)}")
+        
+        if test_mode:
+            articles_to_summarize = articles_to_summarize[:test_count]
+            print(f"🧪 TEST MODE: {len(articles_to_summarize)} articles")
+        
+        return articles, articles_to_summarize, store
+    
+    def _summarize_local(self, backend, articles: Optional[List[Dict]], articles_to_summarize: List[Dict],
+                         store, output_path: Path, method: Optional[str] = None):
+        """Summarize with a local backend, one checkpoint per backend batch"""
+        method = method or backend.method
+        batch_size = getattr(backend, 'batch_size', 256)
+        with tqdm(total=len(articles_to_summarize), desc=f"Summarizing ({backend.name})", unit="article") as progress:
+            for start in range(0, len(articles_to_summarize), batch_size):
+                batch = articles_to_summarize[start:start + batch_size]
+                for article, summary in zip(batch, backend.summarize_many(batch)):
+                    self._apply_result(article, summary, method=method)
+                self._checkpoint(articles, batch, store, output_path)
+                progress.update(len(batch))
+    
+    def _route(self, articles: Optional[List[Dict]], articles_to_summarize: List[Dict],
+               store, output_path: Path) -> List[Dict]:
+        """Apply the passthrough and extractive routes (see summary_router.py);
+        returns the articles that still need a summarizer"""
+        if self.routing is None:
+            return articles_to_summarize
+        
+        plan = self.routing.route(articles_to_summarize)
+        done = []
+        for method in ('passthrough', 'extractive'):
+            for article in plan[method]:
+                self._apply_result(article, self.routing.text(article), method=method)
+                done.append(article)
+        done.extend(plan['skip'])   # Recorded with their summary_error
+        if done:
+            self._checkpoint(articles, done, store, output_path)
+        
+        print(f"\n🧭 Routing {len(articles_to_summarize)} articles: "
+              + ", ".join(f"{route} {len(plan[route])}" for route in ROUTES if plan[route]))
+        for rule, count, description in self.routing.summary():
+            print(f"   {rule}: {count} ({description})")
+        return plan['llm']
+    
+    def _defer_over_budget(self, articles: Optional[List[Dict]], articles_to_summarize: List[Dict],
+                           store, output_path: Path) -> List[Dict]:
+        """Keep today's API requests for the longest articles (the first ones
+        when scheduled); the rest get the fallback now and the LLM on a later
+        run. Returns the articles for the API"""
+        if self.routing is None or not articles_to_summarize:
+            return articles_to_summarize
+        
+        self._init_rate_limiter()
+        left = self.limiter.requests_left_today()
+        llm, deferred = self.routing.defer(articles_to_summarize, left, ordered=self.schedule is not None)
+        if deferred:
+            print(f"💸 API budget: {left} request(s) left today for {len(articles_to_summarize)} long "
+                  f"article(s); {len(deferred)} deferred")
+            if self.fallback is not None:
+                self._summarize_local(self.fallback, articles, deferred, store, output_path, 'fallback')
+        return llm
+    
+    def _checkpoint(self, articles: Optional[List[Dict]], done: List[Dict], store, output_path: Path):
+        """Persist finished articles (row updates in the store, else journal
+        appends) and export the metrics"""
+        self.metrics.export()
+        if self.limiter:
+            self.limiter.save()
+        if store is not None:
+            from src.processing.article_store import SUMMARY_FIELDS
+            with store.transaction():
+                for article in done:
+                    store.update(article['url'], {k: article[k] for k in SUMMARY_FIELDS if k in article})
+        else:
+            self.journal.extend(done)
+            self.journal.sync()
+    
+    def _finish(self, articles: Optional[List[Dict]], store, output_path: Path) -> Path:
+        """Close the store, or fold the journal into the output dataset once"""
+        if store is not None:
+            store.close()
+            return store.path
+        written = self.journal.materialize(articles, output_path)
+        print(f"\n💾 Materialized {written} articles to {output_path.name}")
+        return output_path
+    
+    def _summarize_pending(self, articles: Optional[List[Dict]], articles_to_summarize: List[Dict],
+                           store, output_path: Path):
+        """
+        Sliding-window scheduler: keep `window` requests in flight and start
+        the next article as soon as any request finishes
+        
+        Checkpoints are taken every checkpoint_seconds from this (the
+        collecting) thread; workers never wait for them.
+        """
+        self._init_groq_clients()
+        
+        print(f"🪟 Window: {self.window} requests in flight, checkpoint every {self.checkpoint_seconds}s")
+        
+        units = self.packer.units(articles_to_summarize)
+        if len(units) < len(articles_to_summarize):
+            print(f"📦 Packing short articles: {len(articles_to_summarize)} articles in {len(units)} requests")
+        queue = iter(units)
+        queued = [len(units)]
+        in_flight = {}
+        finished = []
+        next_checkpoint = time.monotonic() + self.checkpoint_seconds
+        next_status = 0.0
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.window) as executor, tqdm(
+                total=len(articles_to_summarize),
+                desc="Summarizing (parallel)",
+                unit="article"
+            ) as progress:
+            
+                def start_next():
+                    unit = next(queue, None)
+                    if unit is not None:
+                        in_flight[executor.submit(self._summarize_unit, unit)] = unit
+                        queued[0] -= 1
+                        self.metrics.set_queue(queued[0])
+            
+                for _ in range(self.window):
+                    start_next()
+            
+                while in_flight:
+                    timeout = max(0.0, next_checkpoint - time.monotonic())
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                    for future in done:
+                        unit = in_flight.pop(future)
+                        try:
+                            for article, summary in future.result():
+                                self._apply_result(article, summary)
+                                finished.append(article)
+                        except QuotaExhausted:
+                            # Not a failure: the articles wait for tomorrow's quota
+                            self.quota_exhausted = True
+                        except Exception as e:
+                            for article in unit:
+                                self._apply_result(article, None, str(e)[:200])
+                                finished.append(article)
+                        progress.update(len(unit))
+                    
+                        if not self.quota_exhausted:
+                            start_next()
+                
+                    if done and time.monotonic() >= next_status:
+                        progress.set_postfix_str(self.metrics.progress_line(), refresh=False)
+                        next_status = time.monotonic() + 1.0
+                
+                    if time.monotonic() >= next_checkpoint:
+                        self._checkpoint(articles, finished, store, output_path)
+                        finished = []
+                        next_checkpoint = time.monotonic() + self.checkpoint_seconds
+        finally:
+            # Also on Ctrl+C: keep what already finished
+            self._checkpoint(articles, finished, store, output_path)
+        
+        if self.quota_exhausted:
+            print("\n⏸️ Every API key used its daily quota. Stopping; rerun tomorrow to continue.")
+    
     def process_dataset(
         self,
         input_file: str = "data/datasets/finbert_ready.json",
         output_file: str = "data/datasets/summarized_dataset.json",
-        batch_size: int = 10,
         test_mode: bool = False,
-        test_count: int = 10
+        test_count: int = 10,
+        store_path: Optional[str] = None,
+        checkpoint_seconds: Optional[float] = None
     ):
-        """Process entire dataset with parallel processing"""
-        print("\n" + "="*70)
-        print("🚀 PARALLEL GROQ LLM SUMMARIZER (MULTI-KEY)")
-        print("="*70)
+        """Process entire dataset with parallel processing
         
-        # Load dataset
-        input_path = project_root / input_file
-        with open(input_path, 'r', encoding='utf-8') as f:
-            articles = json.load(f)
-        
-        print(f"\n📂 Loaded: {len(articles)} articles")
+        With store_path, unsummarized articles are read from the SQLite
+        article store and finished ones are written back as per-row updates.
+        Otherwise they are appended to <output>.journal.jsonl and the output
+        dataset is written once when the run ends. Either way a checkpoint
+        is taken every checkpoint_seconds (default: config or 30).
+        """
+        if checkpoint_seconds is not None:
+            self.checkpoint_seconds = checkpoint_seconds
         
-        # Filter unsummarized
-        articles_to_summarize = [
-            a for a in articles 
-            if not a.get('summarized', False)
-        ]
+        print("\n" + "="*70)
+        print(self.BANNER)
+        print("="*70)
         
-        print(f"📝 Need summarization: {len(articles_to_summarize)}")
-        print(f"✅ Already done: {len(articles) - len(articles_to_summarize)}")
+        output_path = project_root / output_file
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.journal = None if store_path else SummaryJournal.for_output(output_path)
         
-        if test_mode:
-            articles_to_summarize = articles_to_summarize[:test_count]
-            print(f"🧪 TEST MODE: {len(articles_to_summarize)} articles")
+        articles, articles_to_summarize, store = self._load_pending(
+            input_file, store_path, test_mode, test_count
+        )
+        if self.schedule is not None:
+            articles_to_summarize = self.schedule(articles_to_summarize)
         
         if not articles_to_summarize:
             print("✅ All articles already summarized!")
+            if store is not None:
+                store.close()
+            elif self.journal.path.exists():
+                self._finish(articles, store, output_path)
             return
         
-        # Initialize clients
-        self._init_groq_clients()
-        
         self.stats['total_articles'] = len(articles_to_summarize)
+        self.metrics.start()
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_port)
         
-        # Process in batches to save checkpoints
-        output_path = project_root / output_file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        for i in range(0, len(articles_to_summarize), batch_size):
-            batch = articles_to_summarize[i:i + batch_size]
-            
-            print(f"\n🔄 Processing batch {i//batch_size + 1}/{(len(articles_to_summarize)-1)//batch_size + 1}")
-            
-            # Process batch in parallel
-            self.process_batch_parallel(batch)
-            
-            # Save checkpoint
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(articles, f, indent=2, ensure_ascii=False)
-            
-            print(f"💾 Checkpoint saved ({self.stats['summarized']}/{len(articles_to_summarize)})")
-            
-            # Rate limiting between batches
-            time.sleep(2)
+        try:
+            articles_to_summarize = self._route(articles, articles_to_summarize, store, output_path)
+            if self.local is not None:
+                self._summarize_local(self.local, articles, articles_to_summarize, store, output_path)
+            else:
+                # Articles summarized before (same text, model, prompt) cost nothing
+                cached = articles_to_summarize
+                articles_to_summarize = self._resolve_cached(articles_to_summarize)
+                if len(articles_to_summarize) < len(cached):
+                    self._checkpoint(articles, [a for a in cached if a.get('summary_method') == 'llm'],
+                                     store, output_path)
+                articles_to_summarize = self._defer_over_budget(articles, articles_to_summarize, store, output_path)
+                
+                if articles_to_summarize:
+                    self._summarize_pending(articles, articles_to_summarize, store, output_path)
+                
+                if self.quota_exhausted and self.fallback is not None:
+                    left = [a for a in articles_to_summarize if not a.get('summarized')]
+                    if left:
+                        print(f"\n🧮 Quota exhausted: {len(left)} article(s) summarized locally "
+                              f"({self.fallback.name}) until the next run")
+                        self._summarize_local(self.fallback, articles, left, store, output_path, 'fallback')
+        except BaseException:
+            # Keep the journal for the next run to resume from
+            if self.journal is not None:
+                self.journal.close()
+            if store is not None:
+                store.close()
+            raise
+        finally:
+            self.metrics.export()
+            self.metrics.close()
+            if self.hedge_pool is not None:
+                # Abandoned hedge losers finish on their own
+                self.hedge_pool.shutdown(wait=False)
+                self.hedge_pool = None
         
-        # Print final stats
+        # Write the dataset once and print final stats
+        output_path = self._finish(articles, store, output_path)
         self._print_stats(output_path)
     
     def _print_stats(self, output_path: Path):
@@ -393,18 +928,58 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         
         print(f"\n✅ Summarized: {self.stats['summarized']}")
         print(f"❌ Failed: {self.stats['failed']}")
+        print(f"📦 From cache: {self.stats['cached']}")
         print(f"📊 Total: {self.stats['total_articles']}")
+        if set(self.stats['by_method']) - {'llm'}:
+            print("🧮 By method: " + ", ".join(f"{m} {n}" for m, n in self.stats['by_method'].items()))
         
+        if self.cache is not None:
+            cache = self.cache.stats()
+            print(f"\n📦 Summary cache: {cache['hits']} hits, {cache['misses']} misses "
+                  f"({cache['hit_rate']:.0%}), {cache['entries']:,} entries")
+        
+        metrics = self.metrics.snapshot()
         if self.stats['total_tokens'] > 0:
-            print(f"\n🔢 Total tokens: {self.stats['total_tokens']:,}")
+            print(f"\n🔢 Total tokens: {self.stats['total_tokens']:,} "
+                  f"({metrics['tokens_per_second_overall']:,.0f} tokens/sec)")
+        if metrics['errors']:
+            print("⚠️ Errors by class: " + ", ".join(f"{k} {v}" for k, v in sorted(metrics['errors'].items())))
+        
+        budget = self.budget.summary()
+        if budget['trimmed']:
+            print(f"✂️ Trimmed {budget['trimmed']} article(s) to the input budget, "
+                  f"{budget['tokens_saved']:,} prompt tokens saved ({budget['tokenizer']})")
+        
+        if self.hedging is not None:
+            hedging = self.hedging.summary()
+            print(f"🏁 Hedged: {hedging['hedges']} of {hedging['requests']} requests "
+                  f"({hedging['hedge_rate']:.1%}), the hedge answered first {hedging['hedge_wins']} time(s)")
+            if hedging['latency_ms']['p99'] is not None:
+                print(f"   Request p99: {hedging['latency_ms']['p99']:.0f} ms hedged vs "
+                      f"≥ {hedging['unhedged_latency_ms']['p99']:.0f} ms without hedging")
+        
+        if self.stats['packed_requests']:
+            print(f"📦 Packed: {self.stats['packed_articles']} articles in {self.stats['packed_requests']} requests, "
+                  f"{self.stats['pack_fallbacks']} retried alone")
         
         # Per-key stats
         print(f"\n📊 Per-Key Usage:")
-        for key_name, usage in self.stats['key_usage'].items():
+        quota = self.limiter.summary() if self.limiter else []
+        for i, (key_name, usage) in enumerate(self.stats['key_usage'].items()):
             print(f"   {key_name}:")
             print(f"      Requests: {usage['requests']}")
             print(f"      Tokens: {usage['tokens']:,}")
             print(f"      Errors: {usage['errors']}")
+            latency = metrics['keys'].get(key_name, {}).get('latency_ms', {})
+            if latency.get('p50') is not None:
+                print(f"      Latency: p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+                      f"p99 {latency['p99']:.0f} ms")
+            if usage.get('throttled'):
+                print(f"      Throttled (429): {usage['throttled']} ({usage['cooldown_seconds']}s out of rotation)")
+            if i < len(quota):
+                left = quota[i]['left_today']
+                print(f"      Left today: {'unlimited' if left is None else f'{left:,}'}")
+                print(f"      Rate-limit wait: {quota[i]['waited_seconds']}s")
         
         print(f"\n💾 Output: {output_path}")
         print(f"📏 Size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
@@ -424,18 +999,41 @@ def main():
     parser.add_argument('--output', default='data/datasets/summarized_dataset.json')
     parser.add_argument('--test', action='store_true', help='Test mode (10 articles)')
     parser.add_argument('--count', type=int, default=10, help='Test count')
-    parser.add_argument('--batch-size', type=int, default=10, help='Batch size')
+    parser.add_argument('--window', type=int, default=None,
+                        help='Requests kept in flight (default: config or 2 per key)')
+    parser.add_argument('--checkpoint-seconds', type=float, default=None,
+                        help=f'Seconds between checkpoints (default: config or {DEFAULT_CHECKPOINT_SECONDS})')
+    parser.add_argument('--pack', type=int, default=None,
+                        help='Short articles per request (default: config or 5; 1 disables packing)')
+    parser.add_argument('--backend', default=None,
+                        help='groq, or extractive to summarize offline (default: config or groq)')
+    parser.add_argument('--no-fallback', action='store_true',
+                        help='Leave articles unsummarized when every key is out of quota')
+    parser.add_argument('--no-routing', action='store_true',
+                        help='Summarize every article (no passthrough or extractive routes)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus /metrics and /metrics.json on this port during the run')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Duplicate requests slower than their key\'s p95 on another key')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the summary cache')
+    parser.add_argument('--store', nargs='?', const='data/datasets/articles.db', default=None,
+                        help='Use the SQLite article store instead of JSON files')
     
     args = parser.parse_args()
     
     try:
-        summarizer = ParallelSummarizer()
+        summarizer = ParallelSummarizer(use_cache=not args.no_cache, window=args.window, pack=args.pack,
+                                        backend=args.backend, fallback='none' if args.no_fallback else None,
+                                        routing=False if args.no_routing else None,
+                                        metrics_port=args.metrics_port,
+                                        hedging=True if args.hedge else None)
         summarizer.process_dataset(
             input_file=args.input,
             output_file=args.output,
-            batch_size=args.batch_size,
             test_mode=args.test,
-            test_count=args.count
+            test_count=args.count,
+            store_path=args.store,
+            checkpoint_seconds=args.checkpoint_seconds
         )
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Partitioned Parquet Dataset for the Merged Corpus
+Typed, compressed, column-oriented copy of the merged articles
+
+Layout: data/datasets/parquet/year=YYYY/month=MM/part-*.parquet
+- Dates are real dates, counts are ints, flags are bools
+- zstd compression, one row group per flushed batch
+- Articles without a parseable published date go to year=0/month=0
+
+Readers load only the columns and months they ask for:
+
+    from src.processing.parquet_store import read_articles
+    table = read_articles(columns=['title', 'summary', 'published_date'],
+                          start='2024-01-01', end='2024-03-31')
+
+Author: StockBus Team
+Requires: pyarrow
+"""
+
+import sys
+import shutil
+import subprocess
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.scraping.dates import article_day, parse_date
+
+DEFAULT_ROOT = "data/datasets/parquet"
+
+
+def _import_pyarrow():
+    """Import pyarrow, installing it on first use"""
+    try:
+        import pyarrow
+    except ImportError:
+        print("📦 Installing pyarrow package...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "pyarrow"])
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+    return pa, pq, ds
+
+
+def article_schema(pa):
+    """Arrow schema for merged (and later summarized) articles"""
+    return pa.schema([
+        ('url', pa.string()),
+        ('original_url', pa.string()),
+        ('title', pa.string()),
+        ('gnews_title', pa.string()),
+        ('body', pa.string()),
+        ('publisher', pa.dictionary(pa.int32(), pa.string())),
+        ('topic', pa.dictionary(pa.int32(), pa.string())),
+        ('authors', pa.list_(pa.string())),
+        ('published_date', pa.date32()),
+        ('scraped_date', pa.date32()),
+        ('body_length', pa.int32()),
+        ('word_count', pa.int32()),
+        ('extraction_method', pa.dictionary(pa.int32(), pa.string())),
+        ('processing', pa.dictionary(pa.int32(), pa.string())),
+        ('finbert_ready', pa.bool_()),
+        ('summary', pa.string()),
+        ('summarized', pa.bool_()),
+    ])
+
+
+def parse_display_date(value) -> Optional[date]:
+    """DD/MM/YYYY (or ISO/epoch) value to a date, None if unparseable"""
+    dt = parse_date(value)
+    return dt.date() if dt else None
+
+
+def _to_row(article: Dict) -> Dict:
+    """Coerce a JSON article into the typed schema's Python values"""
+    def as_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    authors = article.get('authors') or []
+    return {
+        'url': article.get('url', ''),
+        'original_url': article.get('original_url', ''),
+        'title': article.get('title', ''),
+        'gnews_title': article.get('gnews_title', ''),
+        'body': article.get('body', ''),
+        'publisher': article.get('publisher') or None,
+        'topic': article.get('topic') or None,
+        'authors': [str(a) for a in authors] if isinstance(authors, list) else [str(authors)],
+        'published_date': article_day(article),
+        'scraped_date': parse_display_date(article.get('scraped_date')),
+        'body_length': as_int(article.get('body_length')),
+        'word_count': as_int(article.get('word_count')),
+        'extraction_method': article.get('extraction_method') or None,
+        'processing': article.get('processing') or None,
+        'finbert_ready': article.get('finbert_ready'),
+        'summary': article.get('summary'),
+        'summarized': article.get('summarized'),
+    }
+
+
+class ParquetDatasetWriter:
+    """
+    Streams articles into a year/month partitioned Parquet dataset
+
+    Rows are buffered per partition and flushed as row groups, so memory is
+    bounded by batch_size rows per open month.
+
+    Args:
+        root: Dataset directory
+        append: Add new part files to an existing dataset instead of
+            rebuilding it (a rebuild is written aside and swapped in on close)
+        batch_size: Rows per row group
+        compression: Parquet codec
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, append: bool = False,
+                 batch_size: int = 5000, compression: str = 'zstd'):
+        self.pa, self.pq, _ = _import_pyarrow()
+        self.schema = article_schema(self.pa)
+        self.root = Path(root)
+        self.append = append
+        self.batch_size = batch_size
+        self.compression = compression
+        self.target = self.root if append else self.root.with_name(self.root.name + '.tmp')
+        self.part_name = f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}.parquet"
+        self.buffers = {}
+        self.writers = {}
+        self.count = 0
+
+        if not append and self.target.exists():
+            shutil.rmtree(self.target)
+        self.target.mkdir(parents=True, exist_ok=True)
+
+    def write(self, article: Dict):
+        row = _to_row(article)
+        published = row['published_date']
+        key = (published.year, published.month) if published else (0, 0)
+
+        buffer = self.buffers.setdefault(key, [])
+        buffer.append(row)
+        self.count += 1
+
+        if len(buffer) >= self.batch_size:
+            self._flush(key)
+
+    def _flush(self, key):
+        rows = self.buffers.pop(key, [])
+        if not rows:
+            return
+
+        writer = self.writers.get(key)
+        if writer is None:
+            year, month = key
+            directory = self.target / f"year={year}" / f"month={month:02d}"
+            directory.mkdir(parents=True, exist_ok=True)
+            writer = self.pq.ParquetWriter(
+                directory / self.part_name, self.schema, compression=self.compression
+            )
+            self.writers[key] = writer
+
+        writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        """Flush all partitions and publish the dataset"""
+        for key in list(self.buffers):
+            self._flush(key)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+        if not self.append:
+            if self.root.exists():
+                shutil.rmtree(self.root)
+            self.target.rename(self.root)
+
+    def abort(self):
+        """Drop unflushed rows; a rebuild leaves the old dataset untouched"""
+        self.buffers = {}
+        for writer in self.writers.values():
+            writer.close()
+        if self.append:
+            for key in self.writers:
+                year, month = key
+                (self.target / f"year={year}" / f"month={month:02d}" / self.part_name).unlink(missing_ok=True)
+        elif self.target.exists():
+            shutil.rmtree(self.target)
+        self.writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _as_date(value: Union[str, date, None]) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _filtered_dataset(root, start=None, end=None, publishers=None, topics=None, processing=None):
+    """The dataset at root and the filter expression for the given bounds"""
+    pa, _, ds = _import_pyarrow()
+    dataset = ds.dataset(str(root), format='parquet', partitioning='hive')
+
+    start, end = _as_date(start), _as_date(end)
+    conditions = []
+
+    if start:
+        conditions.append(ds.field('year') >= start.year)
+        conditions.append(ds.field('published_date') >= pa.scalar(start, pa.date32()))
+    if end:
+        conditions.append(ds.field('year') <= end.year)
+        conditions.append(ds.field('published_date') <= pa.scalar(end, pa.date32()))
+    if start and end and start.year == end.year:
+        conditions.append(ds.field('month') >= start.month)
+        conditions.append(ds.field('month') <= end.month)
+    if publishers is not None:
+        conditions.append(ds.field('publisher').isin(list(publishers)))
+    if topics is not None:
+        conditions.append(ds.field('topic').isin(list(topics)))
+    if processing is not None:
+        conditions.append(ds.field('processing').isin(list(processing)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    return dataset, expression
+
+
+def read_articles(
+    root: str = DEFAULT_ROOT,
+    columns: Optional[List[str]] = None,
+    start: Union[str, date, None] = None,
+    end: Union[str, date, None] = None,
+    publishers: Optional[Iterable[str]] = None,
+    topics: Optional[Iterable[str]] = None,
+    processing: Optional[Iterable[str]] = None,
+):
+    """
+    Load a projection of the Parquet dataset as an Arrow table
+
+    Args:
+        root: Dataset directory
+        columns: Columns to read (default: all)
+        start, end: Inclusive published-date bounds ('YYYY-MM-DD' or date);
+            months outside the range are pruned by partition
+        publishers, topics, processing: Keep only these values
+
+    Returns:
+        pyarrow.Table (call .to_pandas() or .to_pylist() as needed)
+    """
+    dataset, expression = _filtered_dataset(root, start, end, publishers, topics, processing)
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def iter_batches(root: str = DEFAULT_ROOT, columns: Optional[List[str]] = None,
+                 batch_size: int = 10000, **filters):
+    """Stream the same projection as read_articles in record batches of dicts
+
+    Batches are scanned straight from the files, so only about one batch
+    is held in memory at a time.
+    """
+    dataset, expression = _filtered_dataset(root, **filters)
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pylist()
+
+
+def main():
+    import argparse
+    from src.scraping.json_stream import iter_json_records
+
+    parser = argparse.ArgumentParser(
+        description="Convert a merged JSON dataset to a partitioned Parquet dataset"
+    )
+    parser.add_argument('--input', default='data/datasets/finbert_ready.json')
+    parser.add_argument('--output', default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    output_root = project_root / args.output
+    print(f"\n🔄 Converting {args.input} -> {args.output}")
+    with ParquetDatasetWriter(output_root) as writer:
+        for article in iter_json_records(project_root / args.input):
+            writer.write(article)
+
+    size_mb = sum(f.stat().st_size for f in output_root.rglob('*.parquet')) / 1024 / 1024
+    print(f"✅ Wrote {writer.count:,} articles ({size_mb:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
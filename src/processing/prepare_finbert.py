@@ -7,19 +7,66 @@ Author: StockBus Team
 Created: October 9, 2025 (Day 3)
 """
 
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.scraping.article_record import dump_articles, load_articles
+
+
+def prepare_article(article: dict, stats: dict) -> dict:
+    """Set the FinBERT input fields on one article (in place)"""
+    # Determine what to use as FinBERT input
+    if article.get('summary'):
+        # Use AI-generated summary
+        article['finbert_input'] = article['summary']
+        article['input_source'] = 'summary'
+        stats['used_summary'] += 1
+        
+    elif article.get('body'):
+        # Use original body if short enough
+        body = article['body']
+        word_count = article.get('word_count', len(body.split()))
+        
+        if word_count <= 512:
+            article['finbert_input'] = body
+            article['input_source'] = 'body'
+            stats['used_body'] += 1
+        else:
+            # Still too long (shouldn't happen after summarization)
+            article['finbert_input'] = body[:2000]  # Truncate as fallback
+            article['input_source'] = 'body_truncated'
+            article['warning'] = 'Text truncated - original was too long'
+            stats['still_too_long'] += 1
+    
+    else:
+        # No body or summary (edge case)
+        article['finbert_input'] = article.get('title', '')
+        article['input_source'] = 'title_only'
+        article['warning'] = 'No body or summary available'
+    
+    # Calculate input word count
+    article['finbert_input_words'] = len(article['finbert_input'].split())
+    
+    # Mark as ready
+    if article['finbert_input_words'] > 0 and article['finbert_input_words'] <= 512:
+        article['finbert_ready'] = True
+        stats['total_ready'] += 1
+    else:
+        article['finbert_ready'] = False
+    
+    return article
+
 
 def prepare_finbert_dataset(
     input_file: str = "data/datasets/summarized_dataset.json",
-    output_file: str = "data/datasets/finbert_input.json"
+    output_file: str = "data/datasets/finbert_input.json",
+    store_path: Optional[str] = None
 ):
     """
     Create final dataset with unified input field for FinBERT
@@ -28,19 +75,15 @@ def prepare_finbert_dataset(
     - If article has 'summary' → use summary
     - Else if 'body' is short enough → use body
     - Adds 'finbert_input' field for consistency
+    
+    With store_path the SQLite article store is updated row by row instead
+    of writing output_file, and None is returned.
     """
     
     print("\n" + "="*70)
     print("📊 PREPARING FINBERT INPUT DATASET")
     print("="*70)
     
-    # Load data
-    input_path = project_root / input_file
-    with open(input_path, 'r', encoding='utf-8') as f:
-        articles = json.load(f)
-    
-    print(f"\n📂 Loaded: {len(articles)} articles")
-    
     stats = {
         'used_summary': 0,
         'used_body': 0,
@@ -48,53 +91,34 @@ def prepare_finbert_dataset(
         'total_ready': 0
     }
     
-    # Process each article
-    for article in articles:
-        # Determine what to use as FinBERT input
-        if article.get('summary'):
-            # Use AI-generated summary
-            article['finbert_input'] = article['summary']
-            article['input_source'] = 'summary'
-            stats['used_summary'] += 1
-            
-        elif article.get('body'):
-            # Use original body if short enough
-            body = article['body']
-            word_count = article.get('word_count', len(body.split()))
-            
-            if word_count <= 512:
-                article['finbert_input'] = body
-                article['input_source'] = 'body'
-                stats['used_body'] += 1
-            else:
-                # Still too long (shouldn't happen after summarization)
-                article['finbert_input'] = body[:2000]  # Truncate as fallback
-                article['input_source'] = 'body_truncated'
-                article['warning'] = 'Text truncated - original was too long'
-                stats['still_too_long'] += 1
+    if store_path:
+        from src.processing.article_store import ArticleStore, FINBERT_FIELDS
         
-        else:
-            # No body or summary (edge case)
-            article['finbert_input'] = article.get('title', '')
-            article['input_source'] = 'title_only'
-            article['warning'] = 'No body or summary available'
+        articles = None
+        with ArticleStore(project_root / store_path) as store, store.transaction():
+            total = 0
+            for article in store.iter_articles(fields=['summary', 'body', 'word_count', 'title']):
+                prepare_article(article, stats)
+                store.update(article['url'], {k: article[k] for k in FINBERT_FIELDS if k in article})
+                total += 1
+            output_path = store.path
         
-        # Calculate input word count
-        article['finbert_input_words'] = len(article['finbert_input'].split())
+        print(f"\n🗄️ Updated: {total} articles in {store_path}")
+    else:
+        # Load data
+        input_path = project_root / input_file
+        articles = load_articles(input_path)
         
-        # Mark as ready
-        if article['finbert_input_words'] > 0 and article['finbert_input_words'] <= 512:
-            article['finbert_ready'] = True
-            stats['total_ready'] += 1
-        else:
-            article['finbert_ready'] = False
-    
-    # Save output
-    output_path = project_root / output_file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, indent=2, ensure_ascii=False)
+        print(f"\n📂 Loaded: {len(articles)} articles")
+        total = len(articles)
+        
+        # Process each article
+        for article in articles:
+            prepare_article(article, stats)
+        
+        # Save output
+        output_path = project_root / output_file
+        dump_articles(articles, output_path)
     
     # Print statistics
     print("\n" + "="*70)
@@ -103,7 +127,7 @@ def prepare_finbert_dataset(
     print(f"\n✅ Used AI summaries: {stats['used_summary']}")
     print(f"✅ Used original body: {stats['used_body']}")
     print(f"⚠️ Truncated (still long): {stats['still_too_long']}")
-    print(f"\n🎯 Total FinBERT-ready: {stats['total_ready']} / {len(articles)}")
+    print(f"\n🎯 Total FinBERT-ready: {stats['total_ready']} / {total}")
     
     print(f"\n💾 Saved to: {output_path}")
     print(f"📏 File size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
@@ -136,13 +160,21 @@ def main():
         default='data/datasets/finbert_input.json',
         help='Output file (default: finbert_input.json)'
     )
+    parser.add_argument(
+        '--store',
+        nargs='?',
+        const='data/datasets/articles.db',
+        default=None,
+        help='Update the SQLite article store instead of writing JSON (default: data/datasets/articles.db)'
+    )
     
     args = parser.parse_args()
     
     try:
         prepare_finbert_dataset(
             input_file=args.input,
-            output_file=args.output
+            output_file=args.output,
+            store_path=args.store
         )
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Prompt Token Budgeting
+Fill the input budget with an article's most informative sentences
+
+The summarizers used to cut bodies at max_input_tokens * 4 characters.
+That guess is wrong in both directions: short articles still pay for
+newsletter footers and "Also read" links, while long ones lose whatever
+came after the cut, often the paragraph with the numbers.
+
+Instead:
+- Tokens are counted with the model's tokenizer when one is configured
+  (llm.summarization.tokenizer: a Llama 3 tokenizer.json, or a Hugging
+  Face tokenizer name in the local cache). Without one the counts are an
+  approximation: tiktoken's cl100k_base if installed, else a word-piece
+  heuristic. Neither is Llama 3's vocabulary, so budgets can be off by a
+  few percent either way; the limiter's reservations are corrected by
+  the usage each response reports
+- Boilerplate sentences (subscribe, also read, disclaimers...) are dropped
+- Over budget, sentences are ranked by financial salience (numbers,
+  percentages, amounts, index names, tickers, market verbs, overlap with
+  the title, position in the lead) and the best ones that fit are kept in
+  their original order; sentences with no salience at all are left out
+  even when they would fit
+
+Config (config/config.yaml):
+    llm:
+      summarization:
+        max_input_tokens: 2000
+        trim: extractive            # or: truncate (old behaviour)
+        tokenizer: null             # tokenizer.json path or HF tokenizer name
+
+Usage:
+    budget = PromptBudget.from_config(config)
+    body = budget.fit(article)
+    tokens = budget.counter.count(prompt)
+
+Author: StockBus Team
+"""
+
+import math
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+project_root = Path(__file__).parent.parent.parent
+
+DEFAULT_MAX_INPUT_TOKENS = 2000
+TIKTOKEN_ENCODING = "cl100k_base"   # Closest offline relative of the Llama 3 vocabulary
+
+
+# ----------------------------------------------------------------------
+# Token counting
+# ----------------------------------------------------------------------
+
+_PIECE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def heuristic_token_count(text: str) -> int:
+    """Approximate BPE token count: common words are one token, long words
+    a few, digits go in groups of three, every other symbol is one token"""
+    count = 0
+    for piece in _PIECE.findall(text):
+        if piece[0].isalpha() and piece.isascii():
+            count += 1 + max(0, len(piece) - 7) // 4
+        else:
+            count += 1
+    return count
+
+
+class TokenCounter:
+    """
+    Token counts from the best tokenizer available without network access
+
+    Args:
+        tokenizer: Path to a tokenizer.json, or a Hugging Face tokenizer
+            name already in the local cache (None: try tiktoken, then the
+            heuristic)
+    """
+
+    def __init__(self, tokenizer: Optional[str] = None):
+        self.name = 'heuristic'
+        self._encode = None
+        self._load(tokenizer)
+
+    def _load(self, tokenizer: Optional[str]):
+        if tokenizer:
+            path = Path(tokenizer)
+            if not path.is_absolute():
+                path = project_root / path
+            if path.is_file():
+                try:
+                    from tokenizers import Tokenizer
+                    encoder = Tokenizer.from_file(str(path))
+                    self._encode = lambda text: len(encoder.encode(text, add_special_tokens=False).ids)
+                    self.name = path.name
+                    return
+                except Exception as e:
+                    print(f"⚠️ Could not load tokenizer {path}: {str(e)[:80]}")
+            else:
+                try:
+                    from transformers import AutoTokenizer
+                    encoder = AutoTokenizer.from_pretrained(tokenizer, local_files_only=True)
+                    self._encode = lambda text: len(encoder.encode(text, add_special_tokens=False))
+                    self.name = tokenizer
+                    return
+                except Exception as e:
+                    print(f"⚠️ Tokenizer {tokenizer} not available offline: {str(e)[:80]}")
+
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+            self._encode = lambda text: len(encoding.encode(text, disallowed_special=()))
+            self.name = f'tiktoken/{TIKTOKEN_ENCODING}'
+        except Exception:
+            self._encode = None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encode is None:
+            return heuristic_token_count(text)
+        return self._encode(text)
+
+
+# ----------------------------------------------------------------------
+# Sentences and salience
+# ----------------------------------------------------------------------
+
+# Abbreviations that end in a period without ending the sentence
+_ABBREVIATIONS = {
+    'rs', 'mr', 'mrs', 'ms', 'dr', 'ltd', 'pvt', 'inc', 'co', 'corp', 'vs',
+    'no', 'st', 'jr', 'sr', 'govt', 'dept', 'approx', 'est', 'u.s', 'e.g', 'i.e',
+}
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=["\'(\[]?[A-Z0-9₹$])|\n+')
+
+_BOILERPLATE = re.compile(
+    r"also read|read more|click here|subscribe|sign up|newsletter|follow us|"
+    r"download the .{0,20}app|catch all the|for all the latest|all rights reserved|"
+    r"disclaimer|views and recommendations|do not necessarily reflect|"
+    r"terms of use|cookie|advertisement|first published|updated on|©",
+    re.IGNORECASE
+)
+
+_PERCENT = re.compile(r"\d[\d,.]*\s*(?:%|per\s?cent|bps|basis points)", re.IGNORECASE)
+_AMOUNT = re.compile(
+    r"(?:₹|rs\.?|inr|\$|usd)\s*\d|\d[\d,.]*\s*(?:crore|cr\b|lakh|billion|million|trillion|bn\b|mn\b)",
+    re.IGNORECASE
+)
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_INDEX = re.compile(
+    r"\b(?:nifty|sensex|bank nifty|finnifty|midcap|smallcap|bse|nse|india vix|gift nifty|"
+    r"dow jones|nasdaq|s&p 500|nikkei|hang seng|rbi|sebi|repo rate|gdp|cpi|wpi|fii|fpi|dii)\b",
+    re.IGNORECASE
+)
+_MARKET_TERMS = re.compile(
+    r"\b(?:rose|rises?|fell|falls?|gain(?:s|ed)?|declin(?:e|es|ed)|surg(?:e|es|ed)|plung(?:e|es|ed)|"
+    r"jump(?:s|ed)?|slipp?(?:s|ed)?|rall(?:y|ies|ied)|drop(?:s|ped)?|climb(?:s|ed)?|tumbl(?:e|es|ed)|"
+    r"closed|ended|settled|profit|revenue|earnings|ebitda|margin|dividend|buyback|ipo|"
+    r"inflation|outflows?|inflows?|target price|upgrade[ds]?|downgrade[ds]?|guidance|quarter|q[1-4]|fy\d{2})\b",
+    re.IGNORECASE
+)
+_TICKER = re.compile(r"\b[A-Z][A-Z&]{1,9}\b")
+_NOT_TICKERS = {'THE', 'AND', 'FOR', 'BUT', 'NOT', 'WITH', 'THIS', 'THAT', 'CEO', 'CFO', 'MD',
+                'IST', 'AM', 'PM', 'US', 'UK', 'EU', 'AI', 'TV', 'PTI', 'ANI', 'IANS'}
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'at', 'by', 'with', 'as',
+    'is', 'are', 'was', 'were', 'be', 'from', 'its', 'it', 'this', 'that', 'after', 'amid',
+    'over', 'into', 'up', 'down', 'says', 'said', 'new', 'how', 'why', 'what', 'here',
+}
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of an article body (decimals, 'Rs.' and similar are not breaks)"""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        before = text[start:match.start()].rstrip('"\')]')
+        last_word = before.rsplit(None, 1)[-1].rstrip('.').lower() if before.strip() else ''
+        if '\n' not in match.group() and last_word in _ABBREVIATIONS:
+            continue
+        sentence = text[start:match.start()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def is_boilerplate(sentence: str) -> bool:
+    return bool(_BOILERPLATE.search(sentence))
+
+
+def content_words(text: str) -> set:
+    return {w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2}
+
+
+def salience(sentence: str, title_words: set = frozenset(), position: Optional[int] = None) -> float:
+    """How much market information a sentence carries (0: none)"""
+    percents = len(_PERCENT.findall(sentence))
+    amounts = len(_AMOUNT.findall(sentence))
+    numbers = len(_NUMBER.findall(sentence))
+    score = 2.0 * percents + 2.0 * amounts + 0.5 * min(numbers, 6)
+    score += 1.5 * min(len(_INDEX.findall(sentence)), 3)
+    score += 1.0 * min(len(_MARKET_TERMS.findall(sentence)), 4)
+    score += 0.5 * min(sum(1 for t in _TICKER.findall(sentence) if t not in _NOT_TICKERS), 3)
+    if title_words:
+        score += 2.0 * len(title_words & content_words(sentence)) / len(title_words)
+    if score and position is not None and position < 3:
+        score += (1.5, 1.0, 0.5)[position]
+    return score
+
+
+# ----------------------------------------------------------------------
+# Budget
+# ----------------------------------------------------------------------
+
+class PromptBudget:
+    """
+    Token-budgeted article bodies for the summary prompt
+
+    Args:
+        max_tokens: Body budget in tokens (llm.summarization.max_input_tokens)
+        counter: Token counter (default: TokenCounter())
+        mode: 'extractive' (salience ranking) or 'truncate' (token-exact cut)
+    """
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_INPUT_TOKENS, counter: Optional[TokenCounter] = None,
+                 mode: str = 'extractive'):
+        if mode not in ('extractive', 'truncate'):
+            raise ValueError(f"Unknown trim mode: {mode}")
+        self.max_tokens = max_tokens
+        self.counter = counter or TokenCounter()
+        self.mode = mode
+        self.stats = {'articles': 0, 'trimmed': 0, 'tokens_in': 0, 'tokens_out': 0}
+        self.lock = threading.Lock()    # fit() runs on the summarizers' worker threads
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'PromptBudget':
+        settings = config.get('llm', {}).get('summarization', {}) or {}
+        return cls(
+            settings.get('max_input_tokens', DEFAULT_MAX_INPUT_TOKENS),
+            TokenCounter(settings.get('tokenizer')),
+            settings.get('trim', 'extractive'),
+        )
+
+    def fit(self, article: Dict) -> str:
+        """The article body, trimmed to the token budget"""
+        body = article.get('body', '') or ''
+        tokens_in = self.counter.count(body)
+        if self.mode == 'truncate':
+            fitted = self._truncate(body, self.max_tokens) if tokens_in > self.max_tokens else body
+        else:
+            fitted = self._extract(article.get('title', '') or '', body, tokens_in)
+
+        tokens_out = tokens_in if fitted is body else self.counter.count(fitted)
+        with self.lock:
+            self.stats['articles'] += 1
+            self.stats['tokens_in'] += tokens_in
+            self.stats['tokens_out'] += tokens_out
+            if tokens_out < tokens_in:
+                self.stats['trimmed'] += 1
+        return fitted
+
+    def _extract(self, title: str, body: str, tokens_in: int) -> str:
+        sentences = split_sentences(body)
+        kept = [(i, s) for i, s in enumerate(sentences) if not is_boilerplate(s)]
+        if not kept:
+            return self._truncate(body, self.max_tokens) if tokens_in > self.max_tokens else body
+
+        sized = [(i, s, self.counter.count(s)) for i, s in kept]
+        if sum(n for _, _, n in sized) <= self.max_tokens:
+            if len(kept) == len(sentences):
+                return body
+            return ' '.join(s for _, s, _ in sized)
+
+        title_words = content_words(title)
+        ranked: List[Tuple[float, int, str, int]] = []
+        for position, (i, sentence, n) in enumerate(sized):
+            score = salience(sentence, title_words, position)
+            if score > 0:
+                # Mild length normalization: prefer dense sentences without
+                # letting fragments crowd out full ones
+                ranked.append((score / math.sqrt(1 + n / 40), i, sentence, n))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+
+        chosen = []
+        used = 0
+        for _, i, sentence, n in ranked:
+            if used + n > self.max_tokens:
+                continue
+            chosen.append((i, sentence))
+            used += n
+        if not chosen:
+            # Nothing scored or fitted: fall back to the lead
+            return self._truncate(' '.join(s for _, s, _ in sized), self.max_tokens)
+
+        chosen.sort()
+        return ' '.join(sentence for _, sentence in chosen)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens (binary search on characters)"""
+        if self.counter.count(text) <= max_tokens:
+            return text
+        # No token is longer than ~16 characters, so the cut is within that bound
+        low, high = 0, min(len(text), max_tokens * 16)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.counter.count(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        cut = text[:low]
+        # Do not end mid-word
+        if ' ' in cut:
+            cut = cut.rsplit(' ', 1)[0]
+        return cut + "..."
+
+    def summary(self) -> Dict:
+        with self.lock:
+            saved = self.stats['tokens_in'] - self.stats['tokens_out']
+            return dict(self.stats, tokens_saved=saved, tokenizer=self.counter.name)
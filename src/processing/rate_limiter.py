@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Per-Key Rate Limiter for the Groq Summarizers
+Run every API key at its ceiling without getting throttled
+
+Each key gets three budgets:
+- Requests per minute: token bucket, refilled continuously
+- Tokens per minute: token bucket charged with an estimate before the
+  request and corrected from response.usage afterwards
+- Requests per day: counter reset at UTC midnight, persisted so that
+  separate runs on the same day share it
+
+Token estimates learn from the responses: prompts are counted with the
+tokenizer from prompt_budget.py when one is given (else from a learned
+characters-per-token ratio), scaled by the observed billed/counted ratio,
+and the typical completion length is tracked as a moving average, so the
+reservation converges on what the API actually bills.
+
+Config (config/config.yaml, all limits are per key):
+    llm:
+      rate_limit:
+        max_requests_per_minute: 30
+        max_tokens_per_minute: 6000
+        max_requests_per_day: 14400
+        state_path: cache/groq_quota.json   # Daily counters (optional)
+
+Usage:
+    limiter = RateLimiter.from_config(config, api_keys)
+    estimate = limiter.estimate(prompt)
+    limiter.acquire(key_idx, estimate)          # or: await limiter.acquire_async(...)
+    response = client.chat.completions.create(...)
+    limiter.record(key_idx, estimate, response.usage, prompt=prompt)
+
+Author: StockBus Team
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+project_root = Path(__file__).parent.parent.parent
+
+# Groq free tier, per key
+DEFAULT_RPM = 30
+DEFAULT_TPM = 6000
+DEFAULT_RPD = 14400
+
+DEFAULT_STATE_PATH = "cache/groq_quota.json"
+
+CHARS_PER_TOKEN = 4.0   # Starting guess, refined from response.usage
+EWMA_ALPHA = 0.1
+
+
+class QuotaExhausted(RuntimeError):
+    """A key has used its daily request quota"""
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Stable short id for a key, so quota state never stores the key itself"""
+    return hashlib.blake2b(api_key.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket
+
+    Args:
+        capacity: Maximum level (the per-minute limit)
+        per_second: Refill rate
+    """
+
+    __slots__ = ('capacity', 'per_second', 'level', 'updated')
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = float(capacity)
+        self.per_second = float(per_second)
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)"""
+        self._refill(now)
+        # A single request larger than the bucket only needs a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.per_second
+
+    def take(self, amount: float):
+        self.level -= amount
+
+    def give(self, amount: float):
+        """Return (or, if negative, charge) tokens after the fact"""
+        self.level = min(self.capacity, self.level + amount)
+
+
+class KeyBudget:
+    """RPM/TPM buckets and the daily request counter of one key"""
+
+    def __init__(self, key_id: str, rpm: float, tpm: float, rpd: Optional[int]):
+        self.key_id = key_id
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0) if tpm else None
+        self.rpd = rpd
+        self.day = _today()
+        self.used_today = 0
+        self.waited = 0.0
+
+    def roll_day(self):
+        today = _today()
+        if today != self.day:
+            self.day = today
+            self.used_today = 0
+
+    def daily_left(self) -> Optional[int]:
+        self.roll_day()
+        return None if not self.rpd else max(0, self.rpd - self.used_today)
+
+
+class RateLimiter:
+    """
+    Thread- and asyncio-safe per-key RPM/TPM/daily limiter
+
+    Args:
+        key_ids: One id per API key (see key_fingerprint); order defines key_idx
+        rpm: Requests per minute per key
+        tpm: Tokens per minute per key (0 disables the token budget)
+        rpd: Requests per day per key (0 disables the daily quota)
+        max_completion_tokens: Initial completion-length estimate
+        state_path: JSON file for daily counters (None keeps them in memory)
+        token_counter: Object with count(text) -> tokens (see
+            prompt_budget.TokenCounter); None uses characters per token
+    """
+
+    def __init__(
+        self,
+        key_ids: Sequence[str],
+        rpm: float = DEFAULT_RPM,
+        tpm: float = DEFAULT_TPM,
+        rpd: int = DEFAULT_RPD,
+        max_completion_tokens: int = 500,
+        state_path: Optional[Path] = None,
+        token_counter=None
+    ):
+        self.keys = [KeyBudget(key_id, rpm, tpm, rpd) for key_id in key_ids]
+        self.lock = threading.Lock()
+        self.chars_per_token = CHARS_PER_TOKEN
+        self.token_counter = token_counter
+        self.token_scale = 1.0      # Billed prompt tokens per counted token (chat template, system message)
+        self.completion_tokens = float(max_completion_tokens)
+        self.state_path = Path(state_path) if state_path else None
+        self._load_state()
+
+    @classmethod
+    def from_config(cls, config: dict, api_keys: Sequence[str],
+                    state_path: Optional[str] = DEFAULT_STATE_PATH, token_counter=None) -> 'RateLimiter':
+        """Build a limiter from the llm.rate_limit section of config.yaml"""
+        llm = config.get('llm', {})
+        limits = llm.get('rate_limit', {}) or {}
+        return cls(
+            [key_fingerprint(k) for k in api_keys],
+            rpm=limits.get('max_requests_per_minute', DEFAULT_RPM),
+            tpm=limits.get('max_tokens_per_minute', DEFAULT_TPM),
+            rpd=limits.get('max_requests_per_day', DEFAULT_RPD),
+            max_completion_tokens=llm.get('summarization', {}).get('max_tokens', 500),
+            state_path=(project_root / limits.get('state_path', state_path)) if state_path else None,
+            token_counter=token_counter,
+        )
+
+    # ------------------------------------------------------------------
+    # Token estimates
+    # ------------------------------------------------------------------
+
+    def count_prompt_tokens(self, prompt: str) -> int:
+        """Prompt tokens, from the tokenizer or the learned characters-per-token ratio"""
+        if self.token_counter is not None:
+            return int(self.token_counter.count(prompt) * self.token_scale) + 1
+        return int(len(prompt) / self.chars_per_token) + 1
+
+    def estimate(self, prompt: str, articles: int = 1) -> int:
+        """Tokens a request will be billed for: prompt plus expected completion
+        (one per article for packed requests)"""
+        return self.count_prompt_tokens(prompt) + int(self.completion_tokens * articles)
+
+    # ------------------------------------------------------------------
+    # Acquire / record
+    # ------------------------------------------------------------------
+
+    def try_acquire(self, key_idx: int, tokens: int) -> float:
+        """Reserve one request and `tokens` on a key if possible
+
+        Returns:
+            0.0 if reserved, otherwise seconds to wait before trying again
+
+        Raises:
+            QuotaExhausted: the key has no daily requests left
+        """
+        budget = self.keys[key_idx]
+        with self.lock:
+            left = budget.daily_left()
+            if left is not None and left <= 0:
+                raise QuotaExhausted(f"key_{key_idx + 1} used its {budget.rpd} requests today")
+
+            now = time.monotonic()
+            wait = budget.requests.wait_time(1, now)
+            if budget.tokens is not None:
+                wait = max(wait, budget.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+
+            budget.requests.take(1)
+            if budget.tokens is not None:
+                budget.tokens.take(tokens)
+            budget.used_today += 1
+            return 0.0
+
+    def acquire(self, key_idx: int, tokens: int):
+        """Block the calling thread until the key can take the request"""
+        while True:
+            wait = self.try_acquire(key_idx, tokens)
+            if not wait:
+                return
+            self.keys[key_idx].waited += wait
+            time.sleep(wait)
+
+    async def acquire_async(self, key_idx: int, tokens: int):
+        """Like acquire(), but yields to the event loop while waiting"""
+        while True:
+            wait = self.try_acquire(key_idx, tokens)
+            if not wait:
+                return
+            self.keys[key_idx].waited += wait
+            await asyncio.sleep(wait)
+
+    def record(self, key_idx: int, estimated: int, usage=None, prompt: Optional[str] = None,
+               articles: int = 1, refund: bool = True):
+        """Correct the token reservation from response.usage
+
+        Without usage (the request failed), the reserved tokens are
+        returned unless refund is False (a cancelled request may still be
+        billed); the request itself stays counted.
+        """
+        budget = self.keys[key_idx]
+        counted = None
+        if usage is not None and prompt and self.token_counter is not None:
+            counted = self.token_counter.count(prompt)
+        with self.lock:
+            if usage is None:
+                actual = 0
+            else:
+                actual = getattr(usage, 'total_tokens', 0) or 0
+                prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+                completion = getattr(usage, 'completion_tokens', 0) or 0
+                if counted and prompt_tokens:
+                    self.token_scale += EWMA_ALPHA * (prompt_tokens / counted - self.token_scale)
+                elif prompt and prompt_tokens:
+                    ratio = len(prompt) / prompt_tokens
+                    self.chars_per_token += EWMA_ALPHA * (ratio - self.chars_per_token)
+                if completion:
+                    per_article = completion / max(1, articles)
+                    self.completion_tokens += EWMA_ALPHA * (per_article - self.completion_tokens)
+
+            if budget.tokens is not None and (usage is not None or refund):
+                budget.tokens.give(estimated - actual)
+
+    def mark_exhausted(self, key_idx: int):
+        """The API reported the daily quota used up, whatever our count says"""
+        budget = self.keys[key_idx]
+        with self.lock:
+            if budget.rpd:
+                budget.roll_day()
+                budget.used_today = max(budget.used_today, budget.rpd)
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def remaining(self, key_idx: int) -> Dict:
+        """Current headroom of a key"""
+        budget = self.keys[key_idx]
+        with self.lock:
+            now = time.monotonic()
+            budget.requests._refill(now)
+            if budget.tokens is not None:
+                budget.tokens._refill(now)
+            return {
+                'requests_this_minute': int(budget.requests.level),
+                'tokens_this_minute': int(budget.tokens.level) if budget.tokens is not None else None,
+                'requests_today': budget.daily_left(),
+            }
+
+    def headroom(self, key_idx: int) -> float:
+        """Fraction (0-1) of the key's per-minute budget currently free"""
+        budget = self.keys[key_idx]
+        with self.lock:
+            now = time.monotonic()
+            budget.requests._refill(now)
+            free = budget.requests.level / budget.requests.capacity
+            if budget.tokens is not None:
+                budget.tokens._refill(now)
+                free = min(free, budget.tokens.level / budget.tokens.capacity)
+            return max(0.0, free)
+
+    def exhausted(self, key_idx: int) -> bool:
+        left = self.keys[key_idx].daily_left()
+        return left is not None and left <= 0
+
+    def all_exhausted(self) -> bool:
+        return all(self.exhausted(i) for i in range(len(self.keys)))
+
+    def requests_left_today(self) -> Optional[int]:
+        """Daily requests left across all keys (None: no daily quota)"""
+        left = [budget.daily_left() for budget in self.keys]
+        return None if any(n is None for n in left) else sum(left)
+
+    def summary(self) -> List[Dict]:
+        """Per-key usage for stats output"""
+        return [
+            {
+                'quota': budget.rpd or None,
+                'used_today': budget.used_today,
+                'left_today': budget.daily_left(),
+                'waited_seconds': round(budget.waited, 1),
+            }
+            for budget in self.keys
+        ]
+
+    # ------------------------------------------------------------------
+    # Daily counter persistence
+    # ------------------------------------------------------------------
+
+    def _load_state(self):
+        if not self.state_path or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        today = _today()
+        for budget in self.keys:
+            entry = state.get(budget.key_id)
+            if entry and entry.get('day') == today:
+                budget.used_today = entry.get('used', 0)
+
+    def save(self):
+        """Persist today's request counts (atomic replace, merged with other keys' entries)"""
+        if not self.state_path:
+            return
+        state = {}
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+        with self.lock:
+            for budget in self.keys:
+                budget.roll_day()
+                state[budget.key_id] = {'day': budget.day, 'used': budget.used_today}
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_path)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Hedged Requests
+Cut the summarizers' tail latency by racing a slow request on a second key
+
+Most Groq responses arrive in well under a second, but now and then one
+takes tens of seconds. That request holds its worker (and in
+process_batch_parallel the whole batch) the entire time. With hedging:
+
+- A request that has not answered by its key's rolling p95 latency
+  (summarizer_metrics.py, at least min_delay) gets a duplicate on another
+  key, if one has spare budget right now (RPM/TPM headroom, daily quota,
+  at most one request above its in-flight cap; see KeyRouter.try_acquire)
+- The first successful answer is used and the other request is cancelled
+  (async engine) or abandoned (thread engine: a blocking HTTP call cannot
+  be cancelled, its answer is accounted and discarded)
+- If one of the two fails, the other is still awaited
+- Hedges are capped at max_fraction of all requests, so the extra quota
+  spent is bounded
+- Until a key has min_samples answered requests its p95 is not
+  meaningful, so the p95 across all keys is used; no hedging before the
+  run as a whole has min_samples
+
+Reported at the end of a run: hedge rate, how often the hedge won, and
+the request p99 with hedging next to the p99 the primaries alone would
+have had. A cancelled primary only tells us it would have taken at least
+as long as it ran, so the unhedged p99 is a lower bound.
+
+Config (config/config.yaml):
+    llm:
+      hedging:
+        enabled: false
+        percentile: 95          # Hedge after this latency percentile of the key
+        min_delay: 0.5          # Seconds; never hedge sooner
+        min_samples: 20         # Answered requests behind a p95
+        max_fraction: 0.05      # At most this share of requests are hedged
+
+Usage:
+    hedging = HedgePolicy.from_config(config, metrics)
+    delay = hedging.delay(key_idx)                  # None: do not hedge
+    hedge_key = hedging.acquire(router, key_idx, estimate)
+    hedging.record(latency, primary_latency, hedged=True, won=True)
+    print(hedging.summary())
+
+Author: StockBus Team
+"""
+
+import threading
+from typing import Dict, Optional
+
+from src.processing.rate_limiter import QuotaExhausted
+from src.processing.summarizer_metrics import LatencyHistogram
+
+DEFAULT_PERCENTILE = 95
+DEFAULT_MIN_DELAY = 0.5
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_FRACTION = 0.05
+
+
+class HedgePolicy:
+    """
+    When to hedge a request, on which key, and how it went
+
+    Args:
+        metrics: SummarizerMetrics of the run (per-key latency percentiles)
+        percentile: Latency percentile of the key after which to hedge
+        min_delay: Lower bound on the hedge delay (seconds)
+        min_samples: Answered requests a p95 needs (the key's, else all keys')
+        max_fraction: Cap on hedges as a share of requests
+    """
+
+    def __init__(self, metrics, percentile: float = DEFAULT_PERCENTILE, min_delay: float = DEFAULT_MIN_DELAY,
+                 min_samples: int = DEFAULT_MIN_SAMPLES, max_fraction: float = DEFAULT_MAX_FRACTION):
+        self.metrics = metrics
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_fraction = max_fraction
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0               # The hedge answered first
+        self.no_key = 0             # Due for a hedge, but no other key had budget
+        self.latency = LatencyHistogram()           # What callers waited
+        self.unhedged = LatencyHistogram()          # Primaries alone (lower bound when cancelled)
+
+    @classmethod
+    def from_config(cls, config: dict, metrics, enabled: Optional[bool] = None) -> Optional['HedgePolicy']:
+        """Policy from llm.hedging, or None when hedging is off (the default)"""
+        settings = config.get('llm', {}).get('hedging', {}) or {}
+        if enabled is None:
+            enabled = settings.get('enabled', False)
+        if not enabled:
+            return None
+        return cls(
+            metrics,
+            percentile=settings.get('percentile', DEFAULT_PERCENTILE),
+            min_delay=settings.get('min_delay', DEFAULT_MIN_DELAY),
+            min_samples=settings.get('min_samples', DEFAULT_MIN_SAMPLES),
+            max_fraction=settings.get('max_fraction', DEFAULT_MAX_FRACTION),
+        )
+
+    def delay(self, key_idx: int) -> Optional[float]:
+        """Seconds after which a request on the key is hedged (None: not yet known)"""
+        with self.lock:
+            self.requests += 1
+        if self.metrics.latency_samples(key_idx) < self.min_samples:
+            key_idx = None      # Too few answers on this key yet: all keys
+            if self.metrics.latency_samples(None) < self.min_samples:
+                return None
+        latency = self.metrics.latency_percentile(key_idx, self.percentile)
+        return None if latency is None else max(self.min_delay, latency)
+
+    def acquire(self, router, key_idx: int, tokens: int) -> Optional[int]:
+        """Reserve a hedge on another key with spare budget, within the hedge cap
+
+        Returns:
+            The hedge's key index, or None (over the cap, or no key free now)
+        """
+        with self.lock:
+            if self.hedges + 1 > self.max_fraction * self.requests:
+                return None
+            try:
+                hedge_key, _ = router.try_acquire(tokens, exclude=key_idx, extra_in_flight=1)
+            except QuotaExhausted:
+                hedge_key = None
+            if hedge_key is None:
+                self.no_key += 1
+                return None
+            self.hedges += 1
+            return hedge_key
+
+    def record(self, latency: float, primary_latency: float, hedged: bool = False, won: bool = False):
+        """One request answered
+
+        Args:
+            latency: Seconds from the primary's start to the answer used
+            primary_latency: The primary's latency, or how long it had run
+                when it was cancelled
+            hedged: A hedge was sent
+            won: The hedge answered first
+        """
+        with self.lock:
+            self.latency.observe(latency)
+            self.unhedged.observe(max(latency, primary_latency))
+            if hedged and won:
+                self.wins += 1
+
+    def summary(self) -> Dict:
+        """Hedge rate, win rate and request latency with and without hedging (ms)"""
+        with self.lock:
+            def ms(histogram, pct):
+                value = histogram.percentile(pct)
+                return round(value * 1000, 1) if value is not None else None
+
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'hedge_rate': round(self.hedges / self.requests, 4) if self.requests else 0.0,
+                'hedge_wins': self.wins,
+                'win_rate': round(self.wins / self.hedges, 4) if self.hedges else 0.0,
+                'no_spare_key': self.no_key,
+                'latency_ms': {f'p{p}': ms(self.latency, p) for p in (50, 95, 99)},
+                'unhedged_latency_ms': {f'p{p}': ms(self.unhedged, p) for p in (50, 95, 99)},
+            }
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Multi-Article Request Packing
+Summarize several short articles in one API request
+
+On the Groq free tier the binding limit is requests per minute, not
+tokens: a 150-word `use_as_is` article costs a whole request for a few
+hundred tokens. Short articles are therefore grouped into packs:
+
+- Articles whose fitted body is under `short_tokens` are packed, up to
+  `max_articles` per request and `pack_tokens` of bodies in total
+- The packed prompt labels each article with an ID (A1, A2, ...) and asks
+  for a JSON object {"A1": [facts...], "A2": [...]}
+- The response is validated per article: the ID must be present with at
+  least one fact, and no fact may quote a number that only appears in a
+  different article of the pack (a sign the model mixed them up)
+- Articles that fail validation go back through the single-article prompt
+
+Config (config/config.yaml):
+    llm:
+      packing:
+        enabled: true
+        max_articles: 5
+        short_tokens: 350
+        pack_tokens: 1500
+
+Usage:
+    packer = RequestPacker.from_config(config, counter)
+    for unit in packer.units(articles):       # lists of 1..max_articles
+        if len(unit) > 1:
+            prompt = packer.prompt([(a['title'], body_of(a)) for a in unit])
+            facts = packer.parse(response_text, unit)   # {index: [facts]}
+
+Author: StockBus Team
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_ARTICLES = 5
+DEFAULT_SHORT_TOKENS = 350
+DEFAULT_PACK_TOKENS = 1500
+MAX_PACKED_COMPLETION = 4000    # Completion tokens for one packed request
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def article_id(index: int) -> str:
+    return f"A{index + 1}"
+
+
+def _numbers(text: str) -> set:
+    return {n.replace(',', '') for n in _NUMBER.findall(text)}
+
+
+def extract_json_object(text: str) -> Optional[dict]:
+    """The JSON object in a model response (tolerates code fences and chatter)"""
+    if not text:
+        return None
+    start = text.find('{')
+    end = text.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class RequestPacker:
+    """
+    Groups short articles into packed summary requests and splits the replies
+
+    Args:
+        counter: Token counter (prompt_budget.TokenCounter)
+        max_articles: Articles per packed request (1 disables packing)
+        short_tokens: Only bodies up to this many tokens are packed
+        pack_tokens: Body tokens per packed request
+    """
+
+    def __init__(self, counter, max_articles: int = DEFAULT_MAX_ARTICLES,
+                 short_tokens: int = DEFAULT_SHORT_TOKENS, pack_tokens: int = DEFAULT_PACK_TOKENS):
+        self.counter = counter
+        self.max_articles = max(1, max_articles)
+        self.short_tokens = short_tokens
+        self.pack_tokens = pack_tokens
+
+    @classmethod
+    def from_config(cls, config: dict, counter, max_articles: Optional[int] = None) -> 'RequestPacker':
+        """Packer from llm.packing (max_articles overrides it; packing disabled gives 1)"""
+        settings = config.get('llm', {}).get('packing', {}) or {}
+        if max_articles is None:
+            max_articles = settings.get('max_articles', DEFAULT_MAX_ARTICLES) if settings.get('enabled', True) else 1
+        return cls(
+            counter,
+            max_articles,
+            settings.get('short_tokens', DEFAULT_SHORT_TOKENS),
+            settings.get('pack_tokens', DEFAULT_PACK_TOKENS),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_articles > 1
+
+    def units(self, articles: Sequence[Dict]) -> List[List[Dict]]:
+        """Split articles into request units: packs of short articles and singles"""
+        if not self.enabled:
+            return [[article] for article in articles]
+
+        units = []
+        pack, pack_size = [], 0
+        for article in articles:
+            size = self.counter.count(article.get('title', '') or '') + self.counter.count(article.get('body', '') or '')
+            if size > self.short_tokens:
+                units.append([article])
+                continue
+            if pack and (len(pack) >= self.max_articles or pack_size + size > self.pack_tokens):
+                units.append(pack)
+                pack, pack_size = [], 0
+            pack.append(article)
+            pack_size += size
+        if pack:
+            units.append(pack)
+        return units
+
+    def prompt(self, items: Sequence[Tuple[str, str]]) -> str:
+        """Packed prompt for (title, body) pairs"""
+        ids = ', '.join(article_id(i) for i in range(len(items)))
+        sections = '\n\n'.join(
+            f"=== {article_id(i)} ===\nTITLE: {title}\n\nARTICLE:\n{body}"
+            for i, (title, body) in enumerate(items)
+        )
+        return f"""You are a financial news analyst. Extract 5-10 KEY FACTS from EACH of the {len(items)} Indian stock market news articles below.
+
+CRITICAL REQUIREMENTS:
+- Output ONLY a JSON object mapping each article ID to a list of fact strings, like {{"A1": ["fact", "fact"], "A2": ["fact"]}}
+- Include every article ID exactly once: {ids}
+- Facts for an ID come ONLY from that article; never mix articles
+- NO markdown, NO bullet symbols, NO text outside the JSON object
+- Focus on: market movements, company news, economic indicators, policy changes
+- Keep each fact concise (1-2 sentences max)
+- Preserve ALL numbers, percentages, and company names exactly
+- Remove opinions and editorial commentary
+
+{sections}
+
+JSON:"""
+
+    @staticmethod
+    def completion_tokens(count: int, per_article: int) -> int:
+        return min(MAX_PACKED_COMPLETION, per_article * count)
+
+    def parse(self, text: str, pack: Sequence[Dict], bodies: Optional[Sequence[str]] = None) -> Dict[int, List[str]]:
+        """
+        Split a packed response into validated facts per article
+
+        Args:
+            text: Raw model response
+            pack: The packed articles, in prompt order
+            bodies: Bodies as sent (default: the articles' bodies)
+
+        Returns:
+            {index in pack: facts} for the articles that passed validation;
+            missing indexes need a single-article request
+        """
+        data = extract_json_object(text)
+        if data is None:
+            return {}
+        if bodies is None:
+            bodies = [article.get('body', '') or '' for article in pack]
+        sources = [_numbers(f"{article.get('title', '')} {body}") for article, body in zip(pack, bodies)]
+
+        results = {}
+        for i in range(len(pack)):
+            value = data.get(article_id(i))
+            if isinstance(value, str):
+                value = value.split('\n')
+            if not isinstance(value, list):
+                continue
+            facts = [str(fact).strip() for fact in value if str(fact).strip()]
+            if not facts:
+                continue
+
+            # Numbers that only another article of the pack contains
+            others = set().union(*(s for j, s in enumerate(sources) if j != i))
+            stray = {n for fact in facts for n in _numbers(fact)} - sources[i]
+            if stray & others:
+                continue
+            results[i] = facts
+        return results
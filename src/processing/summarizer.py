@@ -10,7 +10,6 @@ Free API: Groq (14,400 requests/day)
 
 import os
 import sys
-import json
 import time
 import yaml
 from pathlib import Path
@@ -22,6 +21,15 @@ from tqdm import tqdm
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.processing.key_router import is_daily_limit, is_rate_limit_error, retry_after
+from src.processing.prompt_budget import PromptBudget
+from src.processing.rate_limiter import QuotaExhausted, RateLimiter
+from src.processing.summary_backends import get_backend
+from src.processing.summary_cache import SummaryCache
+from src.processing.summary_journal import SummaryJournal
+from src.processing.summary_router import ROUTES, SummaryRouter
+from src.scraping.article_record import load_articles
+
 
 class ArticleSummarizer:
     """
@@ -31,19 +39,51 @@ class ArticleSummarizer:
     - Free Groq API (llama-3.1-8b-instant)
     - Batch processing with progress bars
     - Automatic retry logic
-    - Rate limiting (25 req/min)
-    - Saves intermediate results
+    - Rate limiting (requests/min, tokens/min and daily quota)
+    - Saves intermediate results to an append-only journal (resumable)
+    - Persistent summary cache (no API call for text seen before)
+    - Offline extractive backend, also the fallback when the quota runs out
+    - Routing: only articles too long to trim locally go to the API
     """
     
-    def __init__(self, config_path: str = "config/config.yaml"):
-        """Initialize summarizer with config"""
+    # Bump when the prompt or cleaning changes, so cached summaries miss
+    PROMPT_VERSION = 2
+    
+    def __init__(self, config_path: str = "config/config.yaml", use_cache: bool = True,
+                 backend: Optional[str] = None, fallback: Optional[str] = None,
+                 routing: Optional[bool] = None):
+        """Initialize summarizer with config
+        
+        Args:
+            backend: 'groq', or a local backend from summary_backends.py
+                (default: llm.backend, else groq)
+            fallback: Local backend once the daily quota is used up, 'none'
+                to stop instead (default: llm.fallback, else extractive)
+            routing: Pass clean FinBERT-sized articles through and trim
+                noisy or slightly long ones locally (default:
+                llm.routing.enabled, else on)
+        """
         self.config = self._load_config(config_path)
+        llm = self.config.get('llm', {})
+        self.backend_name = backend or llm.get('backend') or 'groq'
+        fallback = fallback or llm.get('fallback') or 'extractive'
+        self.local = get_backend(self.backend_name, self.config) if self.backend_name != 'groq' else None
+        self.fallback = None
+        if self.local is None and fallback != 'none':
+            self.fallback = get_backend(fallback, self.config)
         self.client = None
+        self.limiter = None
+        self.cache = SummaryCache.from_config(self.config) if use_cache else None
+        self.budget = PromptBudget.from_config(self.config)
+        self.routing = SummaryRouter.from_config(self.config, self.budget.counter, routing)
         self.stats = {
             'total_articles': 0,
             'summarized': 0,
             'skipped': 0,
             'failed': 0,
+            'cached': 0,
+            'local': 0,
+            'routed': 0,
             'total_tokens': 0
         }
         
@@ -60,19 +100,20 @@ class ArticleSummarizer:
         with open(config_file, 'r') as f:
             config = yaml.safe_load(f)
         
-        # Validate API key
-        api_key = config.get('llm', {}).get('groq', {}).get('api_key', '')
+        return config
+    
+    def _init_groq_client(self):
+        """Initialize Groq API client"""
+        # Validate API key (local backends run without one)
+        api_key = self.config.get('llm', {}).get('groq', {}).get('api_key', '')
         if not api_key or api_key == 'YOUR_GROQ_API_KEY_HERE':
             raise ValueError(
                 "❌ Groq API key not set!\n"
                 "1. Get free API key: https://console.groq.com/keys\n"
-                "2. Add to config/config.yaml under llm.groq.api_key"
+                "2. Add to config/config.yaml under llm.groq.api_key\n"
+                "   (or run offline with --backend extractive)"
             )
         
-        return config
-    
-    def _init_groq_client(self):
-        """Initialize Groq API client"""
         try:
             from groq import Groq
         except ImportError:
@@ -80,21 +121,17 @@ class ArticleSummarizer:
             os.system(f"{sys.executable} -m pip install groq")
             from groq import Groq
         
-        api_key = self.config['llm']['groq']['api_key']
-        self.client = Groq(api_key=api_key)
+        # base_url: another OpenAI-compatible endpoint, e.g. tests/mock_llm_server.py
+        self.client = Groq(api_key=api_key, base_url=self.config['llm']['groq'].get('base_url'))
+        self.limiter = RateLimiter.from_config(self.config, [api_key], token_counter=self.budget.counter)
         print(f"✅ Groq API initialized (Model: {self.config['llm']['groq']['model']})")
     
     def _create_summary_prompt(self, article: Dict) -> str:
         """Create prompt for article summarization"""
         title = article.get('title', 'No title')
-        body = article.get('body', '')
-        
-        # Truncate if too long
-        max_tokens = self.config['llm']['summarization']['max_input_tokens']
-        max_chars = max_tokens * 4  # Rough estimate: 1 token ≈ 4 chars
         
-        if len(body) > max_chars:
-            body = body[:max_chars] + "..."
+        # Best sentences that fit max_input_tokens (see prompt_budget.py)
+        body = self.budget.fit(article)
         
         prompt = f"""You are a financial news analyst. Extract 5-10 KEY FACTS from this Indian stock market news article.
 
@@ -169,7 +206,23 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         
         Returns:
             Summary string or None if failed
+        
+        Raises:
+            QuotaExhausted: the key's daily request quota is used up
         """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key_for(
+                article,
+                self.config['llm']['groq']['model'],
+                self.PROMPT_VERSION,
+                self.config['llm']['summarization']['temperature'],
+            )
+            summary = self.cache.get(cache_key)
+            if summary:
+                self.stats['cached'] += 1
+                return summary
+        
         if not self.client:
             self._init_groq_client()
         
@@ -180,6 +233,10 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         retry_delay = self.config['llm']['rate_limit']['retry_delay']
         
         for attempt in range(max_retries):
+            # Wait for RPM/TPM headroom (raises QuotaExhausted at the daily limit)
+            estimate = self.limiter.estimate(prompt)
+            self.limiter.acquire(0, estimate)
+            
             try:
                 response = self.client.chat.completions.create(
                     model=self.config['llm']['groq']['model'],
@@ -203,15 +260,27 @@ KEY FACTS (one per line, no bullets, no formatting):"""
                 summary = self._clean_summary(summary)
                 
                 # Track token usage
-                if hasattr(response, 'usage'):
-                    self.stats['total_tokens'] += response.usage.total_tokens
+                usage = getattr(response, 'usage', None)
+                self.limiter.record(0, estimate, usage, prompt=prompt)
+                if usage:
+                    self.stats['total_tokens'] += usage.total_tokens
+                
+                if cache_key and summary:
+                    self.cache.put(cache_key, summary, self.config['llm']['groq']['model'])
                 
                 return summary
                 
             except Exception as e:
+                self.limiter.record(0, estimate)
+                delay = retry_delay
+                if is_rate_limit_error(e):
+                    if is_daily_limit(e):
+                        self.limiter.mark_exhausted(0)
+                        raise QuotaExhausted(str(e)[:100])
+                    delay = retry_after(e) or retry_delay
                 if attempt < max_retries - 1:
                     print(f"⚠️ Attempt {attempt + 1} failed: {str(e)[:100]}. Retrying...")
-                    time.sleep(retry_delay)
+                    time.sleep(delay)
                 else:
                     print(f"❌ Failed after {max_retries} attempts: {str(e)[:100]}")
                     return None
@@ -224,7 +293,8 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         output_file: str = "data/datasets/summarized_dataset.json",
         batch_size: int = 10,
         test_mode: bool = False,
-        test_count: int = 5
+        test_count: int = 5,
+        store_path: Optional[str] = None
     ):
         """
         Process entire dataset and summarize articles that need it
@@ -232,33 +302,56 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         Args:
             input_file: Path to finbert_ready.json
             output_file: Path to save summarized dataset
-            batch_size: Save results every N articles
+            batch_size: fsync the summary journal every N articles
             test_mode: If True, only process first test_count articles
             test_count: Number of articles to process in test mode
+            store_path: Read from and update this SQLite article store
+                instead of the JSON files (one row update per article)
         """
         print("\n" + "="*70)
         print("🤖 GROQ LLM ARTICLE SUMMARIZER")
         print("="*70)
         
-        # Load dataset
-        input_path = project_root / input_file
-        if not input_path.exists():
-            raise FileNotFoundError(f"❌ Input file not found: {input_path}")
-        
-        with open(input_path, 'r', encoding='utf-8') as f:
-            articles = json.load(f)
+        output_path = project_root / output_file
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        print(f"\n📂 Loaded: {len(articles)} articles from {input_file}")
+        store = None
+        journal = None
+        if store_path:
+            from src.processing.article_store import ArticleStore, SUMMARY_FIELDS
+            store = ArticleStore(project_root / store_path)
+            articles = list(store.iter_articles(
+                "processing IN ('needs_summary', 'use_as_is') OR needs_summary = 1 "
+                "OR summarized IS NOT 1 OR json_extract(extra, '$.summary_method') = 'fallback'"
+            ))
+            print(f"\n🗄️ Loaded: {len(articles)} candidate articles from {store_path}")
+        else:
+            # Load dataset
+            input_path = project_root / input_file
+            if not input_path.exists():
+                raise FileNotFoundError(f"❌ Input file not found: {input_path}")
+            
+            articles = load_articles(input_path)
+            
+            print(f"\n📂 Loaded: {len(articles)} articles from {input_file}")
+            
+            # Resume: replay results an interrupted run already journaled
+            journal = SummaryJournal.for_output(output_path)
+            resumed = journal.apply(articles)
+            if resumed:
+                print(f"♻️ Resumed: {resumed} results from {journal.path.name}")
         
         # Filter articles that need summarization
         # Check both 'processing' field and legacy 'needs_summary' field
-        # ALSO summarize 'use_as_is' articles to remove noise and improve accuracy
+        # 'use_as_is' and 'ready' articles are candidates too: the router
+        # passes clean ones through and strips the noise from the rest
         articles_to_summarize = [
             a for a in articles 
             if (a.get('processing') == 'needs_summary' or 
                 a.get('processing') == 'use_as_is' or
                 a.get('needs_summary', False) or
-                not a.get('summarized', False))  # Skip already summarized
+                not a.get('summarized', False) or  # Skip already summarized
+                (self.local is None and a.get('summary_method') == 'fallback'))  # LLM replaces stand-ins
         ]
         
         print(f"📝 Articles to summarize: {len(articles_to_summarize)}")
@@ -270,64 +363,142 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         
         if not articles_to_summarize:
             print("✅ No articles need summarization!")
+            if store is not None:
+                store.close()
+            elif journal.path.exists():
+                self._save_dataset(articles, output_path, journal)
             return
         
-        # Initialize client
-        self._init_groq_client()
-        
-        # Process articles with progress bar
-        print(f"\n🚀 Starting summarization...")
-        print(f"⏱️ Estimated time: ~{len(articles_to_summarize) * 3 // 60} minutes\n")
-        
         self.stats['total_articles'] = len(articles_to_summarize)
         
-        # Rate limiting
-        max_rpm = self.config['llm']['rate_limit']['max_requests_per_minute']
-        delay_between_requests = 60 / max_rpm
+        def record(article):
+            if store is not None:
+                store.update(article['url'], {k: article[k] for k in SUMMARY_FIELDS if k in article})
+            else:
+                journal.append(article)
         
-        output_path = project_root / output_file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.routing is not None:
+            articles_to_summarize = self._route(articles_to_summarize, record, journal)
         
-        for idx, article in enumerate(tqdm(
-            articles_to_summarize,
-            desc="Summarizing",
-            unit="article"
-        ), 1):
-            
-            # Generate summary
-            summary = self.summarize_article(article)
+        if self.local is not None:
+            self._summarize_local(self.local, articles_to_summarize, record, journal)
+        elif articles_to_summarize:
+            # Initialize client
+            self._init_groq_client()
             
-            if summary:
-                article['summary'] = summary
-                article['summarized'] = True
-                article['summarized_at'] = datetime.now().isoformat()
-                article['processing'] = 'summarized'  # Update processing status
-                article['needs_summary'] = False  # Legacy field
-                self.stats['summarized'] += 1
-            else:
-                article['summarized'] = False
-                article['summary_error'] = "Failed to generate summary"
-                self.stats['failed'] += 1
+            if self.routing is not None:
+                left = self.limiter.requests_left_today()
+                articles_to_summarize, deferred = self.routing.defer(articles_to_summarize, left)
+                if deferred:
+                    print(f"💸 API budget: {left} request(s) left today; {len(deferred)} long article(s) deferred")
+                    if self.fallback is not None:
+                        self._summarize_local(self.fallback, deferred, record, journal, 'fallback')
             
-            # Rate limiting
-            if idx < len(articles_to_summarize):
-                time.sleep(delay_between_requests)
+            # Process articles with progress bar
+            print(f"\n🚀 Starting summarization...")
+            print(f"⏱️ Estimated time: ~{len(articles_to_summarize) * 3 // 60} minutes\n")
             
-            # Save intermediate results every batch_size articles
-            if idx % batch_size == 0:
-                self._save_dataset(articles, output_path)
-                print(f"\n💾 Saved checkpoint: {idx}/{len(articles_to_summarize)} articles")
+            for idx, article in enumerate(tqdm(
+                articles_to_summarize,
+                desc="Summarizing",
+                unit="article"
+            ), 1):
+                
+                # Generate summary (the rate limiter paces the requests)
+                try:
+                    summary = self.summarize_article(article)
+                except QuotaExhausted as e:
+                    if self.fallback is None:
+                        print(f"\n⏸️ {e}. Stopping; rerun tomorrow to continue.")
+                        break
+                    left = [a for a in articles_to_summarize[idx - 1:] if not a.get('summarized')]
+                    print(f"\n⏸️ {e}. Summarizing the remaining {len(left)} locally ({self.fallback.name}); "
+                          f"rerun tomorrow to replace them.")
+                    self._summarize_local(self.fallback, left, record, journal, 'fallback')
+                    break
+                
+                self._apply_result(article, summary)
+                record(article)
+                
+                # Make intermediate results durable every batch_size articles
+                if idx % batch_size == 0:
+                    self.limiter.save()
+                    if journal is not None:
+                        journal.sync()
         
         # Final save
-        self._save_dataset(articles, output_path)
+        if self.limiter is not None:
+            self.limiter.save()
+        if store is not None:
+            store.close()
+            output_path = store.path
+        else:
+            self._save_dataset(articles, output_path, journal)
         
         # Print statistics
         self._print_stats(output_path)
     
-    def _save_dataset(self, articles: List[Dict], output_path: Path):
-        """Save dataset to file"""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, indent=2, ensure_ascii=False)
+    def _apply_result(self, article: Dict, summary: Optional[str], method: str = 'llm'):
+        """Record a summary (or the failure) on the article and in stats"""
+        if summary:
+            article['summary'] = summary
+            article['summarized'] = True
+            article['summarized_at'] = datetime.now().isoformat()
+            article['summary_method'] = method
+            article['processing'] = 'summarized'  # Update processing status
+            article['needs_summary'] = False  # Legacy field
+            article.pop('summary_error', None)
+            self.stats['summarized'] += 1
+        else:
+            # A local stand-in summary stays usable until the LLM replaces it
+            if article.get('summary_method') != 'fallback':
+                article['summarized'] = False
+            article['summary_error'] = "Failed to generate summary"
+            self.stats['failed'] += 1
+    
+    def _route(self, articles: List[Dict], record, journal: Optional[SummaryJournal]) -> List[Dict]:
+        """Apply the passthrough and extractive routes (see summary_router.py);
+        returns the articles that still need a summarizer"""
+        plan = self.routing.route(articles)
+        for method in ('passthrough', 'extractive'):
+            for article in plan[method]:
+                self._apply_result(article, self.routing.text(article), method)
+                record(article)
+                if article.get('summary_method') == method:
+                    self.stats['routed'] += 1
+        for article in plan['skip']:
+            record(article)     # Recorded with their summary_error
+        if journal is not None:
+            journal.sync()
+        self.stats['skipped'] += len(plan['skip'])
+        
+        print(f"\n🧭 Routing {len(articles)} articles: "
+              + ", ".join(f"{route} {len(plan[route])}" for route in ROUTES if plan[route]))
+        for rule, count, description in self.routing.summary():
+            print(f"   {rule}: {count} ({description})")
+        return plan['llm']
+    
+    def _summarize_local(self, backend, articles: List[Dict], record, journal: Optional[SummaryJournal],
+                         method: Optional[str] = None):
+        """Summarize with a local backend in batches (no API, no quota)"""
+        method = method or backend.method
+        batch_size = getattr(backend, 'batch_size', 256)
+        with tqdm(total=len(articles), desc=f"Summarizing ({backend.name})", unit="article") as progress:
+            for start in range(0, len(articles), batch_size):
+                batch = articles[start:start + batch_size]
+                for article, summary in zip(batch, backend.summarize_many(batch)):
+                    self._apply_result(article, summary, method)
+                    record(article)
+                    if summary:
+                        self.stats['local'] += 1
+                if journal is not None:
+                    journal.sync()
+                progress.update(len(batch))
+    
+    def _save_dataset(self, articles: List[Dict], output_path: Path, journal: SummaryJournal):
+        """Write the output dataset once and retire the journal"""
+        written = journal.materialize(articles, output_path)
+        print(f"\n💾 Materialized {written} articles to {output_path.name}")
     
     def _print_stats(self, output_path: Path):
         """Print summarization statistics"""
@@ -336,6 +507,11 @@ KEY FACTS (one per line, no bullets, no formatting):"""
         print("="*70)
         print(f"\n✅ Summarized: {self.stats['summarized']}")
         print(f"⏭️ Skipped: {self.stats['skipped']}")
+        print(f"📦 From cache: {self.stats['cached']}")
+        if self.stats['local']:
+            print(f"🧮 Local backend: {self.stats['local']}")
+        if self.stats['routed']:
+            print(f"🧭 Routed without the API: {self.stats['routed']}")
         print(f"❌ Failed: {self.stats['failed']}")
         print(f"📊 Total: {self.stats['total_articles']}")
         
@@ -343,6 +519,16 @@ KEY FACTS (one per line, no bullets, no formatting):"""
             print(f"\n🔢 Total tokens used: {self.stats['total_tokens']:,}")
             print(f"💰 Cost: $0.00 (Free tier)")
         
+        budget = self.budget.summary()
+        if budget['trimmed']:
+            print(f"✂️ Trimmed {budget['trimmed']} article(s) to the input budget, "
+                  f"{budget['tokens_saved']:,} prompt tokens saved ({budget['tokenizer']})")
+        
+        if self.cache is not None:
+            cache = self.cache.stats()
+            print(f"\n📦 Summary cache: {cache['hits']} hits, {cache['misses']} misses "
+                  f"({cache['hit_rate']:.0%}), {cache['entries']:,} entries")
+        
         print(f"\n💾 Output saved to: {output_path}")
         print(f"📏 File size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
         
@@ -390,17 +576,50 @@ def main():
         default=10,
         help='Save checkpoint every N articles (default: 10)'
     )
+    parser.add_argument(
+        '--backend',
+        default=None,
+        help='groq, or extractive to summarize offline without API keys (default: config or groq)'
+    )
+    parser.add_argument(
+        '--no-fallback',
+        action='store_true',
+        help='Stop when the daily quota runs out instead of summarizing the rest locally'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore the summary cache (always call the API)'
+    )
+    parser.add_argument(
+        '--no-routing',
+        action='store_true',
+        help='Summarize every article (no passthrough or extractive routes)'
+    )
+    parser.add_argument(
+        '--store',
+        nargs='?',
+        const='data/datasets/articles.db',
+        default=None,
+        help='Use the SQLite article store instead of JSON files (default: data/datasets/articles.db)'
+    )
     
     args = parser.parse_args()
     
     try:
-        summarizer = ArticleSummarizer()
+        summarizer = ArticleSummarizer(
+            use_cache=not args.no_cache,
+            backend=args.backend,
+            fallback='none' if args.no_fallback else None,
+            routing=False if args.no_routing else None
+        )
         summarizer.process_dataset(
             input_file=args.input,
             output_file=args.output,
             batch_size=args.batch_size,
             test_mode=args.test,
-            test_count=args.count
+            test_count=args.count,
+            store_path=args.store
         )
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
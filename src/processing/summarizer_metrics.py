@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Summarizer Metrics
+Thread-safe request metrics for long summarization runs
+
+The parallel engine's worker threads used to bump plain dict counters
+(`stats['key_usage'][key]['requests'] += 1`, `stats['total_tokens']`)
+without a lock, and the only view of a run was the totals printed at the
+end. SummarizerMetrics is updated from any thread or coroutine under one
+lock and can be read at any time:
+
+- Per-key request latency histograms: Prometheus buckets for export, and
+  p50/p95/p99 over the most recent requests
+- Prompt/completion tokens, overall and over the last minute (tokens/sec)
+- Queue depth and requests in flight
+- Errors by class: rate_limit, daily_limit, timeout, connection,
+  server_error, client_error, or the exception type
+- Articles finished by summary_method
+
+Views:
+- progress_line(): one line for the tqdm postfix
+- snapshot(): JSON-ready dict
+- to_prometheus(): Prometheus text exposition format
+- export(): <path>.json and <path>.prom (node_exporter textfile collector),
+  written atomically at every checkpoint
+- serve(port): /metrics and /metrics.json over HTTP for scraping during
+  the run
+
+Config (config/config.yaml):
+    llm:
+      metrics:
+        path: outputs/metrics/summarizer     # null disables the files
+        port: null                           # e.g. 9108 to serve /metrics
+
+Usage:
+    metrics = SummarizerMetrics(['key_1', 'key_2'])
+    metrics.request_started(0)
+    metrics.request_finished(0, latency, prompt_tokens=812, completion_tokens=140)
+    metrics.request_failed(1, latency, exc)
+    print(metrics.progress_line())
+
+Author: StockBus Team
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from src.processing.key_router import is_daily_limit, is_rate_limit_error
+
+project_root = Path(__file__).parent.parent.parent
+
+DEFAULT_METRICS_PATH = "outputs/metrics/summarizer"
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+RECENT = 2048               # Requests per key kept for percentiles
+RATE_WINDOW = 60.0          # Seconds behind tokens/sec and articles/min
+PREFIX = "stockbus_summarizer"
+
+
+def error_class(exc: BaseException) -> str:
+    """Short, stable label for an API error"""
+    if is_rate_limit_error(exc):
+        return 'daily_limit' if is_daily_limit(exc) else 'rate_limit'
+    name = type(exc).__name__
+    if 'Timeout' in name:
+        return 'timeout'
+    if 'Connection' in name:
+        return 'connection'
+    status = getattr(exc, 'status_code', None)
+    if isinstance(status, int):
+        return 'server_error' if status >= 500 else 'client_error'
+    return name
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts (for export) plus a window of recent samples (for percentiles)"""
+
+    __slots__ = ('counts', 'count', 'total', 'recent')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)     # Last bucket: +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT)
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the recent samples (None before the first)"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+class _KeyMetrics:
+    __slots__ = ('requests', 'errors', 'in_flight', 'latency', 'prompt_tokens', 'completion_tokens')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = Counter()
+        self.in_flight = 0
+        self.latency = LatencyHistogram()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+class SummarizerMetrics:
+    """
+    Request, token, queue and error metrics shared by all workers
+
+    Args:
+        key_names: One label per API key (key_1, key_2, ...)
+        path: Export path without extension (None: no files)
+    """
+
+    def __init__(self, key_names: Sequence[str], path: Optional[Path] = None):
+        self.key_names = list(key_names)
+        self.keys = [_KeyMetrics() for _ in self.key_names]
+        self.path = Path(path) if path else None
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.queued = 0
+        self.articles = Counter()
+        self.recent_tokens = deque()        # (time, tokens)
+        self.recent_articles = deque()      # (time, articles)
+        self.server = None
+
+    @classmethod
+    def from_config(cls, config: dict, key_names: Sequence[str]) -> 'SummarizerMetrics':
+        settings = config.get('llm', {}).get('metrics', {}) or {}
+        path = settings.get('path', DEFAULT_METRICS_PATH)
+        return cls(key_names, (project_root / path) if path else None)
+
+    # ------------------------------------------------------------------
+    # Recording (any thread)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the run clock (rates are measured from here)"""
+        with self.lock:
+            self.started = time.time()
+
+    def request_started(self, key_idx: int):
+        with self.lock:
+            self.keys[key_idx].in_flight += 1
+
+    def request_finished(self, key_idx: int, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """A request returned a response"""
+        now = time.time()
+        with self.lock:
+            key = self.keys[key_idx]
+            key.in_flight = max(0, key.in_flight - 1)
+            key.requests += 1
+            key.latency.observe(latency)
+            key.prompt_tokens += prompt_tokens
+            key.completion_tokens += completion_tokens
+            self.recent_tokens.append((now, prompt_tokens + completion_tokens))
+            self._trim(now)
+
+    def request_cancelled(self, key_idx: int):
+        """A request was cancelled before it answered (the losing side of a hedge)"""
+        with self.lock:
+            key = self.keys[key_idx]
+            key.in_flight = max(0, key.in_flight - 1)
+            key.requests += 1
+
+    def request_failed(self, key_idx: int, latency: float, exc: BaseException) -> str:
+        """A request raised; returns its error class"""
+        label = error_class(exc)
+        with self.lock:
+            key = self.keys[key_idx]
+            key.in_flight = max(0, key.in_flight - 1)
+            key.requests += 1
+            key.errors[label] += 1
+        return label
+
+    def articles_done(self, count: int = 1, method: str = 'llm'):
+        now = time.time()
+        with self.lock:
+            self.articles[method] += count
+            self.recent_articles.append((now, count))
+            self._trim(now)
+
+    def set_queue(self, queued: int):
+        """Work units not yet started"""
+        with self.lock:
+            self.queued = queued
+
+    def _trim(self, now: float):
+        for recent in (self.recent_tokens, self.recent_articles):
+            while recent and now - recent[0][0] > RATE_WINDOW:
+                recent.popleft()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _rate(self, recent: deque, now: float) -> float:
+        """Per-second rate over the last minute (or the run so far, if shorter)"""
+        span = min(RATE_WINDOW, max(now - self.started, 1e-6))
+        return sum(n for _, n in recent) / span
+
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-ready dict"""
+        now = time.time()
+        with self.lock:
+            self._trim(now)
+            keys = {}
+            for name, key in zip(self.key_names, self.keys):
+                keys[name] = {
+                    'requests': key.requests,
+                    'errors': dict(key.errors),
+                    'in_flight': key.in_flight,
+                    'prompt_tokens': key.prompt_tokens,
+                    'completion_tokens': key.completion_tokens,
+                    'latency_ms': self._percentiles(key.latency),
+                }
+            merged = LatencyHistogram()
+            for key in self.keys:
+                merged.recent.extend(key.latency.recent)
+            errors = Counter()
+            for key in self.keys:
+                errors.update(key.errors)
+            tokens = sum(k.prompt_tokens + k.completion_tokens for k in self.keys)
+            elapsed = max(now - self.started, 1e-6)
+            return {
+                'timestamp': now,
+                'elapsed_seconds': round(elapsed, 1),
+                'requests': sum(k.requests for k in self.keys),
+                'in_flight': sum(k.in_flight for k in self.keys),
+                'queued': self.queued,
+                'errors': dict(errors),
+                'tokens': tokens,
+                'tokens_per_second': round(self._rate(self.recent_tokens, now), 1),
+                'tokens_per_second_overall': round(tokens / elapsed, 1),
+                'articles': dict(self.articles),
+                'articles_per_minute': round(self._rate(self.recent_articles, now) * 60, 1),
+                'latency_ms': self._percentiles(merged),
+                'keys': keys,
+            }
+
+    @staticmethod
+    def _percentiles(histogram: LatencyHistogram) -> Dict:
+        values = {f'p{p}': histogram.percentile(p) for p in (50, 95, 99)}
+        return {k: round(v * 1000, 1) if v is not None else None for k, v in values.items()}
+
+    def latency_percentile(self, key_idx: Optional[int], pct: float) -> Optional[float]:
+        """Seconds, for one key or all keys (None); None until a request answered"""
+        with self.lock:
+            if key_idx is not None:
+                return self.keys[key_idx].latency.percentile(pct)
+            merged = LatencyHistogram()
+            for key in self.keys:
+                merged.recent.extend(key.latency.recent)
+            return merged.percentile(pct)
+
+    def latency_samples(self, key_idx: Optional[int]) -> int:
+        """Recent answered requests behind the percentiles of a key (None: all keys)"""
+        with self.lock:
+            keys = self.keys if key_idx is None else [self.keys[key_idx]]
+            return sum(len(key.latency.recent) for key in keys)
+
+    def progress_line(self) -> str:
+        """Compact live status for the progress bar"""
+        snap = self.snapshot()
+        latency = snap['latency_ms']
+        parts = [
+            f"{snap['articles_per_minute']:.0f} art/min",
+            f"{snap['tokens_per_second']:.0f} tok/s",
+        ]
+        if latency['p50'] is not None:
+            parts.append(f"p50 {latency['p50']:.0f}ms p95 {latency['p95']:.0f}ms p99 {latency['p99']:.0f}ms")
+        parts.append(f"queue {snap['queued']} / {snap['in_flight']} in flight")
+        if snap['errors']:
+            parts.append("err " + ", ".join(f"{k} {v}" for k, v in sorted(snap['errors'].items())))
+        return " | ".join(parts)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{PREFIX}_{name}{{{label_text}}} {value}" if label_text
+                             else f"{PREFIX}_{name} {value}")
+
+        with self.lock:
+            now = time.time()
+            self._trim(now)
+            names = list(zip(self.key_names, self.keys))
+            metric('requests_total', 'counter', 'API requests sent',
+                   [({'key': n}, k.requests) for n, k in names])
+            metric('errors_total', 'counter', 'API requests that raised, by error class',
+                   [({'key': n, 'class': c}, v) for n, k in names for c, v in sorted(k.errors.items())])
+            metric('tokens_total', 'counter', 'Tokens billed',
+                   [({'key': n, 'kind': kind}, getattr(k, f'{kind}_tokens'))
+                    for n, k in names for kind in ('prompt', 'completion')])
+            metric('in_flight', 'gauge', 'Requests in flight',
+                   [({'key': n}, k.in_flight) for n, k in names])
+            metric('queue_depth', 'gauge', 'Work units waiting to start', [({}, self.queued)])
+            metric('tokens_per_second', 'gauge', 'Tokens per second over the last minute',
+                   [({}, round(self._rate(self.recent_tokens, now), 3))])
+            metric('articles_total', 'counter', 'Articles finished, by summary method',
+                   [({'method': m}, v) for m, v in sorted(self.articles.items())])
+
+            name = 'request_latency_seconds'
+            lines.append(f"# HELP {PREFIX}_{name} API request latency")
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for n, k in names:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), k.latency.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{PREFIX}_{name}_bucket{{key="{n}",le="{le}"}} {cumulative}')
+                lines.append(f'{PREFIX}_{name}_sum{{key="{n}"}} {round(k.latency.total, 6)}')
+                lines.append(f'{PREFIX}_{name}_count{{key="{n}"}} {k.latency.count}')
+        return "\n".join(lines) + "\n"
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def export(self):
+        """Write <path>.json and <path>.prom (atomic replace)"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        for suffix, text in (('.json', json.dumps(self.snapshot(), indent=2)), ('.prom', self.to_prometheus())):
+            target = self.path.with_name(self.path.name + suffix)
+            tmp = target.with_name(target.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp, target)
+
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        """Serve /metrics (Prometheus) and /metrics.json from a daemon thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body, kind = json.dumps(metrics.snapshot()), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body, kind = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', kind)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics on http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Summary Backends
+Summarize without the network: local extractive backend behind a small interface
+
+The summarizers call Groq by default. A backend is anything that turns a
+list of articles into summaries in the same one-fact-per-line format
+`_clean_summary` produces, so it can stand in for the API:
+
+- as the whole run (`--backend extractive`: no keys, no network, no quota)
+- as the fallback once every key has used its daily quota; those
+  summaries are marked `summary_method: fallback` and the next LLM run
+  summarizes them again
+
+ExtractiveBackend (CPU, NumPy only):
+- Splits sentences and drops boilerplate (see prompt_budget.py)
+- Builds TF-IDF sentence vectors per batch of articles (IDF across the
+  batch, so words every article uses carry little weight)
+- Ranks sentences with TextRank (power iteration on the cosine similarity
+  graph) or by similarity to the article centroid, blended with financial
+  salience (numbers, amounts, index names, market verbs)
+- Skips sentences that repeat one already chosen
+- Keeps the 5-10 best sentences in article order, one per line
+
+Config (config/config.yaml):
+    llm:
+      backend: groq                 # or: extractive
+      fallback: extractive          # or: none
+      extractive:
+        method: textrank            # or: centroid
+        min_facts: 5
+        max_facts: 10
+
+Usage:
+    backend = get_backend('extractive', config)
+    summaries = backend.summarize_many(articles)
+
+Author: StockBus Team
+"""
+
+import math
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.processing.prompt_budget import content_words, is_boilerplate, salience, split_sentences
+
+DEFAULT_MIN_FACTS = 5
+DEFAULT_MAX_FACTS = 10
+DEFAULT_BATCH_SIZE = 256
+DAMPING = 0.85
+REDUNDANCY = 0.8            # Cosine similarity above which a sentence repeats a chosen one
+
+_TERM = re.compile(r"[a-z0-9]+(?:[.,'&-][a-z0-9]+)*%?")
+_STOPWORDS = frozenset("""
+a an the and or but if of to in on for at by with as is are was were be been being from its it this that
+these those after before amid over under into up down out about than then also has have had having will
+would could should can may might must not no nor so such says said say which who whom whose what when where
+why how all any both each few more most other some own same very just only their there they them he she his
+her we our you your i me my us while during per
+""".split())
+
+
+class SummaryBackend:
+    """
+    Interface for summary producers other than the Groq API
+
+    Subclasses implement summarize_many(); `method` is recorded on each
+    article as summary_method.
+    """
+
+    name = 'base'
+    method = 'base'
+
+    def summarize_many(self, articles: List[Dict]) -> List[Optional[str]]:
+        """One summary (or None) per article, in order"""
+        raise NotImplementedError
+
+    def summarize(self, article: Dict) -> Optional[str]:
+        return self.summarize_many([article])[0]
+
+    def close(self):
+        pass
+
+
+class ExtractiveBackend(SummaryBackend):
+    """
+    Vectorized TF-IDF sentence ranking, fully offline
+
+    Args:
+        method: 'textrank' or 'centroid'
+        min_facts: Facts per summary when the article has that many sentences
+        max_facts: Upper bound on facts per summary
+        batch_size: Articles vectorized together (shared IDF)
+    """
+
+    name = 'extractive'
+    method = 'extractive'
+
+    def __init__(self, method: str = 'textrank', min_facts: int = DEFAULT_MIN_FACTS,
+                 max_facts: int = DEFAULT_MAX_FACTS, batch_size: int = DEFAULT_BATCH_SIZE):
+        if method not in ('textrank', 'centroid'):
+            raise ValueError(f"Unknown ranking method: {method}")
+        self.rank_method = method
+        self.min_facts = min_facts
+        self.max_facts = max(min_facts, max_facts)
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'ExtractiveBackend':
+        settings = config.get('llm', {}).get('extractive', {}) or {}
+        return cls(
+            settings.get('method', 'textrank'),
+            settings.get('min_facts', DEFAULT_MIN_FACTS),
+            settings.get('max_facts', DEFAULT_MAX_FACTS),
+            settings.get('batch_size', DEFAULT_BATCH_SIZE),
+        )
+
+    # ------------------------------------------------------------------
+    # Sentences
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _candidates(article: Dict) -> List[str]:
+        """Sentences worth stating as facts (no boilerplate, not too short or long)"""
+        candidates = []
+        seen = set()
+        for sentence in split_sentences(article.get('body', '') or ''):
+            sentence = ' '.join(sentence.replace('**', '').lstrip('•*-–—→ ').split())
+            words = sentence.count(' ') + 1
+            key = sentence.casefold()
+            if 5 <= words <= 60 and key not in seen and not is_boilerplate(sentence):
+                seen.add(key)
+                candidates.append(sentence)
+        return candidates
+
+    @staticmethod
+    def _terms(sentence: str) -> List[str]:
+        return [t for t in _TERM.findall(sentence.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+
+    def _scores(self, matrix: np.ndarray) -> np.ndarray:
+        """Centrality of each sentence (rows are L2-normalized TF-IDF vectors)"""
+        count = matrix.shape[0]
+        if self.rank_method == 'centroid':
+            centroid = matrix.mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            return matrix @ centroid / norm if norm else np.ones(count)
+
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+        weights = similarity.sum(axis=1, keepdims=True)
+        # Sentences sharing no terms with the rest link uniformly
+        transition = np.divide(similarity, weights, out=np.full_like(similarity, 1.0 / count),
+                               where=weights > 0)
+        rank = np.full(count, 1.0 / count)
+        for _ in range(50):
+            updated = (1 - DAMPING) / count + DAMPING * (transition.T @ rank)
+            if np.abs(updated - rank).sum() < 1e-6:
+                rank = updated
+                break
+            rank = updated
+        return rank
+
+    def _facts(self, count: int) -> int:
+        return min(count, max(self.min_facts, min(self.max_facts, math.ceil(count * 0.3))))
+
+    def summarize_many(self, articles: List[Dict]) -> List[Optional[str]]:
+        summaries = []
+        for start in range(0, len(articles), self.batch_size):
+            summaries.extend(self._summarize_batch(articles[start:start + self.batch_size]))
+        return summaries
+
+    def _summarize_batch(self, batch: List[Dict]) -> List[Optional[str]]:
+        sentences = [self._candidates(article) for article in batch]
+
+        # Batch vocabulary and document frequencies (a document is an article)
+        vocabulary: Dict[str, int] = {}
+        term_ids = []
+        document_terms = []
+        for article_sentences in sentences:
+            ids = [
+                np.fromiter((vocabulary.setdefault(t, len(vocabulary)) for t in self._terms(s)), dtype=np.int64)
+                for s in article_sentences
+            ]
+            term_ids.append(ids)
+            document_terms.append(np.unique(np.concatenate(ids)) if ids else np.empty(0, dtype=np.int64))
+
+        df = np.zeros(len(vocabulary))
+        for terms in document_terms:
+            df[terms] += 1
+        idf = np.log((1 + len(batch)) / (1 + df)) + 1.0
+
+        summaries = []
+        for article, article_sentences, ids, terms in zip(batch, sentences, term_ids, document_terms):
+            if not article_sentences:
+                summaries.append(None)
+                continue
+            if len(article_sentences) <= self.min_facts:
+                summaries.append('\n'.join(article_sentences))
+                continue
+
+            # Sentence x article-term TF-IDF matrix
+            rows = np.repeat(np.arange(len(ids)), [len(i) for i in ids])
+            columns = np.searchsorted(terms, np.concatenate(ids))
+            matrix = np.zeros((len(ids), len(terms)))
+            np.add.at(matrix, (rows, columns), 1.0)
+            matrix = np.log1p(matrix) * idf[terms]
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+            centrality = self._scores(matrix)
+            centrality = centrality / (centrality.max() or 1.0)
+            title_words = content_words(article.get('title', '') or '')
+            facts = np.array([salience(s, title_words, i) for i, s in enumerate(article_sentences)])
+            facts = facts / (facts.max() or 1.0)
+            scores = 0.5 * centrality + 0.5 * facts
+
+            keep = self._select(scores, matrix, self._facts(len(article_sentences)))
+            summaries.append('\n'.join(article_sentences[i] for i in keep))
+        return summaries
+
+    @staticmethod
+    def _select(scores: np.ndarray, matrix: np.ndarray, count: int) -> List[int]:
+        """Best sentences, skipping near-duplicates of ones already chosen; article order"""
+        chosen = []
+        for i in np.argsort(-scores, kind='stable'):
+            if chosen and float((matrix[chosen] @ matrix[i]).max()) > REDUNDANCY:
+                continue
+            chosen.append(int(i))
+            if len(chosen) >= count:
+                break
+        return sorted(chosen)
+
+
+BACKENDS = {
+    'extractive': ExtractiveBackend,
+}
+
+
+def get_backend(name: str, config: dict) -> SummaryBackend:
+    """Local backend by name (the Groq API is the summarizers' built-in default)"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown summary backend: {name} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name].from_config(config)
+
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Persistent Summary Cache
+Never pay twice for the same article summary
+
+Summaries are stored under a hash of everything that determines them:
+- the article text (title + body, Unicode-normalized, case-folded,
+  whitespace collapsed), so syndicated copies share one entry
+- the model, the prompt version and the temperature, so changing any of
+  them naturally misses
+
+The summarizers look up every article before calling the API, so
+rebuilding finbert_ready.json or rerunning after a merge costs no LLM
+calls for articles seen before.
+
+Storage is one SQLite table (WAL, safe for the summarizers' worker
+threads). Least recently used entries are evicted above max_entries.
+
+Config (config/config.yaml):
+    llm:
+      cache:
+        enabled: true
+        path: cache/summary_cache.db
+        max_entries: 200000
+
+Usage:
+    cache = SummaryCache()
+    key = cache.key_for(article, model, prompt_version=1, temperature=0.3)
+    summary = cache.get(key)
+    if summary is None:
+        summary = call_llm(...)
+        cache.put(key, summary, model)
+
+    python src/processing/summary_cache.py seed data/datasets/summarized_dataset.json
+    python src/processing/summary_cache.py stats
+    python src/processing/summary_cache.py prune --max-entries 100000
+
+Author: StockBus Team
+"""
+
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+DEFAULT_PATH = "cache/summary_cache.db"
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def normalize_text(text: str) -> str:
+    """NFKC, case-folded, single-spaced text (what 'the same article' means here)"""
+    return ' '.join(unicodedata.normalize('NFKC', text or '').casefold().split())
+
+
+def content_key(title: str, body: str, model: str, prompt_version, temperature) -> str:
+    """Cache key for one summary request"""
+    digest = hashlib.sha256()
+    for part in (normalize_text(title), normalize_text(body), model,
+                 str(prompt_version), f"{float(temperature):.3f}"):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    SQLite-backed summary cache with LRU eviction and hit/miss stats
+
+    Args:
+        path: Database file (created on first use)
+        max_entries: Evict least recently used entries above this count
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        if not self.path.is_absolute():
+            self.path = project_root / self.path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    model TEXT,
+    created REAL,
+    last_used REAL,
+    hits INTEGER DEFAULT 0
+)""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used)")
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional['SummaryCache']:
+        """Cache from llm.cache in config.yaml, or None when disabled"""
+        settings = config.get('llm', {}).get('cache', {}) or {}
+        if not settings.get('enabled', True):
+            return None
+        return cls(settings.get('path', DEFAULT_PATH), settings.get('max_entries', DEFAULT_MAX_ENTRIES))
+
+    @staticmethod
+    def key_for(article: Dict, model: str, prompt_version, temperature) -> str:
+        return content_key(article.get('title', ''), article.get('body', ''), model, prompt_version, temperature)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached summary or None (counts a hit or a miss)"""
+        with self.lock:
+            row = self.conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE summaries SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                    (time.time(), key)
+                )
+            return row[0]
+
+    def put(self, key: str, summary: str, model: Optional[str] = None):
+        """Store a summary (replacing any previous one for the key)"""
+        if not summary:
+            return
+        now = time.time()
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO summaries (key, summary, model, created, last_used, hits) "
+                    "VALUES (?, ?, ?, ?, ?, COALESCE((SELECT hits FROM summaries WHERE key = ?), 0))",
+                    (key, summary, model, now, now, key)
+                )
+            self.stores += 1
+            self._entries += 1  # Upper bound (replacements count too); _evict recounts
+            # Evict in chunks (10% over the limit) rather than on every insert
+            if self.max_entries and self._entries > self.max_entries * 1.1:
+                self._evict(self.max_entries)
+
+    def _evict(self, keep: int):
+        total = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        excess = total - keep
+        if excess > 0:
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM summaries WHERE key IN "
+                    "(SELECT key FROM summaries ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+            self.evictions += excess
+        self._entries = min(total, keep)
+
+    def prune(self, max_entries: Optional[int] = None) -> int:
+        """Evict down to max_entries now; returns entries removed"""
+        before = self.evictions
+        with self.lock:
+            self._evict(max_entries if max_entries is not None else self.max_entries)
+        return self.evictions - before
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def seed(cache: SummaryCache, path: Path, model: str, prompt_version, temperature) -> int:
+    """Add the summaries of an already summarized dataset to the cache
+
+    Only LLM summaries are taken (summary_method 'llm', or unset in
+    datasets from before it was recorded): fallback and extractive
+    stand-ins must not be served as LLM output.
+    """
+    from src.scraping.json_stream import iter_json_records
+
+    added = 0
+    with cache.lock, cache.conn:
+        now = time.time()
+        for article in iter_json_records(path):
+            summary = article.get('summary')
+            if not article.get('summarized') or not summary:
+                continue
+            if (article.get('summary_method') or 'llm') != 'llm':
+                continue
+            key = SummaryCache.key_for(article, model, prompt_version, temperature)
+            cursor = cache.conn.execute(
+                "INSERT OR IGNORE INTO summaries (key, summary, model, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, summary, model, now, now)
+            )
+            added += cursor.rowcount
+    cache._entries += added
+    return added
+
+
+def main():
+    import argparse
+    import yaml
+
+    from src.processing.summarizer import ArticleSummarizer
+
+    parser = argparse.ArgumentParser(description="Persistent LLM summary cache")
+    parser.add_argument('--cache', default=None, help=f'Cache database (default: config or {DEFAULT_PATH})')
+    parser.add_argument('--config', default='config/config.yaml')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_seed = sub.add_parser('seed', help='Import summaries from summarized datasets')
+    p_seed.add_argument('files', nargs='+')
+    p_seed.add_argument('--model', help='Model the summaries came from (default: config)')
+    p_seed.add_argument('--temperature', type=float, help='Temperature used (default: config)')
+
+    sub.add_parser('stats', help='Show entry counts')
+
+    p_prune = sub.add_parser('prune', help='Evict least recently used entries')
+    p_prune.add_argument('--max-entries', type=int, required=True)
+
+    args = parser.parse_args()
+
+    config = {}
+    config_file = project_root / args.config
+    if config_file.exists():
+        with open(config_file, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    settings = config.get('llm', {}).get('cache', {}) or {}
+    cache = SummaryCache(args.cache or settings.get('path', DEFAULT_PATH),
+                         settings.get('max_entries', DEFAULT_MAX_ENTRIES))
+
+    if args.command == 'seed':
+        llm = config.get('llm', {})
+        model = args.model or llm.get('groq', {}).get('model')
+        temperature = args.temperature if args.temperature is not None else llm.get('summarization', {}).get('temperature')
+        if model is None or temperature is None:
+            parser.error("--model and --temperature are required without a config file")
+        for name in args.files:
+            added = seed(cache, project_root / name, model, ArticleSummarizer.PROMPT_VERSION, temperature)
+            print(f"✅ {name}: {added} new summaries")
+    elif args.command == 'prune':
+        removed = cache.prune(args.max_entries)
+        print(f"🧹 Evicted {removed} entries")
+
+    rows = cache.conn.execute(
+        "SELECT model, COUNT(*), SUM(hits) FROM summaries GROUP BY model ORDER BY COUNT(*) DESC"
+    ).fetchall()
+    print(f"\n📦 {cache.path}: {len(cache):,} summaries")
+    for model, count, hits in rows:
+        print(f"   {model}: {count:,} ({hits or 0:,} hits)")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Append-Only Summary Journal
+Checkpoint each finished summary as one JSONL line instead of rewriting
+the whole dataset
+
+Rewriting a 50k-article summarized_dataset.json every 10 summaries costs
+more than the API calls. The summarizers instead append each result's
+summary fields to <output>.journal.jsonl:
+
+- Appends are flushed immediately and fsynced at every checkpoint
+- At startup the journal is replayed onto the loaded articles, so a crash
+  or Ctrl+C loses at most the records since the last fsync; a torn last
+  line (crash mid-write) is dropped and truncated away
+- When the run ends the journal is folded into the output dataset once
+  (atomic replace) and removed
+
+Usage:
+    journal = SummaryJournal.for_output('data/datasets/summarized_dataset.json')
+    journal.apply(articles)                  # resume
+    journal.append(article); journal.sync()
+    journal.materialize(articles, output_path)
+
+Author: StockBus Team
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from src.processing.article_store import SUMMARY_FIELDS
+
+
+class SummaryJournal:
+    """
+    Crash-safe JSONL journal of summary results, keyed by article URL
+
+    Args:
+        path: Journal file (created on first append)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self.appended = 0
+
+    @classmethod
+    def for_output(cls, output_path) -> 'SummaryJournal':
+        """The journal that belongs to an output dataset"""
+        output_path = Path(output_path)
+        return cls(output_path.with_name(output_path.stem + '.journal.jsonl'))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, article: Dict):
+        """Record an article's summary fields"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        record = {'url': article['url']}
+        for key in SUMMARY_FIELDS:
+            value = article.get(key)
+            if value is not None:
+                record[key] = value
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.appended += 1
+
+    def extend(self, articles: Iterable[Dict]):
+        for article in articles:
+            self.append(article)
+
+    def sync(self):
+        """Make everything appended so far durable"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+
+    def replay(self) -> Dict[str, Dict]:
+        """{url: summary fields} from the journal, last record per URL wins
+
+        A torn final line is ignored and cut off so later appends start on
+        a clean line.
+        """
+        results = {}
+        if not self.path.exists():
+            return results
+
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                results[record.pop('url')] = record
+                good_end += len(line)
+
+        if good_end < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+            print(f"⚠️ Dropped a partial record at the end of {self.path.name}")
+        return results
+
+    def apply(self, articles: List[Dict]) -> int:
+        """Replay the journal onto loaded articles; returns how many were updated"""
+        results = self.replay()
+        if not results:
+            return 0
+        applied = 0
+        for article in articles:
+            fields = results.get(article.get('url'))
+            if fields:
+                article.update(fields)
+                applied += 1
+        return applied
+
+    def __len__(self) -> int:
+        if not self.path.exists():
+            return 0
+        with open(self.path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+
+    def materialize(self, articles: List[Dict], output_path) -> int:
+        """Write the final dataset once and retire the journal
+
+        `articles` must already include the journaled results (they do when
+        they were replayed with apply() and updated in place since).
+        """
+        from src.scraping.article_record import dump_articles
+
+        self.close()
+        written = dump_articles(articles, output_path)
+        if self.path.exists():
+            self.path.unlink()
+        return written
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Summary Routing
+Send only the articles that need it to the LLM
+
+create_finbert_ready already marks `ready` (200-512 words) and `use_as_is`
+(50-199 words) articles as FinBERT-compatible, yet the summarizers sent
+every one of them to Groq. Each article now gets one of three routes:
+
+- passthrough: fits FinBERT and is clean; the body (whitespace-normalized)
+  is used as the summary, no API call
+- extractive:  fits but is noisy (newsletter footers, links, repeated or
+  fragment sentences), or is only somewhat over the FinBERT limit; the
+  body is trimmed to its salient sentences within the limit (the
+  prompt_budget.py ranking), no API call
+- llm:         too long to trim without losing facts
+
+The remaining API budget is checked before any request: when today's
+requests left across all keys cannot cover the `llm` articles, the
+longest ones keep the LLM and the rest are summarized by the local
+fallback (`summary_method: fallback`, so the next run sends them to the
+LLM again).
+
+Every routed article records `route_reason`, e.g. "fits FinBERT (312
+tokens), noise 0.02", next to `summary_method`. Articles without body
+text are skipped and get `summary_error: no body text`, so they are
+recorded as unsummarizable instead of looking unprocessed.
+
+Config (config/config.yaml):
+    llm:
+      routing:
+        enabled: true
+        finbert_tokens: 512         # Passthrough / trim target
+        extractive_tokens: 768      # Longer articles go to the LLM
+        max_noise: 0.1              # Noise score above which a fitting article is trimmed
+        reserve: 0.05               # Share of today's requests kept for retries
+
+Usage:
+    router = SummaryRouter.from_config(config, counter)
+    plan = router.route(articles)               # {'passthrough': [...], 'extractive': [...], ...}
+    text = router.text(article)                 # passthrough / extractive summary
+    llm, deferred = router.defer(plan['llm'], limiter.requests_left_today())
+
+Author: StockBus Team
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.processing.prompt_budget import PromptBudget, TokenCounter, is_boilerplate, split_sentences
+
+DEFAULT_FINBERT_TOKENS = 512
+DEFAULT_EXTRACTIVE_TOKENS = 768
+DEFAULT_MAX_NOISE = 0.1
+DEFAULT_RESERVE = 0.05
+
+ROUTES = ('passthrough', 'extractive', 'llm', 'skip')
+
+_LINK = re.compile(r"https?://\S+|www\.\S+|\S+@\S+\.\w+", re.IGNORECASE)
+_DIGIT = re.compile(r"\d")
+
+
+def noise_score(body: str) -> float:
+    """
+    Share (0-1) of the body's characters that carry no article content:
+    boilerplate sentences, links and e-mail addresses, repeated sentences
+    and short fragments without numbers (navigation, captions, bylines)
+    """
+    sentences = split_sentences(body)
+    total = sum(len(s) for s in sentences)
+    if not total:
+        return 0.0
+
+    noisy = 0
+    seen = set()
+    for sentence in sentences:
+        key = ' '.join(sentence.casefold().split())
+        if (key in seen or is_boilerplate(sentence)
+                or (sentence.count(' ') < 3 and not _DIGIT.search(sentence))):
+            noisy += len(sentence)
+        else:
+            noisy += sum(len(link) for link in _LINK.findall(sentence))
+        seen.add(key)
+    return min(1.0, noisy / total)
+
+
+class Route(NamedTuple):
+    """Routing decision for one article"""
+    method: str         # passthrough, extractive, llm or skip
+    rule: str           # Short reason key for stats
+    reason: str         # Human-readable reason, stored as route_reason
+    tokens: int
+    noise: float
+
+
+RULES = {
+    'clean': 'fits FinBERT, clean',
+    'noisy': 'fits FinBERT, noisy: trimmed',
+    'near_limit': 'slightly over the FinBERT limit: trimmed',
+    'long': 'too long to trim',
+    'budget': 'over today\'s API budget',
+    'empty': 'no body text',
+}
+
+
+class SummaryRouter:
+    """
+    Per-article choice between passthrough, extractive trim and the LLM
+
+    Args:
+        counter: Token counter (prompt_budget.TokenCounter)
+        finbert_tokens: Bodies up to this many tokens fit FinBERT as they are
+        extractive_tokens: Bodies up to this many tokens are trimmed locally;
+            longer ones go to the LLM
+        max_noise: Noise score (see noise_score) a passthrough body may have
+        reserve: Share of today's API requests not planned for (retries,
+            packed-request fallbacks)
+    """
+
+    def __init__(self, counter: Optional[TokenCounter] = None, finbert_tokens: int = DEFAULT_FINBERT_TOKENS,
+                 extractive_tokens: int = DEFAULT_EXTRACTIVE_TOKENS, max_noise: float = DEFAULT_MAX_NOISE,
+                 reserve: float = DEFAULT_RESERVE):
+        self.counter = counter or TokenCounter()
+        self.finbert_tokens = finbert_tokens
+        self.extractive_tokens = max(finbert_tokens, extractive_tokens)
+        self.max_noise = max_noise
+        self.reserve = reserve
+        self.trimmer = PromptBudget(finbert_tokens, self.counter, 'extractive')
+        self.routes: Dict[int, Route] = {}
+        self.stats = Counter()
+
+    @classmethod
+    def from_config(cls, config: dict, counter: Optional[TokenCounter] = None,
+                    enabled: Optional[bool] = None) -> Optional['SummaryRouter']:
+        """Router from llm.routing, or None when routing is disabled"""
+        settings = config.get('llm', {}).get('routing', {}) or {}
+        if enabled is None:
+            enabled = settings.get('enabled', True)
+        if not enabled:
+            return None
+        return cls(
+            counter,
+            settings.get('finbert_tokens', DEFAULT_FINBERT_TOKENS),
+            settings.get('extractive_tokens', DEFAULT_EXTRACTIVE_TOKENS),
+            settings.get('max_noise', DEFAULT_MAX_NOISE),
+            settings.get('reserve', DEFAULT_RESERVE),
+        )
+
+    # ------------------------------------------------------------------
+    # Decisions
+    # ------------------------------------------------------------------
+
+    def decide(self, article: Dict) -> Route:
+        """Route one article on its length and noise (the API budget is applied by defer)"""
+        body = article.get('body', '') or ''
+        if not body.strip():
+            return Route('skip', 'empty', RULES['empty'], 0, 0.0)
+
+        tokens = self.counter.count(body)
+        noise = noise_score(body)
+        measured = f"{tokens} tokens, noise {noise:.2f}"
+        if tokens <= self.finbert_tokens:
+            if noise <= self.max_noise:
+                return Route('passthrough', 'clean', f"fits FinBERT ({measured})", tokens, noise)
+            return Route('extractive', 'noisy', f"fits FinBERT but noisy ({measured})", tokens, noise)
+        if tokens <= self.extractive_tokens:
+            return Route('extractive', 'near_limit',
+                         f"trimmed to {self.finbert_tokens} tokens ({measured})", tokens, noise)
+        return Route('llm', 'long', f"over {self.extractive_tokens} tokens ({measured})", tokens, noise)
+
+    def route(self, articles: Sequence[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Route articles and record the reason on each (route_reason, and
+        summary_error for skipped ones)
+
+        Returns:
+            {route: articles} for every route in ROUTES
+        """
+        plan = {route: [] for route in ROUTES}
+        for article in articles:
+            decision = self.decide(article)
+            self.routes[id(article)] = decision
+            article['route_reason'] = decision.reason
+            if decision.method == 'skip':
+                article['summarized'] = False
+                article['summary_error'] = decision.reason
+            plan[decision.method].append(article)
+            self.stats[decision.rule] += 1
+        return plan
+
+    def defer(self, articles: List[Dict], requests_left: Optional[int],
+              ordered: bool = False) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split LLM-routed articles by what today's API budget can cover
+
+        The longest articles keep the LLM; the rest are deferred.
+
+        Args:
+            articles: Articles routed to the LLM
+            requests_left: Requests left today across all keys (None: no
+                daily quota)
+            ordered: Articles are in priority order (summary_scheduler.py);
+                the first ones keep the LLM instead of the longest
+
+        Returns:
+            (for the LLM, deferred)
+        """
+        if requests_left is None:
+            return articles, []
+        allowed = max(0, int(requests_left * (1 - self.reserve)))
+        if len(articles) <= allowed:
+            return articles, []
+
+        if ordered:
+            by_length = articles
+        else:
+            by_length = sorted(articles, key=lambda a: -self.routes[id(a)].tokens if id(a) in self.routes else 0)
+        keep = {id(a) for a in by_length[:allowed]}
+        llm, deferred = [], []
+        for article in articles:
+            if id(article) in keep:
+                llm.append(article)
+                continue
+            article['route_reason'] = (f"{article.get('route_reason', '')}; "
+                                       f"API budget: {requests_left} requests left today").lstrip('; ')
+            self.stats['long'] -= 1
+            self.stats['budget'] += 1
+            deferred.append(article)
+        return llm, deferred
+
+    # ------------------------------------------------------------------
+    # Local routes
+    # ------------------------------------------------------------------
+
+    def text(self, article: Dict) -> Optional[str]:
+        """Summary text of a passthrough or extractive article (None if nothing is left)"""
+        decision = self.routes.get(id(article)) or self.decide(article)
+        if decision.method == 'passthrough':
+            text = ' '.join((article.get('body', '') or '').split())
+        else:
+            text = ' '.join(self.trimmer.fit(article).split())
+        return text or None
+
+    def summary(self) -> List[Tuple[str, int, str]]:
+        """(rule, articles, description) for every rule that routed something"""
+        return [(rule, self.stats[rule], RULES[rule]) for rule in RULES if self.stats[rule]]
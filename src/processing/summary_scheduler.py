@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Quota-Aware Summary Scheduler
+Drain the summary backlog over as many days as the API quotas need
+
+A free-tier key allows 14,400 requests a day, so a large backlog cannot
+be summarized in one run: process_dataset stops when every key is out of
+quota and somebody has to start it again tomorrow. The scheduler runs
+the summarizer in cycles instead:
+
+- Before each cycle it reads every key's daily quota and what is left
+  (the rate limiter's persisted counters) and skips straight to waiting
+  when nothing is left
+- Articles are prioritized: most recent published day first, then
+  `needs_summary` before unknown, `use_as_is`, `ready` and local fallback
+  stand-ins; when the budget runs out the lowest-priority articles wait
+- The summarizer stops cleanly on QuotaExhausted; the scheduler then
+  sleeps until the daily counters reset (UTC midnight) and resumes
+- A durable SQLite queue records every article's state (pending, done,
+  parked, no_text), attempts and last error. Finished summaries are kept
+  there too, so in JSON mode the next day's run restores them instead of
+  calling the API again; articles that failed max_attempts times are
+  parked rather than retried forever (`requeue` releases them)
+- Articles without body text are never sent to a summarizer: they are
+  marked `no_text` (summary_error "no body text") and do not count as
+  pending, until a re-scrape gives them a body
+
+Config (config/config.yaml):
+    llm:
+      scheduler:
+        queue_path: cache/summary_queue.db
+        max_attempts: 3
+        resume_margin_seconds: 60      # Wait past UTC midnight before resuming
+
+Usage:
+    python src/processing/summary_scheduler.py run
+    python src/processing/summary_scheduler.py run --engine async --store
+    python src/processing/summary_scheduler.py run --watch 3600      # Keep polling for new articles
+    python src/processing/summary_scheduler.py status
+    python src/processing/summary_scheduler.py requeue
+
+Author: StockBus Team
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.processing.article_store import SUMMARY_FIELDS
+from src.processing.summary_cache import normalize_text
+from src.processing.summary_router import RULES
+from src.scraping.dates import article_day
+
+DEFAULT_QUEUE_PATH = "cache/summary_queue.db"
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RESUME_MARGIN = 60
+
+# Lower runs first; fallback stand-ins already have a usable summary
+PROCESSING_RANK = {'needs_summary': 0, 'use_as_is': 2, 'ready': 3, 'summarized': 4}
+UNKNOWN_RANK = 1
+
+STATES = ('pending', 'done', 'parked', 'no_text')
+NO_TEXT_ERROR = RULES['empty']
+
+
+def priority_key(article: Dict):
+    """Sort key: most recent published day first, then by processing class"""
+    day = article_day(article)
+    rank = PROCESSING_RANK.get(article.get('processing'), UNKNOWN_RANK)
+    if article.get('summary_method') == 'fallback':
+        rank = PROCESSING_RANK['summarized']
+    return (-(day.toordinal() if day else 0), rank, article.get('url', ''))
+
+
+def has_text(article: Dict) -> bool:
+    """The article has body text to summarize"""
+    return bool((article.get('body', '') or '').strip())
+
+
+def text_hash(article: Dict) -> str:
+    """Hash of the normalized title and body (a stored summary is only reused for the same text)"""
+    text = normalize_text(article.get('title', '')) + '\x1f' + normalize_text(article.get('body', ''))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def seconds_until_reset(now: Optional[datetime] = None, margin: float = DEFAULT_RESUME_MARGIN) -> float:
+    """Seconds until the daily quotas reset (next UTC midnight) plus a margin"""
+    now = now or datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds() + margin
+
+
+class SummaryQueue:
+    """
+    Durable per-article work queue of the scheduler (SQLite, WAL)
+
+    Args:
+        path: Database file (created on first use)
+        max_attempts: Failed attempts after which an article is parked
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = Path(path)
+        if not self.path.is_absolute():
+            self.path = project_root / self.path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS queue (
+    url TEXT PRIMARY KEY,
+    day TEXT,
+    rank INTEGER,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    text_hash TEXT,
+    result TEXT,
+    enqueued REAL,
+    updated REAL
+)""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_state ON queue(state, day)")
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'SummaryQueue':
+        settings = config.get('llm', {}).get('scheduler', {}) or {}
+        return cls(settings.get('queue_path', DEFAULT_QUEUE_PATH),
+                   settings.get('max_attempts', DEFAULT_MAX_ATTEMPTS))
+
+    def sync(self, articles: List[Dict]) -> int:
+        """Enqueue articles not seen before and reopen no_text articles that
+        have a body now; returns how many were added"""
+        now = time.time()
+        rows = []
+        reopened = []
+        for article in articles:
+            if not article.get('url'):
+                continue
+            day = article_day(article)
+            _, rank, _ = priority_key(article)
+            rows.append((article['url'], day.isoformat() if day else '', rank, now, now))
+            if has_text(article):
+                reopened.append((now, article['url']))
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO queue (url, day, rank, enqueued, updated) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            added = self.conn.total_changes - before
+            self.conn.executemany(
+                "UPDATE queue SET state = 'pending', error = NULL, updated = ? WHERE url = ? AND state = 'no_text'",
+                reopened
+            )
+            return added
+
+    def mark_no_text(self, urls: List[str]):
+        """Set articles without body text aside (not pending, no attempt counted)"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE queue SET state = 'no_text', error = ?, updated = ? WHERE url = ?",
+                [(NO_TEXT_ERROR, now, url) for url in urls]
+            )
+
+    def states(self, urls: List[str]) -> Dict[str, sqlite3.Row]:
+        """Queue rows of the given URLs, by URL"""
+        found = {}
+        with self.lock:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                marks = ','.join('?' * len(chunk))
+                for row in self.conn.execute(f"SELECT * FROM queue WHERE url IN ({marks})", chunk):
+                    found[row['url']] = row
+        return found
+
+    def record(self, articles: List[Dict]) -> Dict[str, int]:
+        """
+        Store the outcome of a cycle
+
+        Summarized articles (except local fallback stand-ins) are done and
+        keep their summary fields; articles with an error count an attempt
+        and are parked after max_attempts; the rest stay pending.
+
+        Returns:
+            {'done': n, 'failed': n, 'parked': n}
+        """
+        now = time.time()
+        outcome = {'done': 0, 'failed': 0, 'parked': 0}
+        with self.lock, self.conn:
+            for article in articles:
+                url = article.get('url')
+                if not url:
+                    continue
+                if article.get('summarized') and article.get('summary_method') != 'fallback':
+                    result = {k: article[k] for k in SUMMARY_FIELDS if k in article}
+                    self.conn.execute(
+                        "UPDATE queue SET state = 'done', error = NULL, text_hash = ?, result = ?, updated = ? "
+                        "WHERE url = ?",
+                        (text_hash(article), json.dumps(result, ensure_ascii=False, default=str), now, url)
+                    )
+                    outcome['done'] += 1
+                elif article.get('summary_error'):
+                    self.conn.execute(
+                        "UPDATE queue SET attempts = attempts + 1, error = ?, updated = ?, "
+                        "state = CASE WHEN attempts + 1 >= ? THEN 'parked' ELSE state END WHERE url = ?",
+                        (article['summary_error'], now, self.max_attempts, url)
+                    )
+                    outcome['failed'] += 1
+            outcome['parked'] = self.conn.execute(
+                "SELECT COUNT(*) FROM queue WHERE state = 'parked' AND updated = ?", (now,)
+            ).fetchone()[0]
+        return outcome
+
+    def requeue(self) -> int:
+        """Release parked articles (attempts reset); returns how many"""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "UPDATE queue SET state = 'pending', attempts = 0, updated = ? WHERE state = 'parked'",
+                (time.time(),)
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Articles per state"""
+        with self.lock:
+            rows = self.conn.execute("SELECT state, COUNT(*) FROM queue GROUP BY state").fetchall()
+        counts = {state: 0 for state in STATES}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    def pending_days(self, limit: int = 5) -> List:
+        """(day, pending articles) for the most recent days with pending work"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT day, COUNT(*) FROM queue WHERE state = 'pending' GROUP BY day ORDER BY day DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SummaryScheduler:
+    """
+    Runs a summarizer in daily cycles until the backlog is drained
+
+    Features:
+    - Per-key daily quota report before every cycle
+    - Priority order (recent days first, needs_summary first) handed to the
+      summarizer, so the budget goes to the articles that matter most
+    - Sleeps until the quotas reset instead of failing, then resumes
+    - Durable queue: restart at any time, finished summaries are restored
+
+    Args:
+        make_summarizer: Returns a fresh ParallelSummarizer or
+            AsyncSummarizer for each cycle (reloads config and keys)
+        queue: Durable queue (default: from the summarizer's config)
+        resume_margin: Seconds to wait past UTC midnight (default:
+            llm.scheduler.resume_margin_seconds, else 60)
+        sleep: Sleep function (tests pass a fake one)
+    """
+
+    def __init__(self, make_summarizer: Callable, queue: Optional[SummaryQueue] = None,
+                 resume_margin: Optional[float] = None, sleep: Callable[[float], None] = time.sleep):
+        self.make_summarizer = make_summarizer
+        self.queue = queue
+        self.resume_margin = resume_margin
+        self.sleep = sleep
+        self.candidates = []
+        self.restored = 0
+        self.no_text = 0
+        self.cycles = 0
+
+    def order(self, articles: List[Dict]) -> List[Dict]:
+        """
+        The summarizer's schedule hook: enqueue, restore, drop parked, prioritize
+
+        Args:
+            articles: The summarizer's articles to summarize
+
+        Returns:
+            The articles that still need a summary, highest priority first
+        """
+        added = self.queue.sync(articles)
+        rows = self.queue.states([a['url'] for a in articles if a.get('url')])
+        pending = []
+        no_text = []
+        parked = 0
+        self.restored = 0
+        for article in articles:
+            row = rows.get(article.get('url'))
+            if row is not None and row['state'] == 'done' and row['result'] \
+                    and row['text_hash'] == text_hash(article):
+                # Summarized on an earlier day (JSON mode re-reads the input)
+                article.update(json.loads(row['result']))
+                self.restored += 1
+                continue
+            if row is not None and row['state'] == 'parked':
+                parked += 1
+                continue
+            if not has_text(article):
+                article['summarized'] = False
+                article['summary_error'] = NO_TEXT_ERROR
+                no_text.append(article)
+                continue
+            # A stale error belongs to an earlier attempt (the queue keeps it)
+            article.pop('summary_error', None)
+            pending.append(article)
+        pending.sort(key=priority_key)
+        self.candidates = pending
+        self.no_text = len(no_text)
+        self.queue.mark_no_text([a['url'] for a in no_text if a.get('url')])
+
+        if added:
+            print(f"📥 Queued {added} new article(s)")
+        if self.restored:
+            print(f"♻️ Restored {self.restored} summaries from the queue")
+        if parked:
+            print(f"🅿️ Skipping {parked} parked article(s) (failed {self.queue.max_attempts} times)")
+        if no_text:
+            print(f"🚫 Skipping {len(no_text)} article(s) without body text")
+        if pending:
+            first, last = article_day(pending[0]), article_day(pending[-1])
+            print(f"🗓️ Priority: {len(pending)} article(s), newest {first or 'undated'} → oldest {last or 'undated'}")
+        return pending
+
+    @staticmethod
+    def quota_report(summarizer) -> Optional[int]:
+        """Print each key's daily quota and what is left; returns requests left (None: unlimited)"""
+        summarizer._init_rate_limiter()
+        limiter = summarizer.limiter
+        print(f"\n🔑 Daily quota ({datetime.now(timezone.utc):%Y-%m-%d} UTC):")
+        for i, usage in enumerate(limiter.summary()):
+            quota = usage['quota']
+            if quota is None:
+                print(f"   key_{i + 1}: {usage['used_today']:,} used, unlimited")
+            else:
+                print(f"   key_{i + 1}: {usage['used_today']:,} / {quota:,} used, {usage['left_today']:,} left")
+        left = limiter.requests_left_today()
+        print(f"   Total left today: {'unlimited' if left is None else f'{left:,}'}")
+        return left
+
+    def wait_for_reset(self):
+        """Sleep until the daily quotas reset"""
+        seconds = seconds_until_reset(margin=self.resume_margin)
+        resume = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+        print(f"\n💤 Daily quota used up. Resuming at {resume:%Y-%m-%d %H:%M} UTC "
+              f"(in {int(seconds // 3600)}h {int(seconds % 3600 // 60)}m); Ctrl+C to stop")
+        self.sleep(seconds)
+
+    def run_cycle(self, input_file: str, output_file: str, store_path: Optional[str] = None) -> Dict:
+        """
+        One summarizer run over the prioritized backlog
+
+        Returns:
+            {'left_today', 'done', 'failed', 'parked', 'no_text', 'pending',
+             'deferred', 'quota_exhausted', 'skipped'}
+        """
+        self.cycles += 1
+        summarizer = self.make_summarizer()
+        if self.queue is None:
+            self.queue = SummaryQueue.from_config(summarizer.config)
+        if self.resume_margin is None:
+            settings = summarizer.config.get('llm', {}).get('scheduler', {}) or {}
+            self.resume_margin = settings.get('resume_margin_seconds', DEFAULT_RESUME_MARGIN)
+
+        left = self.quota_report(summarizer) if summarizer.local is None else None
+        if left == 0:
+            return {'left_today': 0, 'done': 0, 'failed': 0, 'parked': 0, 'no_text': 0, 'pending': None,
+                    'deferred': 0, 'quota_exhausted': True, 'skipped': True}
+
+        self.candidates = []
+        self.no_text = 0
+        summarizer.schedule = self.order
+        summarizer.process_dataset(input_file=input_file, output_file=output_file, store_path=store_path)
+
+        outcome = self.queue.record(self.candidates)
+        pending = sum(1 for a in self.candidates
+                      if not a.get('summarized') or a.get('summary_method') == 'fallback')
+        outcome.update({
+            'left_today': summarizer.limiter.requests_left_today() if summarizer.limiter else None,
+            'no_text': self.no_text,
+            'pending': pending - outcome['parked'],
+            # Routing kept today's last requests in reserve and deferred the rest
+            'deferred': summarizer.routing.stats['budget'] if summarizer.routing is not None else 0,
+            'quota_exhausted': summarizer.quota_exhausted,
+            'skipped': False,
+        })
+        print(f"\n🗂️ Cycle {self.cycles}: {outcome['done']} done, {outcome['failed']} failed "
+              f"({outcome['parked']} parked), {outcome['pending']} still pending"
+              + (f", {outcome['no_text']} without body text" if outcome['no_text'] else ""))
+        return outcome
+
+    def run(self, input_file: str, output_file: str, store_path: Optional[str] = None,
+            watch: Optional[float] = None, once: bool = False):
+        """
+        Run cycles until the backlog is drained
+
+        Args:
+            input_file / output_file / store_path: As for process_dataset
+            watch: Keep running and look for new articles every `watch`
+                seconds once the backlog is empty
+            once: Run a single cycle (no waiting for the next day)
+        """
+        print("\n" + "="*70)
+        print("🗓️ QUOTA-AWARE SUMMARY SCHEDULER")
+        print("="*70)
+
+        try:
+            while True:
+                outcome = self.run_cycle(input_file, output_file, store_path)
+                if once:
+                    break
+                if outcome['pending'] != 0 and (outcome['quota_exhausted'] or outcome['deferred']):
+                    self.wait_for_reset()
+                elif outcome['pending']:
+                    if outcome['done']:
+                        continue    # Quota left and progress made: go on
+                    print("\n⚠️ No progress this cycle; the pending articles keep failing")
+                    if watch is None:
+                        break
+                    self.sleep(watch)
+                elif watch is not None:
+                    print(f"\n✅ Backlog drained; checking for new articles in {watch:.0f}s")
+                    self.sleep(watch)
+                else:
+                    print("\n✅ Backlog drained")
+                    break
+        except KeyboardInterrupt:
+            print("\n⏸️ Stopped; the queue and summaries so far are saved")
+        finally:
+            if self.queue is not None:
+                self.print_status(self.queue)
+
+    @staticmethod
+    def print_status(queue: SummaryQueue):
+        counts = queue.counts()
+        print(f"\n📋 Queue ({queue.path.name}): {counts['pending']:,} pending, {counts['done']:,} done, "
+              f"{counts['parked']:,} parked, {counts['no_text']:,} without body text")
+        for day, count in queue.pending_days():
+            print(f"   {day or 'undated'}: {count:,} pending")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Summarize a backlog across days within the API quotas')
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--queue', default=None, help=f'Queue database (default: config or {DEFAULT_QUEUE_PATH})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help='Summarize until the backlog is drained, waiting for quota resets')
+    p_run.add_argument('--engine', choices=['parallel', 'async'], default='parallel')
+    p_run.add_argument('--input', default='data/datasets/finbert_ready.json')
+    p_run.add_argument('--output', default='data/datasets/summarized_dataset.json')
+    p_run.add_argument('--store', nargs='?', const='data/datasets/articles.db', default=None,
+                       help='Use the SQLite article store instead of JSON files')
+    p_run.add_argument('--watch', type=float, default=None, metavar='SECONDS',
+                       help='Keep running and look for new articles this often')
+    p_run.add_argument('--once', action='store_true', help='Run one cycle and exit')
+    p_run.add_argument('--no-cache', action='store_true', help='Ignore the summary cache')
+
+    sub.add_parser('status', help='Show the queue and today\'s quota')
+    sub.add_parser('requeue', help='Retry parked articles')
+
+    args = parser.parse_args()
+
+    def make_summarizer():
+        if getattr(args, 'engine', 'parallel') == 'async':
+            from src.processing.async_summarizer import AsyncSummarizer
+            return AsyncSummarizer(args.config, use_cache=not getattr(args, 'no_cache', False))
+        from src.processing.parallel_summarizer import ParallelSummarizer
+        return ParallelSummarizer(args.config, use_cache=not getattr(args, 'no_cache', False))
+
+    summarizer = make_summarizer()
+    queue = SummaryQueue(args.queue) if args.queue else SummaryQueue.from_config(summarizer.config)
+
+    if args.command == 'run':
+        scheduler = SummaryScheduler(make_summarizer, queue)
+        scheduler.run(args.input, args.output, args.store, watch=args.watch, once=args.once)
+    elif args.command == 'requeue':
+        print(f"🔁 Released {queue.requeue()} parked article(s)")
+        SummaryScheduler.print_status(queue)
+    else:
+        if summarizer.local is None:
+            SummaryScheduler.quota_report(summarizer)
+        SummaryScheduler.print_status(queue)
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,69 @@ Script 2: Merge All Scraped JSON Files
 Combines all JSON files from data/raw/news/ or data/raw/news_archive/ into a single dataset.
 Removes duplicates and analyzes data quality.
 
+The merge streams: files are decoded in a process pool (--workers) and
+consumed in order, articles are deduplicated against a compact URL hash
+index, counted for the analysis in the same pass, and written to both
+output datasets as they go. Peak memory is the index plus the few files
+in flight, not the corpus.
+
+Runs are incremental: data/datasets/merge_manifest.json records each input
+file's size, mtime and content hash, and merge_urls.idx holds the URL hash
+index. Only new files and files that grew (the scraper appends articles in
+place) are read, and their new articles are appended to the existing
+outputs. If a merged file was edited instead (its earlier records no
+longer match), articles in the outputs would go stale, so the merge
+rebuilds everything from scratch. Use --full to force a rebuild.
+
+Every article gets normalized published_iso/published_ts fields, and each
+output gets a sorted date index (<name>.dates.idx, see src/scraping/dates.py)
+for date-range and per-day lookups without a full scan.
+
+With --parquet the FinBERT-tagged articles are also written to a year/month
+partitioned Parquet dataset (see src/processing/parquet_store.py).
+
+With --store they are also inserted into the SQLite article store (see
+src/processing/article_store.py). Rows the scraper already stored get the
+merge's tags and normalized dates; their text and the fields later stages
+added are kept. Run once with --full to fill a new store with the whole
+corpus.
+
 Usage:
     python src/scraping/2_merge_data.py
     python src/scraping/2_merge_data.py --input data/raw/news_archive
+    python src/scraping/2_merge_data.py --full
+    python src/scraping/2_merge_data.py --parquet
+    python src/scraping/2_merge_data.py --store
+    python src/scraping/2_merge_data.py --workers 8
 """
 
+import os
+import sys
 import json
-import glob
+import hashlib
 import argparse
+from array import array
 from pathlib import Path
 from collections import Counter
 
-def load_all(input_dir="data/raw/news_archive"):
-    """Load all articles from JSON files"""
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.scraping.json_stream import JsonArrayWriter
+from src.scraping.raw_loader import iter_load
+from src.scraping.dates import DateIndex, article_day, display_date, normalize_published
+
+MANIFEST_VERSION = 3
+
+def find_input_files(input_dir="data/raw/news_archive"):
+    """List raw JSON/JSONL files, trying the usual locations if needed"""
     news_dir = Path(input_dir)
-    
+
     if not news_dir.exists():
         print(f"❌ Directory '{input_dir}' not found!")
         print(f"   Trying alternative locations...")
-        
+
         # Try alternative locations
         alternatives = ["data/raw/news", "scraped_news", "data/raw/news_archive"]
         for alt in alternatives:
@@ -34,174 +78,533 @@ def load_all(input_dir="data/raw/news_archive"):
         else:
             print("❌ No data directories found!")
             return []
-    
-    all_articles = []
-    files = list(news_dir.glob("*.json"))
-    
+
+    files = sorted(list(news_dir.glob("*.json")) + list(news_dir.glob("*.jsonl")))
     print(f"📂 Found {len(files)} JSON files\n")
-    
-    for json_file in files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                articles = json.load(f)
-                all_articles.extend(articles)
-                print(f"✅ {json_file.name}: {len(articles)} articles")
-        except Exception as e:
-            print(f"❌ Error loading {json_file.name}: {e}")
-    
-    print(f"\n📊 Total: {len(all_articles)} articles")
-    return all_articles
-
-def remove_duplicates(articles):
-    """Remove duplicate articles by URL"""
-    seen = set()
-    unique = []
-    dups = 0
-    
-    for art in articles:
-        url = art.get('url', '')
-        if url and url not in seen:
-            seen.add(url)
-            unique.append(art)
+    return files
+
+def iter_articles(files, counts=None, workers=None):
+    """Yield articles from each file in turn, reporting per-file counts
+
+    If `counts` is a dict it is filled with {str(path): articles read}.
+    """
+    total = 0
+
+    for json_file, articles, error in iter_load(files, workers=workers):
+        if error:
+            print(f"❌ Error loading {json_file.name}: {error} (file skipped)")
         else:
-            dups += 1
-    
-    if dups > 0:
-        print(f"🔍 Removed {dups} duplicates")
-    
-    return unique
+            print(f"✅ {json_file.name}: {len(articles)} articles")
+        yield from articles
+        total += len(articles)
+        if counts is not None:
+            counts[str(json_file)] = len(articles)
+
+    print(f"\n📊 Total: {total} articles")
+
+class UrlIndex:
+    """Compact set of 64-bit URL hashes used for deduplication
+
+    An int per URL costs ~70 bytes with set overhead, so millions of
+    articles fit comfortably in memory without keeping the URLs themselves.
+    """
+
+    def __init__(self):
+        self.hashes = set()
+
+    @staticmethod
+    def key(url):
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, url):
+        """Add a URL; returns False if it was already present"""
+        h = self.key(url)
+        if h in self.hashes:
+            return False
+        self.hashes.add(h)
+        return True
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def save(self, path):
+        """Write the index as packed unsigned 64-bit integers"""
+        path = Path(path)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            array('Q', self.hashes).tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        packed = array('Q')
+        with open(path, 'rb') as f:
+            packed.frombytes(f.read())
+        index.hashes = set(packed)
+        return index
+
+class DatasetStats:
+    """Single-pass accumulator for the dataset analysis"""
+
+    def __init__(self):
+        self.total = 0
+        self.wc_min = None
+        self.wc_max = None
+        self.wc_sum = 0
+        self.lengths = Counter()
+        self.publishers = Counter()
+        self.topics = Counter()
+        self.date_min = None  # ISO dates, so min/max order chronologically
+        self.date_max = None
+        self.processing = Counter()  # FinBERT tags, filled by merge()
+
+    def to_dict(self):
+        return {k: dict(v) if isinstance(v, Counter) else v for k, v in vars(self).items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for k, v in data.items():
+            setattr(stats, k, Counter(v) if isinstance(getattr(stats, k, None), Counter) else v)
+        return stats
+
+    def add(self, art):
+        self.total += 1
+
+        wc = art.get('word_count', 0)
+        self.wc_sum += wc
+        self.wc_min = wc if self.wc_min is None else min(self.wc_min, wc)
+        self.wc_max = wc if self.wc_max is None else max(self.wc_max, wc)
+
+        if wc < 50:
+            self.lengths['very_short'] += 1
+        elif wc < 200:
+            self.lengths['short'] += 1
+        elif wc <= 512:
+            self.lengths['medium'] += 1
+        elif wc <= 1000:
+            self.lengths['long'] += 1
+        else:
+            self.lengths['very_long'] += 1
+
+        if art.get('publisher'):
+            self.publishers[art['publisher']] += 1
+        if art.get('topic'):
+            self.topics[art['topic']] += 1
+
+        d = art.get('published_iso')
+        if not d:
+            day = article_day(art)
+            d = day.isoformat() if day else None
+        if d:
+            self.date_min = d if self.date_min is None else min(self.date_min, d)
+            self.date_max = d if self.date_max is None else max(self.date_max, d)
+
+    def report(self):
+        """Print the dataset analysis"""
+        print("\n" + "="*70)
+        print("DATASET ANALYSIS")
+        print("="*70)
+
+        print(f"\n📈 Total Articles: {self.total}")
+
+        if not self.total:
+            print("\n" + "="*70)
+            return
+
+        # Word count stats
+        print(f"\n📝 Word Count:")
+        print(f"   Min: {self.wc_min}")
+        print(f"   Max: {self.wc_max}")
+        print(f"   Average: {self.wc_sum // self.total}")
+
+        # Length categories for FinBERT
+        pct = lambda n: n / self.total * 100
+        print(f"\n📊 Length Distribution (for FinBERT):")
+        print(f"   Very Short (<50): {self.lengths['very_short']} ({pct(self.lengths['very_short']):.1f}%)")
+        print(f"   Short (50-200): {self.lengths['short']} ({pct(self.lengths['short']):.1f}%)")
+        print(f"   Medium (200-512): {self.lengths['medium']} ({pct(self.lengths['medium']):.1f}%) ✅ Ideal")
+        print(f"   Long (512-1000): {self.lengths['long']} ({pct(self.lengths['long']):.1f}%) ⚠️ Summarize")
+        print(f"   Very Long (>1000): {self.lengths['very_long']} ({pct(self.lengths['very_long']):.1f}%) ⚠️ Summarize")
+
+        # Publishers
+        if self.publishers:
+            print(f"\n📰 Top 10 Publishers:")
+            for pub, count in self.publishers.most_common(10):
+                print(f"   {pub}: {count}")
+
+        # Topics
+        if self.topics:
+            print(f"\n🔍 Articles per Topic:")
+            for topic, count in self.topics.items():
+                print(f"   {topic}: {count}")
+
+        # Date range
+        if self.date_min:
+            print(f"\n📅 Date Range:")
+            print(f"   Earliest: {display_date(self.date_min)}")
+            print(f"   Latest: {display_date(self.date_max)}")
+
+        print("\n" + "="*70)
 
 def analyze(articles):
     """Analyze dataset"""
-    print("\n" + "="*70)
-    print("DATASET ANALYSIS")
-    print("="*70)
-    
-    print(f"\n📈 Total Articles: {len(articles)}")
-    
-    # Word count stats
-    word_counts = [art.get('word_count', 0) for art in articles]
-    if word_counts:
-        print(f"\n📝 Word Count:")
-        print(f"   Min: {min(word_counts)}")
-        print(f"   Max: {max(word_counts)}")
-        print(f"   Average: {sum(word_counts) // len(word_counts)}")
-    
-    # Length categories for FinBERT
-    very_short = sum(1 for wc in word_counts if wc < 50)
-    short = sum(1 for wc in word_counts if 50 <= wc < 200)
-    medium = sum(1 for wc in word_counts if 200 <= wc <= 512)
-    long = sum(1 for wc in word_counts if 512 < wc <= 1000)
-    very_long = sum(1 for wc in word_counts if wc > 1000)
-    
-    print(f"\n📊 Length Distribution (for FinBERT):")
-    print(f"   Very Short (<50): {very_short} ({very_short/len(articles)*100:.1f}%)")
-    print(f"   Short (50-200): {short} ({short/len(articles)*100:.1f}%)")
-    print(f"   Medium (200-512): {medium} ({medium/len(articles)*100:.1f}%) ✅ Ideal")
-    print(f"   Long (512-1000): {long} ({long/len(articles)*100:.1f}%) ⚠️ Summarize")
-    print(f"   Very Long (>1000): {very_long} ({very_long/len(articles)*100:.1f}%) ⚠️ Summarize")
-    
-    # Publishers
-    publishers = [art.get('publisher', 'Unknown') for art in articles if art.get('publisher')]
-    if publishers:
-        top = Counter(publishers).most_common(10)
-        print(f"\n📰 Top 10 Publishers:")
-        for pub, count in top:
-            print(f"   {pub}: {count}")
-    
-    # Topics
-    topics = [art.get('topic', 'Unknown') for art in articles if art.get('topic')]
-    if topics:
-        counts = Counter(topics)
-        print(f"\n🔍 Articles per Topic:")
-        for topic, count in counts.items():
-            print(f"   {topic}: {count}")
-    
-    # Date range
-    dates = [art.get('published_date', '') for art in articles if art.get('published_date')]
-    if dates:
-        dates = [d for d in dates if d]  # Remove empty
-        print(f"\n📅 Date Range:")
-        print(f"   Earliest: {min(dates)}")
-        print(f"   Latest: {max(dates)}")
-    
-    print("\n" + "="*70)
+    stats = DatasetStats()
+    for art in articles:
+        stats.add(art)
+    stats.report()
+    return stats
+
+def tag_for_finbert(art):
+    """Set the FinBERT processing flags on an article (in place)"""
+    wc = art.get('word_count', 0)
+
+    if 200 <= wc <= 512:
+        art['processing'] = 'ready'
+        art['finbert_ready'] = True
+    elif 50 <= wc < 200:
+        art['processing'] = 'use_as_is'
+        art['finbert_ready'] = True
+    elif wc > 512:
+        art['processing'] = 'needs_summary'
+        art['finbert_ready'] = False
+    else:
+        art['processing'] = 'too_short'
+        art['finbert_ready'] = False
+
+    return art
 
-def save_merged(articles, filename="data/datasets/complete_dataset.json"):
-    """Save merged dataset"""
-    output_path = Path(filename)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    
-    size_mb = output_path.stat().st_size / (1024 * 1024)
-    print(f"\n💾 Saved: {output_path}")
+def merge(files,
+          complete_file="data/datasets/complete_dataset.json",
+          finbert_file="data/datasets/finbert_ready.json",
+          index=None, stats=None, counts=None, append=False, parquet_root=None,
+          workers=None, date_indexes=None, store_path=None):
+    """Stream files into the merged and FinBERT-ready datasets
+
+    With append=True, `index` and `stats` come from the manifest and new
+    articles are added to the end of the current outputs; otherwise both
+    outputs are rebuilt. If `parquet_root` is set the tagged articles also
+    go to the partitioned Parquet dataset there, and if `store_path` is set
+    they are inserted into the article store there. `workers` sets the number
+    of decoding processes. `date_indexes` ({'complete': DateIndex,
+    'finbert': DateIndex}) are extended with the written articles' offsets.
+    Returns (stats for the whole dataset, articles added).
+    """
+    index = index if index is not None else UrlIndex()
+    stats = stats or DatasetStats()
+    date_indexes = date_indexes if date_indexes is not None else {}
+    complete_dates = date_indexes.setdefault('complete', DateIndex())
+    finbert_dates = date_indexes.setdefault('finbert', DateIndex())
+    added = 0
+    dups = 0
+
+    complete_out = JsonArrayWriter(complete_file, append=append)
+    finbert_out = JsonArrayWriter(finbert_file, append=append)
+    outputs = [complete_out, finbert_out]
+
+    if parquet_root:
+        from src.processing.parquet_store import ParquetDatasetWriter
+        parquet_out = ParquetDatasetWriter(parquet_root, append=append)
+        outputs.append(parquet_out)
+
+    if store_path:
+        from src.processing.article_store import ArticleStoreWriter
+        store_out = ArticleStoreWriter(store_path)
+        outputs.append(store_out)
+
+    try:
+        for art in iter_articles(files, counts, workers):
+            url = art.get('url', '')
+            if not url or not index.add(url):
+                dups += 1
+                continue
+
+            normalize_published(art)
+            day = article_day(art)
+            stats.add(art)
+            complete_dates.add(day, complete_out.write(art))
+            added += 1
+
+            tag_for_finbert(art)
+            stats.processing[art['processing']] += 1
+            finbert_dates.add(day, finbert_out.write(art))
+            if parquet_root:
+                parquet_out.write(art)
+            if store_path:
+                store_out.write(art)
+    except BaseException:
+        for out in outputs:
+            out.abort()
+        raise
+
+    if dups > 0:
+        print(f"🔍 Removed {dups} duplicates")
+
+    if not added:
+        for out in outputs:
+            out.abort()
+        return stats, added
+
+    stats.report()
+
+    print("\n💾 Saving datasets...")
+    for out in outputs:
+        out.close()
+
+    size_mb = complete_out.path.stat().st_size / (1024 * 1024)
+    print(f"\n💾 Saved: {complete_out.path}")
     print(f"   Size: {size_mb:.2f} MB")
 
-def create_finbert_ready(articles, filename="data/datasets/finbert_ready.json"):
-    """Create FinBERT-ready dataset with processing flags"""
-    output_path = Path(filename)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    for art in articles:
-        wc = art.get('word_count', 0)
-        
-        if 200 <= wc <= 512:
-            art['processing'] = 'ready'
-            art['finbert_ready'] = True
-        elif 50 <= wc < 200:
-            art['processing'] = 'use_as_is'
-            art['finbert_ready'] = True
-        elif wc > 512:
-            art['processing'] = 'needs_summary'
-            art['finbert_ready'] = False
-        else:
-            art['processing'] = 'too_short'
-            art['finbert_ready'] = False
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    
-    ready = sum(1 for a in articles if a['finbert_ready'])
-    needs_summary = sum(1 for a in articles if a['processing'] == 'needs_summary')
-    too_short = sum(1 for a in articles if a['processing'] == 'too_short')
-    
-    print(f"\n📋 FinBERT Dataset: {output_path}")
-    print(f"   ✅ Ready: {ready}")
-    print(f"   ⚠️ Need summary: {needs_summary}")
-    print(f"   ❌ Too short: {too_short}")
+    print(f"\n📋 FinBERT Dataset: {finbert_out.path}")
+    print(f"   ✅ Ready: {stats.processing['ready'] + stats.processing['use_as_is']}")
+    print(f"   ⚠️ Need summary: {stats.processing['needs_summary']}")
+    print(f"   ❌ Too short: {stats.processing['too_short']}")
+
+    if parquet_root:
+        print(f"\n🧱 Parquet Dataset: {parquet_root} (+{parquet_out.count} rows)")
+    if store_path:
+        print(f"\n🗄️ Article Store: {store_path} (+{store_out.count} new rows)")
+
+    return stats, added
+
+# ============================================================================
+# MANIFEST (incremental merges)
+# ============================================================================
+
+def file_hash(path, prefix_size=None):
+    """SHA-256 of a file's contents, or (whole file, first prefix_size bytes)"""
+    h = hashlib.sha256()
+    prefix = None
+    done = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            if prefix_size is not None and prefix is None and done + len(block) >= prefix_size:
+                h.update(block[:prefix_size - done])
+                prefix = h.copy()
+                h.update(block[prefix_size - done:])
+            else:
+                h.update(block)
+            done += len(block)
+    if prefix_size is None:
+        return h.hexdigest()
+    if prefix is None:
+        prefix = h.copy()   # File is shorter than the prefix
+    return h.hexdigest(), prefix.hexdigest()
+
+def records_end(path):
+    """Offset just past the last record: what stays unchanged when articles are appended
+
+    For a JSON array that is before the closing bracket; for JSONL (or a
+    file that is not an array) the whole file.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return JsonArrayWriter._find_closing_bracket(f)[0]
+    except (OSError, ValueError):
+        return Path(path).stat().st_size
+
+def output_size(path):
+    """Size of an output file, or total size of an output directory"""
+    path = Path(path)
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+    return path.stat().st_size
+
+def fingerprint(path, previous=None):
+    """Size/mtime/hash record for a file, reusing the old hashes if size and mtime match
+
+    `records_size`/`records_sha256` cover the file up to its last record,
+    so a later run can tell appended articles from edited ones.
+    """
+    st = Path(path).stat()
+    entry = {'size': st.st_size, 'mtime': st.st_mtime}
+    if previous and previous.get('size') == st.st_size and previous.get('mtime') == st.st_mtime:
+        for key in ('sha256', 'records_size', 'records_sha256'):
+            entry[key] = previous[key]
+    else:
+        entry['records_size'] = records_end(path)
+        entry['sha256'], entry['records_sha256'] = file_hash(path, entry['records_size'])
+    return entry
+
+def only_appended(path, previous):
+    """True if the file still starts with every record it had when it was merged"""
+    size = previous.get('records_size')
+    if size is None or Path(path).stat().st_size < size:
+        return False
+    return file_hash(path, size)[1] == previous.get('records_sha256')
+
+def load_manifest(manifest_file, outputs):
+    """Load the manifest if it still describes the current outputs, else None"""
+    path = Path(manifest_file)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable manifest ({e})")
+        return None
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+
+    # Outputs must be exactly what the last run left behind
+    for name, output in outputs.items():
+        recorded = manifest.get('outputs', {}).get(name, {})
+        output = Path(output)
+        if recorded.get('path') != str(output) or not output.exists() \
+                or output_size(output) != recorded.get('size'):
+            print(f"⚠️ {output} changed since the last merge, rebuilding")
+            return None
+
+    if not Path(manifest.get('url_index', '')).exists():
+        return None
+    for name in outputs:
+        if name in manifest.get('date_indexes', {}) and not Path(manifest['date_indexes'][name]).exists():
+            return None
+
+    return manifest
+
+def save_manifest(manifest_file, fingerprints, previous_files, counts, stats, index_file, outputs,
+                  date_index_files=None):
+    """Record input fingerprints, dataset stats and output sizes"""
+    entries = {}
+    for key, entry in fingerprints.items():
+        entry = dict(entry)
+        entry['articles'] = counts.get(key, previous_files.get(key, {}).get('articles', 0))
+        entries[key] = entry
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'files': entries,
+        'url_index': str(index_file),
+        'date_indexes': {name: str(path) for name, path in (date_index_files or {}).items()},
+        'stats': stats.to_dict(),
+        'outputs': {
+            name: {'path': str(Path(output)), 'size': output_size(output)}
+            for name, output in outputs.items()
+        },
+    }
+
+    path = Path(manifest_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+def changed_files(files, fingerprints, previous_files):
+    """Split files that differ from the manifest
+
+    Returns:
+        (new or appended-to files, files whose merged records were edited)
+    """
+    changed, edited = [], []
+    for path in files:
+        previous = previous_files.get(str(path))
+        if previous is None:
+            changed.append(path)
+        elif fingerprints[str(path)]['sha256'] != previous['sha256']:
+            (changed if only_appended(path, previous) else edited).append(path)
+    return changed, edited
 
 def main():
     parser = argparse.ArgumentParser(description='Merge scraped news data')
-    parser.add_argument('--input', default='data/raw/news_archive', 
+    parser.add_argument('--input', default='data/raw/news_archive',
                        help='Input directory (default: data/raw/news_archive)')
+    parser.add_argument('--full', action='store_true',
+                       help='Ignore the manifest and rebuild both datasets from scratch')
+    parser.add_argument('--manifest', default='data/datasets/merge_manifest.json',
+                       help='Merge manifest (default: data/datasets/merge_manifest.json)')
+    parser.add_argument('--parquet', nargs='?', const='data/datasets/parquet', default=None,
+                       help='Also write a partitioned Parquet dataset (default dir: data/datasets/parquet)')
+    parser.add_argument('--store', nargs='?', const='data/datasets/articles.db', default=None,
+                       help='Also insert articles into the SQLite article store (default: data/datasets/articles.db)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes used to decode raw files (default: CPU count)')
     args = parser.parse_args()
-    
+
+    outputs = {
+        'complete': "data/datasets/complete_dataset.json",
+        'finbert': "data/datasets/finbert_ready.json",
+    }
+    if args.parquet:
+        outputs['parquet'] = args.parquet
+    index_file = Path(args.manifest).with_name('merge_urls.idx')
+    date_index_files = {
+        'complete': DateIndex.path_for(outputs['complete']),
+        'finbert': DateIndex.path_for(outputs['finbert']),
+    }
+
     print("="*70)
     print("MERGE SCRAPED DATA")
     print("="*70)
-    
-    # Load
+
     print(f"\n🔄 Loading articles from: {args.input}")
-    articles = load_all(args.input)
-    
-    if not articles:
-        print("❌ No articles found!")
-        return
-    
-    # Remove duplicates
-    print("\n🔍 Removing duplicates...")
-    articles = remove_duplicates(articles)
-    
-    # Analyze
-    analyze(articles)
-    
-    # Save
-    print("\n💾 Saving datasets...")
-    save_merged(articles, "data/datasets/complete_dataset.json")
-    create_finbert_ready(articles, "data/datasets/finbert_ready.json")
-    
+    files = find_input_files(args.input)
+
+    manifest = None if args.full else load_manifest(args.manifest, outputs)
+    if manifest and set(manifest.get('date_indexes', {})) != set(date_index_files):
+        manifest = None
+    counts = {}
+    fingerprints = None
+
+    if manifest:
+        previous_files = manifest['files']
+        fingerprints = {str(f): fingerprint(f, previous_files.get(str(f))) for f in files}
+        pending, edited = changed_files(files, fingerprints, previous_files)
+        if edited:
+            print(f"⚠️ {len(edited)} merged file(s) were edited, not just appended to "
+                  f"(e.g. {edited[0].name}); rebuilding")
+            manifest = None
+
+    if manifest:
+        # Incremental: only new or appended-to files, appended to the outputs
+        missing = set(previous_files) - {str(f) for f in files}
+
+        print(f"📒 Manifest: {len(files) - len(pending)} files unchanged, {len(pending)} new or appended to")
+        if missing:
+            print(f"⚠️ {len(missing)} previously merged files are gone; their articles stay (use --full to drop them)")
+
+        index = UrlIndex.load(manifest['url_index'])
+        stats = DatasetStats.from_dict(manifest['stats'])
+        date_indexes = {name: DateIndex.load(path) for name, path in manifest['date_indexes'].items()}
+
+        if pending:
+            stats, added = merge(pending, outputs['complete'], outputs['finbert'],
+                                 index=index, stats=stats, counts=counts, append=True,
+                                 parquet_root=args.parquet, workers=args.workers,
+                                 date_indexes=date_indexes, store_path=args.store)
+        else:
+            added = 0
+
+        if not added:
+            print("\n✅ No new articles since the last merge")
+    else:
+        # Full rebuild, one streaming pass
+        previous_files = {}
+        index = UrlIndex()
+        date_indexes = {}
+        stats, added = merge(files, outputs['complete'], outputs['finbert'],
+                             index=index, counts=counts, parquet_root=args.parquet,
+                             workers=args.workers, date_indexes=date_indexes,
+                             store_path=args.store)
+
+        if not added:
+            print("❌ No articles found!")
+            return
+
+    if fingerprints is None:
+        fingerprints = {str(f): fingerprint(f) for f in files}
+
+    index.save(index_file)
+    for name, path in date_index_files.items():
+        date_indexes[name].save(path)
+    save_manifest(args.manifest, fingerprints, previous_files, counts, stats, index_file, outputs,
+                  date_index_files)
+
     print("\n" + "="*70)
     print("✅ COMPLETE!")
     print("="*70)
@@ -0,0 +1,274 @@
+"""
+Compact Article Record
+======================
+A slotted, schema-defined replacement for the ~20-key article dicts that
+flow from the scraper through the merge, the summarizers and prepare_finbert.
+
+- One fixed slot per known field (no per-article dict or key strings)
+- Repeated short strings (publisher, topic, tags, dates) are interned, so
+  500k articles share one copy of each
+- Unknown fields survive in a small `extra` dict
+- Dict-style access (get, [], in, update, keys, items) so existing code
+  that treats articles as dicts keeps working
+- to_dict()/to_json() produce the same JSON as before; unset fields are
+  omitted
+
+Usage:
+    from src.scraping.article_record import Article, load_articles
+    articles = load_articles('data/datasets/finbert_ready.json')
+    art = articles[0]
+    art['processing'] = 'summarized'
+    line = art.to_json()
+
+Benchmark: python tests/benchmark_article_record.py
+"""
+
+import json
+import sys
+
+from src.scraping.json_stream import iter_json_records
+
+# Known article fields in pipeline order (same as the article store columns)
+FIELDS = (
+    # news_scraper
+    'url', 'original_url', 'title', 'gnews_title', 'body', 'publisher', 'topic',
+    'authors', 'published_date', 'published_iso', 'published_ts', 'scraped_date',
+    'body_length', 'word_count', 'extraction_method',
+    # 2_merge_data.py
+    'processing', 'finbert_ready',
+    # Summarizers
+    'summary', 'summarized', 'summarized_at', 'summary_error', 'needs_summary',
+    # prepare_finbert.py
+    'finbert_input', 'input_source', 'finbert_input_words', 'warning',
+)
+
+# Low-cardinality string fields worth interning
+INTERNED = frozenset((
+    'publisher', 'topic', 'published_date', 'published_iso', 'scraped_date',
+    'extraction_method', 'processing', 'input_source', 'warning', 'summary_error',
+))
+
+_FIELD_SET = frozenset(FIELDS)
+
+
+class Article:
+    """
+    Slotted article record with dict-compatible access
+
+    Args:
+        **fields: Article fields; unknown keys go to `extra`
+    """
+
+    __slots__ = FIELDS + ('extra',)
+
+    # Unset slots are simply left empty (no per-field initialization);
+    # every read goes through getattr(self, name, None)
+
+    def __init__(self, **fields):
+        self.extra = None
+        self._fill(fields)
+
+    def _fill(self, data):
+        setters = _SETTERS
+        for key, value in data.items():
+            setter = setters.get(key)
+            if setter is None:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+            else:
+                if type(value) is str and key in INTERNED:
+                    value = sys.intern(value)
+                setter(self, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a decoded JSON object"""
+        if isinstance(data, cls):
+            return data
+        return _from_dict(cls, data)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_dict(self):
+        """Plain dict with the set fields, in schema order, then extras"""
+        return _to_dict(self)
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    # ------------------------------------------------------------------
+    # Dict-style access
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key, None)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._fill({key: value})
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET and getattr(self, key, None) is not None:
+            delattr(self, key)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key, None) is not None
+        return bool(self.extra) and key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, other=(), **kwargs):
+        items = other.items() if hasattr(other, 'items') else other
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return sum(1 for name in FIELDS if getattr(self, name, None) is not None) + len(self.extra or ())
+
+    def __eq__(self, other):
+        if isinstance(other, Article):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Article(url={self.get('url')!r}, title={self.get('title', '')[:40]!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.extra = None
+        self._fill(state)
+
+
+# Slot descriptors' setters, looked up once per field name
+_SETTERS = {name: Article.__dict__[name].__set__ for name in FIELDS}
+
+
+def _compile_codecs():
+    """Generate straight-line from_dict/to_dict functions for FIELDS
+
+    Like namedtuple and dataclasses, unrolling the per-field loop into
+    generated code roughly halves the cost of converting a record.
+    """
+    decode = [
+        "def _from_dict(cls, data):",
+        "    self = new(cls)",
+        "    self.extra = None",
+        "    found = 0",
+        "    get = data.get",
+    ]
+    for name in FIELDS:
+        decode.append(f"    value = get({name!r})")
+        decode.append("    if value is not None:")
+        decode.append("        found += 1")
+        if name in INTERNED:
+            decode.append(f"        self.{name} = intern(value) if type(value) is str else value")
+        else:
+            decode.append(f"        self.{name} = value")
+    decode += [
+        "    if found != len(data):",
+        "        extra = {k: v for k, v in data.items() if k not in known}",
+        "        if extra:",
+        "            self.extra = extra",
+        "    return self",
+    ]
+
+    encode = ["def _to_dict(self):", "    data = {}"]
+    for name in FIELDS:
+        encode.append(f"    value = getattr(self, {name!r}, None)")
+        encode.append("    if value is not None:")
+        encode.append(f"        data[{name!r}] = value")
+    encode += [
+        "    if self.extra:",
+        "        data.update(self.extra)",
+        "    return data",
+    ]
+
+    namespace = {'new': object.__new__, 'intern': sys.intern, 'known': _FIELD_SET}
+    exec('\n'.join(decode + [''] + encode), namespace)
+    return namespace['_from_dict'], namespace['_to_dict']
+
+
+_from_dict, _to_dict = _compile_codecs()
+
+
+def iter_articles(path, bodies='auto'):
+    """Stream Article records from a JSON array or JSONL file
+
+    Articles whose body was stripped (see src/processing/body_store.py) get
+    it back from `bodies`, a BodyStore; 'auto' opens the project's body
+    store on the first body-less article, None disables this.
+    """
+    for record in iter_json_records(path):
+        article = Article.from_dict(record)
+        if bodies is not None and 'body' not in article and 'url' in article:
+            if bodies == 'auto':
+                from src.processing.body_store import BodyStore
+                bodies = BodyStore.open_default()
+                if bodies is None:
+                    yield article
+                    continue
+            body = bodies.get(article['url'])
+            if body is not None:
+                article['body'] = body
+        yield article
+
+
+def load_articles(path, bodies='auto'):
+    """Load a dataset file as a list of Article records without an intermediate dict list"""
+    return list(iter_articles(path, bodies))
+
+
+def dump_articles(articles, path):
+    """Write records (or dicts) as a JSON array, one article per line, atomically"""
+    from src.scraping.json_stream import JsonArrayWriter
+    with JsonArrayWriter(path) as out:
+        for article in articles:
+            out.write(article)
+    return out.count
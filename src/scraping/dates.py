@@ -0,0 +1,260 @@
+"""
+Published Date Helpers
+======================
+Articles keep the human-readable DD/MM/YYYY `published_date` and, next to
+it, normalized fields that sort and compare correctly:
+
+- published_iso: 'YYYY-MM-DD'
+- published_ts: UTC epoch seconds (midnight when only the day is known)
+
+DateIndex is a sorted (day, byte offset) index over a merged dataset file,
+so date-range slices, per-day counts and coverage gaps are binary searches
+instead of full scans that re-parse every date string.
+
+Usage:
+    index = DateIndex.load('data/datasets/complete_dataset.dates.idx')
+    for article in index.read('data/datasets/complete_dataset.json',
+                              start='2024-01-01', end='2024-01-31'):
+        ...
+"""
+
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+DISPLAY_FORMAT = '%d/%m/%Y'
+
+
+def parse_date(value):
+    """Parse a date in any format the pipeline sees; returns a datetime or None
+
+    Accepts datetime/date objects, epoch seconds (or milliseconds),
+    DD/MM/YYYY, ISO 8601 and RFC 2822 (GNews) strings.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            return datetime.fromtimestamp(seconds, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip()
+    try:
+        return datetime.strptime(text[:10], DISPLAY_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def published_fields(value):
+    """Display, ISO and epoch published-date fields for an article
+
+    Returns {'published_date': 'DD/MM/YYYY', 'published_iso': 'YYYY-MM-DD',
+    'published_ts': int}; all empty/None when the value does not parse.
+    """
+    dt = parse_date(value)
+    if dt is None:
+        return {'published_date': '', 'published_iso': '', 'published_ts': None}
+    return {
+        'published_date': dt.strftime(DISPLAY_FORMAT),
+        'published_iso': dt.date().isoformat(),
+        'published_ts': int(dt.timestamp()),
+    }
+
+
+def normalize_published(article):
+    """Fill published_iso/published_ts from published_date if missing (in place)"""
+    if not article.get('published_iso') and article.get('published_date'):
+        fields = published_fields(article['published_date'])
+        article['published_iso'] = fields['published_iso']
+        article['published_ts'] = fields['published_ts']
+    return article
+
+
+def article_day(article):
+    """Published day of an article as a date, or None"""
+    iso = article.get('published_iso')
+    if iso:
+        try:
+            return date.fromisoformat(iso)
+        except ValueError:
+            pass
+    for key in ('published_ts', 'published_date'):
+        dt = parse_date(article.get(key))
+        if dt is not None:
+            return dt.date()
+    return None
+
+
+def display_date(value):
+    """Format a date (or ISO string) as DD/MM/YYYY"""
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.strftime(DISPLAY_FORMAT)
+
+
+def _as_day(value):
+    """date, ISO/display string or ordinal to a date ordinal"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        dt = parse_date(value)
+        if dt is None:
+            raise ValueError(f"Unrecognized date: {value!r}")
+        value = dt.date()
+    elif isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class DateIndex:
+    """
+    Sorted published-day index over a JSON array dataset
+
+    Stores one (day ordinal, byte offset) pair per dated article in two
+    packed arrays, so the index costs 12 bytes per article on disk and in
+    memory. Offsets point at the start of the article's line in the file
+    written by JsonArrayWriter.
+
+    Features:
+    - range(start, end): offsets of articles in an inclusive date range
+    - count(start, end): number of articles in a range without reading them
+    - per_day(): {date: count} from run lengths of the sorted days
+    - coverage(): first/last day and the days with no articles
+    """
+
+    def __init__(self):
+        self.days = array('i')
+        self.offsets = array('q')
+        self.undated = 0
+        self._sorted = True
+
+    def add(self, day, offset):
+        """Record an article's published day (date or None) at a byte offset"""
+        if day is None:
+            self.undated += 1
+            return
+        ordinal = _as_day(day)
+        if self.days and ordinal < self.days[-1]:
+            self._sorted = False
+        self.days.append(ordinal)
+        self.offsets.append(offset)
+
+    def _sort(self):
+        if self._sorted:
+            return
+        pairs = sorted(zip(self.days, self.offsets))
+        self.days = array('i', (d for d, _ in pairs))
+        self.offsets = array('q', (o for _, o in pairs))
+        self._sorted = True
+
+    def __len__(self):
+        return len(self.days)
+
+    def _bounds(self, start=None, end=None):
+        self._sort()
+        lo = bisect_left(self.days, _as_day(start)) if start is not None else 0
+        hi = bisect_right(self.days, _as_day(end)) if end is not None else len(self.days)
+        return lo, hi
+
+    def range(self, start=None, end=None):
+        """Byte offsets of articles published in [start, end], oldest first"""
+        lo, hi = self._bounds(start, end)
+        return self.offsets[lo:hi]
+
+    def count(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def first(self):
+        self._sort()
+        return date.fromordinal(self.days[0]) if self.days else None
+
+    def last(self):
+        self._sort()
+        return date.fromordinal(self.days[-1]) if self.days else None
+
+    def per_day(self, start=None, end=None):
+        """{date: article count} for each day with articles in the range"""
+        lo, hi = self._bounds(start, end)
+        counts = {}
+        i = lo
+        while i < hi:
+            day = self.days[i]
+            j = bisect_right(self.days, day, i, hi)
+            counts[date.fromordinal(day)] = j - i
+            i = j
+        return counts
+
+    def coverage(self, start=None, end=None):
+        """First/last day, days with articles and the missing days in between"""
+        counts = self.per_day(start, end)
+        if not counts:
+            return {'first': None, 'last': None, 'days_with_articles': 0, 'missing_days': []}
+        first = _as_day(start) if start is not None else min(counts).toordinal()
+        last = _as_day(end) if end is not None else max(counts).toordinal()
+        missing = [date.fromordinal(d) for d in range(first, last + 1)
+                   if date.fromordinal(d) not in counts]
+        return {
+            'first': date.fromordinal(first),
+            'last': date.fromordinal(last),
+            'days_with_articles': len(counts),
+            'missing_days': missing,
+        }
+
+    def read(self, data_file, start=None, end=None):
+        """Yield the articles in [start, end] from the indexed dataset file"""
+        from src.scraping.json_stream import read_record_at
+
+        offsets = sorted(self.range(start, end))  # File order keeps reads sequential
+        with open(data_file, 'rb') as f:
+            for offset in offsets:
+                yield read_record_at(f, offset)
+
+    def save(self, path):
+        """Write the index as count, undated, days, offsets"""
+        self._sort()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            array('q', [len(self.days), self.undated]).tofile(f)
+            self.days.tofile(f)
+            self.offsets.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with open(path, 'rb') as f:
+            header = array('q')
+            header.fromfile(f, 2)
+            count, index.undated = header
+            index.days.fromfile(f, count)
+            index.offsets.fromfile(f, count)
+        return index
+
+    @staticmethod
+    def path_for(data_file):
+        """Conventional index location next to a dataset file"""
+        data_file = Path(data_file)
+        return data_file.with_name(data_file.stem + '.dates.idx')
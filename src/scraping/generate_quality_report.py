@@ -14,6 +14,7 @@ Features:
 Usage:
     python scripts/generate_quality_report.py
     python scripts/generate_quality_report.py --input data/raw/news/sample.json
+    python scripts/generate_quality_report.py --workers 8
 """
 
 import json
@@ -23,35 +24,46 @@ from datetime import datetime
 from collections import Counter, defaultdict
 import argparse
 
-# Add src to path
+# Add src and project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.scraping.raw_loader import iter_load
+from src.scraping.article_record import Article
+from src.scraping.dates import article_day, display_date, parse_date
 
 
 class QualityReporter:
     """Generate data quality reports"""
     
-    def __init__(self, data_dir="data/raw/news"):
+    # Only these fields are analyzed, so bodies never leave the loader processes
+    FIELDS = [
+        'body_length', 'word_count', 'extraction_method', 'publisher',
+        'scraped_date', 'published_date', 'published_iso', 'published_ts',
+        'topic', 'authors',
+    ]
+    
+    def __init__(self, data_dir="data/raw/news", workers=None):
         self.data_dir = Path(data_dir)
+        self.workers = workers
         self.articles = []
         
     def load_data(self, file_pattern="*.json"):
         """Load all JSON files"""
         print(f"\n📂 Loading data from: {self.data_dir}")
         
-        files = list(self.data_dir.glob(file_pattern))
+        if self.data_dir.is_file():
+            files = [self.data_dir]
+        else:
+            files = sorted(self.data_dir.glob(file_pattern))
         print(f"   Found {len(files)} JSON files")
         
-        for file in files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        self.articles.extend(data)
-                    else:
-                        self.articles.append(data)
-                print(f"   ✅ Loaded: {file.name} ({len(data) if isinstance(data, list) else 1} articles)")
-            except Exception as e:
-                print(f"   ❌ Error loading {file.name}: {e}")
+        for file, articles, error in iter_load(files, workers=self.workers, fields=self.FIELDS):
+            self.articles.extend(Article.from_dict(a) for a in articles if isinstance(a, dict))
+            if error:
+                print(f"   ❌ Error loading {file.name}: {error} (file skipped)")
+            else:
+                print(f"   ✅ Loaded: {file.name} ({len(articles)} articles)")
         
         print(f"\n📊 Total articles loaded: {len(self.articles)}\n")
         return len(self.articles)
@@ -120,13 +132,17 @@ class QualityReporter:
     
     def _analyze_dates(self):
         """Analyze date coverage"""
-        scraped_dates = [a.get('scraped_date', '') for a in self.articles if a.get('scraped_date')]
-        published_dates = [a.get('published_date', '') for a in self.articles if a.get('published_date')]
+        # Compare real dates; DD/MM/YYYY strings would order by day of month
+        scraped_dates = [parse_date(a.get('scraped_date')) for a in self.articles if a.get('scraped_date')]
+        scraped_dates = [d.date() for d in scraped_dates if d]
+        published_dates = [d for d in map(article_day, self.articles) if d]
         
         return {
-            'earliest_scraped': min(scraped_dates) if scraped_dates else 'N/A',
-            'latest_scraped': max(scraped_dates) if scraped_dates else 'N/A',
+            'earliest_scraped': display_date(min(scraped_dates)) if scraped_dates else 'N/A',
+            'latest_scraped': display_date(max(scraped_dates)) if scraped_dates else 'N/A',
             'total_scraped_dates': len(set(scraped_dates)),
+            'earliest_published': display_date(min(published_dates)) if published_dates else 'N/A',
+            'latest_published': display_date(max(published_dates)) if published_dates else 'N/A',
             'articles_with_publish_date': len(published_dates),
             'publish_date_coverage': len(published_dates) / len(self.articles) * 100 if self.articles else 0,
         }
@@ -209,6 +225,7 @@ class QualityReporter:
         dates = report['dates']
         print(f"  Scraped Date Range: {dates['earliest_scraped']} to {dates['latest_scraped']}")
         print(f"  Total Scraped Dates: {dates['total_scraped_dates']}")
+        print(f"  Published Date Range: {dates['earliest_published']} to {dates['latest_published']}")
         print(f"  Publish Date Coverage: {dates['publish_date_coverage']:.1f}%")
         
         # Topics
@@ -268,11 +285,12 @@ def main():
     parser = argparse.ArgumentParser(description='Generate data quality report')
     parser.add_argument('--input', default='data/raw/news', help='Input directory or file')
     parser.add_argument('--output', default='outputs/reports/data_quality_report.json', help='Output JSON file')
+    parser.add_argument('--workers', type=int, default=None, help='Processes used to decode files (default: CPU count)')
     
     args = parser.parse_args()
     
     # Generate report
-    reporter = QualityReporter(data_dir=args.input)
+    reporter = QualityReporter(data_dir=args.input, workers=args.workers)
     
     if reporter.load_data() > 0:
         report = reporter.analyze()
@@ -427,15 +427,18 @@ class InteractiveScraper:
             
             if json_files:
                 total_articles = 0
+                known = self._manifest_counts()
                 print("Files:")
-                for f in sorted(json_files)[:20]:  # Show first 20
-                    try:
-                        with open(f, 'r') as file:
-                            articles = json.load(file)
-                            total_articles += len(articles)
-                            print(f"  ✅ {f.name}: {len(articles)} articles")
-                    except:
+                for i, f in enumerate(sorted(json_files)):
+                    count = self._count_articles(f, known)
+                    if count is not None:
+                        total_articles += count
+                    if i >= 20:  # Show first 20
+                        continue
+                    if count is None:
                         print(f"  ❌ {f.name}: Error reading")
+                    else:
+                        print(f"  ✅ {f.name}: {count} articles")
                 
                 if len(json_files) > 20:
                     print(f"  ... and {len(json_files) - 20} more files")
@@ -443,20 +446,46 @@ class InteractiveScraper:
                 print()
                 print(f"📊 Total Articles: {total_articles:,}")
         
-        # Check merged dataset
+        # Check merged dataset (article store or date index, no full load)
         merged_file = self.project_root / "data" / "datasets" / "complete_dataset.json"
-        if merged_file.exists():
+        store_file = self.project_root / "data" / "datasets" / "articles.db"
+        if merged_file.exists() or store_file.exists():
             try:
-                with open(merged_file, 'r') as f:
-                    merged = json.load(f)
-                print(f"\n✅ Merged Dataset: {len(merged):,} articles")
-                print(f"   Location: {merged_file}")
-            except:
+                from src.processing.article_query import ArticleQuery
+                query = ArticleQuery()
+                print(f"\n✅ Merged Dataset: {query.count():,} articles")
+                print(f"   Location: {query.source}")
+                if query.store:
+                    print(f"   Summarized: {query.count(summarized=True):,}")
+                query.close()
+            except Exception:
                 pass
         
         print()
         input("Press Enter to continue...")
     
+    def _manifest_counts(self):
+        """Per-file article counts recorded by the last merge, keyed by absolute path"""
+        manifest_file = self.project_root / "data" / "datasets" / "merge_manifest.json"
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            return {}
+        return {str((self.project_root / path).resolve()): entry for path, entry in files.items()}
+    
+    def _count_articles(self, path, known):
+        """Article count for a raw file: from the manifest if unchanged, else by streaming it"""
+        entry = known.get(str(path.resolve()))
+        stat = path.stat()
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime:
+            return entry.get('articles', 0)
+        try:
+            from src.scraping.json_stream import iter_json_records
+            return sum(1 for _ in iter_json_records(path))
+        except Exception:
+            return None
+    
     def advanced_menu(self):
         """Advanced options"""
         self.print_header()
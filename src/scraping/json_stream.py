@@ -0,0 +1,211 @@
+"""
+Streaming JSON Helpers
+======================
+Read and write large article files without holding them in memory.
+
+- iter_json_records: yields articles one by one from a JSON array file
+  (what DataManager writes), a JSONL file, or a single JSON object
+- JsonArrayWriter: writes a valid JSON array one article per line and
+  only replaces the target file once the array is complete, or appends
+  to an existing array in place
+- read_record_at: reads the record starting at a byte offset returned by
+  JsonArrayWriter.write (used by the date index)
+"""
+
+import json
+import os
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 16  # 64 KB
+
+
+def iter_json_records(path, chunk_size=CHUNK_SIZE):
+    """Yield records from a JSON array, JSONL or single-object file
+
+    Arrays are decoded incrementally with JSONDecoder.raw_decode, so memory
+    stays proportional to the largest article rather than the file.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        eof = not buf
+        pos = _skip_ws(buf, 0)
+
+        # Find the first significant character
+        while pos >= len(buf) and not eof:
+            more = f.read(chunk_size)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            pos = _skip_ws(buf, pos)
+
+        if pos >= len(buf):
+            return  # Empty file
+
+        in_array = buf[pos] == '['
+        if in_array:
+            pos += 1
+
+        while True:
+            # Skip whitespace and separators between records
+            while True:
+                pos = _skip_ws(buf, pos)
+                if pos < len(buf) and in_array and buf[pos] == ',':
+                    pos += 1
+                    continue
+                if pos < len(buf) or eof:
+                    break
+                more = f.read(chunk_size)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+
+            if pos >= len(buf):
+                if in_array:
+                    raise ValueError(f"Unterminated JSON array in {Path(path).name}")
+                return
+            if in_array and buf[pos] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Record spans the chunk boundary: read more and retry
+                more = f.read(max(chunk_size, len(buf)))
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+
+            yield record
+            pos = end
+
+            # Drop consumed text so the buffer does not grow with the file
+            if pos > chunk_size:
+                buf, pos = buf[pos:], 0
+
+
+def _skip_ws(buf, pos):
+    length = len(buf)
+    while pos < length and buf[pos] in ' \t\r\n':
+        pos += 1
+    return pos
+
+
+def _encode(obj):
+    """JSON fallback for record objects (e.g. article_record.Article)"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def read_record_at(f, offset):
+    """Decode the one-line record at `offset` in a binary file written by JsonArrayWriter"""
+    f.seek(offset)
+    line = f.readline().rstrip()
+    if line.endswith(b','):
+        line = line[:-1]
+    return json.loads(line)
+
+
+class JsonArrayWriter:
+    """Incrementally write a JSON array, one compact record per line
+
+    Output goes to '<name>.tmp' and is moved over the target on close(),
+    so readers never see a half-written dataset.
+
+    With append=True the records are added to the end of the existing
+    array in place instead; abort() truncates back to the original file.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.append = append
+        self.count = 0
+
+        if append:
+            self.tmp_path = None
+            self.file = open(self.path, 'r+b')
+            try:
+                self.tail_pos, self.has_records = self._find_closing_bracket(self.file)
+            except ValueError:
+                self.file.close()
+                raise
+            self.file.seek(self.tail_pos)
+            self.original_tail = self.file.read()
+            self.file.seek(self.tail_pos)
+            self.file.truncate()
+        else:
+            self.tmp_path = self.path.with_name(self.path.name + '.tmp')
+            self.file = open(self.tmp_path, 'wb')
+            self.file.write(b'[')
+            self.has_records = False
+
+    @staticmethod
+    def _find_closing_bracket(f):
+        """Return (offset just past the last record, whether the array is non-empty)
+
+        Scans backwards past the closing ']' and any whitespace before it.
+        """
+        end = f.seek(0, os.SEEK_END)
+        closing = None
+
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            stripped = f.read(end - start).rstrip()
+            end = start
+            if not stripped:
+                continue
+            if closing is None:
+                if not stripped.endswith(b']'):
+                    raise ValueError("Existing file does not end with a JSON array")
+                closing = start + len(stripped) - 1
+                stripped = stripped[:-1].rstrip()
+                end = start + len(stripped)
+                if not stripped:
+                    continue
+            return start + len(stripped), not stripped.endswith(b'[')
+
+        raise ValueError("Existing file is not a JSON array")
+
+    def write(self, record):
+        """Append a record; returns its byte offset in the final file"""
+        self.file.write(b',\n' if (self.count or self.has_records) else b'\n')
+        offset = self.file.tell()
+        self.file.write(json.dumps(record, ensure_ascii=False, default=_encode).encode('utf-8'))
+        self.count += 1
+        return offset
+
+    def close(self):
+        """Finish the array and atomically replace (or extend) the target file"""
+        if self.file.closed:
+            return
+        self.file.write(b'\n]\n' if (self.count or self.has_records) else b']\n')
+        self.file.close()
+        if not self.append:
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discard everything written so far"""
+        if self.append:
+            if self.file.closed:
+                return
+            self.file.seek(self.tail_pos)
+            self.file.truncate()
+            self.file.write(self.original_tail)
+            self.file.close()
+            return
+        if not self.file.closed:
+            self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
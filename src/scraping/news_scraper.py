@@ -10,25 +10,31 @@ Features:
 - Smart caching (no duplicates)
 - Content quality validation
 - Automatic retry on failures
+- Failure taxonomy with TTL-based retry scheduling (--retry-failed)
 - Clean text extraction
-- Simple DD/MM/YYYY date format
+- Simple DD/MM/YYYY date format, plus ISO/epoch fields for sorting
+- Optional SQLite article store (--store)
 - Parallel processing support
 
 Usage:
     python scraper.py --start 2024-01-01 --end 2024-12-31
     python scraper.py --start 2024-01-01 --end 2024-12-31 --max-articles 50
     python scraper.py --topic "Reliance Industries stock"
+    python scraper.py --retry-failed
+    python scraper.py --store
 """
 
 import json
+import os
 import time
 import argparse
 import hashlib
 import re
 import sys
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 
 # Get project root (2 levels up from this file)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -50,6 +56,10 @@ from newspaper import Article
 import nltk
 from tqdm import tqdm  # Progress bars
 
+from src.scraping.dates import published_fields
+from src.scraping.json_stream import JsonArrayWriter
+from src.scraping.article_record import Article as ArticleRecord
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -61,6 +71,7 @@ class Config:
     OUTPUT_DIR = PROJECT_ROOT / "data" / "raw" / "news"
     CACHE_DIR = PROJECT_ROOT / "cache"
     LOG_DIR = PROJECT_ROOT / "logs"
+    ARTICLE_STORE = None  # SQLite article store path; set by --store
     
     # Search topics
     SEARCH_TOPICS = [
@@ -78,6 +89,11 @@ class Config:
     
     # Scraping settings
     PAGE_TIMEOUT = 10
+    PAGE_LOAD_STRATEGY = 'normal'  # Selenium fetch mode: 'normal', 'eager' or 'none'
+    PAGE_LOAD_STRATEGIES = ['normal', 'eager', 'none']
+    POST_LOAD_DELAY = 2  # Seconds to let late scripts render the article
+    ARTICLE_DELAY = 1  # Politeness delay between articles
+    CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '')  # Skip the driver download when set
     MIN_BODY_LENGTH = 100
     MAX_BODY_LENGTH = 50000
     RETRY_ATTEMPTS = 3
@@ -91,6 +107,41 @@ class Config:
     
     SPAM_DOMAINS = ['ads.', 'tracker.', 'analytics.', 'popup.']
     BLACKLIST = []
+    
+    # Selenium does not expose the HTTP status, so server error pages are
+    # recognized by their title, or by these phrases in a short body
+    ERROR_PAGE_MARKERS = [
+        'service unavailable', 'temporarily unavailable', 'bad gateway', 'gateway timeout',
+        'internal server error', 'too many requests', 'rate limited', 'access denied',
+        'attention required', 'just a moment', 'under maintenance',
+    ]
+    ERROR_PAGE_STATUS = re.compile(r'\b(403|429|500|502|503|504)\b')
+    ERROR_PAGE_MAX_LENGTH = 1000  # Longer bodies are articles, whatever they mention
+    
+    # Failure taxonomy: (category, substrings matched against the reason).
+    # First match wins, so keep the specific rules above the generic ones.
+    FAILURE_RULES = [
+        ('invalid_url', ['spam domain', 'blacklisted']),
+        ('http_error', ['http error page']),
+        ('content', ['too short', 'too long', 'not enough words', 'excessive repetition']),
+        ('empty_body', ['empty body']),
+        ('timeout', ['timeout', 'timed out']),
+        ('network', ['connection', 'err_name_not_resolved', 'err_internet_disconnected', 'max retries']),
+        ('driver', ['webdriver', 'session', 'chrome not reachable', 'stacktrace']),
+    ]
+    PERMANENT_FAILURES = ['invalid_url', 'content']
+    
+    # Hours before a transient failure may be retried (doubles per attempt)
+    FAILURE_TTL_HOURS = {
+        'timeout': 6,
+        'http_error': 2,
+        'network': 12,
+        'driver': 1,
+        'empty_body': 72,
+        'unknown': 24,
+    }
+    MAX_FAILURE_ATTEMPTS = 5
+    FAILURE_TIME_FORMAT = '%d/%m/%Y %H:%M'
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -98,17 +149,15 @@ class Config:
 
 def simple_date(date_string):
     """Convert any date format to DD/MM/YYYY"""
-    if not date_string:
-        return ""
-    try:
-        dt = parsedate_to_datetime(date_string)
-        return dt.strftime('%d/%m/%Y')
-    except:
-        try:
-            dt = datetime.fromisoformat(date_string.replace('Z', '+00:00'))
-            return dt.strftime('%d/%m/%Y')
-        except:
-            return ""
+    return published_fields(date_string)['published_date']
+
+def classify_failure(reason):
+    """Map a free-text failure reason to (category, permanent)"""
+    reason_lower = (reason or '').lower()
+    for category, patterns in Config.FAILURE_RULES:
+        if any(pattern in reason_lower for pattern in patterns):
+            return category, category in Config.PERMANENT_FAILURES
+    return 'unknown', False
 
 def setup_logging(log_file=None):
     """Setup logging"""
@@ -167,19 +216,105 @@ class Cache:
     
     def mark_scraped(self, url):
         """Mark URL as scraped"""
-        self.scraped.add(self._hash(url))
+        h = self._hash(url)
+        self.scraped.add(h)
+        self.failed.pop(h, None)  # Recovered by a retry
         self.save()
     
-    def mark_failed(self, url, reason=""):
-        """Mark URL as failed"""
+    def mark_failed(self, url, reason="", **context):
+        """Mark URL as failed, classifying the reason and scheduling a retry
+        
+        `context` is discovery metadata (title, publisher, topic...) kept
+        with the entry so --retry-failed can save the article later.
+        """
         h = self._hash(url)
-        self.failed[h] = {
+        entry = dict(self.failed.get(h, {}))  # Keep context from earlier attempts
+        now = datetime.now()
+        
+        category, permanent = classify_failure(reason)
+        attempts = self._failure_info(entry)[2] + 1 if entry else 1
+        if attempts >= Config.MAX_FAILURE_ATTEMPTS:
+            permanent = True
+        
+        entry.update({
             'url': url,
             'reason': reason,
-            'time': datetime.now().strftime('%d/%m/%Y %H:%M')
-        }
+            'time': now.strftime(Config.FAILURE_TIME_FORMAT),
+            'category': category,
+            'permanent': permanent,
+            'attempts': attempts,
+            'retry_after': '' if permanent else self._retry_time(now, category, attempts),
+        })
+        entry.update({k: v for k, v in context.items() if v})
+        self.failed[h] = entry
         self.save()
     
+    def retry_candidates(self, now=None):
+        """Transient failures whose TTL has expired, grouped by domain"""
+        now = now or datetime.now()
+        batches = defaultdict(list)
+        
+        for h, entry in self.failed.items():
+            category, permanent, attempts, retry_after = self._failure_info(entry)
+            if permanent or retry_after > now:
+                continue
+            domain = entry.get('domain') or urlparse(entry.get('url', '')).netloc
+            batches[domain].append(dict(entry, hash=h, category=category, attempts=attempts))
+        
+        # Largest domains first so a run cut short still recovers the most
+        return dict(sorted(batches.items(), key=lambda kv: -len(kv[1])))
+    
+    def failure_summary(self):
+        """Count failures per category, split into permanent/pending/eligible"""
+        now = datetime.now()
+        summary = defaultdict(lambda: {'permanent': 0, 'pending': 0, 'eligible': 0})
+        for entry in self.failed.values():
+            category, permanent, _, retry_after = self._failure_info(entry)
+            if permanent:
+                summary[category]['permanent'] += 1
+            elif retry_after > now:
+                summary[category]['pending'] += 1
+            else:
+                summary[category]['eligible'] += 1
+        return dict(summary)
+    
+    @staticmethod
+    def _failure_info(entry):
+        """Return (category, permanent, attempts, retry_after) for any entry.
+        
+        Entries written before the taxonomy existed only have 'reason' and
+        'time', so they are classified on the fly.
+        """
+        if 'category' in entry:
+            category = entry['category']
+            permanent = entry.get('permanent', False)
+            attempts = entry.get('attempts', 1)
+        else:
+            category, permanent = classify_failure(entry.get('reason', ''))
+            attempts = 1
+        
+        if permanent:
+            return category, True, attempts, datetime.max
+        
+        try:
+            retry_after = datetime.strptime(entry['retry_after'], Config.FAILURE_TIME_FORMAT)
+        except (KeyError, ValueError):
+            try:
+                failed_at = datetime.strptime(entry.get('time', ''), Config.FAILURE_TIME_FORMAT)
+                retry_after = datetime.strptime(
+                    Cache._retry_time(failed_at, category, attempts), Config.FAILURE_TIME_FORMAT
+                )
+            except ValueError:
+                retry_after = datetime.min
+        
+        return category, False, attempts, retry_after
+    
+    @staticmethod
+    def _retry_time(failed_at, category, attempts):
+        """Exponential backoff from the category TTL"""
+        hours = Config.FAILURE_TTL_HOURS.get(category, Config.FAILURE_TTL_HOURS['unknown'])
+        return (failed_at + timedelta(hours=hours * 2 ** (attempts - 1))).strftime(Config.FAILURE_TIME_FORMAT)
+    
     @staticmethod
     def _hash(url):
         """Get URL hash"""
@@ -212,6 +347,18 @@ class Validator:
                 return True, f"Clickbait: {word}"
         return False, "OK"
     
+    @staticmethod
+    def check_error_page(title, body):
+        """Detect a server error page (503, 429, CDN challenge...) served instead of the article"""
+        title_lower = (title or '').lower()
+        body_lower = (body or '').lower() if len(body or '') <= Config.ERROR_PAGE_MAX_LENGTH else ''
+        for text in (title_lower, body_lower):
+            for marker in Config.ERROR_PAGE_MARKERS:
+                if marker in text:
+                    status = Config.ERROR_PAGE_STATUS.search(text)
+                    return True, f"HTTP error page: {status.group(1) + ' ' if status else ''}{marker}"
+        return False, "OK"
+    
     @staticmethod
     def check_body(body):
         """Validate body content"""
@@ -267,10 +414,11 @@ class Validator:
 class NewsScraper:
     """Main scraper class"""
     
-    def __init__(self, headless=True, logger=None):
+    def __init__(self, headless=True, logger=None, page_load_strategy=None):
         self.logger = logger or logging.getLogger(__name__)
         self.cache = Cache()
         self.validator = Validator()
+        self.page_load_strategy = page_load_strategy or Config.PAGE_LOAD_STRATEGY
         self.driver = self._setup_driver(headless)
         self.stats = {
             'total': 0,
@@ -279,10 +427,12 @@ class NewsScraper:
             'cached': 0,
             'invalid': 0
         }
+        self.timings = defaultdict(list)  # Per-stage latencies in seconds
     
     def _setup_driver(self, headless):
         """Setup Chrome WebDriver"""
         options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
         
         if headless:
             options.add_argument('--headless')
@@ -297,8 +447,9 @@ class NewsScraper:
         options.add_experimental_option('useAutomationExtension', False)
         
         try:
+            driver_path = Config.CHROMEDRIVER_PATH or ChromeDriverManager().install()
             driver = webdriver.Chrome(
-                service=ChromeService(ChromeDriverManager().install()),
+                service=ChromeService(driver_path),
                 options=options
             )
             driver.set_page_load_timeout(Config.PAGE_TIMEOUT)
@@ -308,8 +459,12 @@ class NewsScraper:
             self.logger.error(f"❌ WebDriver error: {e}")
             raise
     
-    def scrape(self, url, title="", retry=0):
-        """Scrape a single article with enhanced metadata extraction"""
+    def scrape(self, url, title="", retry=0, context=None):
+        """Scrape a single article with enhanced metadata extraction
+        
+        `context` (discovery metadata) is stored with the URL if it fails.
+        """
+        context = context or {}
         
         # Check cache
         if self.cache.is_scraped(url):
@@ -321,7 +476,7 @@ class NewsScraper:
         valid, reason = self.validator.check_url(url)
         if not valid:
             self.logger.warning(f"❌ Invalid URL: {reason}")
-            self.cache.mark_failed(url, reason)
+            self.cache.mark_failed(url, reason, **context)
             self.stats['invalid'] += 1
             return None
         
@@ -335,16 +490,19 @@ class NewsScraper:
             self.logger.info(f"🔍 Scraping: {url}")
             
             # Load page
+            started = time.perf_counter()
             try:
                 self.driver.get(url)
                 WebDriverWait(self.driver, Config.PAGE_TIMEOUT).until(
                     EC.presence_of_element_located((By.TAG_NAME, "body"))
                 )
-                time.sleep(2)
+                time.sleep(Config.POST_LOAD_DELAY)
             except TimeoutException:
                 raise Exception("Page timeout")
+            self.timings['load'].append(time.perf_counter() - started)
             
             # Parse page
+            started = time.perf_counter()
             soup = BeautifulSoup(self.driver.page_source, 'html.parser')
             
             # Extract with newspaper3k (enhanced metadata)
@@ -356,28 +514,32 @@ class NewsScraper:
             # Extract body
             body = self._get_body(soup)
             body = self.validator.clean_text(body)
+            self.timings['extract'].append(time.perf_counter() - started)
             
-            # Validate body
-            valid, reason = self.validator.check_body(body)
+            # Validate body (an error page is transient, not bad content)
+            started = time.perf_counter()
+            is_error, reason = self.validator.check_error_page(soup.title.get_text() if soup.title else '', body)
+            valid, reason = (False, reason) if is_error else self.validator.check_body(body)
+            self.timings['validate'].append(time.perf_counter() - started)
             if not valid:
                 self.logger.warning(f"⚠️  {reason}")
-                self.cache.mark_failed(url, reason)
+                self.cache.mark_failed(url, reason, **context)
                 self.stats['failed'] += 1
                 return None
             
             # Create enhanced article data
-            article = {
-                'title': scraped_title,
-                'body': body,
-                'url': self.driver.current_url,
-                'original_url': url,
-                'scraped_date': datetime.now().strftime('%d/%m/%Y'),
-                'published_date': article_meta.get('published_date', ''),
-                'authors': article_meta.get('authors', []),
-                'body_length': len(body),
-                'word_count': len(body.split()),
-                'extraction_method': article_meta.get('method', 'beautifulsoup')
-            }
+            article = ArticleRecord(
+                title=scraped_title,
+                body=body,
+                url=self.driver.current_url,
+                original_url=url,
+                scraped_date=datetime.now().strftime('%d/%m/%Y'),
+                published_date=article_meta.get('published_date', ''),
+                authors=article_meta.get('authors', []),
+                body_length=len(body),
+                word_count=len(body.split()),
+                extraction_method=article_meta.get('method', 'beautifulsoup')
+            )
             
             self.cache.mark_scraped(url)
             self.stats['success'] += 1
@@ -393,9 +555,9 @@ class NewsScraper:
             if retry < Config.RETRY_ATTEMPTS:
                 self.logger.info(f"🔄 Retry ({retry + 1}/{Config.RETRY_ATTEMPTS})")
                 time.sleep(Config.RETRY_DELAY)
-                return self.scrape(url, title, retry + 1)
+                return self.scrape(url, title, retry + 1, context)
             else:
-                self.cache.mark_failed(url, error)
+                self.cache.mark_failed(url, error, **context)
                 self.stats['failed'] += 1
                 return None
     
@@ -541,26 +703,62 @@ class NewsScraper:
 # ============================================================================
 
 class DataManager:
-    """Manages saving data"""
+    """Manages saving data
     
-    def __init__(self):
+    Articles are appended to the raw JSON file in place (one per line) and,
+    if an article store is configured, inserted into it as well.
+    """
+    
+    def __init__(self, store=None):
         self.dir = Config.OUTPUT_DIR
         self.dir.mkdir(parents=True, exist_ok=True)  # Create parent directories too!
+        
+        store = store or Config.ARTICLE_STORE
+        if store and not hasattr(store, 'add'):
+            from src.processing.article_store import ArticleStore
+            store = ArticleStore(store)
+        self.store = store
     
     def save(self, article, filename):
-        """Save article to JSON file"""
+        """Save article to JSON file (and the article store)"""
         filepath = self.dir / filename
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except:
-            data = []
+            writer = JsonArrayWriter(filepath, append=filepath.exists())
+        except ValueError:
+            # Not a JSON array (e.g. hand-edited): rewrite it the slow way
+            data = self._load_existing(filepath)
+            writer = JsonArrayWriter(filepath)
+            for existing in data:
+                writer.write(existing)
         
-        data.append(article)
+        with writer:
+            writer.write(article)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if self.store is not None:
+            self.store.add(article)
+    
+    @staticmethod
+    def _load_existing(filepath):
+        """Articles of an existing file that is not a plain JSON array
+
+        An empty file counts as no articles. A file that cannot be parsed
+        (e.g. truncated by a crash) is moved aside to '<name>.corrupt-<time>'
+        so a fresh array can be started without losing it.
+        """
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                text = f.read()
+            if not text.strip():
+                return []
+            data = json.loads(text)
+        except ValueError as e:
+            aside = filepath.with_name(f"{filepath.name}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            os.replace(filepath, aside)
+            logging.getLogger(__name__).warning(
+                f"⚠️  {filepath.name} is not valid JSON ({e}); moved to {aside.name}, starting a new file")
+            return []
+        return data if isinstance(data, list) else [data]
     
     def get_filename(self, start, end, topic=""):
         """Generate filename"""
@@ -572,19 +770,38 @@ class DataManager:
         if topic_slug:
             return f"{topic_slug}_{date_range}.json"
         return f"news_{date_range}.json"
+    
+    def get_retry_filename(self):
+        """Filename for articles recovered by --retry-failed"""
+        return f"retried_{datetime.now().strftime('%Y%m%d')}.json"
 
 # ============================================================================
 # MAIN SCRAPING FUNCTION
 # ============================================================================
 
-def run_scraper(start_date, end_date, topics=None, headless=True, max_articles=None):
-    """Main scraping function"""
+def gnews_discovery(topic, start_date, end_date):
+    """Default discovery source: GNews search results for a topic"""
+    # Increased from 10 to 25 for better coverage
+    gnews = GNews(language='en', country='IN', max_results=25)
+    gnews.start_date = start_date
+    gnews.end_date = end_date
+    return gnews.get_news(topic)
+
+def run_scraper(start_date, end_date, topics=None, headless=True, max_articles=None,
+                discovery=None, page_load_strategy=None):
+    """Main scraping function
+    
+    `discovery(topic, start_date, end_date)` returns GNews-style items and
+    defaults to GNews; benchmarks pass a stub. Returns the scraper so callers
+    can read its stats and per-stage timings.
+    """
     
     logger = setup_logging()
     logger.info(f"🚀 Starting scraper: {start_date} to {end_date}")
     
     topics = topics or Config.SEARCH_TOPICS
-    scraper = NewsScraper(headless=headless, logger=logger)
+    discovery = discovery or gnews_discovery
+    scraper = NewsScraper(headless=headless, logger=logger, page_load_strategy=page_load_strategy)
     data_mgr = DataManager()
     
     try:
@@ -593,13 +810,11 @@ def run_scraper(start_date, end_date, topics=None, headless=True, max_articles=N
             logger.info(f"📰 Topic: {topic}")
             logger.info(f"{'='*60}")
             
-            # Get news (increased from 10 to 25 for better coverage)
-            gnews = GNews(language='en', country='IN', max_results=25)
-            gnews.start_date = start_date
-            gnews.end_date = end_date
-            
+            # Get news
+            started = time.perf_counter()
             try:
-                items = gnews.get_news(topic)
+                items = discovery(topic, start_date, end_date)
+                scraper.timings['discovery'].append(time.perf_counter() - started)
                 logger.info(f"Found {len(items)} articles")
             except Exception as e:
                 logger.error(f"Error fetching news: {e}")
@@ -621,18 +836,29 @@ def run_scraper(start_date, end_date, topics=None, headless=True, max_articles=N
                 
                 scraper.stats['total'] += 1
                 
-                article = scraper.scrape(url, title)
+                # Remember where the URL came from so --retry-failed can save it later
+                publisher = item.get('publisher', {})
+                context = {
+                    'gnews_title': title,
+                    'published': item.get('published date', ''),
+                    'publisher': publisher.get('title', ''),
+                    'domain': urlparse(publisher.get('href', '')).netloc,
+                    'topic': topic,
+                }
+                article = scraper.scrape(url, title, context=context)
                 
                 if article:
                     # Add metadata
                     article['gnews_title'] = title
-                    article['published_date'] = simple_date(item.get('published date', ''))
-                    article['publisher'] = item.get('publisher', {}).get('title', '')
+                    article.update(published_fields(item.get('published date', '')))
+                    article['publisher'] = publisher.get('title', '')
                     article['topic'] = topic
                     
+                    started = time.perf_counter()
                     data_mgr.save(article, filename)
+                    scraper.timings['save'].append(time.perf_counter() - started)
                 
-                time.sleep(1)
+                time.sleep(Config.ARTICLE_DELAY)
         
         scraper.print_stats()
         logger.info(f"\n✅ Complete! Check '{Config.OUTPUT_DIR}' for results")
@@ -644,6 +870,73 @@ def run_scraper(start_date, end_date, topics=None, headless=True, max_articles=N
         logger.error(f"Fatal error: {e}", exc_info=True)
     finally:
         scraper.cleanup()
+    
+    return scraper
+
+def run_retry_failed(headless=True, max_articles=None, page_load_strategy=None):
+    """Re-attempt transient failures whose retry TTL has expired, one domain at a time"""
+    
+    logger = setup_logging()
+    
+    # Check the cache before paying for a WebDriver
+    cache = Cache()
+    batches = cache.retry_candidates()
+    summary = cache.failure_summary()
+    
+    logger.info("🔁 Failure summary:")
+    for category, counts in sorted(summary.items()):
+        logger.info(f"   {category}: {counts['eligible']} eligible, "
+                    f"{counts['pending']} pending, {counts['permanent']} permanent")
+    
+    total = sum(len(entries) for entries in batches.values())
+    if not total:
+        logger.info("✅ No failures are due for a retry")
+        return
+    
+    logger.info(f"🚀 Retrying {total} failed URLs across {len(batches)} domains")
+    
+    scraper = NewsScraper(headless=headless, logger=logger, page_load_strategy=page_load_strategy)
+    data_mgr = DataManager()
+    filename = data_mgr.get_retry_filename()
+    remaining = max_articles
+    
+    try:
+        for domain, entries in batches.items():
+            if remaining is not None and remaining <= 0:
+                break
+            if remaining is not None:
+                entries = entries[:remaining]
+                remaining -= len(entries)
+            
+            logger.info(f"\n{'='*60}")
+            logger.info(f"🌐 Domain: {domain or 'unknown'} ({len(entries)} URLs)")
+            logger.info(f"{'='*60}")
+            
+            for entry in tqdm(entries, desc=f"Retrying {domain[:30]}", unit="article"):
+                scraper.stats['total'] += 1
+                
+                article = scraper.scrape(entry['url'], entry.get('gnews_title', ''))
+                
+                if article:
+                    article['gnews_title'] = entry.get('gnews_title', '')
+                    article.update(published_fields(entry.get('published', '')))
+                    article['publisher'] = entry.get('publisher', '')
+                    article['topic'] = entry.get('topic', '')
+                    
+                    data_mgr.save(article, filename)
+                
+                time.sleep(Config.ARTICLE_DELAY)
+        
+        scraper.print_stats()
+        logger.info(f"\n✅ Retry complete! Recovered articles are in '{Config.OUTPUT_DIR / filename}'")
+        
+    except KeyboardInterrupt:
+        logger.warning("\n⚠️  Interrupted by user")
+        scraper.print_stats()
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+    finally:
+        scraper.cleanup()
 
 # ============================================================================
 # COMMAND LINE INTERFACE
@@ -659,6 +952,7 @@ Examples:
   python scraper.py --start 2024-01-01 --end 2024-12-31 --max-articles 50
   python scraper.py --topic "Reliance stock"
   python scraper.py --start 2024-01-01 --end 2024-03-31 --no-headless
+  python scraper.py --retry-failed
         """
     )
     
@@ -667,9 +961,26 @@ Examples:
     parser.add_argument('--topic', help='Single search topic')
     parser.add_argument('--max-articles', type=int, help='Max articles per topic')
     parser.add_argument('--no-headless', action='store_true', help='Show browser')
+    parser.add_argument('--page-load', choices=Config.PAGE_LOAD_STRATEGIES,
+                        help=f'Selenium page load strategy (default: {Config.PAGE_LOAD_STRATEGY})')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Only re-attempt transient failures whose retry TTL has expired')
+    parser.add_argument('--store', nargs='?', const='data/datasets/articles.db', default=None,
+                        help='Also insert articles into the SQLite article store (default: data/datasets/articles.db)')
     
     args = parser.parse_args()
     
+    if args.store:
+        Config.ARTICLE_STORE = PROJECT_ROOT / args.store
+    
+    if args.retry_failed:
+        run_retry_failed(
+            headless=not args.no_headless,
+            max_articles=args.max_articles,
+            page_load_strategy=args.page_load
+        )
+        return
+    
     # Parse dates
     start = datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else Config.DEFAULT_START
     end = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else Config.DEFAULT_END
@@ -683,7 +994,8 @@ Examples:
         end_date=end,
         topics=topics,
         headless=not args.no_headless,
-        max_articles=args.max_articles
+        max_articles=args.max_articles,
+        page_load_strategy=args.page_load
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""
+Parallel Raw File Loader
+========================
+Decodes many scraped JSON/JSONL files across CPU cores.
+
+Used by 2_merge_data.py and generate_quality_report.py. Files are decoded
+in a process pool and handed back in input order. Workers never hold a
+whole file: they stream its records into a temporary spool of pickled
+chunks, and the consumer reads the spool back one chunk at a time, so
+memory stays bounded by the chunk size however large the files are.
+Callers can ask for only the fields they need, which keeps the spools
+small.
+
+A file that fails to decode partway is skipped whole (no partial
+articles), as the merge always did.
+
+Usage:
+    for path, articles, error in iter_load(files, workers=4):
+        print(len(articles))
+        for article in articles:    # Valid until the next file is requested
+            ...
+"""
+
+import os
+import pickle
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.scraping.json_stream import iter_json_records
+
+CHUNK_RECORDS = 500
+
+
+def default_workers():
+    """One worker per core"""
+    return os.cpu_count() or 1
+
+
+class SpooledRecords:
+    """Decoded records of one file, read back from its spool chunk by chunk"""
+
+    def __init__(self, spool=None, count=0):
+        self.spool = spool
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.spool is None:
+            return
+        with open(self.spool, 'rb') as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def discard(self):
+        """Remove the spool file"""
+        if self.spool is not None:
+            _remove(self.spool)
+            self.spool = None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def spool_file(path, fields=None, chunk_records=CHUNK_RECORDS, spool_dir=None):
+    """Decode one file into a temporary spool of pickled chunks
+
+    Returns:
+        (spool path, records, None), or (None, 0, error message) if the
+        file could not be decoded to the end; its spool is removed then
+    """
+    fd, spool = tempfile.mkstemp(prefix='raw-', suffix='.spool', dir=spool_dir)
+    count = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            chunk = []
+            for record in iter_json_records(path):
+                if fields is not None and isinstance(record, dict):
+                    record = {k: record[k] for k in fields if k in record}
+                chunk.append(record)
+                if len(chunk) >= chunk_records:
+                    pickle.dump(chunk, out, protocol=pickle.HIGHEST_PROTOCOL)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                pickle.dump(chunk, out, protocol=pickle.HIGHEST_PROTOCOL)
+                count += len(chunk)
+    except Exception as e:
+        _remove(spool)
+        return None, 0, str(e)
+    return spool, count, None
+
+
+def iter_load(files, workers=None, fields=None, prefetch=2, chunk_records=CHUNK_RECORDS, spool_dir=None):
+    """Yield (path, articles, error) for each file, in input order
+
+    `articles` is a SpooledRecords: it has a len() and can be iterated
+    until the next file is requested, after which its spool is removed.
+    Files that failed to decode come back empty with the error.
+
+    Args:
+        files: Paths to decode
+        workers: Processes to use (default: CPU count; 1 decodes in-process)
+        fields: Keep only these keys of each article (default: all)
+        prefetch: Files spooled per worker ahead of the consumer
+        chunk_records: Records per spooled chunk
+        spool_dir: Directory for the spools (default: the system temp dir)
+    """
+    workers = workers or default_workers()
+    files = list(files)
+    fields = list(fields) if fields is not None else None
+
+    if workers <= 1 or len(files) <= 1:
+        for path in files:
+            spool, count, error = spool_file(path, fields, chunk_records, spool_dir)
+            articles = SpooledRecords(spool, count)
+            try:
+                yield path, articles, error
+            finally:
+                articles.discard()
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+        pending = deque()
+        remaining = iter(files)
+
+        def submit_next():
+            path = next(remaining, None)
+            if path is not None:
+                pending.append((path, executor.submit(spool_file, path, fields, chunk_records, spool_dir)))
+
+        for _ in range(workers * prefetch):
+            submit_next()
+
+        try:
+            while pending:
+                path, future = pending.popleft()
+                submit_next()
+                try:
+                    spool, count, error = future.result()
+                except Exception as e:  # Worker crashed
+                    spool, count, error = None, 0, str(e)
+                articles = SpooledRecords(spool, count)
+                try:
+                    yield path, articles, error
+                finally:
+                    articles.discard()
+        finally:
+            # Consumer stopped early: drop the spools already written
+            for _, future in pending:
+                if not future.cancel():
+                    try:
+                        spool = future.result()[0]
+                    except Exception:
+                        continue
+                    if spool is not None:
+                        _remove(spool)
@@ -0,0 +1,173 @@
+"""
+Article Record Benchmark
+========================
+
+Compares today's plain-dict articles with the slotted Article record
+(src/scraping/article_record.py):
+
+- memory per article (tracemalloc, bodies included and excluded)
+- JSONL decode speed (json.loads vs json.loads + Article.from_dict)
+- JSON encode speed (json.dumps(dict) vs Article.to_json)
+
+Uses synthetic articles shaped like finbert_ready.json by default, or a
+real dataset with --input.
+
+Usage:
+    python tests/benchmark_article_record.py
+    python tests/benchmark_article_record.py --articles 200000
+    python tests/benchmark_article_record.py --input data/datasets/finbert_ready.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraping.article_record import Article
+from src.scraping.json_stream import iter_json_records
+
+PUBLISHERS = ['Mint', 'The Economic Times', 'Moneycontrol', 'Business Standard',
+              'NDTV Profit', 'The Hindu BusinessLine', 'Reuters', 'CNBCTV18']
+TOPICS = ['Nifty 50 stock market India', 'BSE Sensex India stock market',
+          'Indian stock market news', 'NSE India trading']
+WORDS = ('shares rose fell percent crore quarter profit revenue index points '
+         'investors market bank rate policy RBI inflation growth Nifty Sensex').split()
+
+
+def synthetic_lines(count, body_words, seed=42):
+    """JSON lines shaped like merged, FinBERT-tagged articles"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        words = rng.randint(body_words // 2, body_words * 2)
+        day, month = rng.randint(1, 28), rng.randint(1, 12)
+        article = {
+            'title': f"Sensex {rng.choice(['gains', 'slips'])} {rng.randint(10, 900)} points {i}",
+            'body': ' '.join(rng.choice(WORDS) for _ in range(words)),
+            'url': f"https://example.com/markets/{i}",
+            'original_url': f"https://news.google.com/rss/articles/{i}",
+            'scraped_date': f"{rng.randint(1, 28):02d}/10/2025",
+            'published_date': f"{day:02d}/{month:02d}/2024",
+            'published_iso': f"2024-{month:02d}-{day:02d}",
+            'published_ts': 1704067200 + i,
+            'authors': ['Staff Writer'],
+            'body_length': words * 6,
+            'word_count': words,
+            'extraction_method': 'newspaper3k',
+            'gnews_title': f"Sensex update {i}",
+            'publisher': rng.choice(PUBLISHERS),
+            'topic': rng.choice(TOPICS),
+            'processing': 'needs_summary' if words > 512 else 'ready',
+            'finbert_ready': words <= 512,
+        }
+        lines.append(json.dumps(article, ensure_ascii=False))
+    return lines
+
+
+def measure_memory(lines, build, drop_body=False):
+    """Bytes allocated per article while holding all decoded articles"""
+    gc.collect()
+    tracemalloc.start()
+    articles = []
+    for line in lines:
+        record = json.loads(line)
+        if drop_body:
+            record.pop('body', None)
+        articles.append(build(record))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del articles
+    return current / len(lines)
+
+
+def measure_speed(func, items, repeat):
+    """Best-of-N items per second"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    return len(items) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dict vs Article record benchmark')
+    parser.add_argument('--articles', type=int, default=50000, help='Synthetic articles (default: 50000)')
+    parser.add_argument('--body-words', type=int, default=400, help='Typical body length in words')
+    parser.add_argument('--input', help='Benchmark a real dataset instead of synthetic articles')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is kept)')
+    parser.add_argument('--output', default='outputs/benchmarks/article_record.json')
+    args = parser.parse_args()
+
+    if args.input:
+        lines = [json.dumps(a, ensure_ascii=False) for a in iter_json_records(args.input)]
+        source = args.input
+    else:
+        lines = synthetic_lines(args.articles, args.body_words)
+        source = f"synthetic ({args.articles} articles, ~{args.body_words} words)"
+
+    print("\n" + "="*70)
+    print("⏱️  ARTICLE RECORD BENCHMARK")
+    print("="*70)
+    print(f"Source: {source}")
+
+    identity = lambda record: record
+    memory = {
+        'dict_bytes': measure_memory(lines, identity),
+        'record_bytes': measure_memory(lines, Article.from_dict),
+        'dict_bytes_no_body': measure_memory(lines, identity, drop_body=True),
+        'record_bytes_no_body': measure_memory(lines, Article.from_dict, drop_body=True),
+    }
+
+    dicts = [json.loads(line) for line in lines]
+    records = [Article.from_dict(d) for d in dicts]
+    speed = {
+        'decode_dict_per_sec': measure_speed(json.loads, lines, args.repeat),
+        'decode_record_per_sec': measure_speed(Article.from_json, lines, args.repeat),
+        'encode_dict_per_sec': measure_speed(lambda d: json.dumps(d, ensure_ascii=False), dicts, args.repeat),
+        'encode_record_per_sec': measure_speed(Article.to_json, records, args.repeat),
+    }
+
+    print(f"\n🧠 Memory per article:")
+    print(f"   dict:   {memory['dict_bytes']:8.0f} B  ({memory['dict_bytes_no_body']:6.0f} B without body)")
+    print(f"   record: {memory['record_bytes']:8.0f} B  ({memory['record_bytes_no_body']:6.0f} B without body)")
+    saved = 1 - memory['record_bytes_no_body'] / memory['dict_bytes_no_body']
+    print(f"   Metadata overhead saved: {saved:.0%}")
+
+    print(f"\n⚡ Throughput (articles/sec):")
+    print(f"   decode dict:   {speed['decode_dict_per_sec']:12,.0f}")
+    print(f"   decode record: {speed['decode_record_per_sec']:12,.0f}")
+    print(f"   encode dict:   {speed['encode_dict_per_sec']:12,.0f}")
+    print(f"   encode record: {speed['encode_record_per_sec']:12,.0f}")
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': source,
+        'articles': len(lines),
+        'memory': {k: round(v, 1) for k, v in memory.items()},
+        'speed': {k: round(v, 1) for k, v in speed.items()},
+    }
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n💾 Results saved to: {output_path}")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
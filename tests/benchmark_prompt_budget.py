@@ -0,0 +1,200 @@
+"""
+Prompt Budget Benchmark
+=======================
+
+Compares three ways of fitting an article body into the summary prompt
+(src/processing/prompt_budget.py):
+
+- chars:      the old cut at max_input_tokens * 4 characters
+- truncate:   token-exact cut at max_input_tokens
+- extractive: boilerplate dropped, salient sentences ranked into the budget
+
+For each it reports body tokens per request, how many of the article's
+numeric facts survive (every number, percentage and amount in the full
+body is a fact) and the requests per minute one key's TPM budget allows.
+
+Uses synthetic market articles (facts spread through the body, filler
+commentary and newsletter boilerplate) by default, or a real dataset
+with --input.
+
+Usage:
+    python tests/benchmark_prompt_budget.py
+    python tests/benchmark_prompt_budget.py --max-input-tokens 800
+    python tests/benchmark_prompt_budget.py --input data/datasets/finbert_ready.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.prompt_budget import PromptBudget, TokenCounter
+from src.processing.rate_limiter import DEFAULT_TPM
+from src.scraping.json_stream import iter_json_records
+
+COMPANIES = ['Reliance Industries', 'TCS', 'Infosys', 'HDFC Bank', 'ICICI Bank', 'Tata Motors',
+             'Bajaj Finance', 'Larsen & Toubro', 'ITC', 'Adani Ports', 'Wipro', 'SBI']
+FACTS = [
+    "{c} shares rose {p}% to Rs {n} on the NSE after the results.",
+    "The Nifty 50 closed at {i} points, up {p} per cent, while the Sensex gained {m} points.",
+    "{c} reported a net profit of Rs {n} crore for the quarter, up {p}% from a year earlier.",
+    "Foreign institutional investors (FIIs) sold shares worth Rs {n} crore on Friday.",
+    "Revenue from operations climbed {p}% to Rs {n} crore, ahead of estimates.",
+    "The RBI kept the repo rate unchanged at 6.5% and retained its {p}% inflation forecast.",
+    "Bank Nifty slipped {p}% to {i}, dragged by {c}.",
+    "Brokerage Motilal Oswal raised its target price on {c} to Rs {n}.",
+]
+FILLER = [
+    "Analysts believe the coming weeks will test investor sentiment.",
+    "Market participants are watching global cues closely.",
+    "The management said it remains confident about the long-term outlook.",
+    "Experts suggested that investors should stay cautious and selective.",
+    "The broader mood on Dalal Street remained mixed through the session.",
+    "Several factors could influence the direction of the market going forward.",
+    "Industry watchers expect the trend to continue for some time.",
+]
+BOILERPLATE = [
+    "Also read: Top stocks to buy today according to experts.",
+    "Catch all the Business News, Market News and Breaking News Events on our website.",
+    "Download the app to get daily market updates.",
+    "Disclaimer: The views and recommendations above are those of individual analysts, not of the publication.",
+    "Subscribe to our newsletter for the latest market updates.",
+]
+FACT_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def synthetic_articles(count, facts, fillers, seed=42):
+    """Market articles with facts scattered through filler and boilerplate"""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        sentences = []
+        for _ in range(facts):
+            sentences.append(rng.choice(FACTS).format(
+                c=rng.choice(COMPANIES), p=f"{rng.uniform(0.1, 9.9):.1f}", n=f"{rng.randint(100, 99999):,}",
+                i=f"{rng.randint(18000, 26000):,}", m=rng.randint(50, 900)))
+        sentences += [rng.choice(FILLER) for _ in range(fillers)]
+        rng.shuffle(sentences)
+        sentences.insert(rng.randint(0, len(sentences)), rng.choice(BOILERPLATE))
+        sentences += rng.sample(BOILERPLATE, 2)
+        articles.append({
+            'title': f"{company} shares {rng.choice(['jump', 'slip'])} after Q{rng.randint(1, 4)} results {i}",
+            'body': ' '.join(sentences),
+            'url': f"https://example.com/markets/{i}",
+        })
+    return articles
+
+
+def facts_in(text):
+    return set(FACT_PATTERN.findall(text))
+
+
+def char_cut(article, max_tokens):
+    """The old _create_summary_prompt truncation"""
+    body = article.get('body', '')
+    max_chars = max_tokens * 4
+    return body[:max_chars] + "..." if len(body) > max_chars else body
+
+
+def run(name, fit, articles, counter, completion_tokens, prompt_overhead):
+    started = time.perf_counter()
+    bodies = [fit(article) for article in articles]
+    elapsed = time.perf_counter() - started
+
+    tokens = [counter.count(body) for body in bodies]
+    kept = total = 0
+    for article, body in zip(articles, bodies):
+        facts = facts_in(article.get('body', ''))
+        total += len(facts)
+        kept += len(facts & facts_in(body))
+    mean_tokens = sum(tokens) / len(tokens)
+    request_tokens = mean_tokens + prompt_overhead + completion_tokens
+    return {
+        'mode': name,
+        'mean_body_tokens': round(mean_tokens, 1),
+        'max_body_tokens': max(tokens),
+        'fact_retention': round(kept / total, 4) if total else 1.0,
+        'requests_per_minute_at_tpm': round(DEFAULT_TPM / request_tokens, 2),
+        'articles_per_sec': round(len(articles) / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prompt budget benchmark')
+    parser.add_argument('--articles', type=int, default=300)
+    parser.add_argument('--facts', type=int, default=14, help='Fact sentences per synthetic article')
+    parser.add_argument('--fillers', type=int, default=30, help='Filler sentences per synthetic article')
+    parser.add_argument('--max-input-tokens', type=int, default=400)
+    parser.add_argument('--completion-tokens', type=int, default=300)
+    parser.add_argument('--tokenizer', default=None, help='tokenizer.json path or cached HF tokenizer')
+    parser.add_argument('--input', help='Real dataset (JSON array or JSONL)')
+    parser.add_argument('--output', default='outputs/benchmarks/prompt_budget.json')
+    args = parser.parse_args()
+
+    if args.input:
+        articles = [a for a in iter_json_records(args.input) if a.get('body')][:args.articles]
+        source = args.input
+    else:
+        articles = synthetic_articles(args.articles, args.facts, args.fillers)
+        source = f'synthetic ({args.facts} facts, {args.fillers} fillers per article)'
+
+    counter = TokenCounter(args.tokenizer)
+    # Instructions, title and system message around the body
+    prompt_overhead = 190
+
+    print("\n" + "="*70)
+    print("✂️  PROMPT BUDGET BENCHMARK")
+    print("="*70)
+    print(f"Source: {source}")
+    print(f"Articles: {len(articles):,}   Budget: {args.max_input_tokens} tokens   Tokenizer: {counter.name}")
+
+    truncate = PromptBudget(args.max_input_tokens, counter, 'truncate')
+    extractive = PromptBudget(args.max_input_tokens, counter, 'extractive')
+    results = [
+        run('chars', lambda a: char_cut(a, args.max_input_tokens), articles, counter,
+            args.completion_tokens, prompt_overhead),
+        run('truncate', truncate.fit, articles, counter, args.completion_tokens, prompt_overhead),
+        run('extractive', extractive.fit, articles, counter, args.completion_tokens, prompt_overhead),
+    ]
+
+    print(f"\n{'mode':<12}{'tokens/body':>12}{'max':>8}{'facts kept':>12}{'req/min@TPM':>13}{'art/s':>10}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['mean_body_tokens']:>12.1f}{r['max_body_tokens']:>8}"
+              f"{r['fact_retention']:>12.1%}{r['requests_per_minute_at_tpm']:>13.2f}{r['articles_per_sec']:>10,.0f}")
+
+    base, best = results[0], results[2]
+    saved = 1 - best['mean_body_tokens'] / base['mean_body_tokens']
+    print(f"\n📉 Body tokens vs chars cut: {saved:+.0%} saved, "
+          f"fact retention {base['fact_retention']:.0%} → {best['fact_retention']:.0%}")
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': source,
+        'articles': len(articles),
+        'max_input_tokens': args.max_input_tokens,
+        'tokenizer': counter.name,
+        'results': results,
+    }
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n💾 Results saved to: {output_path}")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Scraper Throughput Benchmark (Offline)
+======================================
+
+Runs run_scraper end-to-end against the local fixture server with a stub
+discovery source, once per Selenium page load strategy, and saves a
+machine-readable baseline.
+
+Reports per mode:
+- articles/sec
+- p50/p90/p99 latency per stage (discovery, load, extract, validate, save)
+- peak RSS during the mode of this process and of its process tree
+  (chromedriver and Chrome), sampled with psutil or /proc
+
+Usage:
+    python tests/benchmark_scraper.py
+    python tests/benchmark_scraper.py --articles 100 --latency-ms 80 --error-rate 0.05
+    python tests/benchmark_scraper.py --modes eager --output outputs/benchmarks/eager.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.scraping.news_scraper import Config, run_scraper
+from fixture_server import FixtureServer, StubDiscovery
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def _process_tree_rss():
+    """(RSS of this process, summed RSS of all its descendants) in bytes
+
+    Uses psutil when installed, else /proc on Linux; None elsewhere.
+    Descendants include Chrome's grandchildren of chromedriver, which
+    RUSAGE_CHILDREN only sees once they are reaped.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        me = psutil.Process()
+        children = 0
+        for child in me.children(recursive=True):
+            try:
+                children += child.memory_info().rss
+            except psutil.Error:
+                pass  # Exited while we looked
+        return me.memory_info().rss, children
+
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+    page = os.sysconf('SC_PAGE_SIZE')
+
+    def rss(pid):
+        try:
+            return int((proc / str(pid) / 'statm').read_text().split()[1]) * page
+        except (OSError, IndexError, ValueError):
+            return 0
+
+    parents = {}
+    for entry in proc.iterdir():
+        if entry.name.isdigit():
+            try:
+                stat = (entry / 'stat').read_text()
+                parents[int(entry.name)] = int(stat[stat.rindex(')') + 2:].split()[1])
+            except (OSError, ValueError):
+                pass
+    own = os.getpid()
+    tree, frontier = set(), [own]
+    while frontier:
+        pid = frontier.pop()
+        for child, parent in parents.items():
+            if parent == pid and child not in tree:
+                tree.add(child)
+                frontier.append(child)
+    return rss(own), sum(rss(pid) for pid in tree)
+
+
+class PeakRss:
+    """Samples the RSS of this process and its process tree in the background
+
+    Used around one mode, so each mode reports its own peak rather than
+    the whole run's high-water mark.
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.own = 0
+        self.children = 0
+        self.supported = _process_tree_rss() is not None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            self.sample()
+            if self._stop.wait(self.interval):
+                return
+
+    def sample(self):
+        usage = _process_tree_rss()
+        if usage is not None:
+            self.own = max(self.own, usage[0])
+            self.children = max(self.children, usage[1])
+
+    def __enter__(self):
+        if self.supported:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.supported:
+            self._stop.set()
+            self._thread.join()
+
+    def peak_mb(self):
+        """(own, descendants) peak RSS in MB, or (None, None) when unsupported"""
+        if not self.supported:
+            return None, None
+        return round(self.own / 1024 / 1024, 1), round(self.children / 1024 / 1024, 1)
+
+
+def run_mode(mode, args):
+    """Benchmark one page load strategy in an isolated output/cache directory"""
+    workdir = Path(tempfile.mkdtemp(prefix=f"scraper_bench_{mode}_"))
+    Config.OUTPUT_DIR = workdir / "news"
+    Config.CACHE_DIR = workdir / "cache"
+    Config.LOG_DIR = workdir / "logs"
+
+    with FixtureServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        stall_seconds=Config.PAGE_TIMEOUT + 2,
+        seed=args.seed
+    ) as server:
+        discovery = StubDiscovery(server, articles_per_topic=args.articles)
+
+        with PeakRss() as memory:
+            started = time.perf_counter()
+            scraper = run_scraper(
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 12, 31),
+                topics=["benchmark"],
+                headless=True,
+                discovery=discovery,
+                page_load_strategy=mode
+            )
+            elapsed = time.perf_counter() - started
+        counters = server.snapshot()
+
+    stages = {
+        stage: {
+            'count': len(values),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p90_ms': round(percentile(values, 90) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'mean_ms': round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        }
+        for stage, values in scraper.timings.items()
+    }
+    own_rss, children_rss = memory.peak_mb()
+
+    return {
+        'mode': mode,
+        'elapsed_seconds': round(elapsed, 3),
+        'articles': scraper.stats['success'],
+        'articles_per_sec': round(scraper.stats['success'] / elapsed, 3) if elapsed else 0.0,
+        'stats': scraper.stats,
+        'server': counters,
+        'stages': stages,
+        'peak_rss_mb': own_rss,
+        'peak_rss_children_mb': children_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline scraper throughput benchmark')
+    parser.add_argument('--articles', type=int, default=50, help='Articles per mode (default: 50)')
+    parser.add_argument('--modes', nargs='+', choices=Config.PAGE_LOAD_STRATEGIES,
+                        default=Config.PAGE_LOAD_STRATEGIES, help='Page load strategies to run')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Mean server latency')
+    parser.add_argument('--jitter-ms', type=float, default=25, help='Latency jitter (+/-)')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Fraction of HTTP 503 responses')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='Fraction of requests that time out')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep-delays', action='store_true',
+                        help='Keep the production politeness delays (default: zeroed)')
+    parser.add_argument('--output', default='outputs/benchmarks/scraper_baseline.json')
+    args = parser.parse_args()
+
+    if not args.keep_delays:
+        Config.POST_LOAD_DELAY = 0
+        Config.ARTICLE_DELAY = 0
+        Config.RETRY_DELAY = 0
+
+    print("\n" + "="*70)
+    print("⏱️  SCRAPER THROUGHPUT BENCHMARK (OFFLINE)")
+    print("="*70)
+    print(f"Articles per mode: {args.articles}")
+    print(f"Modes: {', '.join(args.modes)}")
+    print(f"Latency: {args.latency_ms}±{args.jitter_ms} ms | Errors: {args.error_rate:.0%} | Stalls: {args.stall_rate:.0%}")
+
+    results = []
+    for mode in args.modes:
+        print(f"\n🚀 Mode: {mode}")
+        result = run_mode(mode, args)
+        results.append(result)
+
+        print(f"   ✅ {result['articles']} articles in {result['elapsed_seconds']:.1f}s "
+              f"({result['articles_per_sec']:.2f} articles/sec)")
+        for stage, s in result['stages'].items():
+            print(f"   {stage:10s} p50 {s['p50_ms']:8.1f} ms | p90 {s['p90_ms']:8.1f} ms | p99 {s['p99_ms']:8.1f} ms")
+
+    baseline = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'articles': args.articles,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'error_rate': args.error_rate,
+            'stall_rate': args.stall_rate,
+            'seed': args.seed,
+            'post_load_delay': Config.POST_LOAD_DELAY,
+            'article_delay': Config.ARTICLE_DELAY,
+        },
+        'results': results,
+    }
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+
+    print(f"\n💾 Baseline saved to: {output_path}")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Summarizer Load Test (Offline)
+==============================
+
+Runs the summarizers end-to-end against the local mock LLM server
+(tests/mock_llm_server.py) instead of Groq, so concurrency and rate-limiter
+settings can be tuned without spending quota.
+
+Each summarizer gets a fresh server, config, quota state and dataset.
+Reported per summarizer:
+- articles per minute and articles summarized
+- request latency p50/p95/p99 (server side, successful requests)
+- requests, retries (requests beyond one per article/pack), 429s by cause
+  (rpm, tpm, rpd, injected), 5xx
+- billed and wasted tokens (rejected requests, repeated answers)
+- client-side request p99 and, for hedged runs (--hedge adds a hedged run
+  of parallel and async), the hedge rate and how often the hedge won
+
+Usage:
+    python tests/benchmark_summarizers.py
+    python tests/benchmark_summarizers.py --articles 300 --keys 5 --latency lognormal:600:0.6 --tail-rate 0.02
+    python tests/benchmark_summarizers.py --summarizers parallel,async --server-rpm 30 --client-rpm 28
+    python tests/benchmark_summarizers.py --summarizers async --hedge --tail-rate 0.02 --tail-ms 8000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.scraping.article_record import dump_articles, load_articles
+from benchmark_prompt_budget import synthetic_articles
+from mock_llm_server import MockLLMServer
+
+SUMMARIZERS = ('parallel', 'async', 'single')
+HEDGED = ('parallel', 'async')
+
+
+def write_config(workdir, base_url, args):
+    """config.yaml for one run: mock endpoint, fake keys, isolated quota state"""
+    keys = [f"gsk_mock_{i}" for i in range(1, args.keys + 1)]
+    config = {
+        'llm': {
+            'groq': {'api_key': keys[0], 'api_keys': keys, 'model': 'llama-3.1-8b-instant', 'base_url': base_url},
+            'summarization': {'max_input_tokens': 2000, 'temperature': 0.3, 'max_tokens': 500},
+            'rate_limit': {
+                'max_requests_per_minute': args.client_rpm,
+                'max_tokens_per_minute': args.client_tpm,
+                'max_requests_per_day': args.client_rpd,
+                'retry_attempts': 3,
+                'retry_delay': 1,
+                'state_path': str(workdir / 'groq_quota.json'),
+            },
+            'concurrency': {'in_flight_per_key': args.in_flight, 'window': args.window},
+            'packing': {'enabled': args.pack > 1, 'max_articles': args.pack},
+            'routing': {'enabled': args.routing},
+            'hedging': {'max_fraction': args.hedge_fraction},
+            'metrics': {'path': str(workdir / 'metrics' / 'summarizer')},
+            'fallback': 'none',
+        }
+    }
+    path = workdir / 'config.yaml'
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def make_summarizer(name, config_path):
+    """Summarizer for a run name: 'parallel', 'async' or 'single', '+hedge' for hedged requests"""
+    engine, _, variant = name.partition('+')
+    hedging = variant == 'hedge'
+    if engine == 'parallel':
+        from src.processing.parallel_summarizer import ParallelSummarizer
+        return ParallelSummarizer(str(config_path), use_cache=False, hedging=hedging)
+    if engine == 'async':
+        from src.processing.async_summarizer import AsyncSummarizer
+        return AsyncSummarizer(str(config_path), use_cache=False, hedging=hedging)
+    from src.processing.summarizer import ArticleSummarizer
+    return ArticleSummarizer(str(config_path), use_cache=False)
+
+
+def run(name, articles, args):
+    workdir = Path(tempfile.mkdtemp(prefix=f"summarizer_bench_{name}_"))
+    input_path = workdir / 'input.json'
+    output_path = workdir / 'output.json'
+    dump_articles(articles, input_path)
+
+    with MockLLMServer(
+        latency=args.latency,
+        tail_rate=args.tail_rate,
+        tail_ms=args.tail_ms,
+        rpm=args.server_rpm,
+        tpm=args.server_tpm,
+        rpd=args.server_rpd,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ) as server:
+        config_path = write_config(workdir, server.base_url, args)
+        log = io.StringIO()
+        quiet = contextlib.ExitStack()
+        if not args.verbose:
+            quiet.enter_context(contextlib.redirect_stdout(log))
+            quiet.enter_context(contextlib.redirect_stderr(log))
+
+        with quiet:
+            summarizer = make_summarizer(name, config_path)
+            started = time.perf_counter()
+            summarizer.process_dataset(input_file=str(input_path), output_file=str(output_path))
+        elapsed = time.perf_counter() - started
+        served = server.snapshot()
+
+    done = sum(1 for a in load_articles(output_path) if a.get('summarized'))
+    hedging = summarizer.hedging.summary() if getattr(summarizer, 'hedging', None) is not None else None
+    if hedging is not None:
+        client_latency = hedging['latency_ms']
+    elif hasattr(summarizer, 'metrics'):
+        client_latency = summarizer.metrics.snapshot()['latency_ms']
+    else:
+        client_latency = None
+    units = getattr(getattr(summarizer, 'packer', None), 'units', None)
+    expected = len(units(articles)) if units else len(articles)
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'summarizer': name,
+        'seconds': round(elapsed, 2),
+        'articles_per_minute': round(done / elapsed * 60, 1) if elapsed else 0.0,
+        'summarized': done,
+        'requests': served['requests'],
+        'retries': max(0, served['requests'] - expected),
+        'rate_limited': served['rate_limited'],
+        'rejected': served['rejected'],
+        'latency_ms': served['latency_ms'],
+        'client_latency_ms': client_latency,
+        'hedging': hedging,
+        'billed_tokens': served['billed_tokens'],
+        'wasted_tokens': served['wasted_tokens'],
+        'wasted_share': round(served['wasted_tokens'] / (served['billed_tokens'] + served['wasted_tokens']), 4)
+        if served['billed_tokens'] else 0.0,
+        'requests_per_key': served['requests_per_key'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarizer load test against a mock LLM server')
+    parser.add_argument('--summarizers', default=','.join(SUMMARIZERS), help='Comma-separated: parallel,async,single')
+    parser.add_argument('--articles', type=int, default=120)
+    parser.add_argument('--keys', type=int, default=3)
+    # Server behaviour
+    parser.add_argument('--latency', default='lognormal:300:0.5', help='See mock_llm_server.LatencyModel')
+    parser.add_argument('--tail-rate', type=float, default=0.01)
+    parser.add_argument('--tail-ms', type=float, default=5000)
+    parser.add_argument('--server-rpm', type=int, default=120, help='Enforced requests/min per key (0: off)')
+    parser.add_argument('--server-tpm', type=int, default=60000, help='Enforced tokens/min per key (0: off)')
+    parser.add_argument('--server-rpd', type=int, default=0, help='Enforced requests/day per key (0: off)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.02, help='Injected 429 fraction')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Injected 500 fraction')
+    # Client settings under test
+    parser.add_argument('--client-rpm', type=int, default=120, help='llm.rate_limit.max_requests_per_minute')
+    parser.add_argument('--client-tpm', type=int, default=60000, help='llm.rate_limit.max_tokens_per_minute')
+    parser.add_argument('--client-rpd', type=int, default=14400, help='llm.rate_limit.max_requests_per_day')
+    parser.add_argument('--window', type=int, default=None, help='Parallel requests in flight (default: 2 per key)')
+    parser.add_argument('--in-flight', type=int, default=4, help='Async requests in flight per key')
+    parser.add_argument('--pack', type=int, default=1, help='Articles per request (1: no packing)')
+    parser.add_argument('--routing', action='store_true', help='Keep passthrough/extractive routing on')
+    parser.add_argument('--hedge', action='store_true', help='Also run parallel/async with hedged requests')
+    parser.add_argument('--hedge-fraction', type=float, default=0.05, help='llm.hedging.max_fraction')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help='Keep the per-run work directories')
+    parser.add_argument('--verbose', action='store_true', help='Show the summarizers\' own output')
+    parser.add_argument('--output', default='outputs/benchmarks/summarizers.json')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.summarizers.split(',') if n.strip()]
+    unknown = set(names) - set(SUMMARIZERS)
+    if unknown:
+        parser.error(f"unknown summarizer(s): {', '.join(sorted(unknown))}")
+    if args.hedge:
+        names = [run_name for n in names for run_name in ((n, f"{n}+hedge") if n in HEDGED else (n,))]
+
+    # Long enough that every article needs the LLM
+    articles = synthetic_articles(args.articles, facts=14, fillers=30, seed=args.seed)
+
+    print("\n" + "="*70)
+    print("🏋️ SUMMARIZER LOAD TEST (MOCK LLM SERVER)")
+    print("="*70)
+    print(f"Articles: {args.articles}   Keys: {args.keys}   Latency: {args.latency} "
+          f"(+{args.tail_rate:.0%} at {args.tail_ms:.0f} ms)")
+    print(f"Server limits/key: {args.server_rpm} RPM, {args.server_tpm} TPM   "
+          f"Client limits/key: {args.client_rpm} RPM, {args.client_tpm} TPM   "
+          f"Injected: {args.rate_limit_rate:.0%} 429, {args.error_rate:.0%} 500")
+
+    results = []
+    for name in names:
+        print(f"\n▶️  {name}...")
+        results.append(run(name, articles, args))
+
+    print(f"\n{'summarizer':<15}{'art/min':>9}{'done':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'reqs':>6}{'retries':>9}{'429s':>6}{'wasted tok':>12}")
+    for r in results:
+        latency = r['latency_ms']
+        print(f"{r['summarizer']:<15}{r['articles_per_minute']:>9.1f}{r['summarized']:>6}"
+              f"{latency['p50']:>9.0f}{latency['p95']:>9.0f}{latency['p99']:>9.0f}"
+              f"{r['requests']:>6}{r['retries']:>9}{r['rate_limited']:>6}"
+              f"{r['wasted_tokens']:>7,} ({r['wasted_share']:.0%})")
+
+    hedged = [r for r in results if r['hedging']]
+    if hedged:
+        print(f"\n{'hedged run':<15}{'hedges':>8}{'rate':>8}{'won':>6}{'client p99':>12}{'unhedged p99':>14}")
+        baseline = {r['summarizer']: r for r in results if not r['hedging']}
+        for r in hedged:
+            base = baseline.get(r['summarizer'].partition('+')[0])
+            base_p99 = (base or {}).get('client_latency_ms', {}) or {}
+            hedging = r['hedging']
+            print(f"{r['summarizer']:<15}{hedging['hedges']:>8}{hedging['hedge_rate']:>8.1%}{hedging['hedge_wins']:>6}"
+                  f"{r['client_latency_ms']['p99'] or 0:>12.0f}{base_p99.get('p99') or 0:>14.0f}")
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('output', 'keep', 'verbose')},
+        'results': results,
+    }
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n💾 Results saved to: {output_path}")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
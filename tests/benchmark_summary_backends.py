@@ -0,0 +1,104 @@
+"""
+Summary Backend Benchmark
+=========================
+
+Throughput and fact coverage of the offline extractive backend
+(src/processing/summary_backends.py), TextRank vs centroid ranking:
+
+- articles per minute on this machine (single process)
+- facts per summary
+- share of summary lines that carry a number (the facts FinBERT needs)
+
+Uses synthetic market articles (see benchmark_prompt_budget.py) by
+default, or a real dataset with --input.
+
+Usage:
+    python tests/benchmark_summary_backends.py
+    python tests/benchmark_summary_backends.py --articles 20000
+    python tests/benchmark_summary_backends.py --input data/datasets/finbert_ready.json
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.summary_backends import ExtractiveBackend
+from src.scraping.json_stream import iter_json_records
+from tests.benchmark_prompt_budget import synthetic_articles
+
+NUMBER = re.compile(r"\d")
+
+
+def run(method, articles, batch_size):
+    backend = ExtractiveBackend(method, batch_size=batch_size)
+    started = time.perf_counter()
+    summaries = backend.summarize_many(articles)
+    elapsed = time.perf_counter() - started
+
+    produced = [s for s in summaries if s]
+    lines = [line for s in produced for line in s.split('\n')]
+    return {
+        'method': method,
+        'articles_per_minute': round(len(articles) / elapsed * 60),
+        'seconds': round(elapsed, 2),
+        'summarized': len(produced),
+        'facts_per_summary': round(len(lines) / len(produced), 2) if produced else 0.0,
+        'lines_with_numbers': round(sum(1 for line in lines if NUMBER.search(line)) / len(lines), 3) if lines else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extractive summary backend benchmark')
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--input', help='Real dataset (JSON array or JSONL)')
+    parser.add_argument('--output', default='outputs/benchmarks/summary_backends.json')
+    args = parser.parse_args()
+
+    if args.input:
+        articles = [a for a in iter_json_records(args.input) if a.get('body')][:args.articles]
+        source = args.input
+    else:
+        articles = synthetic_articles(args.articles, facts=14, fillers=30)
+        source = 'synthetic'
+
+    print("\n" + "="*70)
+    print("🧮 EXTRACTIVE BACKEND BENCHMARK")
+    print("="*70)
+    print(f"Source: {source}   Articles: {len(articles):,}   Batch: {args.batch_size}")
+
+    results = [run(method, articles, args.batch_size) for method in ('textrank', 'centroid')]
+
+    print(f"\n{'method':<10}{'articles/min':>14}{'seconds':>10}{'facts':>8}{'with numbers':>14}")
+    for r in results:
+        print(f"{r['method']:<10}{r['articles_per_minute']:>14,}{r['seconds']:>10.2f}"
+              f"{r['facts_per_summary']:>8.1f}{r['lines_with_numbers']:>14.0%}")
+
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': source,
+        'articles': len(articles),
+        'results': results,
+    }
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n💾 Results saved to: {output_path}")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
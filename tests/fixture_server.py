@@ -0,0 +1,301 @@
+"""
+Offline Publisher Fixture Server
+================================
+
+Local HTTP server that stands in for news publishers so the scraper can be
+benchmarked and regression-tested without touching GNews or live sites.
+
+Pages come from recorded HTML in tests/fixtures/pages/ (see --record) and
+fall back to synthetic articles that mimic a publisher layout (nav, header,
+article body, related links, footer, scripts).
+
+Usage:
+    python tests/fixture_server.py --port 8765 --latency-ms 80 --error-rate 0.05
+    python tests/fixture_server.py --record https://www.livemint.com/market/...
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+PUBLISHERS = [
+    ("The Economic Times", "economictimes"),
+    ("Moneycontrol", "moneycontrol"),
+    ("Business Standard", "business-standard"),
+    ("Mint", "livemint"),
+]
+
+COMPANIES = ["Reliance Industries", "HDFC Bank", "Infosys", "TCS", "ICICI Bank", "Larsen & Toubro"]
+
+SENTENCES = [
+    "The Nifty 50 closed {pct}% {dir} at {level} points as {company} shares moved {pct2}%.",
+    "The BSE Sensex ended the session {dir} {points} points, led by gains in banking and IT stocks.",
+    "Foreign institutional investors net {fii} shares worth Rs {crore} crore on Tuesday, provisional data showed.",
+    "Analysts said {company} remained in focus after its quarterly profit rose {pct2}% year-on-year.",
+    "The India VIX, a gauge of near-term volatility, {vix} {pct}% to {vixlevel}.",
+    "Market breadth was {breadth}, with {adv} stocks advancing and {dec} declining on the NSE.",
+    "The rupee settled at {inr} against the US dollar amid firm crude oil prices.",
+    "Brokerages maintained a {rating} rating on {company} with a target price of Rs {target}.",
+]
+
+BOILERPLATE = """
+<nav><a href="/">Home</a> <a href="/markets">Markets</a> <a href="/news">News</a></nav>
+<header><div class="logo">{publisher}</div><div class="ticker">Sensex | Nifty | Gold</div></header>
+<aside><h3>Trending</h3><ul><li>Top gainers today</li><li>IPO watch</li></ul></aside>
+"""
+
+FOOTER = """
+<section class="related"><h3>Related Articles</h3><ul><li>Stocks to watch</li><li>Market outlook</li></ul></section>
+<footer>Copyright {year} {publisher}. All rights reserved. Follow us on social media.</footer>
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+"""
+
+
+def synthetic_article(article_id, paragraphs=8):
+    """Deterministic fake publisher page for an article id"""
+    rng = random.Random(article_id)
+    publisher, _ = PUBLISHERS[article_id % len(PUBLISHERS)]
+    company = rng.choice(COMPANIES)
+
+    def sentence():
+        return rng.choice(SENTENCES).format(
+            pct=round(rng.uniform(0.1, 2.5), 2),
+            pct2=round(rng.uniform(0.5, 12), 1),
+            dir=rng.choice(["higher", "lower"]),
+            level=rng.randint(17000, 26000),
+            points=rng.randint(50, 900),
+            company=rng.choice(COMPANIES),
+            fii=rng.choice(["bought", "sold"]),
+            crore=rng.randint(200, 6000),
+            vix=rng.choice(["rose", "fell"]),
+            vixlevel=round(rng.uniform(10, 22), 2),
+            breadth=rng.choice(["positive", "negative"]),
+            adv=rng.randint(600, 2200),
+            dec=rng.randint(600, 2200),
+            inr=round(rng.uniform(82, 88), 2),
+            rating=rng.choice(["buy", "hold", "add"]),
+            target=rng.randint(500, 4500),
+        )
+
+    body = "\n".join(
+        "<p>" + " ".join(sentence() for _ in range(rng.randint(2, 4))) + "</p>"
+        for _ in range(paragraphs)
+    )
+    published = datetime(2024, 1, 1) + timedelta(days=article_id % 365)
+    title = f"{company} shares in focus as markets trade {rng.choice(['higher', 'lower'])} (#{article_id})"
+
+    return f"""<!DOCTYPE html>
+<html><head>
+<title>{title} | {publisher}</title>
+<meta property="og:title" content="{title}">
+<meta property="article:published_time" content="{published.isoformat()}">
+<meta name="author" content="Markets Desk">
+</head><body>
+{BOILERPLATE.format(publisher=publisher)}
+<article>
+<h1>{title}</h1>
+<div class="byline">By Markets Desk</div>
+<div class="article-body" itemprop="articleBody">
+{body}
+</div>
+</article>
+{FOOTER.format(year=published.year, publisher=publisher)}
+</body></html>"""
+
+
+class FixtureServer:
+    """Threaded fixture server with latency and error injection
+
+    Args:
+        port: Port to bind (0 picks a free port)
+        latency_ms: Mean added latency per request
+        jitter_ms: Uniform +/- jitter around the mean
+        error_rate: Fraction of article requests answered with HTTP 503
+        stall_rate: Fraction of article requests that stall past the scraper's page timeout
+        stall_seconds: How long a stalled request hangs
+        seed: Seed for the injection RNG, so runs are reproducible
+    """
+
+    def __init__(self, port=0, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 stall_rate=0.0, stall_seconds=15, seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.recorded = sorted(FIXTURE_DIR.glob("*.html")) if FIXTURE_DIR.exists() else []
+        self.counters = {'requests': 0, 'errors': 0, 'stalls': 0}
+        self.counters_lock = threading.Lock()  # Handler threads count concurrently
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def article_url(self, article_id):
+        return f"{self.base_url}/article/{article_id}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, name):
+        with self.counters_lock:
+            self.counters[name] += 1
+
+    def snapshot(self):
+        """Copy of the request/error/stall counters"""
+        with self.counters_lock:
+            return dict(self.counters)
+
+    def page(self, article_id):
+        """HTML for an article: recorded page if available, synthetic otherwise"""
+        if self.recorded:
+            return self.recorded[article_id % len(self.recorded)].read_text(encoding='utf-8')
+        return synthetic_article(article_id)
+
+    def _draw(self):
+        with self.rng_lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            return self.rng.random(), max(0.0, (self.latency_ms + jitter) / 1000)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = re.match(r"^/article/(\d+)", self.path)
+                if not match:
+                    self._send(404, "<html><body>Not found</body></html>")
+                    return
+
+                server.count('requests')
+                roll, delay = server._draw()
+                time.sleep(delay)
+
+                if roll < server.error_rate:
+                    server.count('errors')
+                    self._send(503, "<html><body>Service Unavailable</body></html>")
+                    return
+                if roll < server.error_rate + server.stall_rate:
+                    server.count('stalls')
+                    time.sleep(server.stall_seconds)
+
+                self._send(200, server.page(int(match.group(1))))
+
+            def _send(self, status, html):
+                payload = html.encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (page timeout)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class StubDiscovery:
+    """Stand-in for GNews that returns fixture server URLs
+
+    Callable with the same signature as news_scraper.gnews_discovery.
+    """
+
+    def __init__(self, server, articles_per_topic=25):
+        self.server = server
+        self.articles_per_topic = articles_per_topic
+        self.next_id = 0
+
+    def __call__(self, topic, start_date, end_date):
+        items = []
+        for _ in range(self.articles_per_topic):
+            article_id = self.next_id
+            self.next_id += 1
+            publisher, slug = PUBLISHERS[article_id % len(PUBLISHERS)]
+            published = datetime(2024, 1, 1) + timedelta(days=article_id % 365)
+            items.append({
+                'title': f"{topic} fixture article {article_id}",
+                'url': self.server.article_url(article_id),
+                'published date': format_datetime(published),
+                'publisher': {'href': f"https://www.{slug}.com", 'title': publisher},
+            })
+        return items
+
+
+def record_pages(urls, dest=FIXTURE_DIR):
+    """Save live publisher pages as fixtures (run once, online)"""
+    import requests
+
+    dest.mkdir(parents=True, exist_ok=True)
+    for url in urls:
+        response = requests.get(url, timeout=30, headers={'User-Agent': 'Mozilla/5.0'})
+        response.raise_for_status()
+        name = hashlib.md5(url.encode()).hexdigest()[:12] + ".html"
+        (dest / name).write_text(response.text, encoding='utf-8')
+        print(f"✅ Recorded {url} -> {dest / name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline publisher fixture server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--stall-rate', type=float, default=0.0)
+    parser.add_argument('--record', nargs='+', metavar='URL', help='Record live pages as fixtures and exit')
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.record)
+        return
+
+    server = FixtureServer(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate
+    )
+    print(f"🌐 Serving fixtures on {server.base_url}/article/<id> (Ctrl+C to stop)")
+    print(f"   Recorded pages: {len(server.recorded)} (synthetic pages otherwise)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
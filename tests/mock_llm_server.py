@@ -0,0 +1,417 @@
+"""
+Mock Groq / OpenAI-Compatible LLM Server
+========================================
+
+Local HTTP server that stands in for the Groq chat completions API so the
+summarizers can be load-tested without spending quota.
+
+- POST /openai/v1/chat/completions (Groq SDK) and /v1/chat/completions (OpenAI)
+- Latency from a distribution: fixed:MS, uniform:LO:HI, lognormal:MEDIAN:SIGMA,
+  plus an optional slow tail (tail_rate of requests take tail_ms)
+- Per-key RPM, TPM and daily limits enforced like Groq: HTTP 429 with
+  retry-after, x-ratelimit-* headers and Groq's error messages ("requests
+  per minute (RPM)", "requests per day (RPD)"), so key_router.py treats
+  them exactly like the real thing
+- Random 429 and 500 injection
+- Canned responses: a list cycled through, or facts built from the prompt
+  (sentences with numbers; a JSON object per article ID for packed prompts)
+- Counters for the harness: requests, 429s by cause, 5xx, latency
+  percentiles, billed tokens and wasted tokens (rejected requests and
+  repeated answers to the same prompt)
+
+Usage:
+    python tests/mock_llm_server.py --port 8766 --latency lognormal:400:0.5 --rpm 30 --tpm 6000
+
+    # config/config.yaml
+    llm:
+      groq:
+        base_url: http://127.0.0.1:8766
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.prompt_budget import heuristic_token_count, split_sentences
+
+COMPLETION_PATHS = ('/openai/v1/chat/completions', '/v1/chat/completions')
+SECTION = re.compile(r"^=== (A\d+) ===$", re.MULTILINE)
+NUMBER = re.compile(r"\d")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class LatencyModel:
+    """Response latency distribution
+
+    Spec strings (milliseconds):
+        fixed:200
+        uniform:100:400
+        lognormal:400:0.5     (median, sigma of the underlying normal)
+    """
+
+    def __init__(self, spec='fixed:0'):
+        kind, *params = spec.split(':')
+        if kind not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.spec = spec
+
+    def sample(self, rng):
+        """One latency in seconds"""
+        if self.kind == 'fixed':
+            ms = self.params[0]
+        elif self.kind == 'uniform':
+            ms = rng.uniform(self.params[0], self.params[1])
+        else:
+            ms = self.params[0] * math.exp(rng.gauss(0.0, self.params[1]))
+        return max(0.0, ms / 1000)
+
+
+def facts_from_prompt(prompt, json_reply=False):
+    """Plausible summary for a summarizer prompt: its sentences that carry numbers"""
+    sections = SECTION.split(prompt)
+    if len(sections) > 1:
+        # Packed prompt: "=== A1 ===" followed by that article
+        reply = {}
+        for article_id, text in zip(sections[1::2], sections[2::2]):
+            text = text.split('\nJSON:')[0]
+            reply[article_id] = _facts(text) or [text.strip().splitlines()[0][:120]]
+        return json.dumps(reply)
+
+    text = prompt.split('ARTICLE:', 1)[-1].split('KEY FACTS', 1)[0]
+    facts = _facts(text) or [text.strip()[:200]]
+    return json.dumps({'A1': facts}) if json_reply else '\n'.join(facts)
+
+
+def _facts(text, limit=8):
+    return [s for s in split_sentences(text) if NUMBER.search(s) and not s.startswith('TITLE:')][:limit]
+
+
+class _KeyWindow:
+    """Last minute of requests and tokens, and today's request count, for one API key"""
+
+    def __init__(self):
+        self.requests = deque()     # Admission times
+        self.tokens = deque()       # (time, tokens)
+        self.today = 0
+
+    def trim(self, now):
+        while self.requests and now - self.requests[0] >= 60:
+            self.requests.popleft()
+        while self.tokens and now - self.tokens[0][0] >= 60:
+            self.tokens.popleft()
+
+    def token_total(self):
+        return sum(n for _, n in self.tokens)
+
+
+class MockLLMServer:
+    """Threaded chat completions server with latency, limits and error injection
+
+    Args:
+        port: Port to bind (0 picks a free port)
+        latency: LatencyModel spec (see LatencyModel)
+        tail_rate: Fraction of requests that take tail_ms instead
+        tail_ms: Latency of a tail request
+        rpm: Requests per minute per key (0: unlimited)
+        tpm: Tokens per minute per key, prompt plus completion (0: unlimited)
+        rpd: Requests per day per key (0: unlimited)
+        rate_limit_rate: Fraction of requests answered with an injected 429
+        error_rate: Fraction of requests answered with HTTP 500
+        retry_after: retry-after seconds of an injected 429
+        responses: Canned response texts, cycled (None: facts from the prompt)
+        seed: Seed for the injection RNG, so runs are reproducible
+    """
+
+    def __init__(self, port=0, latency='fixed:0', tail_rate=0.0, tail_ms=10000, rpm=0, tpm=0, rpd=0,
+                 rate_limit_rate=0.0, error_rate=0.0, retry_after=1.0, responses=None, seed=42):
+        self.latency = LatencyModel(latency)
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+        self.rpm = rpm
+        self.tpm = tpm
+        self.rpd = rpd
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.responses = itertools.cycle(responses) if responses else None
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.answered = set()       # Prompt hashes already answered
+        self.latencies = []         # Seconds, successful requests
+        self.counters = Counter()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    def _admit(self, key, tokens):
+        """None if the request may run, else (status, reason, retry_after, message)"""
+        with self.lock:
+            now = time.monotonic()
+            window = self.keys.setdefault(key, _KeyWindow())
+            window.trim(now)
+            roll = self.rng.random()
+
+            if self.rpd and window.today >= self.rpd:
+                return 429, 'rpd', 3600.0, (f"on requests per day (RPD): Limit {self.rpd}, "
+                                            f"Used {window.today}, Requested 1")
+            if self.rpm and len(window.requests) >= self.rpm:
+                wait = 60 - (now - window.requests[0])
+                return 429, 'rpm', wait, (f"on requests per minute (RPM): Limit {self.rpm}, "
+                                          f"Used {len(window.requests)}, Requested 1")
+            if self.tpm and window.token_total() + tokens > self.tpm:
+                used = window.token_total()
+                wait = 60 - (now - window.tokens[0][0]) if window.tokens else 60.0
+                return 429, 'tpm', wait, (f"on tokens per minute (TPM): Limit {self.tpm}, "
+                                          f"Used {used}, Requested {tokens}")
+            if roll < self.rate_limit_rate:
+                return 429, 'injected', self.retry_after, "on requests per minute (RPM): injected"
+            if roll < self.rate_limit_rate + self.error_rate:
+                return 500, 'error', None, "Internal server error (injected)"
+
+            window.requests.append(now)
+            window.tokens.append((now, tokens))
+            window.today += 1
+            return None
+
+    def _headers(self, key):
+        with self.lock:
+            window = self.keys.get(key)
+            if window is None:
+                return {}
+            headers = {}
+            if self.rpm:
+                headers['x-ratelimit-limit-requests'] = str(self.rpm)
+                headers['x-ratelimit-remaining-requests'] = str(max(0, self.rpm - len(window.requests)))
+            if self.tpm:
+                headers['x-ratelimit-limit-tokens'] = str(self.tpm)
+                headers['x-ratelimit-remaining-tokens'] = str(max(0, self.tpm - window.token_total()))
+            return headers
+
+    def complete(self, key, body):
+        """Answer one chat completion request: (status, payload, headers)"""
+        started = time.monotonic()
+        messages = body.get('messages', [])
+        prompt = messages[-1].get('content', '') if messages else ''
+        prompt_tokens = sum(heuristic_token_count(m.get('content', '') or '') + 4 for m in messages)
+        json_reply = (body.get('response_format') or {}).get('type') == 'json_object'
+
+        if self.responses is not None:
+            with self.lock:
+                content = next(self.responses)
+        else:
+            content = facts_from_prompt(prompt, json_reply)
+        completion_tokens = min(heuristic_token_count(content), body.get('max_tokens') or 10 ** 6)
+
+        with self.lock:
+            self.counters['requests'] += 1
+        rejected = self._admit(key, prompt_tokens + completion_tokens)
+        if rejected is not None:
+            status, reason, wait, message = rejected
+            with self.lock:
+                self.counters[f'rejected_{reason}'] += 1
+                self.counters['wasted_tokens'] += prompt_tokens
+            headers = self._headers(key)
+            if status == 429:
+                headers['retry-after'] = f"{wait:.2f}"
+                error = {'message': f"Rate limit reached for model `{body.get('model')}` in organization "
+                                    f"`org_mock` {message}. Please try again in {wait:.2f}s.",
+                         'type': 'tokens' if reason == 'tpm' else 'requests', 'code': 'rate_limit_exceeded'}
+            else:
+                error = {'message': message, 'type': 'internal_server_error'}
+            return status, {'error': error}, headers
+
+        with self.lock:
+            tail = self.rng.random() < self.tail_rate
+            delay = self.tail_ms / 1000 if tail else self.latency.sample(self.rng)
+        time.sleep(delay)
+
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        with self.lock:
+            self.counters['ok'] += 1
+            self.counters['tail'] += int(tail)
+            self.counters['billed_tokens'] += prompt_tokens + completion_tokens
+            if digest in self.answered:
+                self.counters['repeated'] += 1
+                self.counters['wasted_tokens'] += prompt_tokens + completion_tokens
+            self.answered.add(digest)
+            self.latencies.append(time.monotonic() - started)
+            sequence = self.counters['ok']
+
+        payload = {
+            'id': f"chatcmpl-mock-{sequence}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+        return 200, payload, self._headers(key)
+
+    def snapshot(self):
+        """Counters and latency percentiles so far"""
+        with self.lock:
+            counters = dict(self.counters)
+            latencies = list(self.latencies)
+            keys = {key[-6:]: window.today for key, window in self.keys.items()}
+        rejected = {k[len('rejected_'):]: v for k, v in counters.items() if k.startswith('rejected_')}
+        return {
+            'requests': counters.get('requests', 0),
+            'ok': counters.get('ok', 0),
+            'rejected': rejected,
+            'rate_limited': sum(v for k, v in rejected.items() if k != 'error'),
+            'tail_requests': counters.get('tail', 0),
+            'repeated_prompts': counters.get('repeated', 0),
+            'billed_tokens': counters.get('billed_tokens', 0),
+            'wasted_tokens': counters.get('wasted_tokens', 0),
+            'latency_ms': {
+                'p50': round(percentile(latencies, 50) * 1000, 1),
+                'p95': round(percentile(latencies, 95) * 1000, 1),
+                'p99': round(percentile(latencies, 99) * 1000, 1),
+                'max': round(max(latencies) * 1000, 1) if latencies else 0.0,
+            },
+            'requests_per_key': keys,
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # Keep-alive, like the real API
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if self.path.split('?')[0] not in COMPLETION_PATHS:
+                    self._send(404, {'error': {'message': f"Unknown path {self.path}"}})
+                    return
+                try:
+                    body = json.loads(raw or b'{}')
+                except ValueError:
+                    self._send(400, {'error': {'message': 'Invalid JSON body'}})
+                    return
+                key = (self.headers.get('Authorization') or '').replace('Bearer ', '', 1) or 'anonymous'
+                status, payload, headers = server.complete(key, body)
+                self._send(status, payload, headers)
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    for name, value in (headers or {}).items():
+                        self.send_header(name, value)
+                    if status == 500:
+                        self.send_header("x-should-retry", "false")
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (timeout or cancelled request)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Groq/OpenAI chat completions server')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', default='lognormal:400:0.5',
+                        help='fixed:MS, uniform:LO:HI or lognormal:MEDIAN:SIGMA (milliseconds)')
+    parser.add_argument('--tail-rate', type=float, default=0.0)
+    parser.add_argument('--tail-ms', type=float, default=10000)
+    parser.add_argument('--rpm', type=int, default=30, help='Requests per minute per key (0: unlimited)')
+    parser.add_argument('--tpm', type=int, default=6000, help='Tokens per minute per key (0: unlimited)')
+    parser.add_argument('--rpd', type=int, default=14400, help='Requests per day per key (0: unlimited)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Injected 429 fraction')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Injected 500 fraction')
+    parser.add_argument('--responses', help='Text file of canned responses separated by blank lines')
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        text = Path(args.responses).read_text(encoding='utf-8')
+        responses = [block.strip() for block in text.split('\n\n') if block.strip()]
+
+    server = MockLLMServer(
+        port=args.port,
+        latency=args.latency,
+        tail_rate=args.tail_rate,
+        tail_ms=args.tail_ms,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        rpd=args.rpd,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        responses=responses
+    )
+    print(f"🤖 Mock LLM API on {server.base_url} (set llm.groq.base_url; Ctrl+C to stop)")
+    print(f"   Latency: {args.latency}   Limits per key: {args.rpm} RPM, {args.tpm} TPM, {args.rpd} RPD")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(server.snapshot())}")
+        print("👋 Stopped")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
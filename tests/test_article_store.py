@@ -0,0 +1,86 @@
+"""
+Article Store Tests
+===================
+
+The scraper inserts untagged rows, then the merge runs over the same raw
+file: its tags and normalized dates must land on those rows, while the
+fields a later stage wrote (summaries) stay as they are.
+
+Run:
+    python -m pytest -q tests/test_article_store.py
+"""
+
+import importlib
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.article_store import ArticleStore
+
+merge_data = importlib.import_module('src.scraping.2_merge_data')
+
+
+def make_articles():
+    """Raw scraped articles: one long (needs_summary), one FinBERT-sized"""
+    return [
+        {'url': 'https://example.com/long', 'title': 'Long read', 'body': 'word ' * 600,
+         'word_count': 600, 'published_date': '05/01/2026'},
+        {'url': 'https://example.com/short', 'title': 'Brief', 'body': 'word ' * 250,
+         'word_count': 250, 'published_date': '06/01/2026'},
+    ]
+
+
+def run_merge(tmp_path, raw_file, store_path):
+    return merge_data.merge(
+        [raw_file],
+        complete_file=str(tmp_path / 'complete_dataset.json'),
+        finbert_file=str(tmp_path / 'finbert_ready.json'),
+        workers=1,
+        store_path=str(store_path),
+    )
+
+
+def test_merge_tags_rows_the_scraper_inserted(tmp_path):
+    articles = make_articles()
+    raw_file = tmp_path / 'news_2026.json'
+    raw_file.write_text(json.dumps(articles), encoding='utf-8')
+    store_path = tmp_path / 'articles.db'
+
+    # Scraper: plain inserts, no tags
+    with ArticleStore(str(store_path)) as store:
+        for article in articles:
+            assert store.add(dict(article))
+        assert 'processing' not in store.get('https://example.com/long')
+
+    # A summary written before the merge ran must survive it
+    with ArticleStore(str(store_path)) as store:
+        store.update('https://example.com/long', summary='Short version', summarized=True,
+                     summary_method='llm', processing='summarized')
+
+    run_merge(tmp_path, raw_file, store_path)
+
+    with ArticleStore(str(store_path)) as store:
+        assert len(store) == 2
+        long_read = store.get('https://example.com/long')
+        brief = store.get('https://example.com/short')
+
+    assert brief['processing'] == 'ready'
+    assert brief['finbert_ready'] is True
+    assert brief['published_iso'] == '2026-01-06'
+
+    assert long_read['finbert_ready'] is False
+    assert long_read['published_iso'] == '2026-01-05'
+    assert long_read['processing'] == 'summarized'
+    assert long_read['summary'] == 'Short version'
+    assert long_read['summary_method'] == 'llm'
+
+
+def test_add_counts_only_new_rows(tmp_path):
+    article = make_articles()[0]
+    with ArticleStore(str(tmp_path / 'articles.db')) as store:
+        assert store.add(dict(article))
+        assert not store.add(dict(article))
+        assert not store.add(dict(article, processing='needs_summary'), refresh=['processing'])
+        assert store.get(article['url'])['processing'] == 'needs_summary'
+        assert len(store) == 1
@@ -0,0 +1,87 @@
+"""
+Body Store Tests
+================
+
+Round trip through the compressed body store: bodies written in blocks
+read back by URL, new URLs only on a second pack, abort() leaving the
+store as it was, and stripped articles hydrated on read.
+
+Requires zstandard (skipped without it).
+
+Run:
+    python -m pytest -q tests/test_body_store.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('zstandard')
+
+from src.processing.body_store import BodyStore, BodyStoreWriter
+
+
+def articles(start, stop):
+    return [{'url': f'https://example.com/{i}', 'publisher': 'Mint',
+             'body': f'Article {i}: Nifty rose {i}% as ₹ flows returned. ' * (i % 7 + 1)}
+            for i in range(start, stop)]
+
+
+def pack(root, items, block_size=4):
+    with BodyStoreWriter(str(root), block_size=block_size) as writer:
+        added = sum(writer.write(article) for article in items)
+    return added
+
+
+def test_round_trip(tmp_path):
+    items = articles(0, 10)
+    assert pack(tmp_path, items) == 10
+
+    with BodyStore(str(tmp_path), cache_blocks=1) as store:
+        assert len(store) == 10
+        for article in reversed(items):     # Crosses blocks, evicting the cached one
+            assert store.get(article['url']) == article['body']
+        assert 'https://example.com/missing' not in store
+        assert store.get('https://example.com/missing', '') == ''
+        assert sorted(body for block in store.iter_blocks() for body in block) == \
+            sorted(article['body'] for article in items)
+    assert store.meta['articles'] == 10 and store.meta['blocks'] == 3
+
+
+def test_second_pack_adds_new_urls_only(tmp_path):
+    pack(tmp_path, articles(0, 5))
+    assert pack(tmp_path, articles(3, 8)) == 3
+
+    with BodyStore(str(tmp_path)) as store:
+        assert len(store) == 8
+        assert store.get('https://example.com/7') == articles(7, 8)[0]['body']
+        assert store.get('https://example.com/0') == articles(0, 1)[0]['body']
+
+
+def test_abort_keeps_the_previous_store(tmp_path):
+    pack(tmp_path, articles(0, 5))
+    size = (tmp_path / 'blocks.bin').stat().st_size
+
+    with pytest.raises(RuntimeError):
+        with BodyStoreWriter(str(tmp_path), block_size=2) as writer:
+            for article in articles(5, 10):
+                writer.write(article)
+            raise RuntimeError('pack failed')
+
+    assert (tmp_path / 'blocks.bin').stat().st_size == size
+    with BodyStore(str(tmp_path)) as store:
+        assert len(store) == 5
+        assert 'https://example.com/6' not in store
+
+
+def test_hydrate_fills_stripped_bodies(tmp_path):
+    items = articles(0, 3)
+    pack(tmp_path, items)
+    stripped = [{'url': a['url'], 'body': ''} for a in items] + [{'url': 'https://example.com/new', 'body': ''}]
+
+    with BodyStore(str(tmp_path)) as store:
+        hydrated = list(store.hydrate(stripped))
+    assert [a['body'] for a in hydrated] == [a['body'] for a in items] + ['']
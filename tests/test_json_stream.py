@@ -0,0 +1,114 @@
+"""
+Streaming JSON Tests
+====================
+
+JsonArrayWriter (atomic rebuild, in-place append, abort in both modes)
+and iter_json_records over arrays, JSONL and records split across read
+chunks.
+
+Run:
+    python -m pytest -q tests/test_json_stream.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraping.json_stream import JsonArrayWriter, iter_json_records, read_record_at
+
+
+def records(start, stop):
+    return [{'url': f'https://example.com/{i}', 'title': f'Nifty ₹ update {i}', 'body': 'x' * (i * 10)}
+            for i in range(start, stop)]
+
+
+def write(path, items, append=False):
+    with JsonArrayWriter(path, append=append) as out:
+        offsets = [out.write(item) for item in items]
+    return offsets
+
+
+def test_writer_produces_a_json_array(tmp_path):
+    path = tmp_path / 'data.json'
+    offsets = write(path, records(0, 3))
+
+    assert json.loads(path.read_text(encoding='utf-8')) == records(0, 3)
+    assert not (tmp_path / 'data.json.tmp').exists()
+    with open(path, 'rb') as f:
+        assert [read_record_at(f, offset) for offset in offsets] == records(0, 3)
+
+
+def test_empty_array(tmp_path):
+    path = tmp_path / 'data.json'
+    write(path, [])
+    assert json.loads(path.read_text(encoding='utf-8')) == []
+
+    write(path, records(0, 2), append=True)
+    assert json.loads(path.read_text(encoding='utf-8')) == records(0, 2)
+
+
+def test_append_extends_the_array_in_place(tmp_path):
+    path = tmp_path / 'data.json'
+    write(path, records(0, 2))
+    offsets = write(path, records(2, 4), append=True)
+
+    assert json.loads(path.read_text(encoding='utf-8')) == records(0, 4)
+    with open(path, 'rb') as f:
+        assert read_record_at(f, offsets[-1]) == records(3, 4)[0]
+
+
+def test_abort_leaves_the_target_as_it_was(tmp_path):
+    path = tmp_path / 'data.json'
+    write(path, records(0, 2))
+    before = path.read_bytes()
+
+    rebuild = JsonArrayWriter(path)
+    rebuild.write(records(5, 6)[0])
+    rebuild.abort()
+    assert path.read_bytes() == before
+    assert not (tmp_path / 'data.json.tmp').exists()
+
+    with pytest.raises(RuntimeError):
+        with JsonArrayWriter(path, append=True) as out:
+            out.write(records(5, 6)[0])
+            raise RuntimeError('merge failed')
+    assert path.read_bytes() == before
+
+
+def test_append_refuses_a_file_that_is_not_an_array(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text('{"url": "https://example.com/0"}\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        JsonArrayWriter(path, append=True)
+
+
+def test_iter_records_across_chunk_boundaries(tmp_path):
+    path = tmp_path / 'data.json'
+    write(path, records(0, 50))
+    assert list(iter_json_records(path, chunk_size=64)) == records(0, 50)
+
+
+def test_iter_records_jsonl_and_single_object(tmp_path):
+    jsonl = tmp_path / 'data.jsonl'
+    jsonl.write_text(''.join(json.dumps(r) + '\n' for r in records(0, 5)), encoding='utf-8')
+    assert list(iter_json_records(jsonl, chunk_size=32)) == records(0, 5)
+
+    single = tmp_path / 'one.json'
+    single.write_text(json.dumps(records(0, 1)[0]), encoding='utf-8')
+    assert list(iter_json_records(single)) == records(0, 1)
+
+    empty = tmp_path / 'empty.json'
+    empty.write_text('  \n', encoding='utf-8')
+    assert list(iter_json_records(empty)) == []
+
+
+def test_iter_records_rejects_a_truncated_array(tmp_path):
+    path = tmp_path / 'data.json'
+    write(path, records(0, 3))
+    path.write_bytes(path.read_bytes()[:-3])       # Lose the closing bracket
+    with pytest.raises(ValueError):
+        list(iter_json_records(path))
@@ -0,0 +1,125 @@
+"""
+Merge Manifest Tests
+====================
+
+What an incremental 2_merge_data.py run decides to read again: new and
+appended-to files are merged incrementally, edited ones force a rebuild.
+Also the URL index and the published-date index it keeps beside the
+outputs.
+
+Run:
+    python -m pytest -q tests/test_merge_manifest.py
+"""
+
+import importlib
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scraping.dates import DateIndex
+from src.scraping.json_stream import JsonArrayWriter
+
+merge_data = importlib.import_module('src.scraping.2_merge_data')
+
+
+def articles(start, stop):
+    return [{'url': f'https://example.com/{i}', 'title': f'Article {i}', 'body': 'Nifty rose. ' * 20}
+            for i in range(start, stop)]
+
+
+def write_array(path, items):
+    with JsonArrayWriter(path) as out:
+        for item in items:
+            out.write(item)
+
+
+def append_array(path, items):
+    with JsonArrayWriter(path, append=True) as out:
+        for item in items:
+            out.write(item)
+
+
+def fingerprints(files, previous=None):
+    previous = previous or {}
+    return {str(p): merge_data.fingerprint(p, previous.get(str(p))) for p in files}
+
+
+def test_changed_files_splits_appended_from_edited(tmp_path):
+    same, grown, edited, jsonl = (tmp_path / name for name in
+                                  ('same.json', 'grown.json', 'edited.json', 'feed.jsonl'))
+    for path in (same, grown, edited):
+        write_array(path, articles(0, 3))
+    jsonl.write_text(''.join(json.dumps(a) + '\n' for a in articles(0, 3)), encoding='utf-8')
+    files = [same, grown, edited, jsonl]
+    previous = fingerprints(files)
+
+    append_array(grown, articles(3, 5))
+    edited.write_text(edited.read_text(encoding='utf-8').replace('Article 1', 'Article one'), encoding='utf-8')
+    with open(jsonl, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(articles(3, 4)[0]) + '\n')
+    new = tmp_path / 'new.json'
+    write_array(new, articles(10, 12))
+    files.append(new)
+
+    current = fingerprints(files, previous)
+    changed, edits = merge_data.changed_files(files, current, previous)
+
+    assert changed == [grown, jsonl, new]
+    assert edits == [edited]
+    assert current[str(same)] == previous[str(same)]
+
+
+def test_fingerprint_reuses_hashes_when_size_and_mtime_match(tmp_path):
+    path = tmp_path / 'news.json'
+    write_array(path, articles(0, 2))
+    entry = merge_data.fingerprint(path)
+    stale = dict(entry, sha256='recorded')
+
+    assert merge_data.fingerprint(path, stale)['sha256'] == 'recorded'
+    assert entry['records_size'] < entry['size']      # Up to the last record, not the bracket
+    assert merge_data.only_appended(path, entry)
+
+
+def test_shrunk_file_is_not_an_append(tmp_path):
+    path = tmp_path / 'news.json'
+    write_array(path, articles(0, 3))
+    previous = merge_data.fingerprint(path)
+    write_array(path, articles(0, 1))
+    assert not merge_data.only_appended(path, previous)
+
+
+def test_url_index_round_trip(tmp_path):
+    index = merge_data.UrlIndex()
+    assert index.add('https://example.com/a')
+    assert not index.add('https://example.com/a')
+    assert index.add('https://example.com/b')
+    index.save(tmp_path / 'urls.idx')
+
+    loaded = merge_data.UrlIndex.load(tmp_path / 'urls.idx')
+    assert len(loaded) == 2
+    assert not loaded.add('https://example.com/b')
+    assert loaded.add('https://example.com/c')
+
+
+def test_date_index_ranges_and_reads(tmp_path):
+    path = tmp_path / 'complete_dataset.json'
+    index = DateIndex()
+    days = [date(2026, 1, 3), date(2026, 1, 1), None, date(2026, 1, 3), date(2026, 1, 5)]
+    with JsonArrayWriter(path) as out:
+        for i, day in enumerate(days):
+            index.add(day, out.write({'url': f'https://example.com/{i}', 'day': day and day.isoformat()}))
+
+    index_path = DateIndex.path_for(path)
+    index.save(index_path)
+    loaded = DateIndex.load(index_path)
+
+    assert len(loaded) == 4 and loaded.undated == 1
+    assert (loaded.first(), loaded.last()) == (date(2026, 1, 1), date(2026, 1, 5))
+    assert loaded.count('2026-01-02', '03/01/2026') == 2
+    assert loaded.per_day() == {date(2026, 1, 1): 1, date(2026, 1, 3): 2, date(2026, 1, 5): 1}
+    assert loaded.coverage()['missing_days'] == [date(2026, 1, 2), date(2026, 1, 4)]
+    assert [a['url'] for a in loaded.read(path, '2026-01-03', '2026-01-05')] == [
+        'https://example.com/0', 'https://example.com/3', 'https://example.com/4']
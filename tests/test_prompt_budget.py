@@ -0,0 +1,109 @@
+"""
+Prompt Budget and Request Packing Tests
+=======================================
+
+Bodies trimmed to the token budget (salient sentences, or a token-exact
+cut), and packed replies split per article with cross-article numbers
+rejected.
+
+A whitespace word counter stands in for the tokenizer so the budgets are
+exact.
+
+Run:
+    python -m pytest -q tests/test_prompt_budget.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.prompt_budget import PromptBudget
+from src.processing.request_packing import RequestPacker
+
+
+class WordCounter:
+    name = 'words'
+
+    @staticmethod
+    def count(text):
+        return len(text.split())
+
+
+BODY = (
+    "Nifty rose 2.1% to 24,310 as HDFC Bank gained after its quarterly profit beat estimates. "
+    "The weather in Mumbai was pleasant through the afternoon and many people walked outside. "
+    "Sensex added 640 points while foreign investors bought shares worth Rs 1,200 crore. "
+    "Click here to subscribe to our newsletter for more updates. "
+    "Analysts said the rally could extend if the RBI holds rates at 6.5% next week."
+)
+
+
+def test_short_body_is_untouched():
+    budget = PromptBudget(500, WordCounter())
+    article = {'title': 'Nifty rises', 'body': 'Nifty rose 1% to 24,000 on Monday.'}
+    assert budget.fit(article) is article['body']
+    assert budget.summary()['trimmed'] == 0
+
+
+def test_extractive_fit_keeps_market_facts_within_budget():
+    budget = PromptBudget(40, WordCounter())
+    fitted = budget.fit({'title': 'Nifty rises as HDFC Bank gains', 'body': BODY})
+
+    assert WordCounter.count(fitted) <= 40
+    assert 'Nifty rose 2.1% to 24,310' in fitted
+    assert 'weather' not in fitted
+    assert 'subscribe' not in fitted
+    assert budget.summary()['trimmed'] == 1
+    assert budget.summary()['tokens_saved'] > 0
+
+
+def test_truncate_cuts_on_a_word_boundary():
+    budget = PromptBudget(10, WordCounter(), mode='truncate')
+    fitted = budget.fit({'body': BODY})
+
+    assert fitted.endswith('...')
+    assert WordCounter.count(fitted) <= 10
+    assert BODY.startswith(fitted[:-3])
+    assert budget._truncate('short text', 10) == 'short text'
+
+
+def make_pack():
+    return [
+        {'title': 'Infosys results', 'body': 'Infosys net profit rose 12% to Rs 6,500 crore.'},
+        {'title': 'TCS order win', 'body': 'TCS won a $2 billion deal; shares rose 3%.'},
+    ]
+
+
+def test_packed_reply_is_split_per_article():
+    packer = RequestPacker(WordCounter())
+    reply = 'Sure! ```json\n' + json.dumps({
+        'A1': ['Infosys profit up 12% to Rs 6,500 crore'],
+        'A2': 'TCS won a $2 billion deal\nShares rose 3%',
+    }) + '\n```'
+    assert packer.parse(reply, make_pack()) == {
+        0: ['Infosys profit up 12% to Rs 6,500 crore'],
+        1: ['TCS won a $2 billion deal', 'Shares rose 3%'],
+    }
+
+
+def test_packed_reply_with_another_articles_numbers_is_rejected():
+    packer = RequestPacker(WordCounter())
+    reply = json.dumps({
+        'A1': ['Infosys profit rose 12%', 'Infosys won a $2 billion deal'],     # TCS's number
+        'A2': ['TCS shares rose 3%'],
+    })
+    assert packer.parse(reply, make_pack()) == {1: ['TCS shares rose 3%']}
+    assert packer.parse('not json at all', make_pack()) == {}
+
+
+def test_units_pack_short_articles_only():
+    packer = RequestPacker(WordCounter(), max_articles=2, short_tokens=20, pack_tokens=100)
+    short = [{'title': f'T{i}', 'body': 'word ' * 10} for i in range(3)]
+    long = {'title': 'Long', 'body': 'word ' * 50}
+
+    # A long article goes out on its own at once; the open pack keeps filling
+    units = packer.units(short[:1] + [long] + short[1:])
+    assert units == [[long], short[:2], short[2:]]
+    assert RequestPacker(WordCounter(), max_articles=1).units(short) == [[a] for a in short]
@@ -0,0 +1,128 @@
+"""
+Rate Limiter and Key Router Tests
+=================================
+
+Daily quota counters persisted across runs and rolled over at midnight
+(UTC), and the key router's cooldowns after 429s.
+
+Run:
+    python -m pytest -q tests/test_rate_limiter.py
+"""
+
+import json
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.processing.rate_limiter as rate_limiter
+from src.processing.key_router import DEFAULT_COOLDOWN, KeyRouter
+from src.processing.rate_limiter import QuotaExhausted, RateLimiter
+
+
+@pytest.fixture
+def today(monkeypatch):
+    """Settable UTC day for the limiter"""
+    days = ['2026-01-10']
+    monkeypatch.setattr(rate_limiter, '_today', lambda: days[-1])
+    return days
+
+
+def use(limiter, key_idx, requests):
+    for _ in range(requests):
+        assert limiter.try_acquire(key_idx, 10) == 0.0
+
+
+def test_daily_counts_survive_a_restart(tmp_path, today):
+    state = tmp_path / 'groq_quota.json'
+    limiter = RateLimiter(['key-a', 'key-b'], rpm=600, tpm=0, rpd=5, state_path=state)
+    use(limiter, 0, 3)
+    use(limiter, 1, 1)
+    limiter.save()
+
+    restarted = RateLimiter(['key-a', 'key-b'], rpm=600, tpm=0, rpd=5, state_path=state)
+    assert [k['used_today'] for k in restarted.summary()] == [3, 1]
+    assert restarted.requests_left_today() == 6
+
+
+def test_save_keeps_entries_of_other_keys(tmp_path, today):
+    state = tmp_path / 'groq_quota.json'
+    RateLimiter(['key-a'], rpm=600, tpm=0, rpd=5, state_path=state).save()
+    limiter = RateLimiter(['key-b'], rpm=600, tpm=0, rpd=5, state_path=state)
+    use(limiter, 0, 2)
+    limiter.save()
+
+    with open(state, encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved == {'key-a': {'day': '2026-01-10', 'used': 0}, 'key-b': {'day': '2026-01-10', 'used': 2}}
+
+
+def test_quota_resets_on_a_new_day(tmp_path, today):
+    state = tmp_path / 'groq_quota.json'
+    limiter = RateLimiter(['key-a'], rpm=600, tpm=0, rpd=2, state_path=state)
+    use(limiter, 0, 2)
+    with pytest.raises(QuotaExhausted):
+        limiter.try_acquire(0, 10)
+    limiter.save()
+
+    today.append('2026-01-11')
+    assert not limiter.exhausted(0)
+    assert RateLimiter(['key-a'], rpm=600, tpm=0, rpd=2, state_path=state).requests_left_today() == 2
+
+
+def test_unreadable_state_starts_from_zero(tmp_path, today):
+    state = tmp_path / 'groq_quota.json'
+    state.write_text('{"key-a": {"day": "2026-01-', encoding='utf-8')
+    limiter = RateLimiter(['key-a'], rpm=600, tpm=0, rpd=5, state_path=state)
+    assert limiter.requests_left_today() == 5
+    limiter.save()
+    assert json.loads(state.read_text(encoding='utf-8'))['key-a']['used'] == 0
+
+
+def rate_limit_error(retry=None, message='Rate limit reached on requests per minute (RPM)'):
+    error = RuntimeError(message)
+    error.status_code = 429
+    error.response = types.SimpleNamespace(headers={'retry-after': retry} if retry else {})
+    return error
+
+
+def make_router():
+    return KeyRouter(RateLimiter(['key-a', 'key-b'], rpm=600, tpm=0, rpd=0), stats={})
+
+
+def test_retry_after_takes_the_key_out_of_rotation():
+    router = make_router()
+    router.throttled(0, rate_limit_error('30'))
+
+    assert router.cooling(0)
+    assert 29 < router.keys[0].cooldown_until - time.monotonic() <= 30
+    assert router.try_acquire(10) == (1, 0.0)
+    assert router.key_usage['key_1']['throttled'] == 1
+
+
+def test_cooldown_without_retry_after_backs_off():
+    router = make_router()
+    router.throttled(0, rate_limit_error())
+    first = router.keys[0].cooldown_until - time.monotonic()
+    router.throttled(0, rate_limit_error())
+    second = router.keys[0].cooldown_until - time.monotonic()
+
+    assert DEFAULT_COOLDOWN - 1 < first <= DEFAULT_COOLDOWN
+    assert 2 * DEFAULT_COOLDOWN - 1 < second <= 2 * DEFAULT_COOLDOWN
+
+    router.finished(0, 0.1)     # A success clears the strikes
+    assert router.keys[0].strikes == 0
+
+
+def test_daily_limit_error_exhausts_the_key():
+    router = KeyRouter(RateLimiter(['key-a', 'key-b'], rpm=600, tpm=0, rpd=100))
+    router.throttled(0, rate_limit_error('1', 'Rate limit reached on requests per day (RPD)'))
+    assert router.limiter.exhausted(0)
+
+    router.throttled(1, rate_limit_error('1', 'Rate limit reached on requests per day (RPD)'))
+    with pytest.raises(QuotaExhausted):
+        router.try_acquire(10)
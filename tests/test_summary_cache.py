@@ -0,0 +1,110 @@
+"""
+Summary Cache Tests
+===================
+
+Keys of the persistent summary cache (same text, same settings), LRU
+eviction, and seeding from a summarized dataset (LLM summaries only).
+
+Run:
+    python -m pytest -q tests/test_summary_cache.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.summary_cache import SummaryCache, seed
+
+MODEL = 'llama-3.1-8b-instant'
+
+
+def article(i, **fields):
+    return dict({'url': f'https://example.com/{i}', 'title': f'Title {i}', 'body': f'Body of article {i}.',
+                 'summary': f'Summary {i}', 'summarized': True}, **fields)
+
+
+def test_seed_takes_only_llm_summaries(tmp_path):
+    dataset = tmp_path / 'summarized_dataset.json'
+    articles = [
+        article(0, summary_method='llm'),
+        article(1),                                 # Older dataset: no summary_method
+        article(2, summary_method='fallback'),
+        article(3, summary_method='extractive'),
+        article(4, summarized=False),
+    ]
+    dataset.write_text(json.dumps(articles), encoding='utf-8')
+    cache = SummaryCache(str(tmp_path / 'cache.db'))
+
+    assert seed(cache, dataset, MODEL, 1, 0.3) == 2
+
+    summaries = [cache.get(SummaryCache.key_for(a, MODEL, 1, 0.3)) for a in articles]
+    assert summaries == ['Summary 0', 'Summary 1', None, None, None]
+    cache.close()
+
+
+def test_key_ignores_case_whitespace_and_unicode_form():
+    a = {'title': 'Sensex  Gains', 'body': 'Nifty rose 1%\n to 24,000.'}
+    b = {'title': 'sensex gains', 'body': 'NIFTY ROSE 1% TO 24,000.'}
+    c = {'title': 'Sensex gains', 'body': 'Nifty rose 1\uff05 to 24,000.'}   # Fullwidth percent sign
+    keys = {SummaryCache.key_for(x, MODEL, 1, 0.3) for x in (a, b, c)}
+    assert len(keys) == 1
+
+
+def test_key_changes_with_text_model_prompt_and_temperature():
+    base = article(0)
+    key = SummaryCache.key_for(base, MODEL, 1, 0.3)
+    assert SummaryCache.key_for(base, MODEL, 1, 0.30001) == key     # Rounded to 3 places
+    assert len({
+        key,
+        SummaryCache.key_for(dict(base, body='Other body.'), MODEL, 1, 0.3),
+        SummaryCache.key_for(base, 'llama-3.3-70b-versatile', 1, 0.3),
+        SummaryCache.key_for(base, MODEL, 2, 0.3),
+        SummaryCache.key_for(base, MODEL, 1, 0.7),
+    }) == 5
+
+
+def test_put_get_counts_hits_and_misses(tmp_path):
+    cache = SummaryCache(str(tmp_path / 'cache.db'))
+    assert cache.get('k1') is None
+    cache.put('k1', 'Summary', MODEL)
+    cache.put('k2', '', MODEL)      # Empty summaries are not stored
+    assert cache.get('k1') == 'Summary'
+    assert cache.get('k2') is None
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 2, 'hit_rate': 0.333,
+                             'stores': 1, 'evictions': 0}
+    cache.close()
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = SummaryCache(str(tmp_path / 'cache.db'), max_entries=10)
+    for i in range(10):
+        cache.put(f'k{i}', f'Summary {i}', MODEL)
+        time.sleep(0.002)           # Distinct last_used times
+    assert cache.get('k0') == 'Summary 0'   # Recently used again
+
+    cache.put('k10', 'Summary 10', MODEL)   # 11 entries: within the 10% slack
+    assert len(cache) == 11
+    cache.put('k11', 'Summary 11', MODEL)   # Over the slack: back to max_entries
+
+    assert len(cache) == 10
+    assert cache.evictions == 2
+    assert cache.get('k0') == 'Summary 0'
+    assert cache.get('k1') is None and cache.get('k2') is None
+    cache.close()
+
+
+def test_prune_and_reopen(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SummaryCache(path)
+    for i in range(5):
+        cache.put(f'k{i}', f'Summary {i}', MODEL)
+        time.sleep(0.002)
+    assert cache.prune(3) == 2
+    cache.close()
+
+    reopened = SummaryCache(path)
+    assert len(reopened) == 3
+    assert reopened.get('k4') == 'Summary 4'
+    reopened.close()
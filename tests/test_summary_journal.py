@@ -0,0 +1,81 @@
+"""
+Summary Journal Tests
+=====================
+
+Replay of the append-only summary journal: torn last line, last record
+per URL wins, and materialize() retiring the journal.
+
+Run:
+    python -m pytest -q tests/test_summary_journal.py
+"""
+
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.summary_journal import SummaryJournal
+
+
+def write_journal(tmp_path):
+    """A journal with two records for a1, one for a2 and a torn last line"""
+    output = tmp_path / 'summarized_dataset.json'
+    journal = SummaryJournal.for_output(output)
+    journal.append({'url': 'a1', 'summary': 'first', 'summarized': True})
+    journal.append({'url': 'a2', 'summary': 'other', 'summarized': True})
+    journal.append({'url': 'a1', 'summary': 'second', 'summarized': True})
+    journal.close()
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "a3", "summary": "cut of')
+    return journal, output
+
+
+def test_replay_drops_torn_line_and_keeps_last_record(tmp_path):
+    journal, _ = write_journal(tmp_path)
+    torn_size = journal.path.stat().st_size
+
+    results = journal.replay()
+
+    assert results == {
+        'a1': {'summary': 'second', 'summarized': True},
+        'a2': {'summary': 'other', 'summarized': True},
+    }
+    assert journal.path.stat().st_size < torn_size
+    assert journal.path.read_bytes().endswith(b'\n')
+    assert len(journal) == 3
+
+
+def test_append_after_torn_line_starts_clean(tmp_path):
+    journal, _ = write_journal(tmp_path)
+    journal.replay()
+
+    journal.append({'url': 'a3', 'summary': 'whole', 'summarized': True})
+    journal.close()
+
+    assert SummaryJournal(journal.path).replay()['a3'] == {'summary': 'whole', 'summarized': True}
+
+
+def test_apply_updates_loaded_articles(tmp_path):
+    journal, _ = write_journal(tmp_path)
+    articles = [
+        {'url': 'a1', 'body': 'one'},
+        {'url': 'a2', 'body': 'two'},
+        {'url': 'a3', 'body': 'three'},
+    ]
+
+    assert journal.apply(articles) == 2
+    assert articles[0]['summary'] == 'second'
+    assert articles[1]['summary'] == 'other'
+    assert 'summary' not in articles[2]
+
+
+def test_materialize_writes_output_and_removes_journal(tmp_path):
+    journal, output = write_journal(tmp_path)
+    articles = [{'url': 'a1', 'body': 'one'}, {'url': 'a2', 'body': 'two'}]
+    journal.apply(articles)
+
+    assert journal.materialize(articles, output) == 2
+    assert not journal.path.exists()
+    with open(output, encoding='utf-8') as f:
+        saved = json.load(f)
+    assert [a['summary'] for a in saved] == ['second', 'other']
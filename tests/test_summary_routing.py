@@ -0,0 +1,103 @@
+"""
+Summary Routing and Extractive Backend Tests
+============================================
+
+Which articles skip the LLM (passthrough, extractive trim, no text), how
+the API budget defers the rest, and the offline extractive summaries.
+
+A whitespace word counter stands in for the tokenizer so the thresholds
+are exact.
+
+Run:
+    python -m pytest -q tests/test_summary_routing.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.summary_backends import ExtractiveBackend
+from src.processing.summary_router import SummaryRouter, noise_score
+
+
+class WordCounter:
+    name = 'words'
+
+    @staticmethod
+    def count(text):
+        return len(text.split())
+
+
+SENTENCES = [
+    "Nifty rose 2.1% to 24,310 as HDFC Bank gained after its quarterly profit beat estimates.",
+    "Sensex added 640 points while foreign investors bought shares worth Rs 1,200 crore.",
+    "Reliance Industries shares climbed 3% after the company announced a new energy unit.",
+    "The rupee strengthened to 83.10 against the dollar on steady foreign inflows.",
+    "Analysts said the rally could extend if the RBI holds rates at 6.5% next week.",
+    "Infosys slipped 1.2% after a brokerage cut its target price to Rs 1,450.",
+    "Bank Nifty ended at a record high of 52,000 led by private lenders.",
+    "Crude oil prices eased to $78 a barrel, helping oil marketing companies.",
+]
+
+
+def body(sentences):
+    return ' '.join(sentences)
+
+
+def make_router():
+    return SummaryRouter(WordCounter(), finbert_tokens=60, extractive_tokens=120, reserve=0.0)
+
+
+def test_routes_by_length_and_noise():
+    router = make_router()
+    clean = {'url': 'clean', 'body': body(SENTENCES[:3])}
+    noisy = {'url': 'noisy', 'body': body(SENTENCES[:2]) + ' Click here to subscribe. Share. Share. Read more.'}
+    near = {'url': 'near', 'body': body(SENTENCES)}
+    long = {'url': 'long', 'body': body(SENTENCES * 2)}
+    empty = {'url': 'empty', 'body': '  '}
+
+    plan = router.route([clean, noisy, near, long, empty])
+
+    assert plan == {'passthrough': [clean], 'extractive': [noisy, near], 'llm': [long], 'skip': [empty]}
+    assert noise_score(clean['body']) == 0.0
+    assert empty['summary_error'] == empty['route_reason'] and empty['summarized'] is False
+    assert 'tokens' in long['route_reason']
+
+
+def test_local_text_fits_finbert():
+    router = make_router()
+    clean = {'body': body(SENTENCES[:3])}
+    near = {'title': 'Nifty at record', 'body': body(SENTENCES)}
+    router.route([clean, near])
+
+    assert router.text(clean) == clean['body']
+    assert WordCounter.count(router.text(near)) <= 60
+
+
+def test_defer_keeps_the_longest_for_the_llm():
+    router = make_router()
+    articles = [{'url': str(n), 'body': body(SENTENCES * n)} for n in (2, 4, 3)]
+    plan = router.route(articles)
+
+    llm, deferred = router.defer(plan['llm'], requests_left=2)
+    assert [a['url'] for a in llm] == ['4', '3']
+    assert [a['url'] for a in deferred] == ['2']
+    assert 'API budget: 2 requests left today' in deferred[0]['route_reason']
+    assert dict(router.stats) == {'long': 2, 'budget': 1}
+    assert router.defer(plan['llm'], requests_left=None) == (plan['llm'], [])
+
+
+def test_extractive_summaries_are_body_sentences():
+    backend = ExtractiveBackend(min_facts=3, max_facts=4)
+    article = {'title': 'Nifty hits record as banks rally', 'body': body(SENTENCES)}
+    short = {'title': 'Rupee', 'body': body(SENTENCES[3:5])}
+
+    summary, short_summary, empty = backend.summarize_many([article, short, {'body': ''}])
+
+    facts = summary.split('\n')
+    assert 3 <= len(facts) <= 4
+    assert all(fact in SENTENCES for fact in facts)
+    assert facts == sorted(facts, key=SENTENCES.index)      # Article order
+    assert short_summary.split('\n') == SENTENCES[3:5]
+    assert empty is None
@@ -0,0 +1,99 @@
+"""
+Summary Scheduler Tests
+=======================
+
+Runs the quota-aware scheduler end to end against the local mock LLM
+server (tests/mock_llm_server.py): the first cycle uses up the day's
+quota, the fake sleep moves the clock to the next day, and the second
+cycle drains the backlog.
+
+Run:
+    python -m pytest -q tests/test_summary_scheduler.py
+"""
+
+import sys
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.processing.rate_limiter as rate_limiter
+from src.processing.parallel_summarizer import ParallelSummarizer
+from src.processing.summary_scheduler import SummaryQueue, SummaryScheduler
+from src.scraping.article_record import dump_articles, load_articles
+from mock_llm_server import MockLLMServer
+
+REQUESTS_PER_DAY = 4
+
+
+def write_config(tmp_path, base_url):
+    """One mock key with a small daily quota; every state file under tmp_path"""
+    config = {
+        'llm': {
+            'groq': {'api_key': 'gsk_mock_1', 'api_keys': ['gsk_mock_1'], 'model': 'llama-3.1-8b-instant',
+                     'base_url': base_url},
+            'summarization': {'max_input_tokens': 2000, 'temperature': 0.3, 'max_tokens': 500},
+            'rate_limit': {
+                'max_requests_per_minute': 600,
+                'max_requests_per_day': REQUESTS_PER_DAY,
+                'retry_attempts': 1,
+                'retry_delay': 0,
+                'state_path': str(tmp_path / 'groq_quota.json'),
+            },
+            'packing': {'enabled': False},
+            'routing': {'enabled': False},
+            'metrics': {'path': str(tmp_path / 'metrics' / 'summarizer')},
+            'scheduler': {'queue_path': str(tmp_path / 'summary_queue.db'), 'resume_margin_seconds': 0},
+            'fallback': 'none',
+        }
+    }
+    path = tmp_path / 'config.yaml'
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def make_articles(count):
+    return [{
+        'url': f'https://example.com/markets/{i}',
+        'title': f'Nifty update {i}',
+        'body': f'Nifty rose {i + 1}% to 24,{i:03d} as banks gained. ' * 40,
+        'published_date': f'{i % 3 + 1:02d}/01/2026',
+        'processing': 'needs_summary',
+    } for i in range(count)]
+
+
+def test_two_cycles_across_a_quota_reset(tmp_path, monkeypatch):
+    days = ['2026-01-10']
+    monkeypatch.setattr(rate_limiter, '_today', lambda: days[-1])
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) > 3:
+            raise KeyboardInterrupt     # Never loop forever on a regression
+        days.append(f'2026-01-{10 + len(sleeps)}')
+
+    articles = make_articles(REQUESTS_PER_DAY + 2)
+    input_path = tmp_path / 'input.json'
+    output_path = tmp_path / 'output.json'
+    dump_articles(articles, input_path)
+
+    with MockLLMServer() as server:
+        config_path = write_config(tmp_path, server.base_url)
+        scheduler = SummaryScheduler(lambda: ParallelSummarizer(str(config_path), use_cache=False),
+                                     sleep=fake_sleep)
+        scheduler.run(str(input_path), str(output_path))
+
+    assert scheduler.cycles == 2
+    assert len(sleeps) == 1 and 0 < sleeps[0] <= 24 * 3600
+    assert server.snapshot()['requests'] == len(articles)
+
+    output = load_articles(output_path)
+    assert sum(1 for a in output if a.get('summarized')) == len(articles)
+
+    queue = SummaryQueue(str(tmp_path / 'summary_queue.db'))
+    assert queue.counts() == {'pending': 0, 'done': len(articles), 'parked': 0, 'no_text': 0}
+    queue.close()